@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+# Simulated broker of backtest, orders, positions, trades and cash stay in memory until saved
+
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from django.db import transaction
+from common import constants
+from common.enums import ActionType, SetupType
+from webull_trader.models import BacktestDayPerformance, BacktestOrder, BacktestTrade
+
+INIT_BALANCE: float = 30000.0
+
+
+# Simulated position class, open position of a symbol
+class SimulatedPosition:
+
+    def __init__(self, symbol: str, ticker_id: str, setup: SetupType, buy_time: datetime,
+                 target_units: int = 4, stop_loss_price: float = 0.0):
+        self.symbol: str = symbol
+        self.ticker_id: str = ticker_id
+        self.setup: SetupType = setup
+        self.order_ids: List[str] = []
+        self.total_cost: float = 0.0
+        self.quantity: int = 0
+        self.units: int = 0
+        self.target_units: int = target_units
+        self.add_unit_price: float = constants.MAX_SECURITY_PRICE
+        self.stop_loss_price: float = stop_loss_price
+        self.buy_date: date = buy_time.date()
+        self.buy_time: datetime = buy_time
+
+
+# Simulated broker class, fill limit orders at order price and keep cash ledger of a backtest day
+class SimulatedBroker:
+
+    def __init__(self, trading_date: date, balance: float = INIT_BALANCE):
+        self.trading_date: date = trading_date
+        self.init_balance: float = balance
+        self.balance: float = balance
+        self.min_balance: float = balance
+        # tightest cash margins of passed and blocked cash checks, decide if day replays with other balance
+        self.min_pass_margin: Optional[float] = None
+        self.max_block_margin: Optional[float] = None
+        # cash ledger of (time, change, order id)
+        self.ledger: List[Tuple[datetime, float, str]] = []
+        # order ids unique for trading date
+        self.order_id: int = int(trading_date.strftime("%Y%m%d")) * 1000000
+        self.orders: List[BacktestOrder] = []
+        self.positions: Dict[str, SimulatedPosition] = {}
+        self.trades: List[BacktestTrade] = []
+
+    def _fill_order(self, symbol: str, ticker_id: str, action: ActionType, quantity: int, price: float,
+                    time: datetime, setup: SetupType, note: str) -> BacktestOrder:
+        self.order_id += 1
+        order = BacktestOrder(
+            order_id=str(self.order_id),
+            ticker_id=ticker_id,
+            symbol=symbol,
+            action=action,
+            quantity=quantity,
+            price=price,
+            filled_time=time,
+            trading_date=self.trading_date,
+            setup=setup,
+            note=note,
+        )
+        self.orders.append(order)
+        change = round(quantity * price, 2)
+        if action == ActionType.BUY:
+            change = -change
+        self.balance = round(self.balance + change, 2)
+        self.min_balance = min(self.min_balance, self.balance)
+        self.ledger.append((time, change, order.order_id))
+        return order
+
+    def get_balance(self) -> float:
+        return self.balance
+
+    def get_min_balance(self) -> float:
+        return self.min_balance
+
+    def has_cash(self, amount: float) -> bool:
+        """
+        check usable cash for order amount, keep margin of the check
+        """
+        margin = self.balance - amount
+        if margin > 0:
+            if self.min_pass_margin == None or margin < self.min_pass_margin:
+                self.min_pass_margin = margin
+            return True
+        if self.max_block_margin == None or margin > self.max_block_margin:
+            self.max_block_margin = margin
+        return False
+
+    def rebase(self, balance: float) -> bool:
+        """
+        move day account to start from carried balance, false if any cash check
+        would pass or block differently so the day has to be replayed
+        """
+        delta = balance - self.init_balance
+        if self.min_pass_margin != None and self.min_pass_margin + delta <= 0:
+            return False
+        if self.max_block_margin != None and self.max_block_margin + delta > 0:
+            return False
+        self.init_balance = balance
+        self.balance = round(self.balance + delta, 2)
+        self.min_balance = round(self.min_balance + delta, 2)
+        if self.min_pass_margin != None:
+            self.min_pass_margin += delta
+        if self.max_block_margin != None:
+            self.max_block_margin += delta
+        return True
+
+    def get_total_pl(self) -> float:
+        return round(self.balance - self.init_balance, 2)
+
+    def get_total_pl_rate(self) -> float:
+        return round((self.balance - self.init_balance) / self.init_balance, 2)
+
+    def get_position(self, symbol: str) -> Optional[SimulatedPosition]:
+        return self.positions.get(symbol)
+
+    def buy(self, symbol: str, ticker_id: str, quantity: int, price: float, time: datetime, setup: SetupType,
+            note: str, target_units: int = 4, stop_loss_price: float = 0.0) -> BacktestOrder:
+        """
+        fill buy order, open or add to position
+        """
+        order = self._fill_order(
+            symbol, ticker_id, ActionType.BUY, quantity, price, time, setup, note)
+        position = self.positions.get(symbol)
+        if position == None:
+            position = SimulatedPosition(symbol, ticker_id, setup, time,
+                                         target_units=target_units, stop_loss_price=stop_loss_price)
+            self.positions[symbol] = position
+        position.order_ids.append(order.order_id)
+        position.quantity += quantity
+        position.total_cost = round(position.total_cost + quantity * price, 2)
+        position.units += 1
+        return order
+
+    def sell(self, symbol: str, ticker_id: str, price: float, time: datetime, note: str) -> Optional[BacktestTrade]:
+        """
+        fill sell order of whole position, close position as trade
+        """
+        position = self.positions.pop(symbol, None)
+        if position == None:
+            return None
+        order = self._fill_order(
+            symbol, ticker_id, ActionType.SELL, position.quantity, price, time, position.setup, note)
+        trade = BacktestTrade(
+            symbol=symbol,
+            ticker_id=ticker_id,
+            order_ids=",".join(position.order_ids + [order.order_id]),
+            total_cost=position.total_cost,
+            total_sold=round(price * position.quantity, 2),
+            quantity=position.quantity,
+            units=position.units,
+            buy_date=position.buy_date,
+            buy_time=position.buy_time,
+            sell_date=time.date(),
+            sell_time=time,
+            setup=position.setup,
+        )
+        self.trades.append(trade)
+        return trade
+
+    def get_gains(self) -> List[float]:
+        return [round(trade.total_sold - trade.total_cost, 2) for trade in self.trades]
+
+
+def get_trades_performance(gains: List[float]) -> dict:
+    """
+    trades, profit loss, win rate and profit/loss ratio, same as day trade performance
+    """
+    win_gains = [gain for gain in gains if gain > 0]
+    loss_gains = [gain for gain in gains if gain <= 0]
+    win_rate = 0.0
+    if len(gains) > 0:
+        win_rate = round(len(win_gains) / len(gains) * 100, 2)
+    avg_profit = 0.0
+    if len(win_gains) > 0:
+        avg_profit = sum(win_gains) / len(win_gains)
+    avg_loss = 0.0
+    if len(loss_gains) > 0:
+        avg_loss = abs(sum(loss_gains) / len(loss_gains))
+    profit_loss_ratio = 1.0
+    if avg_loss > 0:
+        profit_loss_ratio = round(avg_profit / avg_loss, 2)
+    return {
+        "trades": len(gains),
+        "profit_loss": round(sum(gains), 2),
+        "win_rate": win_rate,
+        "profit_loss_ratio": profit_loss_ratio,
+    }
+
+
+def save_results(brokers: List[SimulatedBroker]):
+    """
+    replace backtest results with day brokers, day profit loss merged into account curve in date order,
+    brokers rebased to carried balances or not
+    """
+    orders = []
+    trades = []
+    day_perfs = []
+    net_liquidation = INIT_BALANCE
+    for broker in sorted(brokers, key=lambda broker: broker.trading_date):
+        # day account starts from net liquidation of previous day
+        day_init_balance = net_liquidation
+        net_liquidation = round(net_liquidation + broker.get_total_pl(), 2)
+        performance = get_trades_performance(broker.get_gains())
+        day_perfs.append(BacktestDayPerformance(
+            date=broker.trading_date,
+            trades=performance["trades"],
+            win_rate=performance["win_rate"],
+            profit_loss_ratio=performance["profit_loss_ratio"],
+            day_profit_loss=broker.get_total_pl(),
+            total_buy_amount=round(
+                sum(trade.total_cost for trade in broker.trades), 2),
+            total_sell_amount=round(
+                sum(trade.total_sold for trade in broker.trades), 2),
+            min_usable_cash=round(
+                broker.get_min_balance() - broker.init_balance + day_init_balance, 2),
+            net_liquidation=net_liquidation,
+            total_profit_loss=round(net_liquidation - INIT_BALANCE, 2),
+            total_profit_loss_rate=round(
+                (net_liquidation - INIT_BALANCE) / INIT_BALANCE, 2),
+        ))
+        orders.extend(broker.orders)
+        trades.extend(broker.trades)
+    with transaction.atomic():
+        BacktestOrder.objects.all().delete()
+        BacktestTrade.objects.all().delete()
+        BacktestDayPerformance.objects.all().delete()
+        BacktestOrder.objects.bulk_create(orders)
+        BacktestTrade.objects.bulk_create(trades)
+        BacktestDayPerformance.objects.bulk_create(day_perfs)
+
+
+def chain_balances(brokers: List[SimulatedBroker], replay_day) -> List[SimulatedBroker]:
+    """
+    carry ending balance of each day into next day in date order, days run in parallel from
+    init balance are rebased, or replayed by replay_day(trading_date, balance) if cash limits differ
+    """
+    chained = []
+    balance = INIT_BALANCE
+    for broker in sorted(brokers, key=lambda broker: broker.trading_date):
+        if not broker.rebase(balance):
+            broker = replay_day(broker.trading_date, balance)
+            if broker == None:
+                continue
+        chained.append(broker)
+        balance = broker.get_balance()
+    return chained
@@ -1,5 +1,10 @@
 # backtest config
 
+# max worker processes to backtest days in parallel, 0 for cpu count
+BACKTEST_MAX_WORKERS = 0
+# tag of backtest trading logs
+BACKTEST_LOG_TAG = "BACKTEST"
+
 # min gap ratio for momo, breakout strategy
 MIN_SURGE_CHANGE_RATIO = 0.04
 # min surge volume for momo, breakout strategy
@@ -3,12 +3,40 @@
 # Trading executor class
 
 from datetime import datetime, timedelta, date
+from typing import List, Optional
 from common.enums import AlgorithmType, TradingHourType
 from common import db
 from logger import trading_logger
+from backtest.broker import INIT_BALANCE, SimulatedBroker
 from backtest.strategy.strategy_base import BacktestStrategyBase
 
 
+def get_trading_time_range(trading_date: date, trading_hour: TradingHourType) -> List[datetime]:
+    """
+    first and last trading minute of the trading hour
+    """
+    if trading_hour == TradingHourType.BEFORE_MARKET_OPEN:
+        return [
+            datetime(trading_date.year, trading_date.month,
+                     trading_date.day, 4, 2),
+            datetime(trading_date.year, trading_date.month,
+                     trading_date.day, 9, 28),
+        ]
+    if trading_hour == TradingHourType.AFTER_MARKET_CLOSE:
+        return [
+            datetime(trading_date.year, trading_date.month,
+                     trading_date.day, 16, 2),
+            datetime(trading_date.year, trading_date.month,
+                     trading_date.day, 19, 58),
+        ]
+    return [
+        datetime(trading_date.year, trading_date.month,
+                 trading_date.day, 9, 32),
+        datetime(trading_date.year, trading_date.month,
+                 trading_date.day, 15, 58),
+    ]
+
+
 class BacktestExecutor:
 
     from common.enums import TradingHourType
@@ -21,26 +49,8 @@ class BacktestExecutor:
         self.trading_hour: TradingHourType = trading_hour
         self.strategy: BacktestStrategyBase = strategy
         # set trading time
-        self.trading_time_range = [
-            datetime(trading_date.year, trading_date.month,
-                     trading_date.day, 9, 32),
-            datetime(trading_date.year, trading_date.month,
-                     trading_date.day, 15, 58),
-        ]
-        if trading_hour == TradingHourType.BEFORE_MARKET_OPEN:
-            self.trading_time_range = [
-                datetime(trading_date.year, trading_date.month,
-                         trading_date.day, 4, 2),
-                datetime(trading_date.year, trading_date.month,
-                         trading_date.day, 9, 28),
-            ]
-        if trading_hour == TradingHourType.AFTER_MARKET_CLOSE:
-            self.trading_time_range = [
-                datetime(trading_date.year, trading_date.month,
-                         trading_date.day, 16, 2),
-                datetime(trading_date.year, trading_date.month,
-                         trading_date.day, 19, 58),
-            ]
+        self.trading_time_range = get_trading_time_range(
+            trading_date, trading_hour)
 
     def start(self):
 
@@ -72,6 +82,7 @@ class BacktestExecutor:
 
         trading_logger.log("Trading ended!")
         trading_logger.write(self.trading_hour, self.trading_date)
+        trading_logger.flush()
 
     # load settings
 
@@ -93,63 +104,92 @@ class BacktestExecutor:
         )
 
 
-def start():
-    from datetime import date
-    from webull_trader.models import WebullAccountStatistics, WebullOrder, DayTrade, DayPosition, TradingLog
-    from backtest.executor import BacktestExecutor
-    from common.enums import TradingHourType
-    from common import utils, db
-    from backtest.tracker import account_tracker
-    from scripts import calculate_histdata
-
-    # remove all existing trades, orders
-    WebullOrder.objects.all().delete()
-    DayTrade.objects.all().delete()
-    DayPosition.objects.all().delete()
-    TradingLog.objects.all().delete()
-
-    # backtest function
-    def backtest(trading_date: date, trading_hour: TradingHourType):
-        from backtest.strategy.day_breakout import BacktestDayTradingBreakoutDynExit
-        strategy = BacktestDayTradingBreakoutDynExit(
-            trading_date=trading_date, trading_hour=trading_hour, entry_period=20, exit_period=9)
-        # from backtest.strategy.day_scalping import BacktestDayTradingScalping
-        # strategy = BacktestDayTradingScalping(
-        #     trading_date=trading_date, trading_hour=trading_hour, entry_period=20)
-        executor = BacktestExecutor(
-            strategy=strategy, trading_date=trading_date, trading_hour=trading_hour)
-        print(
-            f"[{utils.get_now()}] Backtesting for {trading_date} ({TradingHourType.tostr(trading_hour)})...")
-        executor.start()
-
-    trading_statistics = WebullAccountStatistics.objects.all()
-    for trading_stat in trading_statistics:
-        trading_stat: WebullAccountStatistics = trading_stat
-        trading_date = trading_stat.date
+def init_backtest_worker():
+    import django
+    from django.db import connections
+    django.setup()
+    # worker process opens its own db connections
+    connections.close_all()
+
+
+def backtest_day(trading_date: date, balance: float = INIT_BALANCE) -> Optional[SimulatedBroker]:
+    """
+    backtest all trading hours of the day with its own simulated broker, none if the day failed
+    """
+    from backtest.strategy.day_breakout import BacktestDayTradingBreakoutDynExit
+    from backtest import config
+    from common import utils
+
+    # keep backtest logs apart from live trading logs
+    trading_logger.set_tag(config.BACKTEST_LOG_TAG)
+    broker = SimulatedBroker(trading_date, balance=balance)
+    try:
         for trading_hour in [TradingHourType.BEFORE_MARKET_OPEN, TradingHourType.REGULAR, TradingHourType.AFTER_MARKET_CLOSE]:
-            backtest(trading_date, trading_hour)
-        # calculate data
-        calculate_histdata.start(day=trading_date)
-        # save account stat
-        db.save_webull_account(
-            {
-                "accountMembers": [
-                    {
-                        "key": "dayProfitLoss",
-                        "value": db.get_hist_day_perf(day=trading_date).day_profit_loss,
-                    },
-                    {
-                        "key": "usableCash",
-                        "value": account_tracker.get_balance(),
-                    },
-                ],
-                "netLiquidation": account_tracker.get_balance(),
-                "totalProfitLoss": account_tracker.get_total_pl(),
-                "totalProfitLossRate": account_tracker.get_total_pl_rate(),
-            },
-            paper=True,
-            day=trading_date,
-        )
+            strategy = BacktestDayTradingBreakoutDynExit(
+                trading_date=trading_date, trading_hour=trading_hour, entry_period=20, exit_period=9)
+            # from backtest.strategy.day_scalping import BacktestDayTradingScalping
+            # strategy = BacktestDayTradingScalping(
+            #     trading_date=trading_date, trading_hour=trading_hour, entry_period=20)
+            strategy.set_broker(broker)
+            executor = BacktestExecutor(
+                strategy=strategy, trading_date=trading_date, trading_hour=trading_hour)
+            print(
+                f"[{utils.get_now()}] Backtesting for {trading_date} ({TradingHourType.tostr(trading_hour)})...")
+            executor.start()
+    except Exception as e:
+        # failed day not abort other days in pool
+        print(f"[{utils.get_now()}] Backtest for {trading_date} error: {e}")
+        return None
+    return broker
+
+
+def replay_day(trading_date: date, balance: float) -> Optional[SimulatedBroker]:
+    """
+    backtest the day again from carried balance, logs of first run replaced
+    """
+    from webull_trader.models import TradingLog
+    from backtest import config
+    from common import utils
+
+    print(f"[{utils.get_now()}] Replaying {trading_date} from balance {balance}...")
+    TradingLog.objects.filter(
+        tag=config.BACKTEST_LOG_TAG, date=trading_date).delete()
+    return backtest_day(trading_date, balance=balance)
+
+
+def start():
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from django.db import connections
+    from webull_trader.models import WebullAccountStatistics, TradingLog
+    from backtest.executor import backtest_day, init_backtest_worker, replay_day
+    from backtest.broker import chain_balances, save_results
+    from backtest import config
+    from common import utils
+
+    # remove logs of last backtest
+    TradingLog.objects.filter(tag=config.BACKTEST_LOG_TAG).delete()
+
+    trading_dates = list(WebullAccountStatistics.objects.order_by(
+        'date').values_list('date', flat=True))
+
+    # backtest days in worker processes, connections are not shared with workers
+    connections.close_all()
+    max_workers = config.BACKTEST_MAX_WORKERS or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_backtest_worker) as pool:
+        results = list(pool.map(backtest_day, trading_dates))
+    brokers = [broker for broker in results if broker != None]
+    failed_dates = [trading_date for trading_date,
+                    broker in zip(trading_dates, results) if broker == None]
+    if len(failed_dates) > 0:
+        print("[{}] Backtest failed for {} days: {}".format(
+            utils.get_now(), len(failed_dates), ", ".join(str(trading_date) for trading_date in failed_dates)))
+
+    # days start from init balance in workers, carry balances in date order
+    brokers = chain_balances(brokers, replay_day)
+
+    # save orders, trades and account curve of all days at once
+    save_results(brokers)
 
 
 if __name__ == "django.core.management.commands.shell":
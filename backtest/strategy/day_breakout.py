@@ -61,16 +61,23 @@ class BacktestDayTradingBreakout(BacktestStrategyBase):
             trading_logger.log(
                 "<{}> price is not above vwap, no entry!".format(symbol))
             return False
-        period_bars = bars.head(len(bars) - 1).tail(self.entry_period)
-        period_high_price = 0
-        period_low_price = constants.MAX_SECURITY_PRICE
-        for _, row in period_bars.iterrows():
-            # use close price for period high
-            if row['close'] > period_high_price:
-                period_high_price = row['close']
-            # use low price for period low
-            if row['low'] < period_low_price:
-                period_low_price = row['low']
+        period_window = self.get_period_window(
+            ticker, bars, self.entry_period) if self.time_scale == 1 else None
+        if period_window:
+            # use close price for period high, low price for period low
+            period_high_price = period_window.get_max_close()
+            period_low_price = period_window.get_min_low()
+        else:
+            period_bars = bars.head(len(bars) - 1).tail(self.entry_period)
+            period_high_price = 0
+            period_low_price = constants.MAX_SECURITY_PRICE
+            for _, row in period_bars.iterrows():
+                # use close price for period high
+                if row['close'] > period_high_price:
+                    period_high_price = row['close']
+                # use low price for period low
+                if row['low'] < period_low_price:
+                    period_low_price = row['low']
 
         # check if new high
         if current_price <= period_high_price:
@@ -304,9 +311,7 @@ class BacktestDayTradingBreakout(BacktestStrategyBase):
 
     def get_price_rate_of_change(self, bars: pd.DataFrame, period: int = 10) -> float:
         period = min(len(bars) - 1, period)
-        period_bars = bars.tail(period + 1)
-        period_bars = period_bars.head(period)
-        period_price = period_bars.iloc[0]['close']
+        period_price = bars.iloc[-period - 1]['close']
         current_price = bars.iloc[-1]['close']
         ROC = (current_price - period_price) / period_price * 100
         return ROC
@@ -335,7 +340,8 @@ class BacktestDayTradingBreakout(BacktestStrategyBase):
                 bars = utils.convert_5m_bars(m1_bars)
 
             # calculate and fill ema 9 data
-            bars['ema9'] = bars['close'].ewm(span=9, adjust=False).mean()
+            if 'ema9' not in bars:
+                bars['ema9'] = bars['close'].ewm(span=9, adjust=False).mean()
 
             # check entry: current price above vwap, entry period minutes new high
             if self.check_entry(ticker, bars):
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+from backtest.strategy.strategy_base import BacktestStrategyBase
+from common.enums import SetupType
+from logger import trading_logger
+from trading.tracker.trading_tracker import TrackingTicker
+
+
+def get_breakout_setup(entry_period: int) -> SetupType:
+    if entry_period == 30:
+        return SetupType.DAY_30_CANDLES_NEW_HIGH
+    elif entry_period == 20:
+        return SetupType.DAY_20_CANDLES_NEW_HIGH
+    return SetupType.DAY_10_CANDLES_NEW_HIGH
+
+
+# Signal breakout day trade backtest class, entry and exit only depend on bar history,
+# same rules as vectorized backtest
+
+class BacktestDayTradingSignalBreakout(BacktestStrategyBase):
+
+    import pandas as pd
+    from datetime import date
+    from common.enums import SetupType, TradingHourType
+    from typing import Tuple
+    from trading.tracker.trading_tracker import TrackingTicker
+
+    def __init__(self, trading_date: date, trading_hour: TradingHourType, entry_period: int = 20, exit_period: int = 10):
+        super().__init__(trading_date=trading_date, trading_hour=trading_hour)
+        self.entry_period: int = entry_period
+        self.exit_period: int = exit_period
+
+    def get_tag(self) -> str:
+        return "BacktestDayTradingSignalBreakout"
+
+    def get_setup(self) -> SetupType:
+        return get_breakout_setup(self.entry_period)
+
+    def check_entry(self, ticker: TrackingTicker, bars: pd.DataFrame) -> bool:
+        symbol = ticker.get_symbol()
+        current_candle = bars.iloc[-1]
+        current_price = current_candle['close']
+        # check if above vwap and ema 9
+        if current_price <= current_candle['vwap'] or current_price <= current_candle['ema9']:
+            return False
+        # need full entry period bars
+        period_window = self.get_period_window(ticker, bars, self.entry_period)
+        if not period_window or period_window.count < self.entry_period:
+            return False
+        # check if new high
+        if current_price <= period_window.get_max_close():
+            return False
+        trading_logger.log(
+            f"<{symbol}> price ${current_price} breakout high ${period_window.get_max_close()}, entry!")
+        # for backtesting
+        ticker.set_backtest_buy_price(current_price)
+        return True
+
+    def check_exit(self, ticker: TrackingTicker, bars: pd.DataFrame) -> Tuple[bool, str]:
+        symbol = ticker.get_symbol()
+        current_price = bars.iloc[-1]['close']
+        period_closes = bars['close'].iloc[-self.exit_period - 1:-1]
+        if period_closes.empty:
+            return (False, None)
+        # check if new low
+        period_low_price = period_closes.min()
+        if current_price >= period_low_price:
+            return (False, None)
+        trading_logger.log("<{}> new period low price, new low: {}, period low: {}, exit!".format(
+            symbol, current_price, period_low_price))
+        # for backtesting
+        ticker.set_backtest_sell_price(current_price)
+        return (True, "{} candles new low.".format(self.exit_period))
+
+    def trade(self, ticker: TrackingTicker):
+        bars = self.backtest_df[ticker.get_symbol()]
+        # only check bar of current minute once
+        if bars.empty or bars.index[-1] != self.trading_time:
+            return
+        if ticker.get_positions() == 0:
+            if self.check_entry(ticker, bars):
+                self.submit_buy_limit_order(ticker)
+        else:
+            exit_trading, exit_note = self.check_exit(ticker, bars)
+            if exit_trading:
+                self.submit_sell_limit_order(ticker, note=exit_note)
+
+    def update(self):
+        super().update()
+
+        for backtest_ticker in self.backtest_tickers:
+            ticker_id = str(backtest_ticker["ticker_id"])
+            if not self.trading_tracker.is_tracking(ticker_id):
+                self.trading_tracker.start_tracking(
+                    TrackingTicker(backtest_ticker["symbol"], ticker_id))
+            # do trade
+            self.trade(self.trading_tracker.get_ticker(ticker_id))
+
+    def end(self):
+        self.trading_end = True
+
+        # sell holding positions at last close
+        for ticker_id in self.trading_tracker.get_tickers():
+            ticker = self.trading_tracker.get_ticker(ticker_id)
+            if ticker.get_positions() > 0:
+                ticker.set_backtest_sell_price(self.day_bar_cache.get_last_close(
+                    ticker.get_symbol(), self.trading_time))
+        self.clear_positions()
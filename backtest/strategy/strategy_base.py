@@ -4,16 +4,17 @@
 
 import time
 import pandas as pd
-from datetime import datetime, date, timedelta
-from typing import List, TypedDict
+from datetime import datetime, date
+from typing import List, Optional, TypedDict
 from backtest.pattern import BacktestPattern
-from backtest.tracker import order_tracker, account_tracker
+from backtest.broker import SimulatedBroker
+from backtest.tracker.day_bar_cache import DayBarCache, DayPeriodWindow
 from logger import trading_logger
-from common import db, utils
+from common import config
 from django.utils import timezone
-from common.enums import ActionType, OrderType, SetupType, TimeInForceType, TradingHourType
+from common.enums import SetupType, TradingHourType
 from trading.tracker.trading_tracker import TradingTracker
-from webull_trader.models import DayPosition, HistoricalMinuteBar, WebullOrder
+from webull_trader.models import BacktestOrder, BacktestTrade
 
 
 class BacktestStrategyBase:
@@ -31,6 +32,14 @@ class BacktestStrategyBase:
         self.backtest_tickers: List[dict] = []
         self.backtest_df: TypedDict[str, pd.DataFrame] = {}
         self.backtest_pattern: BacktestPattern = BacktestPattern()
+        self.day_bar_cache: DayBarCache = DayBarCache()
+        self.broker: SimulatedBroker = SimulatedBroker(trading_date)
+
+    def set_broker(self, broker: SimulatedBroker):
+        self.broker = broker
+
+    def set_day_bar_cache(self, day_bar_cache: DayBarCache):
+        self.day_bar_cache = day_bar_cache
 
     def set_trading_time(self, time: datetime):
         # set ny timezone
@@ -38,13 +47,11 @@ class BacktestStrategyBase:
         self.backtest_pattern.set_trading_time(time)
 
     def begin(self):
+        # load all bars of the day once, unless cache is shared
+        if self.day_bar_cache.trading_date != self.trading_date:
+            self.day_bar_cache.load(self.trading_date)
         # prepare symbols
-        bars = HistoricalMinuteBar.objects.filter(date=self.trading_date)
-        symbol_list = []
-        for bar in bars:
-            bar: HistoricalMinuteBar = bar
-            if bar.symbol not in symbol_list:
-                symbol_list.append(bar.symbol)
+        symbol_list = sorted(self.day_bar_cache.get_symbols())
         current_t = int(time.time())
         # attach ticker id
         for symbol in symbol_list:
@@ -60,18 +67,19 @@ class BacktestStrategyBase:
         trading_logger.log("")
         # clean bars
         self.backtest_df = {}
-        # prepare symbol minute bars
+        # prepare symbol minute bars from day cache
         for ticker in self.backtest_tickers:
             symbol = ticker['symbol']
-            minute_bars = HistoricalMinuteBar.objects.filter(
-                date=self.trading_date, symbol=symbol, time__lte=self.trading_time).order_by('-id')[:60]
-            # minute_bars = list(reversed(minute_bars))
-            bars_df = utils.get_minute_bars_df(minute_bars)
-            self.backtest_df[symbol] = bars_df
+            self.backtest_df[symbol] = self.day_bar_cache.get_bars(
+                symbol, self.trading_time, config.DAY_BAR_CACHE_SIZE)
 
     def end(self):
         pass
 
+    def get_period_window(self, ticker: TrackingTicker, bars: pd.DataFrame, period: int) -> Optional[DayPeriodWindow]:
+        # use precomputed window of day bars if bars are 1m bars of the day
+        return self.day_bar_cache.get_period_window(ticker.get_symbol(), bars, period)
+
     def final(self):
         pass
 
@@ -147,13 +155,9 @@ class BacktestStrategyBase:
     def get_position(self, ticker: TrackingTicker) -> dict:
         symbol = ticker.get_symbol()
         # get current price
-        current_bar = None
-        bar_time = self.trading_time
-        while current_bar == None:
-            current_bar = db.get_hist_minute_bar(symbol, bar_time)
-            bar_time = bar_time - timedelta(minutes=1)
-        current_price = current_bar.close
-        position = DayPosition.objects.filter(symbol=symbol).first()
+        current_price = self.day_bar_cache.get_last_close(
+            symbol, self.trading_time)
+        position = ticker.get_position_obj()
         quantity = position.quantity
         avg_cost = position.total_cost / quantity
         unrealized_pl = round((current_price - avg_cost) / avg_cost, 2)
@@ -166,10 +170,9 @@ class BacktestStrategyBase:
     def submit_buy_limit_order(self, ticker: TrackingTicker, note: str = "Entry point."):
         symbol = ticker.get_symbol()
         ticker_id = ticker.get_id()
-        usable_cash = account_tracker.get_balance()
-        db.save_webull_min_usable_cash(usable_cash, day=self.trading_date)
+        usable_cash = self.broker.get_balance()
         buy_position_amount = self.get_buy_order_limit(ticker)
-        if usable_cash <= buy_position_amount:
+        if not self.broker.has_cash(buy_position_amount):
             trading_logger.log(
                 "Not enough cash to buy <{}>, cash left: {}!".format(symbol, usable_cash))
             return
@@ -177,75 +180,36 @@ class BacktestStrategyBase:
 
         buy_quant = (int)(buy_position_amount / buy_price)
         if buy_quant > 0:
-            # create webull buy order
-            order_id = order_tracker.get_next_order_id()
-            trading_logger.log(
-                f"🟢 Submit buy order {order_id}, ticker: <{symbol}>, quant: {buy_quant}, limit price: {buy_price}")
-            order = db.save_webull_order_backtest(
-                {
-                    'orderId': order_id,
-                    'ticker': {
-                        'symbol': symbol,
-                        'tickerId': ticker_id,
-                    },
-                    'action': ActionType.BUY,
-                    'statusStr': 'Filled',
-                    'orderType': OrderType.LMT,
-                    'totalQuantity': buy_quant,
-                    'filledQuantity': buy_quant,
-                    'avgFilledPrice': buy_price,
-                    'lmtPrice': buy_price,
-                    'filledTime': self.trading_time,
-                    'placedTime': self.trading_time,
-                    'timeInForce': TimeInForceType.DAY,
-                },
+            # fill simulated buy order
+            order = self.broker.buy(
+                symbol,
+                ticker_id,
+                buy_quant,
+                buy_price,
+                self.trading_time,
                 setup=self.get_setup(),
                 note=note,
+                target_units=ticker.get_target_units(),
+                stop_loss_price=ticker.get_stop_loss(),
             )
-            # create day position
+            trading_logger.log(
+                f"🟢 Submit buy order {order.order_id}, ticker: <{symbol}>, quant: {buy_quant}, limit price: {buy_price}")
             self._on_buy_order_filled(ticker, order)
 
         else:
             trading_logger.log(
                 "Order amount limit not enough for <{}>, price: {}".format(symbol, buy_price))
 
-    def _on_buy_order_filled(self, ticker: TrackingTicker, order: WebullOrder):
-        symbol = ticker.get_symbol()
-        ticker_id = ticker.get_id()
-        order_id = order.order_id
-        position_obj = ticker.get_position_obj()
-        if position_obj:
-            # update position obj
-            position_obj.order_ids = f"{position_obj.order_ids},{order_id}"
-            position_obj.quantity += order.filled_quantity
-            position_obj.total_cost = round(
-                position_obj.total_cost + order.filled_quantity * order.avg_price, 2)
-            position_obj.units += 1
-            position_obj.require_adjustment = False
-            position_obj.save()
-        else:
-            # create position obj
-            position_obj = db.add_day_position(
-                symbol=symbol,
-                ticker_id=ticker_id,
-                order_id=order_id,
-                setup=self.get_setup(),
-                cost=order.avg_price,
-                quant=order.filled_quantity,
-                buy_time=order.filled_time,
-                stop_loss_price=ticker.get_stop_loss(),
-                target_units=ticker.get_target_units(),
-                require_adjustment=False,
-            )
+    def _on_buy_order_filled(self, ticker: TrackingTicker, order: BacktestOrder):
+        if not ticker.get_position_obj():
             # set position obj
-            ticker.set_position_obj(position_obj)
+            ticker.set_position_obj(
+                self.broker.get_position(ticker.get_symbol()))
             # set initial cost
-            ticker.set_initial_cost(order.avg_price)
+            ticker.set_initial_cost(order.price)
         ticker.set_last_buy_time(self.trading_time)
-        ticker.inc_positions(order.filled_quantity)
+        ticker.inc_positions(order.quantity)
         ticker.inc_units()
-        # update account tracker
-        account_tracker.update_balance(-(order.filled_quantity * order.avg_price))
 
     # submit sell limit order, only use for backtesting
     def submit_sell_limit_order(self, ticker: TrackingTicker, note: str = "Exit point."):
@@ -253,57 +217,19 @@ class BacktestStrategyBase:
         ticker_id = ticker.get_id()
         holding_quantity = ticker.get_positions()
         sell_price = self.get_sell_price(ticker)
-        # create webull buy order
-        order_id = order_tracker.get_next_order_id()
+        # fill simulated sell order
+        trade = self.broker.sell(
+            symbol, ticker_id, sell_price, self.trading_time, note=note)
         trading_logger.log(
-            f"🔴 Submit sell order {order_id}, ticker: <{symbol}>, quant: {holding_quantity}, limit price: {sell_price}")
-        order = db.save_webull_order_backtest(
-            {
-                'orderId': order_id,
-                'ticker': {
-                    'symbol': symbol,
-                    'tickerId': ticker_id,
-                },
-                'action': ActionType.SELL,
-                'statusStr': 'Filled',
-                'orderType': OrderType.LMT,
-                'totalQuantity': holding_quantity,
-                'filledQuantity': holding_quantity,
-                'avgFilledPrice': sell_price,
-                'lmtPrice': sell_price,
-                'filledTime': self.trading_time,
-                'placedTime': self.trading_time,
-                'timeInForce': TimeInForceType.DAY,
-            },
-            setup=self.get_setup(),
-            note=note,
-        )
-        self._on_sell_order_filled(ticker, order)
-
-    def _on_sell_order_filled(self, ticker: TrackingTicker, order: WebullOrder):
-        symbol = ticker.get_symbol()
-        ticker_id = ticker.get_id()
-        order_id = order.order_id
-        position_obj = ticker.get_position_obj()
-        # add trade object
-        trade = db.add_day_trade(
-            symbol=symbol,
-            ticker_id=ticker_id,
-            position=position_obj,
-            order_id=order_id,
-            sell_price=order.avg_price,
-            sell_time=order.filled_time,
-            require_adjustment=False,
-        )
-        # remove position object
-        position_obj.delete()
+            f"🔴 Submit sell order, ticker: <{symbol}>, quant: {holding_quantity}, limit price: {sell_price}")
+        self._on_sell_order_filled(ticker, trade)
+
+    def _on_sell_order_filled(self, ticker: TrackingTicker, trade: BacktestTrade):
         ticker.reset_positions()
         ticker.set_last_sell_time(self.trading_time)
         # update trading stats
-        tracking_stat = self.trading_tracker.get_stat(symbol)
+        tracking_stat = self.trading_tracker.get_stat(ticker.get_symbol())
         tracking_stat.update_by_trade(trade)
-        # update account tracker
-        account_tracker.update_balance(order.filled_quantity * order.avg_price)
 
     # clear all positions
     def clear_positions(self):
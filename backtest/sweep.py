@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+# Parameter sweep of backtest strategy, replay parameter combinations on shared day bars
+
+import itertools
+import numpy as np
+import pandas as pd
+from datetime import date
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+from backtest.broker import SimulatedBroker, get_trades_performance
+from backtest.tracker.day_bar_cache import DayBarCache
+from common.enums import TradingHourType
+
+SWEEP_TRADING_HOURS = [TradingHourType.BEFORE_MARKET_OPEN,
+                       TradingHourType.REGULAR, TradingHourType.AFTER_MARKET_CLOSE]
+
+# day bar caches of worker process, indicator windows are shared by all combinations
+_day_bar_caches: Dict[date, DayBarCache] = {}
+_shared_day_bars = None
+
+
+# Shared day bars class, bar arrays of all days packed into shared memory for worker processes
+class SharedDayBars:
+
+    def __init__(self, timestamps_shm: shared_memory.SharedMemory, values_shm: shared_memory.SharedMemory,
+                 size: int, ranges: Dict[date, Dict[str, Tuple[int, int]]]):
+        self.timestamps_shm: shared_memory.SharedMemory = timestamps_shm
+        self.values_shm: shared_memory.SharedMemory = values_shm
+        self.size: int = size
+        # row range of each symbol in each day
+        self.ranges: Dict[date, Dict[str, Tuple[int, int]]] = ranges
+
+    @staticmethod
+    def create(day_bar_caches: List[DayBarCache]):
+        size = 0
+        ranges = {}
+        for day_bar_cache in day_bar_caches:
+            day_ranges = {}
+            for symbol in day_bar_cache.get_symbols():
+                count = len(day_bar_cache.timestamps[symbol])
+                day_ranges[symbol] = (size, size + count)
+                size += count
+            ranges[day_bar_cache.trading_date] = day_ranges
+        columns = len(DayBarCache.COLUMNS)
+        shared_day_bars = SharedDayBars(
+            shared_memory.SharedMemory(create=True, size=max(1, size * 8)),
+            shared_memory.SharedMemory(
+                create=True, size=max(1, size * columns * 8)),
+            size, ranges)
+        timestamps, values = shared_day_bars.get_arrays()
+        for day_bar_cache in day_bar_caches:
+            for symbol, (start, end) in ranges[day_bar_cache.trading_date].items():
+                timestamps[start:end] = day_bar_cache.timestamps[symbol]
+                values[start:end] = day_bar_cache.values[symbol]
+        return shared_day_bars
+
+    @staticmethod
+    def attach(timestamps_name: str, values_name: str, size: int, ranges: Dict[date, Dict[str, Tuple[int, int]]]):
+        timestamps_shm = shared_memory.SharedMemory(name=timestamps_name)
+        values_shm = shared_memory.SharedMemory(name=values_name)
+        return SharedDayBars(timestamps_shm, values_shm, size, ranges)
+
+    def get_attach_args(self) -> tuple:
+        return (self.timestamps_shm.name, self.values_shm.name, self.size, self.ranges)
+
+    def get_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        timestamps = np.ndarray(
+            (self.size,), dtype=np.int64, buffer=self.timestamps_shm.buf)
+        values = np.ndarray((self.size, len(DayBarCache.COLUMNS)),
+                            dtype=np.float64, buffer=self.values_shm.buf)
+        return timestamps, values
+
+    def get_day_bar_caches(self) -> Dict[date, DayBarCache]:
+        """
+        day bar caches with views of shared arrays
+        """
+        timestamps, values = self.get_arrays()
+        day_bar_caches = {}
+        for trading_date, day_ranges in self.ranges.items():
+            day_bar_cache = DayBarCache(trading_date)
+            for symbol, (start, end) in day_ranges.items():
+                day_bar_cache.set_bars(
+                    symbol, timestamps[start:end], values[start:end])
+            day_bar_caches[trading_date] = day_bar_cache
+        return day_bar_caches
+
+    def close(self):
+        self.timestamps_shm.close()
+        self.values_shm.close()
+
+    def unlink(self):
+        self.timestamps_shm.unlink()
+        self.values_shm.unlink()
+
+
+def init_sweep_worker(timestamps_name: str, values_name: str, size: int, ranges: Dict[date, Dict[str, Tuple[int, int]]]):
+    global _day_bar_caches
+    global _shared_day_bars
+    import django
+    from django.db import connections
+    from logger import trading_logger
+    django.setup()
+    # worker process opens its own db connections
+    connections.close_all()
+    trading_logger.set_enabled(False)
+    # keep shared memory open while caches use it
+    _shared_day_bars = SharedDayBars.attach(
+        timestamps_name, values_name, size, ranges)
+    _day_bar_caches = _shared_day_bars.get_day_bar_caches()
+
+
+def sweep_day(task: tuple) -> Tuple[int, List[float]]:
+    """
+    backtest one parameter combination for all trading hours of the day, return trade gains
+    """
+    from backtest.executor import BacktestExecutor
+
+    combination_idx, strategy_class, params, trading_date = task
+    # results stay in simulated broker, not saved
+    broker = SimulatedBroker(trading_date)
+    for trading_hour in SWEEP_TRADING_HOURS:
+        strategy = strategy_class(
+            trading_date=trading_date, trading_hour=trading_hour, **params)
+        strategy.set_broker(broker)
+        strategy.set_day_bar_cache(_day_bar_caches[trading_date])
+        executor = BacktestExecutor(
+            strategy=strategy, trading_date=trading_date, trading_hour=trading_hour)
+        executor.start()
+    return combination_idx, broker.get_gains()
+
+
+def get_sweep_result(params: dict, gains: List[float]) -> dict:
+    result = dict(params)
+    result.update(get_trades_performance(gains))
+    return result
+
+
+def sweep(strategy_class: type, param_grid: Dict[str, list], trading_dates: List[date],
+          max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    backtest all combinations of param grid, one result row for each combination
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from django.db import connections
+    from logger import trading_logger
+    global _day_bar_caches
+
+    param_names = list(param_grid.keys())
+    combinations = [dict(zip(param_names, values))
+                    for values in itertools.product(*param_grid.values())]
+    tasks = [(combination_idx, strategy_class, params, trading_date)
+             for combination_idx, params in enumerate(combinations) for trading_date in trading_dates]
+    # load bars of each day once
+    day_bar_caches = []
+    for trading_date in trading_dates:
+        day_bar_cache = DayBarCache()
+        day_bar_cache.load(trading_date)
+        day_bar_caches.append(day_bar_cache)
+
+    combination_gains = [[] for _ in combinations]
+    max_workers = max_workers or os.cpu_count()
+    if max_workers == 1:
+        # run in current process
+        _day_bar_caches = {
+            day_bar_cache.trading_date: day_bar_cache for day_bar_cache in day_bar_caches}
+        trading_logger.set_enabled(False)
+        try:
+            for task in tasks:
+                combination_idx, gains = sweep_day(task)
+                combination_gains[combination_idx].extend(gains)
+        finally:
+            trading_logger.set_enabled(True)
+            _day_bar_caches = {}
+    else:
+        shared_day_bars = SharedDayBars.create(day_bar_caches)
+        del day_bar_caches
+        # connections are not shared with workers
+        connections.close_all()
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=init_sweep_worker,
+                                     initargs=shared_day_bars.get_attach_args()) as pool:
+                chunksize = max(1, len(tasks) // (max_workers * 4))
+                for combination_idx, gains in pool.map(sweep_day, tasks, chunksize=chunksize):
+                    combination_gains[combination_idx].extend(gains)
+        finally:
+            shared_day_bars.close()
+            shared_day_bars.unlink()
+
+    results = [get_sweep_result(params, combination_gains[combination_idx])
+               for combination_idx, params in enumerate(combinations)]
+    return pd.DataFrame(results, columns=param_names + ["trades", "profit_loss", "win_rate", "profit_loss_ratio"]) \
+        .sort_values("profit_loss", ascending=False).reset_index(drop=True)
+
+
+def start():
+    from backtest.sweep import sweep
+    from backtest.strategy.day_breakout import BacktestDayTradingBreakoutDynExit
+    from webull_trader.models import WebullAccountStatistics
+
+    trading_dates = list(WebullAccountStatistics.objects.order_by(
+        'date').values_list('date', flat=True))
+    result = sweep(BacktestDayTradingBreakoutDynExit, {
+        "entry_period": [10, 20, 30, 55],
+        "exit_period": [5, 7, 9, 11],
+    }, trading_dates)
+    print(result.to_string(index=False))
+
+
+if __name__ == "django.core.management.commands.shell":
+    start()
@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from django.utils import timezone
+from common import bar_store, constants
+from webull_trader.models import HistoricalMinuteBar
+
+
+# Day period window class, period high and low of closed bars before current bar
+class DayPeriodWindow:
+
+    def __init__(self, count: int, max_close: float, max_high: float, min_low: float, first_close: float):
+        self.count: int = count
+        self.max_close: float = max_close
+        self.max_high: float = max_high
+        self.min_low: float = min_low
+        self.first_close: float = first_close
+
+    def is_empty(self) -> bool:
+        return self.count == 0
+
+    def get_max_close(self) -> float:
+        if self.count == 0:
+            return 0
+        return self.max_close
+
+    def get_max_high(self) -> float:
+        if self.count == 0:
+            return 0
+        return self.max_high
+
+    def get_min_low(self) -> float:
+        if self.count == 0:
+            return constants.MAX_SECURITY_PRICE
+        return self.min_low
+
+    def get_rate_of_change(self, close: float) -> float:
+        """
+        rate of change in percentage from first close of the window
+        """
+        if self.count == 0:
+            return 0.0
+        return (close - self.first_close) / self.first_close * 100
+
+
+# Day bar cache class, 1m bars of all symbols in a trading day loaded once into column arrays
+class DayBarCache:
+
+    COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'vwap', 'ema9']
+
+    def __init__(self, trading_date: Optional[date] = None):
+        self.trading_date: Optional[date] = trading_date
+        # bar timestamps, bar values and time index of each symbol
+        self.timestamps: Dict[str, np.ndarray] = {}
+        self.values: Dict[str, np.ndarray] = {}
+        self.indexes: Dict[str, pd.DatetimeIndex] = {}
+        # period high and low arrays of symbol and period, shared by strategies using the cache
+        self.windows: Dict[Tuple[str, int], np.ndarray] = {}
+
+    def load(self, trading_date: date):
+        """
+        load all 1m bars of the trading day from columnar store and one query of symbols not in store
+        """
+        self.trading_date = trading_date
+        self.timestamps = {}
+        self.values = {}
+        self.indexes = {}
+        self.windows = {}
+        # read symbols in columnar store first
+        store_symbols = []
+        if bar_store.has_day(trading_date):
+            store_symbols = bar_store.get_day_symbols(trading_date)
+            for symbol in store_symbols:
+                timestamps, values = bar_store.read_day_bars(symbol, trading_date)
+                self._add_symbol_arrays(symbol, timestamps, values)
+        # day may be partly synced, load symbols not in store from db
+        rows = HistoricalMinuteBar.objects.filter(date=trading_date).exclude(symbol__in=store_symbols).order_by(
+            'symbol', 'time', 'id').values_list('symbol', 'time', 'open', 'high', 'low', 'close', 'volume', 'vwap')
+        symbol_rows: Dict[str, List[Tuple]] = {}
+        for row in rows:
+            symbol_rows.setdefault(row[0], []).append(row)
+        for symbol, bars in symbol_rows.items():
+            self._add_symbol(symbol, bars)
+
+    def _add_symbol(self, symbol: str, bars: List[Tuple]):
+        timestamps = np.array([int(bar[1].timestamp())
+                              for bar in bars], dtype=np.int64)
+        # keep last saved bar of duplicated time
+        unique = np.append(timestamps[1:] != timestamps[:-1], True)
+        self._add_symbol_arrays(symbol, timestamps[unique], np.array(
+            [bar[2:] for bar in bars], dtype=np.float64)[unique])
+
+    def _add_symbol_arrays(self, symbol: str, timestamps: np.ndarray, bar_values: np.ndarray):
+        # add ema9 column to bar values
+        values = np.zeros((len(timestamps), len(self.COLUMNS)), dtype=np.float64)
+        values[:, :6] = bar_values
+        values[:, 6] = pd.Series(values[:, 3]).ewm(
+            span=9, adjust=False).mean().to_numpy()
+        self.set_bars(symbol, np.array(timestamps, dtype=np.int64), values)
+
+    def set_bars(self, symbol: str, timestamps: np.ndarray, values: np.ndarray):
+        """
+        set bar arrays of symbol, arrays may live in shared memory
+        """
+        # bar views share the arrays, no strategy should write into them
+        values.flags.writeable = False
+        index = pd.to_datetime(timestamps, unit='s', utc=True).tz_convert(
+            timezone.get_current_timezone()).rename('timestamp')
+        self.timestamps[symbol] = timestamps
+        self.values[symbol] = values
+        self.indexes[symbol] = index
+
+    def _end(self, symbol: str, trading_time: datetime) -> int:
+        # position after last bar not later than trading time
+        return int(np.searchsorted(self.timestamps[symbol], int(trading_time.timestamp()), side='right'))
+
+    def get_symbols(self) -> List[str]:
+        return list(self.timestamps.keys())
+
+    def has_symbol(self, symbol: str) -> bool:
+        return symbol in self.timestamps
+
+    def get_bars(self, symbol: str, trading_time: datetime, count: int) -> pd.DataFrame:
+        """
+        latest count bars until trading time, a view of day arrays without copy
+        """
+        if symbol not in self.timestamps:
+            return pd.DataFrame(columns=self.COLUMNS, index=pd.DatetimeIndex([], name='timestamp'))
+        end = self._end(symbol, trading_time)
+        start = max(0, end - count)
+        return pd.DataFrame(self.values[symbol][start:end], index=self.indexes[symbol][start:end],
+                            columns=self.COLUMNS, copy=False)
+
+    def _get_window_values(self, symbol: str, period: int) -> np.ndarray:
+        # max close, max high, min low and first close of previous period bars for each bar
+        key = (symbol, period)
+        if key not in self.windows:
+            values = self.values[symbol]
+            closes = pd.Series(values[:, 3])
+            window_values = np.zeros((len(values), 4), dtype=np.float64)
+            window_values[:, 0] = closes.rolling(
+                period, min_periods=1).max().shift(1).fillna(0).to_numpy()
+            window_values[:, 1] = pd.Series(values[:, 1]).rolling(
+                period, min_periods=1).max().shift(1).fillna(0).to_numpy()
+            window_values[:, 2] = pd.Series(values[:, 2]).rolling(period, min_periods=1).min().shift(
+                1).fillna(constants.MAX_SECURITY_PRICE).to_numpy()
+            window_values[:, 3] = values[np.maximum(
+                np.arange(len(values)) - period, 0), 3]
+            self.windows[key] = window_values
+        return self.windows[key]
+
+    def get_period_window(self, symbol: str, bars: pd.DataFrame, period: int) -> Optional[DayPeriodWindow]:
+        """
+        period window of bars before the last bar, bars must be 1m bars of the cache
+        """
+        if symbol not in self.timestamps or bars.empty:
+            return None
+        timestamps = self.timestamps[symbol]
+        end = int(np.searchsorted(
+            timestamps, int(bars.index[-1].timestamp()), side='right'))
+        if end == 0 or timestamps[end - 1] != int(bars.index[-1].timestamp()):
+            return None
+        window_values = self._get_window_values(symbol, period)[end - 1]
+        return DayPeriodWindow(min(end - 1, period), *window_values)
+
+    def get_last_close(self, symbol: str, trading_time: datetime) -> Optional[float]:
+        if symbol not in self.timestamps:
+            return None
+        end = self._end(symbol, trading_time)
+        if end == 0:
+            return None
+        return float(self.values[symbol][end - 1, 3])
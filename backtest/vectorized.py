@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+# Vectorized backtest of signal breakout, signals of whole session computed in one pass for each symbol
+
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import List, Optional, Tuple
+from django.utils import timezone
+from backtest.broker import SimulatedBroker
+from backtest.executor import get_trading_time_range
+from backtest.strategy.day_signal import get_breakout_setup
+from backtest.tracker.day_bar_cache import DayBarCache
+from common.enums import TradingHourType
+
+
+def get_breakout_signals(closes: np.ndarray, vwaps: np.ndarray, ema9s: np.ndarray,
+                         entry_period: int, exit_period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    entry and exit signal of each bar, entry on new high of entry period closes above vwap and ema9,
+    exit on new low of exit period closes
+    """
+    closes = pd.Series(closes)
+    # high and low of previous closes, not including current bar
+    prev_high = closes.rolling(entry_period).max().shift(1).to_numpy()
+    prev_low = closes.rolling(exit_period, min_periods=1).min().shift(1).to_numpy()
+    closes = closes.to_numpy()
+    entries = (closes > prev_high) & (closes > vwaps) & (closes > ema9s)
+    exits = closes < prev_low
+    return entries, exits
+
+
+def resolve_positions(entries: np.ndarray, exits: np.ndarray) -> List[Tuple[int, Optional[int]]]:
+    """
+    entry and exit bar of each position, exit is None if position still open at the end
+    """
+    positions = []
+    entry_idx = None
+    # only visit bars with signals
+    for idx in np.flatnonzero(entries | exits):
+        if entry_idx == None:
+            if entries[idx]:
+                entry_idx = idx
+        elif exits[idx]:
+            positions.append((entry_idx, idx))
+            entry_idx = None
+    if entry_idx != None:
+        positions.append((entry_idx, None))
+    return positions
+
+
+def backtest_session(day_bar_cache: DayBarCache, trading_hour: TradingHourType, order_amount_limit: float,
+                     entry_period: int = 20, exit_period: int = 10,
+                     broker: Optional[SimulatedBroker] = None) -> SimulatedBroker:
+    """
+    backtest signal breakout for the trading hour, fill same trades as event driven backtest,
+    cash of broker is not checked before buy
+    """
+    trading_date = day_bar_cache.trading_date
+    if broker == None:
+        broker = SimulatedBroker(trading_date)
+    trading_tz = timezone.get_current_timezone()
+    start_time, end_time = [trading_time.astimezone(trading_tz)
+                            for trading_time in get_trading_time_range(trading_date, trading_hour)]
+    start_ts = int(start_time.timestamp())
+    end_ts = int(end_time.timestamp())
+    setup = get_breakout_setup(entry_period)
+    # fill events of (time, symbol, buy price or None for sell, quantity, note)
+    events = []
+    for symbol in sorted(day_bar_cache.get_symbols()):
+        timestamps = day_bar_cache.timestamps[symbol]
+        values = day_bar_cache.values[symbol]
+        index = day_bar_cache.indexes[symbol]
+        closes = values[:, 3]
+        entries, exits = get_breakout_signals(
+            closes, values[:, 5], values[:, 6], entry_period, exit_period)
+        in_session = (timestamps >= start_ts) & (timestamps <= end_ts)
+        quantities = (order_amount_limit / closes).astype(np.int64)
+        entries &= in_session & (quantities > 0)
+        exits &= in_session
+        for entry_idx, exit_idx in resolve_positions(entries, exits):
+            events.append((index[entry_idx].to_pydatetime(), symbol,
+                           closes[entry_idx], quantities[entry_idx], "Entry point."))
+            if exit_idx == None:
+                # clear position at last close of session
+                last_idx = int(np.searchsorted(
+                    timestamps, end_ts, side='right')) - 1
+                events.append(
+                    (end_time, symbol, closes[last_idx], 0, "Clear position."))
+            else:
+                events.append((index[exit_idx].to_pydatetime(), symbol, closes[exit_idx], 0,
+                               "{} candles new low.".format(exit_period)))
+    # fill in time order, symbols in same minute are filled in symbol order
+    for time, symbol, price, quantity, note in sorted(events, key=lambda event: (event[0], event[1])):
+        if quantity > 0:
+            broker.buy(symbol, symbol, int(quantity), float(price), time, setup=setup, note=note)
+        else:
+            broker.sell(symbol, symbol, float(price), time, note=note)
+    return broker
+
+
+def backtest_day(trading_date: date, order_amount_limit: float, extended_order_amount_limit: float,
+                 entry_period: int = 20, exit_period: int = 10) -> SimulatedBroker:
+    day_bar_cache = DayBarCache()
+    day_bar_cache.load(trading_date)
+    broker = SimulatedBroker(trading_date)
+    for trading_hour in [TradingHourType.BEFORE_MARKET_OPEN, TradingHourType.REGULAR, TradingHourType.AFTER_MARKET_CLOSE]:
+        amount_limit = order_amount_limit
+        if trading_hour != TradingHourType.REGULAR:
+            amount_limit = extended_order_amount_limit
+        backtest_session(day_bar_cache, trading_hour, amount_limit,
+                         entry_period=entry_period, exit_period=exit_period, broker=broker)
+    return broker
+
+
+def start():
+    from backtest.vectorized import backtest_day
+    from backtest.broker import get_trades_performance
+    from common import db
+    from webull_trader.models import WebullAccountStatistics
+
+    trading_settings = db.get_or_create_trading_settings()
+    trading_dates = list(WebullAccountStatistics.objects.order_by(
+        'date').values_list('date', flat=True))
+    # pre-screen before detailed backtest
+    for trading_date in trading_dates:
+        broker = backtest_day(trading_date, trading_settings.order_amount_limit,
+                              trading_settings.extended_order_amount_limit)
+        performance = get_trades_performance(broker.get_gains())
+        print(f"{trading_date}: {performance}")
+
+
+if __name__ == "django.core.management.commands.shell":
+    start()
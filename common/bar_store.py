@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+# Columnar store of historical minute bars, int64 timestamps and float64 bar values
+# of each date and symbol saved as npy files and read back with numpy memmap
+
+import os
+import numpy as np
+import pandas as pd
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from django.conf import settings
+from django.db.models import Q
+
+COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'vwap']
+
+
+def get_day_dir(day: date) -> Path:
+    return Path(settings.BAR_STORE_DIR) / day.strftime("%Y-%m-%d")
+
+
+def _get_paths(symbol: str, day: date) -> Tuple[Path, Path]:
+    day_dir = get_day_dir(day)
+    return (day_dir / f"{symbol}.time.npy", day_dir / f"{symbol}.bars.npy")
+
+
+def _save_array(path: Path, array: np.ndarray):
+    # replace file at once, readers never see partial array
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(temp_path, path)
+
+
+def has_day(day: date) -> bool:
+    return get_day_dir(day).is_dir()
+
+
+def get_day_symbols(day: date) -> List[str]:
+    day_dir = get_day_dir(day)
+    if not day_dir.is_dir():
+        return []
+    return sorted(name[:-len(".time.npy")] for name in os.listdir(day_dir) if name.endswith(".time.npy"))
+
+
+def read_day_bars(symbol: str, day: date) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    read only memmap of bar timestamps and bar values of symbol in the day, None if not stored
+    """
+    time_path, bars_path = _get_paths(symbol, day)
+    if not time_path.exists() or not bars_path.exists():
+        return None
+    return (np.load(time_path, mmap_mode='r'), np.load(bars_path, mmap_mode='r'))
+
+
+def read_day_bars_df(symbol: str, day: date) -> Optional[pd.DataFrame]:
+    """
+    bars of symbol in the day as data frame indexed by utc time like database rows, None if not stored
+    """
+    day_bars = read_day_bars(symbol, day)
+    if day_bars == None:
+        return None
+    timestamps, values = day_bars
+    index = pd.to_datetime(np.asarray(timestamps), unit='s', utc=True)
+    return pd.DataFrame(np.array(values), index=index, columns=COLUMNS)
+
+
+def get_minute_volumes(symbols: Set[str], days: Set[date]) -> Dict[Tuple[str, int], float]:
+    """
+    minute bar volumes of symbols in the days by symbol and epoch minute,
+    symbols not in store of the day read from database with one query
+    """
+    from webull_trader.models import HistoricalMinuteBar
+
+    bar_volumes = {}
+    missing_query = None
+    for day in days:
+        store_symbols = set(get_day_symbols(day)) & symbols
+        for symbol in store_symbols:
+            timestamps, values = read_day_bars(symbol, day)
+            for timestamp, volume in zip(timestamps.tolist(), values[:, COLUMNS.index('volume')].tolist()):
+                bar_volumes[(symbol, timestamp // 60)] = volume
+        if len(store_symbols) < len(symbols):
+            day_query = Q(date=day, symbol__in=symbols - store_symbols)
+            missing_query = day_query if missing_query == None else missing_query | day_query
+    if missing_query != None:
+        bars = HistoricalMinuteBar.objects.filter(
+            missing_query).values_list('symbol', 'time', 'volume')
+        for symbol, bar_time, volume in bars.iterator():
+            bar_volumes.setdefault(
+                (symbol, int(bar_time.timestamp()) // 60), volume)
+    return bar_volumes
+
+
+def _get_bar_arrays(bar_list: List[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    timestamps = np.array([int(bar_data['time'].timestamp())
+                          for bar_data in bar_list], dtype=np.int64)
+    values = np.array([[bar_data[column] for column in COLUMNS]
+                      for bar_data in bar_list], dtype=np.float64).reshape(-1, len(COLUMNS))
+    return (timestamps, values)
+
+
+def write_day_bars(symbol: str, day: date, timestamps: np.ndarray, values: np.ndarray):
+    """
+    replace stored bars of symbol in the day, timestamps must be sorted and unique
+    """
+    time_path, bars_path = _get_paths(symbol, day)
+    time_path.parent.mkdir(parents=True, exist_ok=True)
+    _save_array(bars_path, np.ascontiguousarray(values, dtype=np.float64))
+    _save_array(time_path, np.ascontiguousarray(timestamps, dtype=np.int64))
+
+
+def save_minute_bar_list(bar_list: List[dict]):
+    """
+    merge minute bar dicts into store, existing bar of same time is kept like database
+    """
+    day_bars = {}
+    for bar_data in bar_list:
+        day_bars.setdefault((bar_data['symbol'], bar_data['date']), []).append(bar_data)
+    for (symbol, day), bars in day_bars.items():
+        timestamps, values = _get_bar_arrays(bars)
+        stored_bars = read_day_bars(symbol, day)
+        if stored_bars != None:
+            # stored bars go first, unique keeps first bar of same time
+            timestamps = np.concatenate([stored_bars[0], timestamps])
+            values = np.concatenate([stored_bars[1], values])
+        timestamps, idx = np.unique(timestamps, return_index=True)
+        write_day_bars(symbol, day, timestamps, values[idx])
+
+
+def sync_day_from_db(day: date):
+    """
+    rebuild store of the day from historical minute bars in database
+    """
+    from webull_trader.models import HistoricalMinuteBar
+
+    rows = HistoricalMinuteBar.objects.filter(date=day).order_by(
+        'symbol', 'time', 'id').values('symbol', 'date', 'time', *COLUMNS)
+    symbol_bars = {}
+    for row in rows:
+        symbol_bars.setdefault(row['symbol'], []).append(row)
+    for symbol, bars in symbol_bars.items():
+        timestamps, values = _get_bar_arrays(bars)
+        timestamps, idx = np.unique(timestamps, return_index=True)
+        write_day_bars(symbol, day, timestamps, values[idx])
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+
+# Bucketing of trade statistics, bins of each dimension declared once as edge and label pairs,
+# bucket indexes of all dimensions computed with searchsorted and reduced in one pass
+
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Tuple
+from django.utils import timezone
+from common import constants, enums
+
+
+# Bucket dimension class, bins are (edge, label) pairs in edge order. By default value falls in first bin
+# not below its edge and last bin has no edge, with lower edges value falls in last bin not above it.
+class BucketDimension:
+
+    def __init__(self, field: str, bins: List[Tuple[Optional[float], str]], none_label: Optional[str] = None,
+                 lower_edges: bool = False, key_statistics: bool = False, trading_hour: Optional[int] = None,
+                 transform: Optional[Callable[[np.ndarray], np.ndarray]] = None):
+        self.field: str = field
+        self.bins: List[Tuple[Optional[float], str]] = bins
+        # bucket of None values, None values are skipped if not set
+        self.none_label: Optional[str] = none_label
+        self.lower_edges: bool = lower_edges
+        # only trades with key statistics of buy date
+        self.key_statistics: bool = key_statistics
+        # only trades bought in trading hour
+        self.trading_hour: Optional[int] = trading_hour
+        self.transform: Optional[Callable[[np.ndarray],
+                                          np.ndarray]] = transform
+
+    def get_labels(self) -> List[str]:
+        labels = [label for _, label in self.bins]
+        if self.none_label != None:
+            labels = [self.none_label] + labels
+        return labels
+
+    def get_edges(self) -> np.ndarray:
+        return np.array([edge for edge, _ in self.bins if edge != None], dtype=np.float64)
+
+    def get_fields(self) -> List[str]:
+        fields = [self.field]
+        if self.key_statistics:
+            fields.append('has_key_statistics')
+        if self.trading_hour != None:
+            fields.append('trading_hour')
+        return fields
+
+    def get_values(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        values = columns[self.field]
+        if self.transform:
+            values = self.transform(values)
+        return values
+
+    def get_indexes(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        if self.lower_edges:
+            indexes = np.searchsorted(
+                self.get_edges(), values, side='right') - 1
+            # values below first edge go to last bin
+            indexes[indexes < 0] = len(self.bins) - 1
+        else:
+            indexes = np.searchsorted(self.get_edges(), values, side='left')
+        if self.none_label != None:
+            indexes = np.where(np.isnan(values), 0, indexes + 1)
+        return indexes
+
+    def get_mask(self, columns: Dict[str, np.ndarray], values: np.ndarray) -> np.ndarray:
+        mask = np.ones(len(values), dtype=bool)
+        if self.key_statistics:
+            mask &= columns['has_key_statistics']
+        if self.trading_hour != None:
+            mask &= columns['trading_hour'] == self.trading_hour
+        if self.none_label == None:
+            mask &= ~np.isnan(np.asarray(values, dtype=np.float64))
+        return mask
+
+    def get_index(self, value) -> int:
+        if value == None:
+            value = np.nan
+        return int(self.get_indexes(np.array([value], dtype=np.float64))[0])
+
+
+# Category dimension class, values not in categories go to None bucket at the end
+class CategoryDimension(BucketDimension):
+
+    def __init__(self, field: str, categories: List[str], none_label: str):
+        super().__init__(field, [(None, category)
+                                 for category in categories] + [(None, none_label)])
+        self.categories: np.ndarray = np.array(categories, dtype=str)
+
+    def get_indexes(self, values: np.ndarray) -> np.ndarray:
+        values = np.array(["" if value == None else value for value in values], dtype=str)
+        order = np.argsort(self.categories)
+        sorted_categories = self.categories[order]
+        positions = np.searchsorted(sorted_categories, values).clip(
+            0, len(sorted_categories) - 1)
+        matched = sorted_categories[positions] == values
+        return np.where(matched, order[positions], len(self.categories))
+
+    def get_mask(self, columns: Dict[str, np.ndarray], values: np.ndarray) -> np.ndarray:
+        return np.ones(len(values), dtype=bool)
+
+    def get_index(self, value) -> int:
+        return int(self.get_indexes([value])[0])
+
+
+def get_local_minutes(timestamps: np.ndarray) -> np.ndarray:
+    """
+    minutes of local day of unix timestamps
+    """
+    times = pd.to_datetime(np.asarray(timestamps, dtype=np.int64), unit='s', utc=True).tz_convert(
+        timezone.get_current_timezone())
+    return np.asarray(times.hour * 60 + times.minute, dtype=np.float64)
+
+
+ENTRY_PRICE = BucketDimension('entry_price', [
+    (1, "$0-$1"),
+    (2, "$1-$2"),
+    (3, "$2-$3"),
+    (4, "$3-$4"),
+    (5, "$4-$5"),
+    (6, "$5-$6"),
+    (7, "$6-$7"),
+    (8, "$7-$8"),
+    (9, "$8-$9"),
+    (10, "$9-$10"),
+    (15, "$10-$15"),
+    (20, "$15-$20"),
+    (50, "$20-$50"),
+    (100, "$50-$100"),
+    (200, "$100-$200"),
+    (None, "$200+"),
+])
+
+MARKET_CAP = BucketDimension('market_value', [
+    (50000000, "0-50M (Nano Cap)"),
+    (100000000, "50M-100M (Micro Cap)"),
+    (150000000, "100M-150M (Micro Cap)"),
+    (200000000, "150M-200M (Micro Cap)"),
+    (250000000, "200M-250M (Micro Cap)"),
+    (300000000, "250M-300M (Micro Cap)"),
+    (400000000, "300M-400M (Small Cap)"),
+    (500000000, "400M-500M (Small Cap)"),
+    (600000000, "500M-600M (Small Cap)"),
+    (700000000, "600M-700M (Small Cap)"),
+    (800000000, "700M-800M (Small Cap)"),
+    (900000000, "800M-900M (Small Cap)"),
+    (1000000000, "900M-1B (Small Cap)"),
+    (2000000000, "1B-2B (Small Cap)"),
+    (10000000000, "2B-10B (Mid Cap)"),
+    (200000000000, "10B-200B (Large Cap)"),
+    (None, "200B+ (Mega Cap)"),
+], key_statistics=True)
+
+FREE_FLOAT = BucketDimension('outstanding_shares', [
+    (1000000, "0-1M"),
+    (2000000, "1M-2M"),
+    (3000000, "2M-3M"),
+    (4000000, "3M-4M"),
+    (5000000, "4M-5M"),
+    (6000000, "5M-6M"),
+    (7000000, "6M-7M"),
+    (8000000, "7M-8M"),
+    (9000000, "8M-9M"),
+    (10000000, "9M-10M"),
+    (11000000, "10M-11M"),
+    (12000000, "11M-12M"),
+    (13000000, "12M-13M"),
+    (14000000, "13M-14M"),
+    (15000000, "14M-15M"),
+    (16000000, "15M-16M"),
+    (17000000, "16M-17M"),
+    (18000000, "17M-18M"),
+    (19000000, "18M-19M"),
+    (20000000, "19M-20M"),
+    (30000000, "20M-30M"),
+    (50000000, "30M-50M"),
+    (100000000, "50M-100M"),
+    (200000000, "100M-200M"),
+    (500000000, "200M-500M"),
+    (1000000000, "500M-1B"),
+    (None, "1B+"),
+], none_label="None", key_statistics=True)
+
+TURNOVER_RATIO = BucketDimension('turnover_rate', [
+    (0.1, "0-10%"),
+    (0.2, "10-20%"),
+    (0.4, "20-40%"),
+    (0.6, "40-60%"),
+    (0.8, "60-80%"),
+    (1, "80-100%"),
+    (2, "100-200%"),
+    (5, "200-500%"),
+    (10, "500-1000%"),
+    (None, "1000%+"),
+], none_label="None", key_statistics=True)
+
+SHORT_FLOAT = BucketDimension('short_float', [
+    (5, "0-5%"),
+    (10, "5-10%"),
+    (15, "10-15%"),
+    (20, "15-20%"),
+    (25, "20-25%"),
+    (30, "25-30%"),
+    (None, "30%+"),
+], none_label="None", key_statistics=True)
+
+GAP = BucketDimension('gap', [
+    (-15, "Down 15%+"),
+    (-10, "Down 10-15%"),
+    (-7, "Down 7-10%"),
+    (-5, "Down 5-7%"),
+    (-3, "Down 3-5%"),
+    (-1, "Down 1-3%"),
+    (0, "Down 0-1%"),
+    (1, "Up 0-1%"),
+    (3, "Up 1-3%"),
+    (5, "Up 3-5%"),
+    (7, "Up 5-7%"),
+    (10, "Up 7-10%"),
+    (15, "Up 10-15%"),
+    (None, "Up 15%+"),
+])
+
+RELATIVE_VOLUME = BucketDimension('relative_volume', [
+    (1, "0-1"),
+    (2, "1-2"),
+    (3, "2-3"),
+    (5, "3-5"),
+    (10, "5-10"),
+    (15, "10-15"),
+    (20, "15-20"),
+    (30, "20-30"),
+    (40, "30-40"),
+    (60, "40-60"),
+    (100, "60-100"),
+    (None, "100+"),
+])
+
+VOLUME_BINS = [
+    (0, "None"),
+    (20000, "0-20K"),
+    (50000, "20-50K"),
+    (100000, "50-100K"),
+    (200000, "100-200K"),
+    (500000, "200-500K"),
+    (1000000, "0.5-1M"),
+    (None, "1M+"),
+]
+
+VOLUME = BucketDimension('pre_entry_volume', VOLUME_BINS)
+
+REGULAR_VOLUME = BucketDimension(
+    'pre_entry_volume', VOLUME_BINS, trading_hour=enums.TradingHourType.REGULAR)
+
+PRE_MARKET_VOLUME = BucketDimension(
+    'pre_entry_volume', VOLUME_BINS, trading_hour=enums.TradingHourType.BEFORE_MARKET_OPEN)
+
+AFTER_MARKET_VOLUME = BucketDimension(
+    'pre_entry_volume', VOLUME_BINS, trading_hour=enums.TradingHourType.AFTER_MARKET_CLOSE)
+
+HOLDING_TIME = BucketDimension('holding_sec', [
+    (60, "0-1m"),
+    (180, "1-3m"),
+    (300, "3-5m"),
+    (600, "5-10m"),
+    (900, "10-15m"),
+    (1200, "15-20m"),
+    (1500, "20-25m"),
+    (1800, "25-30m"),
+    (2100, "30-35m"),
+    (2400, "35-40m"),
+    (2700, "40-45m"),
+    (3000, "45-50m"),
+    (3300, "50-55m"),
+    (3600, "55-60m"),
+    (None, "60m+"),
+])
+
+PLPCT = BucketDimension('profit_loss_pct', [
+    (-80, "-80~100%"),
+    (-60, "-60~80%"),
+    (-40, "-40~60%"),
+    (-20, "-20~40%"),
+    (0, "-0~20%"),
+    (20, "+0~20%"),
+    (40, "+20~40%"),
+    (60, "+40~60%"),
+    (80, "+60~80%"),
+    (100, "+80~100%"),
+    (120, "+100~120%"),
+    (None, "+120%+"),
+])
+
+SECTOR = CategoryDimension('sector', [
+    constants.BASIC_MATERIALS,
+    constants.COMMUNICATION_SERVICES,
+    constants.CONSUMER_CYCLICAL,
+    constants.CONSUMER_DEFENSIVE,
+    constants.ENERGY,
+    constants.FINANCIAL_SERVICES,
+    constants.HEALTHCARE,
+    constants.INDUSTRIALS,
+    constants.REAL_ESTATE,
+    constants.TECHNOLOGY,
+    constants.UTILITIES,
+], "None")
+
+# half hour of local buy time from 04:00 to 20:00, out of range time goes to last bin
+MARKET_HOURLY = BucketDimension('buy_time', [
+    (hour * 60 + minute, "{:02d}:{:02d}-{:02d}:{:02d}".format(
+        hour, minute, hour + (minute + 30) // 60, (minute + 30) % 60))
+    for hour in range(4, 20) for minute in [0, 30]
+], lower_edges=True, transform=get_local_minutes)
+
+
+def get_bucket_stats(columns: Dict[str, np.ndarray], dimensions: List[BucketDimension],
+                     gain_field: str = 'profit_loss') -> List[Dict[str, np.ndarray]]:
+    """
+    trades, win trades, loss trades, total profit, total loss, P&L, win rate and profit/loss ratio
+    of each bucket in all dimensions, buckets of all dimensions reduced together
+    """
+    gains = np.asarray(columns[gain_field], dtype=np.float64)
+    offsets = [0]
+    all_indexes = []
+    all_gains = []
+    for dimension in dimensions:
+        values = dimension.get_values(columns)
+        mask = dimension.get_mask(columns, values)
+        all_indexes.append(dimension.get_indexes(values)[mask] + offsets[-1])
+        all_gains.append(gains[mask])
+        offsets.append(offsets[-1] + len(dimension.get_labels()))
+    indexes = np.concatenate(all_indexes).astype(np.int64)
+    gains = np.concatenate(all_gains)
+    wins = gains > 0
+    # trades, win trades, total profit, total loss and P&L of each bucket
+    totals = np.zeros((offsets[-1], 5), dtype=np.float64)
+    np.add.at(totals, indexes, np.column_stack([
+        np.ones(len(gains)), wins, np.where(wins, gains, 0.0), np.where(wins, 0.0, gains), gains]))
+    trades = totals[:, 0].astype(np.int64)
+    win_trades = totals[:, 1].astype(np.int64)
+    loss_trades = trades - win_trades
+    with np.errstate(divide='ignore', invalid='ignore'):
+        win_rate = np.where(trades > 0, win_trades / trades * 100, 0.0)
+        avg_profit = np.where(win_trades > 0, totals[:, 2] / win_trades, 1.0)
+        avg_loss = np.where(loss_trades > 0, totals[:, 3] / loss_trades, 1.0)
+        profit_loss_ratio = np.where(
+            avg_loss < 0, np.abs(avg_profit / avg_loss), 1.0)
+    profit_loss_ratio = np.where(trades > 0, profit_loss_ratio, 0.0)
+    stats = []
+    for i in range(0, len(dimensions)):
+        start, end = offsets[i], offsets[i + 1]
+        stats.append({
+            "trades": trades[start:end],
+            "win_trades": win_trades[start:end],
+            "loss_trades": loss_trades[start:end],
+            "total_profit": totals[start:end, 2],
+            "total_loss": totals[start:end, 3],
+            "profit_loss": totals[start:end, 4],
+            "win_rate": win_rate[start:end],
+            "profit_loss_ratio": profit_loss_ratio[start:end],
+        })
+    return stats
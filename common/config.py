@@ -85,10 +85,68 @@ DAY_BUY_DIP_CANDLE_CHECK_COUNT = 5
 # volume to my position size ratio
 DAY_VOLUME_POS_SIZE_RATIO = 10
 DAY_EXTENDED_VOLUME_POS_SIZE_RATIO = 5
+# 1m bars cached for each tracking ticker
+DAY_BAR_CACHE_SIZE = 60
+# prefetched 1m bars expire time in seconds
+DAY_PREFETCH_BARS_TTL_IN_SEC = 3
+# max worker threads to trade tracking tickers concurrently
+DAY_TRADE_MAX_WORKERS = 4
+# trade check interval in seconds for ticker with position or pending order
+DAY_ACTIVE_TICKER_INTERVAL_IN_SEC = 1
+# trade check interval in seconds for ticker waiting for entry
+DAY_WATCH_TICKER_INTERVAL_IN_SEC = 3
+# strategy update interval in seconds if no ticker is due, scan for new tickers
+IDLE_UPDATE_INTERVAL_IN_SEC = 5
+# account positions and usable cash reuse time in seconds
+ACCOUNT_SNAPSHOT_TTL_IN_SEC = 1
+# order status check interval in seconds while any order is pending
+ORDER_CHECK_INTERVAL_IN_SEC = 1
+# history orders to load for final status of closed orders
+ORDER_HISTORY_FETCH_COUNT = 20
+# delay in seconds after minute boundary to refresh closed bars
+BAR_CLOSE_DELAY_IN_SEC = 2
+# max sleep in seconds of scheduler loop, to check market hour end
+SCHEDULER_MAX_SLEEP_IN_SEC = 1
+# scheduler latency report interval in minutes
+SCHEDULER_REPORT_INTERVAL_IN_MIN = 10
+# historical bars inserted in each bulk insert batch
+HIST_BAR_BULK_BATCH_SIZE = 500
+# max worker threads to fetch historical data of symbols concurrently
+HIST_FETCH_MAX_WORKERS = 4
+# trading logs flush interval in seconds of background log writer
+TRADING_LOG_FLUSH_INTERVAL_IN_SEC = 5
+# buffered trading log lines to flush before interval
+TRADING_LOG_FLUSH_LINES = 500
+
+# webull api config
+
+# max requests per second and burst size for each api family
+WEBULL_API_RATE_LIMITS = {
+    "quote": (5.0, 5),
+    "bars": (5.0, 10),
+    "orders": (2.0, 2),
+    "news": (1.0, 1),
+    "ranking": (1.0, 2),
+}
+# connection pool size of shared http session
+WEBULL_HTTP_POOL_SIZE = 20
+# http request timeout in seconds
+WEBULL_HTTP_TIMEOUT_IN_SEC = 10
+# max worker threads for concurrent api fan-out
+WEBULL_API_MAX_WORKERS = 8
+# max tickers per charts query request
+WEBULL_CHARTS_BATCH_SIZE = 20
+
+# finviz config
+
+# min interval in seconds between finviz page requests
+FINVIZ_REQUEST_INTERVAL_IN_SEC = 1.0
 
 # memcache config
 
 CACHE_TIMEOUT = 60 * 10
+# timeout of reports invalidated by data versions
+REPORT_CACHE_TIMEOUT = 60 * 60 * 24 * 7
 
 
 # twilio config
@@ -1,13 +1,18 @@
-from typing import List, Optional
+import json
+import zlib
+import numpy as np
+from typing import Dict, List, Optional
 from django.db.models.query import QuerySet
 import pytz
 from django.conf import settings
-from datetime import datetime, date
-from common import enums, utils, constants
+from django.db import transaction
+from django.utils import timezone
+from datetime import datetime, date, timedelta
+from common import bar_store, config, enums, report_cache, utils, constants
 from sdk import webullsdk
 from logger import exception_logger
-from webull_trader.models import DayPosition, DayTrade, HistoricalDailyBar, HistoricalDayTradePerformance, HistoricalKeyStatistics, HistoricalMarketStatistics, HistoricalMinuteBar, HistoricalTopGainer, \
-    HistoricalTopLoser, SwingHistoricalDailyBar, TradingSettings, TradingSymbols, WebullAccountStatistics, WebullCredentials, WebullNews, WebullOrder
+from webull_trader.models import DayPosition, DayTrade, DayTradeFacts, HistoricalDailyBar, HistoricalDayChartPayload, HistoricalDayTradePerformance, HistoricalFetchCheckpoint, HistoricalKeyStatistics, HistoricalMarketStatistics, HistoricalMinuteBar, HistoricalTopGainer, \
+    HistoricalTopLoser, StockQuote, SwingHistoricalDailyBar, TradingSettings, TradingSymbols, WebullAccountStatistics, WebullCredentials, WebullNews, WebullOrder
 
 
 def get_or_create_trading_settings() -> TradingSettings:
@@ -276,29 +281,6 @@ def save_webull_order(order_data: dict, paper: bool = True) -> WebullOrder:
     return order
 
 
-def save_webull_order_backtest(order_data: dict, setup: enums.SetupType, note: str) -> WebullOrder:
-    order = WebullOrder(
-        order_id=str(order_data['orderId']),
-        ticker_id=str(order_data['ticker']['tickerId']),
-        symbol=order_data['ticker']['symbol'],
-        action=order_data['action'],
-        status=order_data['statusStr'],
-        total_quantity=int(order_data['totalQuantity']),
-        filled_quantity=int(order_data['filledQuantity']),
-        price=float(order_data['lmtPrice']),
-        avg_price=float(order_data['avgFilledPrice']),
-        order_type=order_data['orderType'],
-        filled_time=order_data['filledTime'],
-        placed_time=order_data['placedTime'],
-        time_in_force=order_data['timeInForce'],
-        paper=True,
-        setup=setup,
-        note=note,
-    )
-    order.save()
-    return order
-
-
 def save_webull_min_usable_cash(usable_cash: float, day: Optional[date] = None):
     if not day:
         day = date.today()
@@ -364,6 +346,119 @@ def add_day_trade(symbol: str, ticker_id: str, position: DayPosition, order_id:
     return trade
 
 
+def build_day_trade_facts(day_trades: List[DayTrade]) -> List[DayTradeFacts]:
+    """
+    report values of day trades, key statistics, daily bars, minute bars and quotes loaded with one query each
+    """
+    if len(day_trades) == 0:
+        return []
+    symbols = set(day_trade.symbol for day_trade in day_trades)
+    buy_dates = set(day_trade.buy_date for day_trade in day_trades)
+    key_stats = {}
+    for key_statistics in HistoricalKeyStatistics.objects.filter(symbol__in=symbols, date__in=buy_dates).order_by('id'):
+        key_stats.setdefault(
+            (key_statistics.symbol, key_statistics.date), key_statistics)
+    # gap of open from previous daily bar close
+    gaps = {}
+    prev_bar = None
+    daily_bars = HistoricalDailyBar.objects.filter(symbol__in=symbols, date__lte=max(buy_dates)).order_by(
+        'symbol', 'date').values_list('symbol', 'date', 'open', 'close')
+    for bar in daily_bars.iterator():
+        if prev_bar and prev_bar[0] == bar[0] and prev_bar[3] > 0:
+            gaps[(bar[0], bar[1])] = round(
+                (bar[2] - prev_bar[3]) / prev_bar[3] * 100, 2)
+        prev_bar = bar
+    bar_volumes = bar_store.get_minute_volumes(symbols, buy_dates)
+    sectors = {}
+    for symbol, sector in StockQuote.objects.filter(symbol__in=symbols).order_by('id').values_list('symbol', 'sector'):
+        sectors.setdefault(symbol, sector)
+
+    facts_list = []
+    for day_trade in day_trades:
+        symbol = day_trade.symbol
+        local_time = utils.local_datetime(day_trade.buy_time)
+        trading_hour = None
+        if utils.is_regular_market_time(local_time):
+            trading_hour = enums.TradingHourType.REGULAR
+        elif utils.is_pre_market_time(local_time):
+            trading_hour = enums.TradingHourType.BEFORE_MARKET_OPEN
+        elif utils.is_after_market_time(local_time):
+            trading_hour = enums.TradingHourType.AFTER_MARKET_CLOSE
+        # avg volume of 2 minute bars before entry
+        buy_minute = int(day_trade.buy_time.timestamp()) // 60
+        volumes = [bar_volumes[(symbol, buy_minute - i)] for i in range(1, 3)
+                   if (symbol, buy_minute - i) in bar_volumes]
+        pre_entry_volume = 0.0
+        if len(volumes) > 0:
+            pre_entry_volume = sum(volumes) / len(volumes)
+        profit_loss = day_trade.total_sold - day_trade.total_cost
+        facts = DayTradeFacts(
+            day_trade=day_trade,
+            buy_time=day_trade.buy_time,
+            trading_hour=trading_hour,
+            entry_price=day_trade.total_cost / day_trade.quantity if day_trade.quantity > 0 else 0.0,
+            gap=gaps.get((symbol, day_trade.buy_date), 0.0),
+            pre_entry_volume=pre_entry_volume,
+            sector=sectors.get(symbol),
+            holding_sec=(day_trade.sell_time - day_trade.buy_time).seconds,
+            profit_loss=profit_loss,
+            profit_loss_pct=round(profit_loss / day_trade.total_cost * 100, 2) if day_trade.total_cost > 0 else 0.0,
+        )
+        key_statistics = key_stats.get((symbol, day_trade.buy_date))
+        if key_statistics:
+            facts.has_key_statistics = True
+            facts.market_value = key_statistics.market_value
+            facts.outstanding_shares = key_statistics.outstanding_shares
+            facts.turnover_rate = key_statistics.turnover_rate
+            facts.short_float = key_statistics.short_float
+            if key_statistics.avg_vol_3m:
+                facts.relative_volume = round(
+                    key_statistics.volume / key_statistics.avg_vol_3m, 2)
+        facts_list.append(facts)
+    return facts_list
+
+
+def save_day_trade_facts(day_trades: List[DayTrade]) -> int:
+    """
+    replace report facts of day trades, return saved facts count
+    """
+    day_trades = list(day_trades)
+    facts_list = build_day_trade_facts(day_trades)
+    with transaction.atomic():
+        DayTradeFacts.objects.filter(
+            day_trade_id__in=[day_trade.id for day_trade in day_trades]).delete()
+        DayTradeFacts.objects.bulk_create(
+            facts_list, batch_size=config.HIST_BAR_BULK_BATCH_SIZE)
+    # bulk create sends no save signal
+    report_cache.bump_versions([report_cache.VERSION_DAY_TRADE_FACTS])
+    return len(facts_list)
+
+
+def get_day_trade_fact_columns(fields: List[str]) -> Dict[str, np.ndarray]:
+    """
+    fields and P&L of adjusted day trades as column arrays in one query,
+    None value is nan, datetime is unix timestamp
+    """
+    fields = list(dict.fromkeys(fields + ['profit_loss']))
+    rows = list(DayTradeFacts.objects.filter(
+        day_trade__require_adjustment=False).values_list(*fields))
+    columns = {}
+    for i, field in enumerate(fields):
+        values = [row[i] for row in rows]
+        internal_type = DayTradeFacts._meta.get_field(
+            field).get_internal_type()
+        if internal_type == 'CharField':
+            columns[field] = np.array(values, dtype=object)
+        elif internal_type == 'BooleanField':
+            columns[field] = np.array(values, dtype=bool)
+        elif internal_type == 'DateTimeField':
+            columns[field] = np.array(
+                [value.timestamp() for value in values], dtype=np.float64)
+        else:
+            columns[field] = np.array(values, dtype=np.float64)
+    return columns
+
+
 def save_webull_news_list(news_list: List[dict], symbol: str, date: date):
     print("[{}] Importing news for {}...".format(utils.get_now(), symbol))
     for news_data in news_list:
@@ -498,20 +593,87 @@ def save_hist_top_loser(loser_data: dict, date: date):
 
 
 def get_hist_minute_bar(symbol: str, time: datetime) -> Optional[HistoricalMinuteBar]:
-    return HistoricalMinuteBar.objects.filter(symbol=symbol).filter(
-        time__year=str(time.year), time__month=str(time.month), time__day=str(time.day), time__hour=str(time.hour), time__minute=str(time.minute)).first()
+    if timezone.is_naive(time):
+        time = timezone.make_aware(time)
+    # time range of the minute, use (symbol, time) index
+    start_time = time.replace(second=0, microsecond=0)
+    return HistoricalMinuteBar.objects.filter(symbol=symbol, time__gte=start_time,
+                                              time__lt=start_time + timedelta(minutes=1)).order_by('time').first()
 
 
 def get_hist_day_perf(day: date) -> HistoricalDayTradePerformance:
     return HistoricalDayTradePerformance.objects.filter(date=day).first()
 
 
+def get_hist_fetch_checkpoints(day: date) -> set:
+    """
+    (symbol, dataset) of fetched historical data in the day
+    """
+    return set(HistoricalFetchCheckpoint.objects.filter(date=day).values_list('symbol', 'dataset'))
+
+
+def save_hist_fetch_checkpoint(day: date, symbol: str, dataset: str):
+    HistoricalFetchCheckpoint.objects.get_or_create(
+        date=day, symbol=symbol, dataset=dataset)
+
+
+def save_hist_day_chart_payload(day: date, symbol: str, payload: dict):
+    """
+    save day analytics chart payload as zlib compressed json
+    """
+    data = zlib.compress(json.dumps(payload).encode('utf-8'))
+    HistoricalDayChartPayload.objects.update_or_create(
+        date=day, symbol=symbol, defaults={'payload': data})
+
+
+def get_hist_day_chart_payload(day: date, symbol: str) -> Optional[dict]:
+    data = HistoricalDayChartPayload.objects.filter(
+        date=day, symbol=symbol).values_list('payload', flat=True).first()
+    if data == None:
+        return None
+    return json.loads(zlib.decompress(data))
+
+
+def bulk_save_hist_bar_list(model, key_field: str, bar_list: List[dict], fields: List[str]) -> int:
+    """
+    insert bars not saved yet in batches, existing keys of each symbol fetched in one query,
+    return inserted bar count
+    """
+    # compare keys as saved values, date may be string
+    key_to_python = model._meta.get_field(key_field).to_python
+    symbol_bars = {}
+    for bar_data in bar_list:
+        symbol_bars.setdefault(bar_data['symbol'], []).append(bar_data)
+    inserted = 0
+    with transaction.atomic():
+        for symbol, bars in symbol_bars.items():
+            keys = [key_to_python(bar_data[key_field]) for bar_data in bars]
+            existing_keys = set(model.objects.filter(**{
+                'symbol': symbol,
+                f'{key_field}__gte': min(keys),
+                f'{key_field}__lte': max(keys),
+            }).values_list(key_field, flat=True))
+            new_bars = []
+            for bar_data, key in zip(bars, keys):
+                if key in existing_keys:
+                    continue
+                # skip duplicated bar in list
+                existing_keys.add(key)
+                new_bars.append(
+                    model(**{field: bar_data[field] for field in fields}))
+            # unique constraint rejects bars saved by others meanwhile
+            model.objects.bulk_create(
+                new_bars, batch_size=config.HIST_BAR_BULK_BATCH_SIZE, ignore_conflicts=True)
+            inserted += len(new_bars)
+    return inserted
+
+
 def save_hist_minute_bar_list(bar_list: List[dict]):
     if len(bar_list) > 0:
         print("[{}] Importing minute bar for {}...".format(
             utils.get_now(), bar_list[0]['symbol']))
-        for bar_data in bar_list:
-            save_hist_minute_bar(bar_data)
+        bulk_save_hist_bar_list(HistoricalMinuteBar, 'time', bar_list, [
+            'symbol', 'date', 'time', 'open', 'high', 'low', 'close', 'volume', 'vwap'])
 
 
 def save_hist_minute_bar(bar_data: dict):
@@ -536,8 +698,8 @@ def save_hist_daily_bar_list(bar_list: List[dict]):
     if len(bar_list) > 0:
         print("[{}] Importing daily bar for {}...".format(
             utils.get_now(), bar_list[0]['symbol']))
-        for bar_data in bar_list:
-            save_hist_daily_bar(bar_data)
+        bulk_save_hist_bar_list(HistoricalDailyBar, 'date', bar_list, [
+            'symbol', 'date', 'open', 'high', 'low', 'close', 'volume'])
 
 
 def save_hist_daily_bar(bar_data: dict):
@@ -557,10 +719,13 @@ def save_hist_daily_bar(bar_data: dict):
 
 
 def save_swing_hist_daily_bar_list(bar_list: List[dict]):
-    print("[{}] Importing swing daily bar for {}...".format(
-        utils.get_now(), bar_list[0]['symbol']))
-    for bar_data in bar_list:
-        save_swing_hist_daily_bar(bar_data)
+    if len(bar_list) > 0:
+        print("[{}] Importing swing daily bar for {}...".format(
+            utils.get_now(), bar_list[0]['symbol']))
+        bulk_save_hist_bar_list(SwingHistoricalDailyBar, 'date', bar_list, [
+            'symbol', 'date', 'open', 'high', 'low', 'close', 'volume', 'rsi_10', 'sma_55', 'sma_120'])
+        # bulk create sends no save signal
+        report_cache.bump_versions([report_cache.VERSION_SWING_DAILY_BAR])
 
 
 def save_swing_hist_daily_bar(bar_data: dict):
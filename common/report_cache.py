@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# report render contexts cached by data versions in shared cache of all web workers
+
+import time
+from typing import List, Optional
+from django.core.cache import cache
+from common import config
+
+# data versions, bumped on saves of the model with same name
+VERSION_DAY_TRADE = "DayTrade"
+VERSION_DAY_TRADE_FACTS = "DayTradeFacts"
+VERSION_DAY_TRADE_PERF = "HistoricalDayTradePerformance"
+VERSION_SWING_TRADE = "SwingTrade"
+VERSION_SWING_POSITION = "SwingPosition"
+VERSION_SWING_DAILY_BAR = "SwingHistoricalDailyBar"
+VERSION_ORDER = "WebullOrder"
+VERSION_SETTINGS = "TradingSettings"
+
+DAY_TRADE_VERSIONS = [VERSION_DAY_TRADE, VERSION_DAY_TRADE_FACTS]
+SWING_POSITION_VERSIONS = [VERSION_SWING_POSITION,
+                           VERSION_ORDER, VERSION_SWING_DAILY_BAR]
+
+# report name: data versions of report, cache timeout
+REPORTS = {
+    "day_reports_price": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_price_shares": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_mktcap": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_float": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_turnover": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_short": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_gap": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_relvol": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_regvol": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_bmovol": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_amcvol": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_sector": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_holding": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_plpct": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_hourly": (DAY_TRADE_VERSIONS, config.REPORT_CACHE_TIMEOUT),
+    "day_reports_daily": ([VERSION_DAY_TRADE_PERF], config.REPORT_CACHE_TIMEOUT),
+    "day_reports_weekly": ([VERSION_DAY_TRADE_PERF], config.REPORT_CACHE_TIMEOUT),
+    "day_reports_monthly": ([VERSION_DAY_TRADE_PERF], config.REPORT_CACHE_TIMEOUT),
+    # positions show latest quotes, keep short timeout
+    "swing_positions": (SWING_POSITION_VERSIONS, config.CACHE_TIMEOUT),
+    "swing_positions_symbol": (SWING_POSITION_VERSIONS, config.CACHE_TIMEOUT),
+    "swing_analytics": ([VERSION_SWING_TRADE], config.REPORT_CACHE_TIMEOUT),
+    "swing_analytics_symbol": ([VERSION_SWING_TRADE, VERSION_SWING_DAILY_BAR], config.REPORT_CACHE_TIMEOUT),
+}
+
+
+def get_version_key(name: str) -> str:
+    return "report_version_{}".format(name)
+
+
+def bump_versions(names: List[str]):
+    """
+    invalidate cached reports of data versions, nanosecond versions never go back
+    even if two workers bump at the same time
+    """
+    version = time.time_ns()
+    cache.set_many({get_version_key(name): version for name in names}, None)
+
+
+def get_versions(names: List[str]) -> List[int]:
+    keys = [get_version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # new version for missing version, not reuse contexts of evicted version
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key, time.time_ns())
+    return [versions[key] for key in keys]
+
+
+def get_context_key(report: str, *args) -> str:
+    """
+    cache key of report context with current data versions, get it before loading report data
+    so context of stale data is never saved under new versions
+    """
+    names, _ = REPORTS[report]
+    versions = get_versions(names + [VERSION_SETTINGS])
+    return "report_{}_{}".format(
+        "_".join([report] + [str(arg) for arg in args]), "_".join(str(version) for version in versions))
+
+
+def get_timeout(report: str) -> Optional[int]:
+    _, timeout = REPORTS[report]
+    return timeout
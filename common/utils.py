@@ -5,8 +5,8 @@ import numpy as np
 from typing import List, Optional
 from django.utils import timezone
 from django.contrib.auth.models import User
-from datetime import datetime
-from common import db, config, enums, constants
+from datetime import date, datetime
+from common import bar_store, bucketing, db, config, enums, constants
 from sdk import fmpsdk
 from webull_trader.models import HistoricalMinuteBar, StockQuote, SwingHistoricalDailyBar, TradingSettings, WebullNews, WebullOrder, HistoricalDailyBar
 
@@ -116,92 +116,49 @@ def get_now() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-def _open_resampler(series: pd.Series) -> float:
-    if series.size > 0:
-        return series[0]
-    return 0
-
-
-def _close_resampler(series: pd.Series) -> float:
-    if series.size > 0:
-        return series[-1]
-    return 0
-
-
-def _high_resampler(series: pd.Series) -> float:
-    if series.size > 0:
-        return np.max(series)
-    return 0
-
-
-def _low_resampler(series: pd.Series) -> float:
-    if series.size > 0:
-        return np.min(series)
-    return 0
-
-
-def _volume_resampler(series: pd.Series) -> float:
-    if series.size > 0:
-        return np.sum(series)
-    return 0
-
-
-def _vwap_resampler(series: pd.Series) -> float:
-    if series.size > 0:
-        return series[-1]
-    return 0
+def resample_bars(bars: pd.DataFrame, minutes: int) -> pd.DataFrame:
+    """
+    aggregate minute bars into bars of given minutes in one pass, same as resample with right label
+    and right closed from start of first day, bars with zero value are skipped
+    """
+    if bars.empty:
+        return pd.DataFrame()
+    if not bars.index.is_monotonic_increasing:
+        bars = bars.sort_index()
+    index = bars.index
+    step = pd.Timedelta(minutes=minutes).value
+    origin = index[0].normalize().value
+    times = index.asi8
+    # bar of (t - minutes, t] labeled as t
+    labels = origin - (origin - times) // step * step
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    ends = np.r_[starts[1:], len(times)] - 1
+    resampled_index = pd.DatetimeIndex(labels[starts], name=index.name)
+    if index.tz != None:
+        resampled_index = resampled_index.tz_localize(
+            'UTC').tz_convert(index.tz)
+    # keep frequency like resample if no bar is missing
+    if len(starts) == (labels[-1] - labels[0]) // step + 1:
+        resampled_index = pd.date_range(
+            resampled_index[0], periods=len(starts), freq=pd.Timedelta(minutes=minutes), name=index.name)
+    resampled_bars = pd.DataFrame({
+        'open': bars['open'].to_numpy()[starts],
+        'close': bars['close'].to_numpy()[ends],
+        'high': np.fmax.reduceat(bars['high'].to_numpy(), starts),
+        'low': np.fmin.reduceat(bars['low'].to_numpy(), starts),
+        'volume': np.add.reduceat(np.nan_to_num(bars['volume'].to_numpy()), starts),
+        'vwap': bars['vwap'].to_numpy()[ends],
+    }, index=resampled_index)
+    # filter zero row
+    return resampled_bars.loc[(resampled_bars != 0).all(axis=1), :]
 
 
 def convert_2m_bars(bars: pd.DataFrame) -> pd.DataFrame:
-    if not bars.empty:
-        bars_2m = pd.DataFrame()
-        bars_2m_open = bars['open'].resample(
-            '2T', label="right", closed="right").apply(_open_resampler)
-        bars_2m_close = bars['close'].resample(
-            '2T', label="right", closed="right").apply(_close_resampler)
-        bars_2m_high = bars['high'].resample(
-            '2T', label="right", closed="right").apply(_high_resampler)
-        bars_2m_low = bars['low'].resample(
-            '2T', label="right", closed="right").apply(_low_resampler)
-        bars_2m_volume = bars['volume'].resample(
-            '2T', label="right", closed="right").apply(_volume_resampler)
-        bars_2m_vwap = bars['vwap'].resample(
-            '2T', label="right", closed="right").apply(_vwap_resampler)
-        bars_2m['open'] = bars_2m_open
-        bars_2m['close'] = bars_2m_close
-        bars_2m['high'] = bars_2m_high
-        bars_2m['low'] = bars_2m_low
-        bars_2m['volume'] = bars_2m_volume
-        bars_2m['vwap'] = bars_2m_vwap
-        # filter zero row
-        return bars_2m.loc[(bars_2m != 0).all(axis=1), :]
-    return pd.DataFrame()
+    return resample_bars(bars, 2)
 
 
 def convert_5m_bars(bars: pd.DataFrame) -> pd.DataFrame:
-    if not bars.empty:
-        bars_5m = pd.DataFrame()
-        bars_5m_open = bars['open'].resample(
-            '5T', label="right", closed="right").apply(_open_resampler)
-        bars_5m_close = bars['close'].resample(
-            '5T', label="right", closed="right").apply(_close_resampler)
-        bars_5m_high = bars['high'].resample(
-            '5T', label="right", closed="right").apply(_high_resampler)
-        bars_5m_low = bars['low'].resample(
-            '5T', label="right", closed="right").apply(_low_resampler)
-        bars_5m_volume = bars['volume'].resample(
-            '5T', label="right", closed="right").apply(_volume_resampler)
-        bars_5m_vwap = bars['vwap'].resample(
-            '5T', label="right", closed="right").apply(_vwap_resampler)
-        bars_5m['open'] = bars_5m_open
-        bars_5m['close'] = bars_5m_close
-        bars_5m['high'] = bars_5m_high
-        bars_5m['low'] = bars_5m_low
-        bars_5m['volume'] = bars_5m_volume
-        bars_5m['vwap'] = bars_5m_vwap
-        # filter zero row
-        return bars_5m.loc[(bars_5m != 0).all(axis=1), :]
-    return pd.DataFrame()
+    return resample_bars(bars, 5)
 
 
 def is_market_hour() -> bool:
@@ -429,14 +386,12 @@ def get_swing_avg_true_range(symbol: str, period: int = 20) -> float:
 
 def get_day_avg_true_range(bars: pd.DataFrame, period: int = 10) -> float:
     period_bars = bars.head(len(bars) - 1).tail(period + 1)
-    true_range_list = []
-    for i in range(0, len(period_bars) - 1):
-        current_bar = period_bars.iloc[len(period_bars) - i - 1]
-        prev_bar = period_bars.iloc[len(period_bars) - i - 2]
-        true_range = max(current_bar['high'] - current_bar['low'], current_bar['high'] -
-                         prev_bar['close'], prev_bar['close'] - current_bar['low'])
-        true_range_list.append(true_range)
-    N = sum(true_range_list)/len(true_range_list)
+    highs = period_bars['high'].to_numpy()[1:]
+    lows = period_bars['low'].to_numpy()[1:]
+    prev_closes = period_bars['close'].to_numpy()[:-1]
+    true_ranges = np.maximum(highs - lows, np.maximum(
+        highs - prev_closes, prev_closes - lows))
+    N = true_ranges.sum()/len(true_ranges)
     return N
 
 
@@ -597,709 +552,100 @@ def get_trades_from_orders(buy_orders, sell_orders):
     return trades
 
 
-def get_stats_empty_list(size=8):
-    empty_list = []
-    for _ in range(0, size):
-        empty_list.append({
-            "trades": 0,
-            "win_trades": 0,
-            "loss_trades": 0,
-            "total_profit": 0.0,
-            "total_loss": 0.0,
-            "profit_loss": 0.0,
-        })
-    return empty_list
-
-
 def get_entry_price_range_labels():
-    return [
-        "$0-$1",  # 0
-        "$1-$2",  # 1
-        "$2-$3",  # 2
-        "$3-$4",  # 3
-        "$4-$5",  # 4
-        "$5-$6",  # 5
-        "$6-$7",  # 6
-        "$7-$8",  # 7
-        "$8-$9",  # 8
-        "$9-$10",  # 9
-        "$10-$15",  # 10
-        "$15-$20",  # 11
-        "$20-$50",  # 12
-        "$50-$100",  # 13
-        "$100-$200",  # 14
-        "$200+",  # 15
-    ]
+    return bucketing.ENTRY_PRICE.get_labels()
 
 
 def get_entry_price_range_index(p):
-    index = -1
-    if p <= 1:
-        index = 0
-    elif p <= 2:
-        index = 1
-    elif p <= 3:
-        index = 2
-    elif p <= 4:
-        index = 3
-    elif p <= 5:
-        index = 4
-    elif p <= 6:
-        index = 5
-    elif p <= 7:
-        index = 6
-    elif p <= 8:
-        index = 7
-    elif p <= 9:
-        index = 8
-    elif p <= 10:
-        index = 9
-    elif p <= 15:
-        index = 10
-    elif p <= 20:
-        index = 11
-    elif p <= 50:
-        index = 12
-    elif p <= 100:
-        index = 13
-    elif p <= 200:
-        index = 14
-    else:
-        index = 15
-    return index
+    return bucketing.ENTRY_PRICE.get_index(p)
 
 
 def get_market_cap_range_labels():
-    return [
-        "0-50M (Nano Cap)",  # 0
-        "50M-100M (Micro Cap)",  # 1
-        "100M-150M (Micro Cap)",  # 2
-        "150M-200M (Micro Cap)",  # 3
-        "200M-250M (Micro Cap)",  # 4
-        "250M-300M (Micro Cap)",  # 5
-        "300M-400M (Small Cap)",  # 6
-        "400M-500M (Small Cap)",  # 7
-        "500M-600M (Small Cap)",  # 8
-        "600M-700M (Small Cap)",  # 9
-        "700M-800M (Small Cap)",  # 10
-        "800M-900M (Small Cap)",  # 11
-        "900M-1B (Small Cap)",  # 12
-        "1B-2B (Small Cap)",  # 13
-        "2B-10B (Mid Cap)",  # 14
-        "10B-200B (Large Cap)",  # 15
-        "200B+ (Mega Cap)",  # 16
-    ]
+    return bucketing.MARKET_CAP.get_labels()
 
 
 def get_market_cap_range_index(mktcap):
-    index = -1
-    if mktcap <= 50000000:
-        index = 0
-    elif mktcap <= 100000000:
-        index = 1
-    elif mktcap <= 150000000:
-        index = 2
-    elif mktcap <= 200000000:
-        index = 3
-    elif mktcap <= 250000000:
-        index = 4
-    elif mktcap <= 300000000:
-        index = 5
-    elif mktcap <= 400000000:
-        index = 6
-    elif mktcap <= 500000000:
-        index = 7
-    elif mktcap <= 600000000:
-        index = 8
-    elif mktcap <= 700000000:
-        index = 9
-    elif mktcap <= 800000000:
-        index = 10
-    elif mktcap <= 900000000:
-        index = 11
-    elif mktcap <= 1000000000:
-        index = 12
-    elif mktcap <= 2000000000:
-        index = 13
-    elif mktcap <= 10000000000:
-        index = 14
-    elif mktcap <= 200000000000:
-        index = 15
-    else:
-        index = 16
-    return index
+    return bucketing.MARKET_CAP.get_index(mktcap)
 
 
 def get_free_float_range_labels():
-    return [
-        "None",  # 0
-        "0-1M",  # 1
-        "1M-2M",  # 2
-        "2M-3M",  # 3
-        "3M-4M",  # 4
-        "4M-5M",  # 5
-        "5M-6M",  # 6
-        "6M-7M",  # 7
-        "7M-8M",  # 8
-        "8M-9M",  # 9
-        "9M-10M",  # 10
-        "10M-11M",  # 11
-        "11M-12M",  # 12
-        "12M-13M",  # 13
-        "13M-14M",  # 14
-        "14M-15M",  # 15
-        "15M-16M",  # 16
-        "16M-17M",  # 17
-        "17M-18M",  # 18
-        "18M-19M",  # 19
-        "19M-20M",  # 20
-        "20M-30M",  # 21
-        "30M-50M",  # 22
-        "50M-100M",  # 23
-        "100M-200M",  # 24
-        "200M-500M",  # 25
-        "500M-1B",  # 26
-        "1B+",  # 27
-    ]
+    return bucketing.FREE_FLOAT.get_labels()
 
 
 def get_free_float_range_index(free_float):
-    index = -1
-    if free_float == None:
-        index = 0
-    elif free_float <= 1000000:
-        index = 1
-    elif free_float <= 2000000:
-        index = 2
-    elif free_float <= 3000000:
-        index = 3
-    elif free_float <= 4000000:
-        index = 4
-    elif free_float <= 5000000:
-        index = 5
-    elif free_float <= 6000000:
-        index = 6
-    elif free_float <= 7000000:
-        index = 7
-    elif free_float <= 8000000:
-        index = 8
-    elif free_float <= 9000000:
-        index = 9
-    elif free_float <= 10000000:
-        index = 10
-    elif free_float <= 11000000:
-        index = 11
-    elif free_float <= 12000000:
-        index = 12
-    elif free_float <= 13000000:
-        index = 13
-    elif free_float <= 14000000:
-        index = 14
-    elif free_float <= 15000000:
-        index = 15
-    elif free_float <= 16000000:
-        index = 16
-    elif free_float <= 17000000:
-        index = 17
-    elif free_float <= 18000000:
-        index = 18
-    elif free_float <= 19000000:
-        index = 19
-    elif free_float <= 20000000:
-        index = 20
-    elif free_float <= 30000000:
-        index = 21
-    elif free_float <= 50000000:
-        index = 22
-    elif free_float <= 100000000:
-        index = 23
-    elif free_float <= 200000000:
-        index = 24
-    elif free_float <= 500000000:
-        index = 25
-    elif free_float <= 1000000000:
-        index = 26
-    else:
-        index = 27
-    return index
+    return bucketing.FREE_FLOAT.get_index(free_float)
 
 
 def get_turnover_ratio_range_labels():
-    return [
-        "None",  # 0
-        "0-10%",  # 1
-        "10-20%",  # 2
-        "20-40%",  # 3
-        "40-60%",  # 4
-        "60-80%",  # 5
-        "80-100%",  # 6
-        "100-200%",  # 7
-        "200-500%",  # 8
-        "500-1000%",  # 9
-        "1000%+",  # 10
-    ]
+    return bucketing.TURNOVER_RATIO.get_labels()
 
 
 def get_turnover_ratio_range_index(turnover):
-    index = -1
-    if turnover == None:
-        index = 0
-    elif turnover <= 0.1:
-        index = 1
-    elif turnover <= 0.2:
-        index = 2
-    elif turnover <= 0.4:
-        index = 3
-    elif turnover <= 0.6:
-        index = 4
-    elif turnover <= 0.8:
-        index = 5
-    elif turnover <= 1:
-        index = 6
-    elif turnover <= 2:
-        index = 7
-    elif turnover <= 5:
-        index = 8
-    elif turnover <= 10:
-        index = 9
-    else:
-        index = 10
-    return index
+    return bucketing.TURNOVER_RATIO.get_index(turnover)
 
 
 def get_short_float_range_labels():
-    return [
-        "None",  # 0
-        "0-5%",  # 1
-        "5-10%",  # 2
-        "10-15%",  # 3
-        "15-20%",  # 4
-        "20-25%",  # 5
-        "25-30%",  # 6
-        "30%+",  # 7
-    ]
+    return bucketing.SHORT_FLOAT.get_labels()
 
 
 def get_short_float_range_index(short_float):
-    index = -1
-    if short_float == None:
-        index = 0
-    elif short_float <= 5:
-        index = 1
-    elif short_float <= 10:
-        index = 2
-    elif short_float <= 15:
-        index = 3
-    elif short_float <= 20:
-        index = 4
-    elif short_float <= 25:
-        index = 5
-    elif short_float <= 30:
-        index = 6
-    else:
-        index = 7
-    return index
+    return bucketing.SHORT_FLOAT.get_index(short_float)
 
 
 def get_gap_range_labels():
-    return [
-        "Down 15%+",  # 0
-        "Down 10-15%",  # 1
-        "Down 7-10%",  # 2
-        "Down 5-7%",  # 3
-        "Down 3-5%",  # 4
-        "Down 1-3%",  # 5
-        "Down 0-1%",  # 6
-        "Up 0-1%",  # 7
-        "Up 1-3%",  # 8
-        "Up 3-5%",  # 9
-        "Up 5-7%",  # 10
-        "Up 7-10%",  # 11
-        "Up 10-15%",  # 12
-        "Up 15%+",  # 13
-    ]
+    return bucketing.GAP.get_labels()
 
 
 def get_gap_range_index(gap):
-    index = -1
-    if gap <= -15:
-        index = 0
-    elif gap <= -10:
-        index = 1
-    elif gap <= -7:
-        index = 2
-    elif gap <= -5:
-        index = 3
-    elif gap <= -3:
-        index = 4
-    elif gap <= -1:
-        index = 5
-    elif gap <= 0:
-        index = 6
-    elif gap <= 1:
-        index = 7
-    elif gap <= 3:
-        index = 8
-    elif gap <= 5:
-        index = 9
-    elif gap <= 7:
-        index = 10
-    elif gap <= 10:
-        index = 11
-    elif gap <= 15:
-        index = 12
-    else:
-        index = 13
-    return index
+    return bucketing.GAP.get_index(gap)
 
 
 def get_holding_time_labels():
-    return [
-        "0-1m",  # 0
-        "1-3m",  # 1
-        "3-5m",  # 2
-        "5-10m",  # 3
-        "10-15m",  # 4
-        "15-20m",  # 5
-        "20-25m",  # 6
-        "25-30m",  # 7
-        "30-35m",  # 8
-        "35-40m",  # 9
-        "40-45m",  # 10
-        "45-50m",  # 11
-        "50-55m",  # 12
-        "55-60m",  # 13
-        "60m+",  # 14
-    ]
+    return bucketing.HOLDING_TIME.get_labels()
 
 
 def get_holding_time_index(holding_sec):
-    index = -1
-    if holding_sec <= 60:
-        index = 0
-    elif holding_sec <= 180:
-        index = 1
-    elif holding_sec <= 300:
-        index = 2
-    elif holding_sec <= 600:
-        index = 3
-    elif holding_sec <= 900:
-        index = 4
-    elif holding_sec <= 1200:
-        index = 5
-    elif holding_sec <= 1500:
-        index = 6
-    elif holding_sec <= 1800:
-        index = 7
-    elif holding_sec <= 2100:
-        index = 8
-    elif holding_sec <= 2400:
-        index = 9
-    elif holding_sec <= 2700:
-        index = 10
-    elif holding_sec <= 3000:
-        index = 11
-    elif holding_sec <= 3300:
-        index = 12
-    elif holding_sec <= 3600:
-        index = 13
-    else:
-        index = 14
-    return index
+    return bucketing.HOLDING_TIME.get_index(holding_sec)
 
 
 def get_plpct_range_labels():
-    return [
-        "-80~100%",  # 0
-        "-60~80%",  # 1
-        "-40~60%",  # 2
-        "-20~40%",  # 3
-        "-0~20%",  # 4
-        "+0~20%",  # 5
-        "+20~40%",  # 6
-        "+40~60%",  # 7
-        "+60~80%",  # 8
-        "+80~100%",  # 9
-        "+100~120%",  # 10
-        "+120%+",  # 11
-    ]
+    return bucketing.PLPCT.get_labels()
 
 
 def get_plpct_range_index(percentage):
-    index = -1
-    if percentage <= -80:
-        index = 0
-    elif percentage <= -60:
-        index = 1
-    elif percentage <= -40:
-        index = 2
-    elif percentage <= -20:
-        index = 3
-    elif percentage <= 0:
-        index = 4
-    elif percentage <= 20:
-        index = 5
-    elif percentage <= 40:
-        index = 6
-    elif percentage <= 60:
-        index = 7
-    elif percentage <= 80:
-        index = 8
-    elif percentage <= 100:
-        index = 9
-    elif percentage <= 120:
-        index = 10
-    else:
-        index = 11
-    return index
+    return bucketing.PLPCT.get_index(percentage)
 
 
 def get_relative_volume_labels():
-    return [
-        "0-1",  # 0
-        "1-2",  # 1
-        "2-3",  # 2
-        "3-5",  # 3
-        "5-10",  # 4
-        "10-15",  # 5
-        "15-20",  # 6
-        "20-30",  # 7
-        "30-40",  # 8
-        "40-60",  # 9
-        "60-100",  # 10
-        "100+"  # 11
-    ]
+    return bucketing.RELATIVE_VOLUME.get_labels()
 
 
 def get_relative_volume_index(rel_vol):
-    index = -1
-    if rel_vol <= 1:
-        index = 0
-    elif rel_vol <= 2:
-        index = 1
-    elif rel_vol <= 3:
-        index = 2
-    elif rel_vol <= 5:
-        index = 3
-    elif rel_vol <= 10:
-        index = 4
-    elif rel_vol <= 15:
-        index = 5
-    elif rel_vol <= 20:
-        index = 6
-    elif rel_vol <= 30:
-        index = 7
-    elif rel_vol <= 40:
-        index = 8
-    elif rel_vol <= 60:
-        index = 9
-    elif rel_vol <= 100:
-        index = 10
-    else:
-        index = 11
-    return index
+    return bucketing.RELATIVE_VOLUME.get_index(rel_vol)
 
 
 def get_volume_labels():
-    return [
-        "None",  # 0
-        "0-20K",  # 1
-        "20-50K",  # 2
-        "50-100K",  # 3
-        "100-200K",  # 4
-        "200-500K",  # 5
-        "0.5-1M",  # 6
-        "1M+",  # 7
-    ]
+    return bucketing.VOLUME.get_labels()
 
 
 def get_volume_index(vol):
-    index = -1
-    if vol == 0:
-        index = 0
-    elif vol <= 20000:
-        index = 1
-    elif vol <= 50000:
-        index = 2
-    elif vol <= 100000:
-        index = 3
-    elif vol <= 200000:
-        index = 4
-    elif vol <= 500000:
-        index = 5
-    elif vol <= 1000000:
-        index = 6
-    else:
-        index = 7
-    return index
+    return bucketing.VOLUME.get_index(vol)
 
 
 def get_sector_labels() -> List[str]:
-    return [
-        constants.BASIC_MATERIALS,  # 0
-        constants.COMMUNICATION_SERVICES,  # 1
-        constants.CONSUMER_CYCLICAL,  # 2
-        constants.CONSUMER_DEFENSIVE,  # 3
-        constants.ENERGY,  # 4
-        constants.FINANCIAL_SERVICES,  # 5
-        constants.HEALTHCARE,  # 6
-        constants.INDUSTRIALS,  # 7
-        constants.REAL_ESTATE,  # 8
-        constants.TECHNOLOGY,  # 9
-        constants.UTILITIES,  # 10
-        "None",  # 11
-    ]
+    return bucketing.SECTOR.get_labels()
 
 
 def get_sector_index(sector: str) -> int:
-    index = -1
-    if sector == constants.BASIC_MATERIALS:
-        index = 0
-    elif sector == constants.COMMUNICATION_SERVICES:
-        index = 1
-    elif sector == constants.CONSUMER_CYCLICAL:
-        index = 2
-    elif sector == constants.CONSUMER_DEFENSIVE:
-        index = 3
-    elif sector == constants.ENERGY:
-        index = 4
-    elif sector == constants.FINANCIAL_SERVICES:
-        index = 5
-    elif sector == constants.HEALTHCARE:
-        index = 6
-    elif sector == constants.INDUSTRIALS:
-        index = 7
-    elif sector == constants.REAL_ESTATE:
-        index = 8
-    elif sector == constants.TECHNOLOGY:
-        index = 9
-    elif sector == constants.UTILITIES:
-        index = 10
-    elif sector == None or sector == "":
-        index = 11
-    return index
+    return bucketing.SECTOR.get_index(sector)
 
 
 def get_market_hourly_interval_labels():
-    return [
-        "04:00-04:30",  # 0
-        "04:30-05:00",  # 1
-        "05:00-05:30",  # 2
-        "05:30-06:00",  # 3
-        "06:00-06:30",  # 4
-        "06:30-07:00",  # 5
-        "07:00-07:30",  # 6
-        "07:30-08:00",  # 7
-        "08:00-08:30",  # 8
-        "08:30-09:00",  # 9
-        "09:00-09:30",  # 10
-        "09:30-10:00",  # 11
-        "10:00-10:30",  # 12
-        "10:30-11:00",  # 13
-        "11:00-11:30",  # 14
-        "11:30-12:00",  # 15
-        "12:00-12:30",  # 16
-        "12:30-13:00",  # 17
-        "13:00-13:30",  # 18
-        "13:30-14:00",  # 19
-        "14:00-14:30",  # 20
-        "14:30-15:00",  # 21
-        "15:00-15:30",  # 22
-        "15:30-16:00",  # 23
-        "16:00-16:30",  # 24
-        "16:30-17:00",  # 25
-        "17:00-17:30",  # 26
-        "17:30-18:00",  # 27
-        "18:00-18:30",  # 28
-        "18:30-19:00",  # 29
-        "19:00-19:30",  # 30
-        "19:30-20:00",  # 31
-    ]
+    return bucketing.MARKET_HOURLY.get_labels()
 
 
 def get_market_hourly_interval_index(t: datetime) -> int:
-    index = -1
-    if t.hour == 4:
-        if t.minute < 30:
-            index = 0
-        else:
-            index = 1
-    elif t.hour == 5:
-        if t.minute < 30:
-            index = 2
-        else:
-            index = 3
-    elif t.hour == 6:
-        if t.minute < 30:
-            index = 4
-        else:
-            index = 5
-    elif t.hour == 7:
-        if t.minute < 30:
-            index = 6
-        else:
-            index = 7
-    elif t.hour == 8:
-        if t.minute < 30:
-            index = 8
-        else:
-            index = 9
-    elif t.hour == 9:
-        if t.minute < 30:
-            index = 10
-        else:
-            index = 11
-    elif t.hour == 10:
-        if t.minute < 30:
-            index = 12
-        else:
-            index = 13
-    elif t.hour == 11:
-        if t.minute < 30:
-            index = 14
-        else:
-            index = 15
-    elif t.hour == 12:
-        if t.minute < 30:
-            index = 16
-        else:
-            index = 17
-    elif t.hour == 13:
-        if t.minute < 30:
-            index = 18
-        else:
-            index = 19
-    elif t.hour == 14:
-        if t.minute < 30:
-            index = 20
-        else:
-            index = 21
-    elif t.hour == 15:
-        if t.minute < 30:
-            index = 22
-        else:
-            index = 23
-    elif t.hour == 16:
-        if t.minute < 30:
-            index = 24
-        else:
-            index = 25
-    elif t.hour == 17:
-        if t.minute < 30:
-            index = 26
-        else:
-            index = 27
-    elif t.hour == 18:
-        if t.minute < 30:
-            index = 28
-        else:
-            index = 29
-    elif t.hour == 19:
-        if t.minute < 30:
-            index = 30
-        else:
-            index = 31
-    return index
+    return bucketing.MARKET_HOURLY.get_index(t.hour * 60 + t.minute)
 
 
 def get_minute_candle_high_by_time_minute(candle_data, time):
@@ -1915,116 +1261,36 @@ def get_swing_trade_stat_record_for_render(symbol, trade_stat):
     }
 
 
-def get_value_stat_from_trades_for_render(day_trades, field_name, value_idx_func, value_labels):
-    statistics_list = get_stats_empty_list(size=len(value_labels))
-    # for P&L, win rate and profit/loss ratio, trades by value
-    for day_trade in day_trades:
-        symbol = day_trade.symbol
-        buy_date = day_trade.buy_date
-        key_statistics = db.get_hist_key_stat(symbol, buy_date)
-        if key_statistics:
-            value = getattr(key_statistics, field_name)
-            value_idx = value_idx_func(value)
-            gain = day_trade.total_sold - day_trade.total_cost
-            if gain > 0:
-                statistics_list[value_idx]['win_trades'] += 1
-                statistics_list[value_idx]['total_profit'] += gain
-            else:
-                statistics_list[value_idx]['loss_trades'] += 1
-                statistics_list[value_idx]['total_loss'] += gain
-            statistics_list[value_idx]['profit_loss'] += gain
-            statistics_list[value_idx]['trades'] += 1
-    value_profit_loss = []
-    value_total_profit = []
-    value_total_loss = []
-    value_win_rate = []
-    value_profit_loss_ratio = []
-    value_trades = []
-    # calculate win rate and profit/loss ratio
-    for stat in statistics_list:
-        value_trades.append(stat['trades'])
-        value_profit_loss.append(get_color_bar_chart_item_for_render(
-            round(stat['profit_loss'], 2)))
-        value_total_profit.append(round(stat['total_profit'], 2))
-        value_total_loss.append(round(stat['total_loss'], 2))
-        if stat['trades'] > 0:
-            value_win_rate.append(
-                round(stat['win_trades']/stat['trades'] * 100, 2))
-        else:
-            value_win_rate.append(0.0)
-        avg_profit = 1.0
-        if stat['win_trades'] > 0:
-            avg_profit = stat['total_profit'] / \
-                stat['win_trades']
-        avg_loss = 1.0
-        if stat['loss_trades'] > 0:
-            avg_loss = stat['total_loss'] / stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        value_profit_loss_ratio.append(profit_loss_ratio)
-
+def get_bucket_stat_for_render(bucket_stat: dict) -> dict:
     return {
-        "profit_loss": value_profit_loss,
-        "total_profit": value_total_profit,
-        "total_loss": value_total_loss,
-        "win_rate": value_win_rate,
-        "profit_loss_ratio": value_profit_loss_ratio,
-        "trades": value_trades,
+        "profit_loss": [get_color_bar_chart_item_for_render(round(float(profit_loss), 2))
+                        for profit_loss in bucket_stat['profit_loss']],
+        "total_profit": [round(float(total_profit), 2) for total_profit in bucket_stat['total_profit']],
+        "total_loss": [round(float(total_loss), 2) for total_loss in bucket_stat['total_loss']],
+        "win_rate": [round(float(win_rate), 2) for win_rate in bucket_stat['win_rate']],
+        "profit_loss_ratio": [round(float(profit_loss_ratio), 2)
+                              for profit_loss_ratio in bucket_stat['profit_loss_ratio']],
+        "trades": [int(trades) for trades in bucket_stat['trades']],
     }
 
 
-def get_hourly_stat_from_trades_for_render(day_trades):
-    hourly_statistics = get_stats_empty_list(size=32)
-    # for hourly P&L, win rate and profit/loss ratio, trades
-    for day_trade in day_trades:
-        hourly_idx = get_market_hourly_interval_index(
-            local_datetime(day_trade.buy_time))
-        gain = day_trade.total_sold - day_trade.total_cost
-        if gain > 0:
-            hourly_statistics[hourly_idx]['win_trades'] += 1
-            hourly_statistics[hourly_idx]['total_profit'] += gain
-        else:
-            hourly_statistics[hourly_idx]['loss_trades'] += 1
-            hourly_statistics[hourly_idx]['total_loss'] += gain
-        hourly_statistics[hourly_idx]['profit_loss'] += gain
-        hourly_statistics[hourly_idx]['trades'] += 1
-    hourly_profit_loss = []
-    hourly_win_rate = []
-    hourly_profit_loss_ratio = []
-    hourly_trades = []
-    # calculate win rate and profit/loss ratio
-    for hourly_stat in hourly_statistics:
-        hourly_trades.append(hourly_stat['trades'])
-        hourly_profit_loss.append(get_color_bar_chart_item_for_render(
-            round(hourly_stat['profit_loss'], 2)))
-        if hourly_stat['trades'] > 0:
-            hourly_win_rate.append(
-                round(hourly_stat['win_trades']/hourly_stat['trades'] * 100, 2))
-        else:
-            hourly_win_rate.append(0.0)
-        avg_profit = 1.0
-        if hourly_stat['win_trades'] > 0:
-            avg_profit = hourly_stat['total_profit'] / \
-                hourly_stat['win_trades']
-        avg_loss = 1.0
-        if hourly_stat['loss_trades'] > 0:
-            avg_loss = hourly_stat['total_loss'] / hourly_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if hourly_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if hourly_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        hourly_profit_loss_ratio.append(profit_loss_ratio)
+def get_day_trade_fact_stats_for_render(dimensions: List[bucketing.BucketDimension]) -> List[dict]:
+    """
+    stats of each dimension from day trade facts, loaded in one query and reduced in one pass
+    """
+    fields = []
+    for dimension in dimensions:
+        fields += dimension.get_fields()
+    columns = db.get_day_trade_fact_columns(fields)
+    return [get_bucket_stat_for_render(bucket_stat) for bucket_stat in bucketing.get_bucket_stats(columns, dimensions)]
 
-    return {
-        "profit_loss": hourly_profit_loss,
-        "win_rate": hourly_win_rate,
-        "profit_loss_ratio": hourly_profit_loss_ratio,
-        "trades": hourly_trades,
+
+def get_hourly_stat_from_trades_for_render(day_trades):
+    columns = {
+        "buy_time": np.array([day_trade.buy_time.timestamp() for day_trade in day_trades], dtype=np.float64),
+        "profit_loss": np.array([day_trade.total_sold - day_trade.total_cost for day_trade in day_trades], dtype=np.float64),
     }
+    return get_bucket_stat_for_render(bucketing.get_bucket_stats(columns, [bucketing.MARKET_HOURLY])[0])
 
 
 def get_minutes_trade_marker_from_orders_for_render(orders, candles, time_scale):
@@ -2060,6 +1326,39 @@ def get_minutes_trade_marker_from_orders_for_render(orders, candles, time_scale)
     return (trade_price_records, trade_quantity_records)
 
 
+def get_day_chart_payload_for_render(symbol: str, day: date) -> dict:
+    """
+    1m, 2m, 5m, daily candles and trade markers of day analytics chart
+    """
+    m1_bars = bar_store.read_day_bars_df(symbol, day)
+    if m1_bars is None:
+        # day not in bar store yet
+        rows = list(HistoricalMinuteBar.objects.filter(symbol=symbol, date=day).order_by('time').values_list(
+            'time', 'open', 'high', 'low', 'close', 'volume', 'vwap'))
+        m1_bars = pd.DataFrame([row[1:] for row in rows], index=[row[0] for row in rows], columns=[
+                               'open', 'high', 'low', 'close', 'volume', 'vwap'], dtype=float)
+    payload = {}
+    buy_orders, sell_orders = get_day_trade_orders(date=day, symbol=symbol)
+    for scale in [1, 2, 5]:
+        bars = m1_bars if scale == 1 else resample_bars(m1_bars, scale)
+        # calculate and fill ema 9 data
+        if not bars.empty:
+            bars['ema9'] = bars['close'].ewm(span=9, adjust=False).mean()
+        candle_data = get_minute_candle_data_for_render(bars)
+        buy_price_records, buy_quantity_records = get_minutes_trade_marker_from_orders_for_render(
+            buy_orders, candle_data, scale)
+        sell_price_records, sell_quantity_records = get_minutes_trade_marker_from_orders_for_render(
+            sell_orders, candle_data, scale)
+        payload[f"m{scale}_candle_data"] = candle_data
+        payload[f"m{scale}_trade_price_records"] = buy_price_records + \
+            sell_price_records
+        payload[f"m{scale}_trade_quantity_records"] = buy_quantity_records + \
+            sell_quantity_records
+    payload["d1_candle_data"] = get_last_60d_daily_candle_data_for_render(
+        symbol, day)
+    return payload
+
+
 def get_daily_trade_marker_from_position_for_render(position):
     trade_price_records = []
     trade_quantity_records = []
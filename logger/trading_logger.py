@@ -1,45 +1,164 @@
+import atexit
+import sys
+import threading
 from datetime import date
-from common import utils
+from typing import Dict, List, Optional, Tuple
+from django.db import transaction
+from common import utils, config
 from common.enums import UNKNOWN, TradingHourType, AlgorithmType
-from webull_trader.models import TradingLog, TradingSettings
+from webull_trader.models import TradingLog, TradingLogChunk, TradingSettings
 
 _algo_tag = UNKNOWN
+_enabled = True
 _trading_logs = []
+_trading_logs_lock = threading.Lock()
+# log lines waiting for background writer, grouped by date and trading hour
+_pending_logs: Dict[Tuple[date, TradingHourType], List[str]] = {}
+_pending_lines = 0
+_flush_lock = threading.Lock()
+_flush_event = threading.Event()
+_writer_thread: Optional[threading.Thread] = None
+
+
+def set_tag(tag: str):
+    """
+    save logs under tag instead of algorithm tag
+    """
+    global _algo_tag
+    _algo_tag = tag
+
+
+def set_enabled(enabled: bool):
+    """
+    disable logs in batch runs like parameter sweep
+    """
+    global _enabled
+    _enabled = enabled
 
 
 def log(text: str):
     global _trading_logs
+    if not _enabled:
+        return
     log_record = "[{}] {}".format(utils.get_now(), text)
-    _trading_logs.append(log_record)
+    with _trading_logs_lock:
+        _trading_logs.append(log_record)
     # output
     print(log_record)
 
 
 def write(trading_hour: TradingHourType, date: date):
-    global _algo_tag
+    """
+    hand over logs to background writer, saved in batch by interval or size
+    """
     global _trading_logs
-    if len(_trading_logs) == 0:
-        return
+    global _pending_lines
+    # take logs, logs from trading threads go to next write
+    with _trading_logs_lock:
+        if len(_trading_logs) == 0:
+            return
+        trading_logs = _trading_logs
+        _trading_logs = []
+        _pending_logs.setdefault((date, trading_hour), []).extend(trading_logs)
+        _pending_lines += len(trading_logs)
+        pending_lines = _pending_lines
+    _start_writer()
+    if pending_lines >= config.TRADING_LOG_FLUSH_LINES:
+        _flush_event.set()
+
+
+def flush():
+    """
+    append pending logs as new chunk of each trading log, logs are kept for next flush if save failed
+    """
+    global _pending_logs
+    global _pending_lines
+    with _flush_lock:
+        with _trading_logs_lock:
+            pending_logs = _pending_logs
+            _pending_logs = {}
+            _pending_lines = 0
+        if len(pending_logs) == 0:
+            return
+        try:
+            _save_pending_logs(pending_logs)
+        except Exception:
+            # keep logs for next flush
+            with _trading_logs_lock:
+                for key, trading_logs in pending_logs.items():
+                    _pending_logs[key] = trading_logs + \
+                        _pending_logs.get(key, [])
+                    _pending_lines += len(trading_logs)
+            raise
+
+
+def _save_pending_logs(pending_logs: Dict[Tuple[date, TradingHourType], List[str]]):
+    global _algo_tag
     if _algo_tag == UNKNOWN:
         settings: TradingSettings = TradingSettings.objects.first()
         _algo_tag = AlgorithmType.totag(settings.algo_type)
-    log_obj = TradingLog.objects.filter(date=date).filter(
-        tag=_algo_tag).filter(trading_hour=trading_hour).first()
-    if log_obj == None:
-        log_obj = TradingLog(
-            date=date,
-            tag=_algo_tag,
-            trading_hour=trading_hour,
-        )
-    log_text = "\n".join(_trading_logs)
-    if log_obj.log_text == None:
-        log_obj.log_text = log_text
-    else:
-        log_obj.log_text = log_obj.log_text + log_text
-    log_obj.log_text += "\n"
-    log_obj.save()
-    # reset _trading_logs
-    _trading_logs = []
+    with transaction.atomic():
+        chunks = []
+        for (log_date, trading_hour), trading_logs in pending_logs.items():
+            log_obj = TradingLog.objects.filter(date=log_date).filter(
+                tag=_algo_tag).filter(trading_hour=trading_hour).first()
+            if log_obj == None:
+                log_obj = TradingLog.objects.create(
+                    date=log_date,
+                    tag=_algo_tag,
+                    trading_hour=trading_hour,
+                )
+            chunks.append(TradingLogChunk(
+                trading_log=log_obj, log_text="\n".join(trading_logs) + "\n"))
+        TradingLogChunk.objects.bulk_create(chunks)
+
+
+def _run_writer():
+    while True:
+        _flush_event.wait(config.TRADING_LOG_FLUSH_INTERVAL_IN_SEC)
+        _flush_event.clear()
+        try:
+            flush()
+        except Exception as e:
+            print("[{}] ⚠️  Exception flush trading logs: {}".format(
+                utils.get_now(), e))
+
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception as e:
+        # no next flush, keep logs in stderr
+        print("[{}] ⚠️  Exception flush trading logs at exit: {}".format(
+            utils.get_now(), e), file=sys.stderr)
+        for trading_logs in _pending_logs.values():
+            print("\n".join(trading_logs), file=sys.stderr)
+
+
+def _start_writer():
+    global _writer_thread
+    if _writer_thread != None:
+        return
+    with _flush_lock:
+        if _writer_thread == None:
+            _writer_thread = threading.Thread(
+                target=_run_writer, name="trading_logger", daemon=True)
+            _writer_thread.start()
+            atexit.register(_flush_at_exit)
+
+
+def iter_log_lines(log_obj: TradingLog):
+    """
+    log lines of trading log, legacy log text first, then appended chunks fetched with db iterator
+    """
+    if log_obj.log_text:
+        for line in log_obj.log_text.splitlines():
+            yield line
+    chunk_texts = TradingLogChunk.objects.filter(trading_log=log_obj).order_by(
+        'id').values_list('log_text', flat=True).iterator()
+    for chunk_text in chunk_texts:
+        for line in chunk_text.splitlines():
+            yield line
 
 
 def log_level2(quote):
@@ -4,7 +4,7 @@
 
 
 def start():
-    from common import utils
+    from common import db, utils
     from common.enums import ActionType
     from webull_trader.models import WebullOrder, SwingPosition, SwingTrade, DayPosition, DayTrade
 
@@ -146,6 +146,7 @@ def start():
 
     # adjust day trade data by filled order
     day_trades = DayTrade.objects.filter(require_adjustment=True)
+    adjusted_day_trades = []
     for day_trade in day_trades:
         order_ids = day_trade.order_ids.split(',')
         total_cost = 0.0
@@ -194,8 +195,11 @@ def start():
         if not uncompleted_order:
             # reset require_adjustment
             day_trade.require_adjustment = False
+            adjusted_day_trades.append(day_trade)
         # save
         day_trade.save()
+    # report facts of adjusted day trades
+    db.save_day_trade_facts(adjusted_day_trades)
 
 
 if __name__ == "django.core.management.commands.shell":
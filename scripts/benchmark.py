@@ -1,248 +1,142 @@
 # -*- coding: utf-8 -*-
 
-# fetch stock quotes for swing trades
-
-
-def start():
-    import sys
+# benchmark day trades P&L with entry bar volume, session, price and setup filters
+
+import numpy as np
+from typing import Dict, List, Optional
+
+SESSION_REGULAR = "regular"
+SESSION_EXTENDED = "pre/after"
+
+DEFAULT_REGULAR_VOLUMES = [100000, 150000, 200000, 500000, 1000000, 1500000]
+DEFAULT_EXTENDED_VOLUMES = [10000, 15000, 20000, 50000, 100000, 150000]
+
+
+# Benchmark filter class, trades passing all set thresholds
+class BenchmarkFilter:
+
+    def __init__(self, session: Optional[str] = None, min_volume: Optional[float] = None, min_price: Optional[float] = None,
+                 max_price: Optional[float] = None, setups: Optional[List[int]] = None):
+        self.session: Optional[str] = session
+        self.min_volume: Optional[float] = min_volume
+        self.min_price: Optional[float] = min_price
+        self.max_price: Optional[float] = max_price
+        self.setups: Optional[List[int]] = setups
+
+    def get_name(self) -> str:
+        names = []
+        if self.min_volume != None:
+            names.append(f"Volume > {int(self.min_volume)}")
+        if self.min_price != None:
+            names.append(f"Price >= {self.min_price}")
+        if self.max_price != None:
+            names.append(f"Price <= {self.max_price}")
+        if self.setups != None:
+            names.append(f"Setup in {self.setups}")
+        name = ", ".join(names) or "All"
+        if self.session:
+            name += f" ({self.session})"
+        return name
+
+    def get_mask(self, trades: Dict[str, np.ndarray]) -> np.ndarray:
+        mask = np.ones(len(trades["total_cost"]), dtype=bool)
+        if self.session == SESSION_REGULAR:
+            mask &= trades["regular"]
+        elif self.session == SESSION_EXTENDED:
+            mask &= ~trades["regular"]
+        if self.min_volume != None:
+            # trades without entry bar are skipped, nan comparison is false
+            mask &= trades["volume"] > self.min_volume
+        if self.min_price != None:
+            mask &= trades["price"] >= self.min_price
+        if self.max_price != None:
+            mask &= trades["price"] <= self.max_price
+        if self.setups != None:
+            mask &= np.isin(trades["setup"], self.setups)
+        return mask
+
+
+def get_volume_filters(regular_volumes: List[float], extended_volumes: List[float], min_price: Optional[float] = None,
+                       max_price: Optional[float] = None, setups: Optional[List[int]] = None) -> List[BenchmarkFilter]:
+    filters = []
+    for volume in regular_volumes:
+        filters.append(BenchmarkFilter(session=SESSION_REGULAR, min_volume=volume,
+                                       min_price=min_price, max_price=max_price, setups=setups))
+    for volume in extended_volumes:
+        filters.append(BenchmarkFilter(session=SESSION_EXTENDED, min_volume=volume,
+                                       min_price=min_price, max_price=max_price, setups=setups))
+    return filters
+
+
+def load_trades() -> Dict[str, np.ndarray]:
+    """
+    all day trades with entry bar volume as column arrays, trades and bars loaded with one query each
+    """
     from django.utils import timezone
-    from common import utils, db
+    from common import bar_store, utils
     from webull_trader.models import DayTrade
 
-    def _progressbar(it, prefix="", size=60, file=sys.stdout):
-        count = len(it)
-
-        def show(j):
-            x = int(size*j/count)
-            file.write("%s[%s%s] %i/%i\r" %
-                       (prefix, "#"*x, "."*(size-x), j, count))
-            file.flush()
-        show(0)
-        for i, item in enumerate(it):
-            yield item
-            show(i+1)
-        file.write("\n")
-        file.flush()
-
-    def _output_result(trades):
-        total_cost = 0.0
-        total_sold = 0.0
-        for trade in trades:
-            trade: DayTrade = trade
-            total_cost += trade.total_cost
-            total_sold += trade.total_sold
-        sign = '' if total_sold - total_cost > 0 else '-'
-        return f"{round((total_sold - total_cost) / total_cost * 100, 2)}%, {sign}${round(abs(total_sold - total_cost), 2)}"
-
-    # performance benchmark
-    all_trades = DayTrade.objects.all()
-    print(f"Benchmark: {_output_result(all_trades)}")
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip pre/after market
-        if utils.is_after_market_time(buy_time) or utils.is_pre_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 100000:
-            filter_trades.append(trade)
-    print(f"Volume > 100000 (regular): {_output_result(filter_trades)}")
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip pre/after market
-        if utils.is_after_market_time(buy_time) or utils.is_pre_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 150000:
-            filter_trades.append(trade)
-    print(f"Volume > 150000 (regular): {_output_result(filter_trades)}")
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip pre/after market
-        if utils.is_after_market_time(buy_time) or utils.is_pre_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 200000:
-            filter_trades.append(trade)
-    print(f"Volume > 200000 (regular): {_output_result(filter_trades)}")
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip pre/after market
-        if utils.is_after_market_time(buy_time) or utils.is_pre_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 500000:
-            filter_trades.append(trade)
-    print(f"Volume > 500000 (regular): {_output_result(filter_trades)}")
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip pre/after market
-        if utils.is_after_market_time(buy_time) or utils.is_pre_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 1000000:
-            filter_trades.append(trade)
-    print(f"Volume > 1000000 (regular): {_output_result(filter_trades)}")
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip pre/after market
-        if utils.is_after_market_time(buy_time) or utils.is_pre_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 1500000:
-            filter_trades.append(trade)
-    print(f"Volume > 1500000 (regular): {_output_result(filter_trades)}")
-
-    print()
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip regular market
-        if utils.is_regular_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 10000:
-            filter_trades.append(trade)
-    print(f"Volume > 10000 (pre/after): {_output_result(filter_trades)}")
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip regular market
-        if utils.is_regular_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 15000:
-            filter_trades.append(trade)
-    print(f"Volume > 15000 (pre/after): {_output_result(filter_trades)}")
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip regular market
-        if utils.is_regular_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 20000:
-            filter_trades.append(trade)
-    print(f"Volume > 20000 (pre/after): {_output_result(filter_trades)}")
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip regular market
-        if utils.is_regular_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 50000:
-            filter_trades.append(trade)
-    print(f"Volume > 50000 (pre/after): {_output_result(filter_trades)}")
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip regular market
-        if utils.is_regular_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 100000:
-            filter_trades.append(trade)
-    print(f"Volume > 100000 (pre/after): {_output_result(filter_trades)}")
-
-    # filter out low volume trade
-    filter_trades = []
-    for trade in _progressbar(all_trades, "Computing: ", 60):
-        trade: DayTrade = trade
-        buy_time = trade.buy_time.astimezone(timezone.get_current_timezone())
-
-        # skip regular market
-        if utils.is_regular_market_time(buy_time):
-            continue
-
-        buy_bar = db.get_hist_minute_bar(trade.symbol, buy_time)
-        if not buy_bar:
-            continue
-        if buy_bar.volume > 150000:
-            filter_trades.append(trade)
-    print(f"Volume > 150000 (pre/after): {_output_result(filter_trades)}")
+    rows = list(DayTrade.objects.values_list(
+        'symbol', 'buy_date', 'buy_time', 'total_cost', 'total_sold', 'quantity', 'setup'))
+    # entry bars of traded symbols in trade days
+    bar_volumes = bar_store.get_minute_volumes(
+        set(row[0] for row in rows), set(row[1] for row in rows))
+    volumes = []
+    regulars = []
+    for symbol, _, buy_time, _, _, _, _ in rows:
+        volumes.append(bar_volumes.get(
+            (symbol, int(buy_time.timestamp()) // 60), np.nan))
+        regulars.append(utils.is_regular_market_time(
+            buy_time.astimezone(timezone.get_current_timezone())))
+    total_costs = np.array([row[3] for row in rows], dtype=np.float64)
+    quantities = np.array([row[5] for row in rows], dtype=np.float64)
+    return {
+        "volume": np.array(volumes, dtype=np.float64),
+        "regular": np.array(regulars, dtype=bool),
+        "total_cost": total_costs,
+        "total_sold": np.array([row[4] for row in rows], dtype=np.float64),
+        "price": np.divide(total_costs, quantities, out=np.zeros_like(total_costs), where=quantities > 0),
+        "setup": np.array([row[6] for row in rows], dtype=np.int64),
+    }
+
+
+def get_results(trades: Dict[str, np.ndarray], filters: List[BenchmarkFilter]) -> List[dict]:
+    """
+    trades, P&L and P&L rate of all trades and each filter
+    """
+    results = []
+    for benchmark_filter in [BenchmarkFilter()] + filters:
+        mask = benchmark_filter.get_mask(trades)
+        total_cost = float(trades["total_cost"][mask].sum())
+        profit_loss = float(trades["total_sold"][mask].sum()) - total_cost
+        results.append({
+            "filter": benchmark_filter.get_name(),
+            "trades": int(mask.sum()),
+            "profit_loss": round(profit_loss, 2),
+            "profit_loss_rate": round(profit_loss / total_cost * 100, 2) if total_cost > 0 else 0.0,
+        })
+    return results
+
+
+def start(filters: Optional[List[BenchmarkFilter]] = None):
+    import time
+
+    if filters == None:
+        filters = get_volume_filters(
+            DEFAULT_REGULAR_VOLUMES, DEFAULT_EXTENDED_VOLUMES)
+    start_time = time.monotonic()
+    trades = load_trades()
+    load_time = time.monotonic() - start_time
+    start_time = time.monotonic()
+    results = get_results(trades, filters)
+    compute_time = time.monotonic() - start_time
+
+    name_width = max(len(result["filter"]) for result in results)
+    print(f"{'Filter'.ljust(name_width)}  {'Trades':>8}  {'P&L %':>9}  {'P&L':>12}")
+    for result in results:
+        print(f"{result['filter'].ljust(name_width)}  {result['trades']:>8}  {result['profit_loss_rate']:>8}%  {result['profit_loss']:>12}")
+    print(f"Loaded {len(trades['total_cost'])} trades in {round(load_time, 3)}s, computed {len(results)} filters in {round(compute_time, 3)}s")
+    return results
 
 
 if __name__ == "django.core.management.commands.shell":
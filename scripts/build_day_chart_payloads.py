@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+# build day analytics chart payload of fetched symbol days without payload
+
+
+def start():
+    from common import db, utils
+    from webull_trader.models import HistoricalDayChartPayload, HistoricalFetchCheckpoint
+
+    saved = set(HistoricalDayChartPayload.objects.values_list('date', 'symbol'))
+    symbol_days = HistoricalFetchCheckpoint.objects.filter(
+        dataset="minute_bars").order_by('date').values_list('date', 'symbol')
+    for day, symbol in symbol_days:
+        if (day, symbol) in saved:
+            continue
+        payload = utils.get_day_chart_payload_for_render(symbol, day)
+        # no bars saved, leave chart computed live
+        if len(payload['m1_candle_data']['candles']) == 0:
+            continue
+        print("[{}] Building chart payload of <{}> in {}...".format(
+            utils.get_now(), symbol, day))
+        db.save_hist_day_chart_payload(day, symbol, payload)
+
+
+if __name__ == "django.core.management.commands.shell":
+    start()
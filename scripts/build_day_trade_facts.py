@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+# build report facts of adjusted day trades without facts
+
+
+def start():
+    from common import db, utils
+    from webull_trader.models import DayTrade
+
+    day_trades = DayTrade.objects.filter(
+        require_adjustment=False, facts__isnull=True)
+    days = day_trades.order_by('sell_date').values_list(
+        'sell_date', flat=True).distinct()
+    for day in days:
+        print("[{}] Building day trade facts of {}...".format(utils.get_now(), day))
+        db.save_day_trade_facts(day_trades.filter(sell_date=day))
+
+
+if __name__ == "django.core.management.commands.shell":
+    start()
@@ -4,6 +4,7 @@
 
 def start(day=None):
     from datetime import date
+    from common import db
     from webull_trader.models import HistoricalDayTradePerformance, HistoricalSwingTradePerformance, DayTrade, SwingTrade
 
     if day == None:
@@ -89,6 +90,8 @@ def start(day=None):
     hist_daytrade_perf.total_sell_amount = round(day_total_sell_amount, 2)
     if hist_daytrade_perf.trades > 0:
         hist_daytrade_perf.save()
+    # refresh report facts with historical data of the day
+    db.save_day_trade_facts(day_trades)
 
     # swing trades
     swing_trades = SwingTrade.objects.filter(sell_date=day)
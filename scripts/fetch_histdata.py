@@ -2,10 +2,168 @@
 
 # fetch minute/daily historical candle data into database
 
+DATASET_MINUTE_BARS = "minute_bars"
+DATASET_DAILY_BARS = "daily_bars"
+DATASET_KEY_STATISTICS = "key_statistics"
+DATASETS = [DATASET_MINUTE_BARS, DATASET_DAILY_BARS, DATASET_KEY_STATISTICS]
 
-def start(day=None):
+
+def fetch_minute_bar_list(symbol, ticker_id, day):
     import time
     import pandas as pd
+    from sdk import webullsdk
+
+    # page 1m bars backwards until previous day
+    timestamp = int(time.time())
+    minute_bar_list = []
+    while timestamp:
+        finish = False
+        temp_bar_list = []
+        bars: pd.DataFrame = webullsdk.fetch_bars(
+            ticker_id, 'm1', 500, timestamp=timestamp)
+        for index, bar in bars.iterrows():
+            date_time = index.to_pydatetime()
+            if day != date_time.date():
+                finish = True
+            else:
+                temp_bar_list.append({
+                    'symbol': symbol,
+                    'date': date_time.date(),
+                    'time': date_time,
+                    'open': bar['open'],
+                    'high': bar['high'],
+                    'low': bar['low'],
+                    'close': bar['close'],
+                    'volume': bar['volume'],
+                    'vwap': bar['vwap'],
+                })
+        minute_bar_list = temp_bar_list + minute_bar_list
+        if finish or bars.size == 0:
+            timestamp = None
+        else:
+            timestamp = int(bars.index[0].timestamp()) - 1
+    if len(minute_bar_list) == 0:
+        raise Exception("no minute bars of {}".format(day))
+    return minute_bar_list
+
+
+def fetch_daily_bar_list(symbol, ticker_id):
+    from sdk import webullsdk
+
+    daily_bar_list = []
+    bars = webullsdk.fetch_bars(ticker_id, 'd1', 60)
+    if bars.empty:
+        raise Exception("no daily bars")
+    for index, bar in bars.iterrows():
+        daily_bar_list.append({
+            'symbol': symbol,
+            'date': index.to_pydatetime().date(),
+            'open': bar['open'],
+            'high': bar['high'],
+            'low': bar['low'],
+            'close': bar['close'],
+            'volume': bar['volume'],
+        })
+    return daily_bar_list
+
+
+def fetch_key_statistics(symbol, ticker_id):
+    from sdk import webullsdk, finvizsdk
+
+    quote_data = webullsdk.get_quote(ticker_id=ticker_id)
+    additional_quote_data = finvizsdk.get_quote(symbol)
+    quote_data['shortFloat'] = additional_quote_data['shortFloat']
+    return quote_data
+
+
+def fetch_dataset(symbol, ticker_id, day, dataset):
+    """
+    fetch dataset of symbol in worker thread, no db access
+    """
+    if dataset == DATASET_MINUTE_BARS:
+        return fetch_minute_bar_list(symbol, ticker_id, day)
+    if dataset == DATASET_DAILY_BARS:
+        return fetch_daily_bar_list(symbol, ticker_id)
+    return fetch_key_statistics(symbol, ticker_id)
+
+
+def save_dataset(symbol, day, dataset, data):
+    from common import bar_store, db
+
+    if dataset == DATASET_MINUTE_BARS:
+        # save historical minute bar
+        db.save_hist_minute_bar_list(data)
+        # keep columnar bar store in sync
+        bar_store.save_minute_bar_list(data)
+    elif dataset == DATASET_DAILY_BARS:
+        # save historical daily bar
+        db.save_hist_daily_bar_list(data)
+    else:
+        # save historical quote
+        db.save_hist_key_statistics(data, day)
+    db.save_hist_fetch_checkpoint(day, symbol, dataset)
+
+
+def fetch_symbols_histdata(day, symbol_list, ticker_id_list):
+    """
+    fetch datasets of symbols in worker pool and save them in current thread,
+    datasets already in checkpoints are skipped
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from common import config, db, utils
+
+    checkpoints = db.get_hist_fetch_checkpoints(day)
+    tasks = [(symbol_list[i], ticker_id_list[i], dataset) for i in range(0, len(symbol_list))
+             for dataset in DATASETS if (symbol_list[i], dataset) not in checkpoints]
+    print("[{}] Fetching {} datasets of {} symbols, {} done before...".format(
+        utils.get_now(), len(tasks), len(symbol_list), len(symbol_list) * len(DATASETS) - len(tasks)))
+    start_time = time.monotonic()
+    done_count = 0
+    failed_count = 0
+    # webull and finviz requests are rate limited in sdk
+    with ThreadPoolExecutor(max_workers=config.HIST_FETCH_MAX_WORKERS, thread_name_prefix="histdata") as executor:
+        futures = {executor.submit(fetch_dataset, symbol, ticker_id, day, dataset): (symbol, dataset)
+                   for symbol, ticker_id, dataset in tasks}
+        for future in as_completed(futures):
+            symbol, dataset = futures[future]
+            try:
+                save_dataset(symbol, day, dataset, future.result())
+                done_count += 1
+            except Exception as e:
+                failed_count += 1
+                print("[{}] Fetch {} for <{}> error: {}".format(
+                    utils.get_now(), dataset, symbol, e))
+                continue
+            elapsed_sec = time.monotonic() - start_time
+            print("[{}] ({}/{}) Fetched {} for <{}>, {} datasets/min".format(
+                utils.get_now(), done_count, len(tasks), dataset, symbol, round(done_count / elapsed_sec * 60, 1)))
+    print("[{}] Fetched {} datasets, {} failed in {}s".format(
+        utils.get_now(), done_count, failed_count, round(time.monotonic() - start_time, 1)))
+
+
+def save_symbols_chart_payload(day, symbol_list):
+    """
+    precompute day analytics chart payload of symbols with minute and daily bars fetched
+    """
+    from common import db, utils
+
+    checkpoints = db.get_hist_fetch_checkpoints(day)
+    saved_count = 0
+    for symbol in symbol_list:
+        if (symbol, DATASET_MINUTE_BARS) not in checkpoints or (symbol, DATASET_DAILY_BARS) not in checkpoints:
+            continue
+        payload = utils.get_day_chart_payload_for_render(symbol, day)
+        # no bars saved, leave chart computed live
+        if len(payload['m1_candle_data']['candles']) == 0:
+            continue
+        db.save_hist_day_chart_payload(day, symbol, payload)
+        saved_count += 1
+    print("[{}] Saved chart payload of {} symbols".format(
+        utils.get_now(), saved_count))
+
+
+def start(day=None):
     from datetime import date
     from sdk import webullsdk, fmpsdk, finvizsdk
     from common import utils, db
@@ -28,74 +186,11 @@ def start(day=None):
     # fetch stock quotes
     utils.fetch_stock_quotes(symbol_list)
 
-    # iterate through all symbol
-    for i in range(0, len(symbol_list)):
-        symbol = symbol_list[i]
-        ticker_id = ticker_id_list[i]
-        # fetch historical minute bar
-        timestamp = int(time.time())
-        minute_bar_list = []
-        while timestamp:
-            finish = False
-            temp_bar_list = []
-            bars: pd.DataFrame = webullsdk.get_1m_bars(
-                ticker_id=ticker_id, count=500, timestamp=timestamp)
-            for index, bar in bars.iterrows():
-                date_time = index.to_pydatetime()
-                if day != date_time.date():
-                    finish = True
-                else:
-                    temp_bar_list.append({
-                        'symbol': symbol,
-                        'date': date_time.date(),
-                        'time': date_time,
-                        'open': bar['open'],
-                        'high': bar['high'],
-                        'low': bar['low'],
-                        'close': bar['close'],
-                        'volume': bar['volume'],
-                        'vwap': bar['vwap'],
-                    })
-            minute_bar_list = temp_bar_list + minute_bar_list
-            # reset temp list
-            temp_bar_list = []
-            if finish or bars.size == 0:
-                timestamp = None
-            else:
-                timestamp = int(bars.index[0].timestamp()) - 1
-
-        # save historical minute bar
-        db.save_hist_minute_bar_list(minute_bar_list)
-
-        # fetch historical daily bar
-        daily_bar_list = []
-        bars = webullsdk.get_1d_bars(ticker_id=ticker_id, count=60)
-        for index, bar in bars.iterrows():
-            daily_bar_list.append({
-                'symbol': symbol,
-                'date': index.to_pydatetime().date(),
-                'open': bar['open'],
-                'high': bar['high'],
-                'low': bar['low'],
-                'close': bar['close'],
-                'volume': bar['volume'],
-            })
-
-        # save historical daily bar
-        db.save_hist_daily_bar_list(daily_bar_list)
-
-        # fetch historical quote
-        quote_data = webullsdk.get_quote(ticker_id=ticker_id)
-
-        additional_quote_data = finvizsdk.get_quote(symbol)
-
-        quote_data['shortFloat'] = additional_quote_data['shortFloat']
-
-        # save historical quote
-        db.save_hist_key_statistics(quote_data, day)
+    # fetch minute bars, daily bars and quotes of all symbols
+    fetch_symbols_histdata(day, symbol_list, ticker_id_list)
 
-        # rest for 5 sec
-        time.sleep(5)
+    # precompute chart payload of symbols
+    save_symbols_chart_payload(day, symbol_list)
 
     # fetch market statistics
     top_gainer_change = utils.get_avg_change_from_movers(
@@ -174,6 +269,7 @@ def start(day=None):
             sma120_120_days = hist_sma120[0:120][::-1]
             sma55_120_days = hist_sma55[0:120][::-1]
             rsi10_120_days = hist_rsi10[0:120][::-1]
+            bar_list = []
             for i in range(0, len(sma120_120_days)):
                 sma120_data = sma120_120_days[i]
                 sma55_data = sma55_120_days[i]
@@ -190,7 +286,8 @@ def start(day=None):
                     'sma_55': sma55_data['sma'],
                     'rsi_10': rsi10_data['rsi'],
                 }
-                db.save_swing_hist_daily_bar(bar_data)
+                bar_list.append(bar_data)
+            db.save_swing_hist_daily_bar_list(bar_list)
 
 
 if __name__ == "django.core.management.commands.shell":
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+# rebuild columnar bar store from historical minute bars in database
+
+
+def start():
+    from common import bar_store, utils
+    from webull_trader.models import HistoricalMinuteBar
+
+    days = HistoricalMinuteBar.objects.order_by(
+        'date').values_list('date', flat=True).distinct()
+    for day in days:
+        print("[{}] Syncing minute bars of {}...".format(utils.get_now(), day))
+        bar_store.sync_day_from_db(day)
+
+
+if __name__ == "django.core.management.commands.shell":
+    start()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+# precompute cached reports of current data versions for web workers
+
+
+def start():
+    from django.contrib.auth.models import AnonymousUser
+    from django.http import Http404
+    from django.test import RequestFactory
+    from common import report_cache, utils
+    from webull_trader import views
+    from webull_trader.models import SwingPosition, SwingTrade
+    from scripts import build_day_trade_facts
+
+    # day reports read facts, build facts of trades without facts first
+    build_day_trade_facts.start()
+
+    reports = [(report, []) for report in report_cache.REPORTS if not report.endswith("_symbol")]
+    for symbol in SwingPosition.objects.values_list('symbol', flat=True).distinct():
+        reports.append(("swing_positions_symbol", [symbol]))
+    for symbol in SwingTrade.objects.values_list('symbol', flat=True).distinct():
+        reports.append(("swing_analytics_symbol", [symbol]))
+
+    request_factory = RequestFactory()
+    for report, args in reports:
+        request = request_factory.get("/")
+        request.user = AnonymousUser()
+        # call view without login, only context is cached
+        view = getattr(views, report).__wrapped__
+        try:
+            view(request, *args)
+        except Http404:
+            continue
+    print("[{}] Warmed {} reports".format(utils.get_now(), len(reports)))
+
+
+if __name__ == "django.core.management.commands.shell":
+    start()
@@ -1,7 +1,9 @@
 import time
+import threading
 import requests
 from datetime import datetime
 from bs4 import BeautifulSoup
+from common import config
 
 # https://finviz.com/quote.ashx?t=FB
 FINVIZ_QUOTE_URL = "https://finviz.com/quote.ashx?t={}"
@@ -73,8 +75,23 @@ def _get_browser_headers():
     }
 
 
+_last_request_time: float = 0.0
+_request_lock = threading.Lock()
+
+
+def _throttle():
+    # keep min interval between finviz requests of all threads
+    global _last_request_time
+    with _request_lock:
+        wait_sec = _last_request_time + \
+            config.FINVIZ_REQUEST_INTERVAL_IN_SEC - time.monotonic()
+        if wait_sec > 0:
+            time.sleep(wait_sec)
+        _last_request_time = time.monotonic()
+
+
 def get_quote(symbol):
-    time.sleep(1)
+    _throttle()
     try:
         session = requests.Session()
         url = FINVIZ_QUOTE_URL.format(symbol)
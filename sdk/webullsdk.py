@@ -1,10 +1,14 @@
 import json
 import time
+import pytz
 import requests
+import threading
 import traceback
 import pandas as pd
-from typing import List, Optional
-from common import utils, db
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from common import utils, db, config
 from logger import trading_logger
 from webull import webull, paper_webull
 from webull_trader.models import WebullCredentials
@@ -33,7 +37,11 @@ ORDER_STATUS_ALL = "All"
 
 ORDER_STATUS_NOT_FOUND = "Not Found"
 
-API_DELAY_IN_SEC = 1.0
+API_FAMILY_QUOTE = "quote"
+API_FAMILY_BARS = "bars"
+API_FAMILY_ORDERS = "orders"
+API_FAMILY_NEWS = "news"
+API_FAMILY_RANKING = "ranking"
 
 
 def _get_browser_headers() -> dict:
@@ -44,6 +52,93 @@ def _get_browser_headers() -> dict:
     }
 
 
+class _TokenBucket:
+    """
+    thread safe token bucket, allow short bursts while keeping the average request rate
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_sec = (1 - self.tokens) / self.rate
+            time.sleep(wait_sec)
+
+
+_rate_limiters: Dict[str, _TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+_request_counts: Dict[str, int] = {}
+
+
+def _throttle(family: str):
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(family)
+        if not limiter:
+            rate, capacity = config.WEBULL_API_RATE_LIMITS[family]
+            limiter = _TokenBucket(rate, capacity)
+            _rate_limiters[family] = limiter
+        _request_counts[family] = _request_counts.get(family, 0) + 1
+    limiter.acquire()
+
+
+def get_request_counts() -> Dict[str, int]:
+    """
+    throttled request count of each api family since process start
+    """
+    with _rate_limiters_lock:
+        return dict(_request_counts)
+
+
+_http_session: requests.Session = None
+_http_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    global _http_session
+    with _http_session_lock:
+        if not _http_session:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=config.WEBULL_HTTP_POOL_SIZE, pool_maxsize=config.WEBULL_HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+    return _http_session
+
+
+def _http_get_json(family: str, url: str, params: dict = None, headers: dict = None):
+    _throttle(family)
+    res = _get_session().get(url, params=params, headers=headers,
+                             timeout=config.WEBULL_HTTP_TIMEOUT_IN_SEC)
+    return res.json()
+
+
+_fanout_executor: ThreadPoolExecutor = None
+_fanout_executor_lock = threading.Lock()
+
+
+def _get_fanout_executor() -> ThreadPoolExecutor:
+    global _fanout_executor
+    with _fanout_executor_lock:
+        if not _fanout_executor:
+            _fanout_executor = ThreadPoolExecutor(
+                max_workers=config.WEBULL_API_MAX_WORKERS, thread_name_prefix="webullsdk")
+    return _fanout_executor
+
+
 _wb_instance: webull = None
 _wb_paper: bool = True
 _wb_trade_pwd: str = "123456"
@@ -261,9 +356,10 @@ def get_account_id() -> Optional[str]:
 # }
 
 
-def get_portfolio() -> dict:
-    instance = _get_instance()
-    data = instance.get_account()
+def get_portfolio(data: Optional[dict] = None) -> dict:
+    if data == None:
+        instance = _get_instance()
+        data = instance.get_account()
     output = {}
     if 'accountMembers' in data:
         for item in data['accountMembers']:
@@ -291,10 +387,10 @@ def get_portfolio() -> dict:
     return output
 
 
-def get_usable_cash() -> float:
+def get_usable_cash(data: Optional[dict] = None) -> float:
     try:
         global _wb_paper
-        portfolio = get_portfolio()
+        portfolio = get_portfolio(data)
         usable_cash = 0.0
         if _wb_paper:
             usable_cash = float(portfolio['usableCash'])
@@ -521,10 +617,10 @@ def get_daily_profitloss() -> List[dict]:
 
 
 def get_quote(ticker_id=None) -> Optional[dict]:
-    time.sleep(API_DELAY_IN_SEC)
     try:
         instance = _get_instance()
-        return instance.get_quote(tId=ticker_id)
+        headers = dict(instance.build_req_headers())
+        return _http_get_json(API_FAMILY_QUOTE, instance._urls.quotes(ticker_id), headers=headers)
     except Exception as e:
         trading_logger.log("⚠️  Exception get_quote: {}".format(e))
         return None
@@ -558,7 +654,7 @@ def get_bid_volume_from_quote(quote: dict) -> float:
 
 
 def get_ticker(symbol: Optional[str] = None) -> Optional[str]:
-    time.sleep(API_DELAY_IN_SEC)
+    _throttle(API_FAMILY_QUOTE)
     try:
         instance = _get_instance()
         return instance.get_ticker(stock=symbol)
@@ -580,22 +676,102 @@ def get_ticker(symbol: Optional[str] = None) -> Optional[str]:
 # 2021-04-07 19:56:00-04:00  8.60  8.60  8.60   8.60    25.0  8.46
 # 2021-04-07 20:00:00-04:00  8.65  8.65  8.65   8.65   100.0  8.46
 
+def _parse_bars(result) -> pd.DataFrame:
+    """
+    parse bars response in the same shape as webull get_bars, in ascending time order
+    """
+    if len(result) == 0 or len(result[0].get("data", [])) == 0:
+        bars = pd.DataFrame(
+            columns=['open', 'high', 'low', 'close', 'volume', 'vwap'])
+        bars.index.name = 'timestamp'
+        return bars
+    time_zone = pytz.timezone(result[0].get('timeZone', 'America/New_York'))
+    timestamps = []
+    rows = []
+    for record in result[0]['data']:
+        record_parts = ['0' if value ==
+                        'null' else value for value in record.split(',')]
+        timestamps.append(int(record_parts[0]))
+        rows.append((
+            float(record_parts[1]),
+            float(record_parts[3]),
+            float(record_parts[4]),
+            float(record_parts[2]),
+            float(record_parts[6]),
+            float(record_parts[7]),
+        ))
+    index = pd.to_datetime(timestamps, unit='s', utc=True).tz_convert(
+        time_zone).rename('timestamp')
+    bars = pd.DataFrame(rows, index=index, columns=[
+                        'open', 'high', 'low', 'close', 'volume', 'vwap'])
+    return bars.sort_index()
+
+
+def fetch_bars(ticker_id, interval, count, timestamp=None) -> pd.DataFrame:
+    """
+    bars of interval before timestamp, request errors are raised instead of returning empty bars
+    """
+    instance = _get_instance()
+    headers = dict(instance.build_req_headers())
+    params = {'type': interval, 'count': count,
+              'extendTrading': 1, 'timestamp': timestamp}
+    result = _http_get_json(
+        API_FAMILY_BARS, instance._urls.bars(ticker_id), params=params, headers=headers)
+    return _parse_bars(result)
+
+
 def get_1m_bars(ticker_id=None, count=20, timestamp=None) -> pd.DataFrame:
-    time.sleep(API_DELAY_IN_SEC)
     try:
-        instance = _get_instance()
-        return instance.get_bars(tId=ticker_id, interval='m1', count=count, extendTrading=1, timeStamp=timestamp)
+        return fetch_bars(ticker_id, 'm1', count, timestamp=timestamp)
     except Exception as e:
         trading_logger.log("⚠️  Exception get_1m_bars: {}".format(e))
         print(traceback.format_exc())
         return pd.DataFrame()
 
 
+def get_1m_bars_many(ticker_ids: List[str], count=20) -> Dict[str, pd.DataFrame]:
+    """
+    fetch 1m bars of multiple tickers concurrently, keyed by ticker id
+    """
+    executor = _get_fanout_executor()
+    futures = {}
+    for ticker_id in ticker_ids:
+        futures[ticker_id] = executor.submit(get_1m_bars, ticker_id, count)
+    bars_dict = {}
+    for ticker_id, future in futures.items():
+        bars_dict[ticker_id] = future.result()
+    return bars_dict
+
+
+def get_1m_bars_batch(ticker_ids: List[str], count=20) -> Dict[str, pd.DataFrame]:
+    """
+    fetch 1m bars of multiple tickers with charts query api, one request per batch, keyed by ticker id
+    """
+    bars_dict = {}
+    batch_size = config.WEBULL_CHARTS_BATCH_SIZE
+    for i in range(0, len(ticker_ids), batch_size):
+        batch_ticker_ids = [str(ticker_id)
+                            for ticker_id in ticker_ids[i:i + batch_size]]
+        try:
+            res_json = _http_get_json(API_FAMILY_BARS, WEBULL_QUOTE_1M_CHARTS_URL.format(
+                ",".join(batch_ticker_ids), count), headers=_get_browser_headers())
+            for idx, chart_obj in enumerate(res_json):
+                if "tickerId" in chart_obj:
+                    ticker_id = str(chart_obj["tickerId"])
+                elif idx < len(batch_ticker_ids):
+                    ticker_id = batch_ticker_ids[idx]
+                else:
+                    continue
+                bars_dict[ticker_id] = _parse_bars([chart_obj])
+        except Exception as e:
+            trading_logger.log(
+                "⚠️  Exception get_1m_bars_batch: {}".format(e))
+    return bars_dict
+
+
 def get_1d_bars(ticker_id=None, count=20) -> pd.DataFrame:
-    time.sleep(API_DELAY_IN_SEC)
     try:
-        instance = _get_instance()
-        return instance.get_bars(tId=ticker_id, interval='d1', count=count, extendTrading=1)
+        return fetch_bars(ticker_id, 'd1', count)
     except Exception as e:
         trading_logger.log("⚠️  Exception get_1d_bars: {}".format(e))
         print(traceback.format_exc())
@@ -1032,7 +1208,7 @@ def get_current_orders():
 
 
 def get_history_orders(status=ORDER_STATUS_ALL, count=20) -> List[dict]:
-    time.sleep(API_DELAY_IN_SEC)
+    _throttle(API_FAMILY_ORDERS)
     try:
         instance = _get_instance()
         return instance.get_history_orders(status=status, count=count)
@@ -1063,7 +1239,7 @@ def get_news(stock=None, items=5) -> List[dict]:
         Id: 0 is latest news article
         items: number of articles to return
     '''
-    time.sleep(API_DELAY_IN_SEC)
+    _throttle(API_FAMILY_NEWS)
     try:
         instance = _get_instance()
         return instance.get_news(stock=stock, Id=0, items=items)
@@ -1075,11 +1251,8 @@ def get_news(stock=None, items=5) -> List[dict]:
 # [{'timestamp': 1617840000, 'open': 8.65, 'close': 8.65, 'high': 8.65, 'low': 8.65, 'volume': 100, 'vwap': 8.46}, ...]
 
 def get_1m_charts(ticker_id, count=20):
-    time.sleep(API_DELAY_IN_SEC)
-    session = requests.Session()
-    res = session.get(WEBULL_QUOTE_1M_CHARTS_URL.format(
+    res_json = _http_get_json(API_FAMILY_BARS, WEBULL_QUOTE_1M_CHARTS_URL.format(
         ticker_id, count), headers=_get_browser_headers())
-    res_json = res.json()
     if len(res_json) == 0:
         return []
     record_list = res_json[0]["data"]
@@ -1106,12 +1279,9 @@ def get_1m_charts(ticker_id, count=20):
 
 
 def get_pre_market_gainers(count=10) -> List[dict]:
-    time.sleep(API_DELAY_IN_SEC)
     try:
-        session = requests.Session()
-        res = session.get(WEBULL_PRE_MARKET_GAINERS_URL.format(
+        res_json = _http_get_json(API_FAMILY_RANKING, WEBULL_PRE_MARKET_GAINERS_URL.format(
             count), headers=_get_browser_headers())
-        res_json = res.json()
         gainers = []
         if "data" in res_json:
             obj_list = res_json["data"]
@@ -1159,12 +1329,9 @@ def get_pre_market_gainers(count=10) -> List[dict]:
 
 
 def get_top_gainers(count=10) -> List[dict]:
-    time.sleep(API_DELAY_IN_SEC)
     try:
-        session = requests.Session()
-        res = session.get(WEBULL_TOP_GAINERS_URL.format(
+        res_json = _http_get_json(API_FAMILY_RANKING, WEBULL_TOP_GAINERS_URL.format(
             count), headers=_get_browser_headers())
-        res_json = res.json()
         gainers = []
         if "data" in res_json:
             obj_list = res_json["data"]
@@ -1199,12 +1366,9 @@ def get_top_gainers(count=10) -> List[dict]:
 
 
 def get_after_market_gainers(count=10) -> List[dict]:
-    time.sleep(API_DELAY_IN_SEC)
     try:
-        session = requests.Session()
-        res = session.get(WEBULL_AFTER_MARKET_GAINERS_URL.format(
+        res_json = _http_get_json(API_FAMILY_RANKING, WEBULL_AFTER_MARKET_GAINERS_URL.format(
             count), headers=_get_browser_headers())
-        res_json = res.json()
         gainers = []
         if "data" in res_json:
             obj_list = res_json["data"]
@@ -1240,12 +1404,9 @@ def get_after_market_gainers(count=10) -> List[dict]:
 
 
 def get_pre_market_losers(count=10) -> List[dict]:
-    time.sleep(API_DELAY_IN_SEC)
     try:
-        session = requests.Session()
-        res = session.get(WEBULL_PRE_MARKET_LOSERS_URL.format(
+        res_json = _http_get_json(API_FAMILY_RANKING, WEBULL_PRE_MARKET_LOSERS_URL.format(
             count), headers=_get_browser_headers())
-        res_json = res.json()
         losers = []
         if "data" in res_json:
             obj_list = res_json["data"]
@@ -1293,12 +1454,9 @@ def get_pre_market_losers(count=10) -> List[dict]:
 
 
 def get_top_losers(count=10) -> List[dict]:
-    time.sleep(API_DELAY_IN_SEC)
     try:
-        session = requests.Session()
-        res = session.get(WEBULL_TOP_LOSERS_URL.format(
+        res_json = _http_get_json(API_FAMILY_RANKING, WEBULL_TOP_LOSERS_URL.format(
             count), headers=_get_browser_headers())
-        res_json = res.json()
         losers = []
         if "data" in res_json:
             obj_list = res_json["data"]
@@ -1333,12 +1491,9 @@ def get_top_losers(count=10) -> List[dict]:
 
 
 def get_after_market_losers(count=10) -> List[dict]:
-    time.sleep(API_DELAY_IN_SEC)
     try:
-        session = requests.Session()
-        res = session.get(WEBULL_AFTER_MARKET_LOSERS_URL.format(
+        res_json = _http_get_json(API_FAMILY_RANKING, WEBULL_AFTER_MARKET_LOSERS_URL.format(
             count), headers=_get_browser_headers())
-        res_json = res.json()
         gainers = []
         if "data" in res_json:
             obj_list = res_json["data"]
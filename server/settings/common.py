@@ -114,3 +114,20 @@ STATIC_ROOT = os.path.join(BASE_DIR, "../static/")
 # https://docs.djangoproject.com/en/3.1/topics/auth/default/
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
+
+# Columnar minute bar store, one memory-mapped file set for each date and symbol
+BAR_STORE_DIR = BASE_DIR / 'bar_store'
+
+# Report cache shared by all web workers, reports are invalidated by data versions
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 2000,
+        },
+    }
+}
+
+# Tests use local memory cache
+TEST_RUNNER = 'server.test_runner.TestRunner'
@@ -0,0 +1,16 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+# Test runner class, tests use local memory cache instead of the file cache shared by web workers
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_override = override_settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+        self.cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_override.disable()
+        super().teardown_test_environment(**kwargs)
@@ -3,12 +3,14 @@
 # Trading executor class
 
 import time
-from datetime import datetime, timedelta, date
-from typing import List
+from datetime import date
+from typing import List, Optional
 from common.enums import AlgorithmType, TradingHourType
 from common import utils, db, config, feishu
 from sdk import webullsdk
 from logger import trading_logger
+from trading.scheduler import TradingScheduler
+from trading.tracker.account_snapshot import AccountSnapshot
 from trading.strategy.strategy_base import StrategyBase
 
 
@@ -48,38 +50,27 @@ class TradingExecutor:
             trading_logger.log(error_msg)
             return
         trading_logger.log("Webull logged in")
-        last_login_refresh_time = datetime.now()
 
         today = date.today()
 
-        # prepare strategies
+        # prepare strategies, share one account snapshot
+        account_snapshot = AccountSnapshot()
         for strategy in self.strategies:
+            strategy.set_account_snapshot(account_snapshot)
             strategy.begin()
 
-        # main loop
-        while utils.is_market_hour():
-            # go through strategies trades
-            for strategy in self.strategies:
-                if strategy.trading_end:
-                    continue
-                strategy.update_orders()
-                strategy.update()
-                trading_logger.write(self.trading_hour, today)
-
-            # refresh login
-            if (datetime.now() - last_login_refresh_time) >= timedelta(minutes=config.REFRESH_LOGIN_INTERVAL_IN_MIN):
-                if webullsdk.login(paper=self.paper):
-                    # trading_logger.log("Refresh webull login")
-                    last_login_refresh_time = datetime.now()
-                else:
-                    error_msg = "Webull refresh login failed, quit trading!"
-                    # send message
-                    feishu.send_message(error_msg)
-                    trading_logger.log(error_msg)
-                    break
-
-            # at least slepp 1 sec
-            time.sleep(1)
+        # main loop, run strategy events when due
+        scheduler = TradingScheduler()
+        for strategy in self.strategies:
+            self.schedule_strategy(scheduler, strategy, today)
+        scheduler.schedule("login", lambda: self.refresh_login(scheduler),
+                           delay=config.REFRESH_LOGIN_INTERVAL_IN_MIN * 60)
+        scheduler.schedule("report", lambda: self.report(scheduler),
+                           delay=config.SCHEDULER_REPORT_INTERVAL_IN_MIN * 60)
+        scheduler.run(utils.is_market_hour)
+        self.report(scheduler)
+        for strategy in self.strategies:
+            strategy.wait_trades()
 
         # finish strategies
         while not utils.is_trading_hour_end(self.trading_hour):
@@ -87,6 +78,7 @@ class TradingExecutor:
                 strategy.update_orders()
                 strategy.end()
                 trading_logger.write(self.trading_hour, today)
+            time.sleep(config.ORDER_CHECK_INTERVAL_IN_SEC)
 
         # final round
         for strategy in self.strategies:
@@ -104,10 +96,67 @@ class TradingExecutor:
         trading_logger.log("Today's P&L: {}".format(day_profit_loss))
 
         trading_logger.write(self.trading_hour, today)
+        trading_logger.flush()
 
         # webullsdk.logout()
         # trading_logger.log("Webull logged out")
 
+    def schedule_strategy(self, scheduler: TradingScheduler, strategy: StrategyBase, today: date):
+        tag = strategy.get_tag()
+        update_event = f"{tag}:update"
+
+        def update() -> Optional[float]:
+            if strategy.trading_end:
+                return None
+            if strategy.update_due():
+                trading_logger.write(self.trading_hour, today)
+            return strategy.get_update_delay()
+
+        def update_orders() -> Optional[float]:
+            if strategy.trading_end:
+                return None
+            # only check order status while any order is pending
+            if strategy.has_pending_orders() and strategy.update_orders():
+                # order done, trade tickers now
+                strategy.set_tickers_due()
+                scheduler.trigger(update_event)
+            return config.ORDER_CHECK_INTERVAL_IN_SEC
+
+        def close_bar() -> Optional[float]:
+            if strategy.trading_end:
+                return None
+            # new bar closed, trade tickers now
+            strategy.set_tickers_due()
+            scheduler.trigger(update_event)
+            return self.get_bar_close_delay()
+
+        scheduler.schedule(update_event, update)
+        scheduler.schedule(f"{tag}:orders", update_orders)
+        scheduler.schedule(f"{tag}:bars", close_bar,
+                           delay=self.get_bar_close_delay())
+
+    def get_bar_close_delay(self) -> float:
+        # align to next minute boundary
+        return 60 - time.time() % 60 + config.BAR_CLOSE_DELAY_IN_SEC
+
+    def refresh_login(self, scheduler: TradingScheduler) -> Optional[float]:
+        if webullsdk.login(paper=self.paper):
+            # trading_logger.log("Refresh webull login")
+            return config.REFRESH_LOGIN_INTERVAL_IN_MIN * 60
+        error_msg = "Webull refresh login failed, quit trading!"
+        # send message
+        feishu.send_message(error_msg)
+        trading_logger.log(error_msg)
+        scheduler.stop()
+        return None
+
+    def report(self, scheduler: TradingScheduler) -> Optional[float]:
+        scheduler.report()
+        request_counts = webullsdk.get_request_counts()
+        trading_logger.log("Webull requests: {}".format(", ".join(
+            [f"{family}: {count}" for family, count in request_counts.items()])))
+        return config.SCHEDULER_REPORT_INTERVAL_IN_MIN * 60
+
     # load settings
     def load_settings(self):
         trading_settings = db.get_or_create_trading_settings()
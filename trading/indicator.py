@@ -0,0 +1,193 @@
+from collections import deque
+from typing import Optional, Tuple
+from common import constants
+
+
+# streaming indicators, closed bars are committed into running state in constant time,
+# the still forming bar is applied on read so it can be patched without replaying history
+
+
+# Streaming exponential moving average class
+class StreamingEMA:
+
+    def __init__(self, period: int):
+        self.period: int = period
+        self.alpha: float = 2.0 / (period + 1)
+        self.ema: Optional[float] = None
+
+    def commit(self, value: float):
+        self.ema = self.get_value(value)
+
+    def get_value(self, value: float) -> float:
+        if self.ema == None:
+            return value
+        return value * self.alpha + self.ema * (1 - self.alpha)
+
+
+# Streaming cumulative volume weighted average price class
+class StreamingVWAP:
+
+    def __init__(self):
+        self.total_amount: float = 0.0
+        self.total_volume: float = 0.0
+
+    def commit(self, high: float, low: float, close: float, volume: float):
+        self.total_amount += (high + low + close) / 3 * volume
+        self.total_volume += volume
+
+    def get_value(self, high: float, low: float, close: float, volume: float) -> float:
+        total_volume = self.total_volume + volume
+        if total_volume <= 0:
+            return close
+        return (self.total_amount + (high + low + close) / 3 * volume) / total_volume
+
+
+# Streaming average true range class, use wilder's smoothing after first period bars
+class StreamingATR:
+
+    def __init__(self, period: int = 14):
+        self.period: int = period
+        self.prev_close: Optional[float] = None
+        self.count: int = 0
+        self.atr: float = 0.0
+
+    def _get_true_range(self, high: float, low: float) -> float:
+        if self.prev_close == None:
+            return high - low
+        return max(high - low, high - self.prev_close, self.prev_close - low)
+
+    def _get_atr(self, true_range: float) -> float:
+        if self.count < self.period:
+            # simple average before enough bars
+            return (self.atr * self.count + true_range) / (self.count + 1)
+        return (self.atr * (self.period - 1) + true_range) / self.period
+
+    def commit(self, high: float, low: float, close: float):
+        self.atr = self._get_atr(self._get_true_range(high, low))
+        self.count += 1
+        self.prev_close = close
+
+    def get_value(self, high: float, low: float) -> float:
+        return self._get_atr(self._get_true_range(high, low))
+
+
+# Rolling window class, period high, low and rate of change of closed bars
+class RollingWindow:
+
+    def __init__(self, period: int):
+        self.period: int = period
+        self.count: int = 0
+        # monotonic queues of (bar number, price)
+        self.max_closes: deque = deque()
+        self.max_highs: deque = deque()
+        self.min_lows: deque = deque()
+        self.closes: deque = deque(maxlen=period)
+
+    def _push_max(self, queue: deque, value: float):
+        while len(queue) > 0 and queue[-1][1] <= value:
+            queue.pop()
+        queue.append((self.count, value))
+        if queue[0][0] <= self.count - self.period:
+            queue.popleft()
+
+    def _push_min(self, queue: deque, value: float):
+        while len(queue) > 0 and queue[-1][1] >= value:
+            queue.pop()
+        queue.append((self.count, value))
+        if queue[0][0] <= self.count - self.period:
+            queue.popleft()
+
+    def commit(self, high: float, low: float, close: float):
+        self._push_max(self.max_closes, close)
+        self._push_max(self.max_highs, high)
+        self._push_min(self.min_lows, low)
+        self.closes.append(close)
+        self.count += 1
+
+    def is_empty(self) -> bool:
+        return self.count == 0
+
+    def get_max_close(self) -> float:
+        if len(self.max_closes) == 0:
+            return 0
+        return self.max_closes[0][1]
+
+    def get_max_high(self) -> float:
+        if len(self.max_highs) == 0:
+            return 0
+        return self.max_highs[0][1]
+
+    def get_min_low(self) -> float:
+        if len(self.min_lows) == 0:
+            return constants.MAX_SECURITY_PRICE
+        return self.min_lows[0][1]
+
+    def get_rate_of_change(self, close: float) -> float:
+        """
+        rate of change in percentage from first close of the window
+        """
+        if len(self.closes) == 0:
+            return 0.0
+        period_price = self.closes[0]
+        return (close - period_price) / period_price * 100
+
+
+# Bar indicators class, running indicators of a ticker's 1m bars
+class BarIndicators:
+
+    def __init__(self, atr_period: int = 14):
+        self.timestamp: Optional[int] = None
+        self.forming_bar: Optional[Tuple[float, float, float, float, float]] = None
+        self.ema9: StreamingEMA = StreamingEMA(9)
+        self.vwap: StreamingVWAP = StreamingVWAP()
+        self.atr: StreamingATR = StreamingATR(atr_period)
+        self.windows: dict = {}
+
+    def _commit(self):
+        _, high, low, close, volume = self.forming_bar
+        self.ema9.commit(close)
+        self.vwap.commit(high, low, close, volume)
+        self.atr.commit(high, low, close)
+        for window in self.windows.values():
+            window.commit(high, low, close)
+
+    def update(self, timestamp: int, open_price: float, high: float, low: float, close: float, volume: float) -> bool:
+        """
+        update with latest bar, commit forming bar if new bar started, older bars are ignored
+        """
+        if self.timestamp != None and timestamp < self.timestamp:
+            return False
+        if self.timestamp != None and timestamp > self.timestamp:
+            self._commit()
+        self.timestamp = timestamp
+        self.forming_bar = (open_price, high, low, close, volume)
+        return True
+
+    def is_ready(self) -> bool:
+        return self.forming_bar != None
+
+    def get_timestamp(self) -> Optional[int]:
+        return self.timestamp
+
+    def get_ema9(self) -> float:
+        return self.ema9.get_value(self.forming_bar[3])
+
+    def get_vwap(self) -> float:
+        _, high, low, close, volume = self.forming_bar
+        return self.vwap.get_value(high, low, close, volume)
+
+    def get_atr(self) -> float:
+        _, high, low, _, _ = self.forming_bar
+        return self.atr.get_value(high, low)
+
+    def has_window(self, period: int) -> bool:
+        return period in self.windows
+
+    def add_window(self, window: RollingWindow):
+        self.windows[window.period] = window
+
+    def get_window(self, period: int) -> Optional[RollingWindow]:
+        """
+        rolling window of closed bars, current forming bar not included
+        """
+        return self.windows.get(period)
@@ -0,0 +1,331 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from common import utils
+
+
+# vectorized candle bar pattern engine, predicates run on contiguous numpy arrays
+
+SESSION_NONE = 0
+SESSION_PRE = 1
+SESSION_REGULAR = 2
+SESSION_AFTER = 3
+
+
+def get_session_by_time(t: datetime) -> int:
+    """
+    get market session of given time
+    """
+    if utils.is_pre_market_time(t):
+        return SESSION_PRE
+    if utils.is_regular_market_time(t):
+        return SESSION_REGULAR
+    if utils.is_after_market_time(t):
+        return SESSION_AFTER
+    return SESSION_NONE
+
+
+def get_session_now() -> int:
+    """
+    get current market session
+    """
+    if utils.is_pre_market_hour_now():
+        return SESSION_PRE
+    if utils.is_regular_market_hour_now():
+        return SESSION_REGULAR
+    if utils.is_after_market_hour_now():
+        return SESSION_AFTER
+    return SESSION_NONE
+
+
+# Bar arrays class, columns of candle bars as contiguous numpy arrays
+class BarArrays:
+
+    def __init__(self, bars: pd.DataFrame):
+        self.index = bars.index
+        self.size: int = len(bars)
+        self.open: np.ndarray = bars['open'].to_numpy(dtype=np.float64)
+        self.high: np.ndarray = bars['high'].to_numpy(dtype=np.float64)
+        self.low: np.ndarray = bars['low'].to_numpy(dtype=np.float64)
+        self.close: np.ndarray = bars['close'].to_numpy(dtype=np.float64)
+        self.volume: np.ndarray = bars['volume'].to_numpy(dtype=np.float64)
+        self.hours: np.ndarray = None
+        self.minutes: np.ndarray = None
+        self.sessions: np.ndarray = None
+
+    def _load_time(self):
+        if self.hours is None:
+            index = pd.DatetimeIndex(self.index)
+            self.hours = index.hour.to_numpy()
+            self.minutes = index.minute.to_numpy()
+
+    def get_minutes(self) -> np.ndarray:
+        self._load_time()
+        return self.minutes
+
+    def get_sessions(self) -> np.ndarray:
+        if self.sessions is None:
+            self._load_time()
+            hours = self.hours
+            minutes = self.minutes
+            sessions = np.full(self.size, SESSION_NONE, dtype=np.int8)
+            sessions[(hours >= 4) & ((hours < 9) | (
+                (hours == 9) & (minutes < 30)))] = SESSION_PRE
+            sessions[((hours > 9) & (hours < 16)) | (
+                (hours == 9) & (minutes >= 30))] = SESSION_REGULAR
+            sessions[(hours >= 16) & (hours < 20)] = SESSION_AFTER
+            self.sessions = sessions
+        return self.sessions
+
+    def get_session_mask(self, session: int) -> np.ndarray:
+        """
+        bars in same market session, all bars match if out of market hour
+        """
+        if session == SESSION_NONE:
+            return np.ones(self.size, dtype=bool)
+        return self.get_sessions() == session
+
+
+def _tail_range(size: int, count: int) -> slice:
+    # same as DataFrame.tail(count)
+    if count <= 0:
+        return slice(size, size)
+    return slice(max(size - count, 0), size)
+
+
+def _period_range(size: int, period: int, skip: int = 1) -> slice:
+    # same as DataFrame.tail(period + skip).head(period), period limited by bars size
+    if period <= 0:
+        return slice(size, size)
+    start = max(size - period - skip, 0)
+    return slice(start, min(start + period, size))
+
+
+def bars_continue(arrays: BarArrays, session: int, time_scale: int = 1, period: int = 10) -> bool:
+    period = min(arrays.size - 1, period)
+    rng = _tail_range(arrays.size, period)
+    minutes = arrays.get_minutes()[rng][arrays.get_session_mask(session)[rng]]
+    if len(minutes) < 2:
+        return True
+    current_minutes = np.where(minutes[1:] == 0, 60, minutes[1:])
+    return bool(np.all(current_minutes - minutes[:-1] == time_scale))
+
+
+def has_volume(arrays: BarArrays, session: int, confirm_volume: float, time_scale: int = 1, period: int = 10) -> bool:
+    if arrays.size < period + 1:
+        return False
+    mask = arrays.get_session_mask(session)
+    # check current, pre or pre, prepre two candles
+    for i in range(0, 2):
+        rng = _period_range(arrays.size, period, skip=i)
+        total_volume = arrays.volume[rng][mask[rng]].sum()
+        avg_volume = total_volume / float(period)
+        if avg_volume >= confirm_volume * time_scale:
+            return True
+    return False
+
+
+def has_amount(arrays: BarArrays, session: int, confirm_amount: float, time_scale: int = 1, period: int = 10) -> bool:
+    period = min(arrays.size - 1, period)
+    rng = _period_range(arrays.size, period)
+    mask = arrays.get_session_mask(session)[rng]
+    total_amount = (arrays.volume[rng][mask] * arrays.close[rng][mask]).sum()
+    avg_amount = float(total_amount) / float(period)
+    return avg_amount >= confirm_amount * time_scale
+
+
+def volume_with_pos_size(arrays: BarArrays, session: int, target_volume: float, period: int = 10) -> bool:
+    period = min(arrays.size - 1, period)
+    rng = _period_range(arrays.size, period)
+    volume = arrays.volume[rng][arrays.get_session_mask(session)[rng]]
+    return not bool(np.any(volume < target_volume))
+
+
+def amount_grinding(arrays: BarArrays, session: int, period: int = 10) -> bool:
+    period = min(arrays.size - 1, period)
+    rng = _period_range(arrays.size, period)
+    mask = arrays.get_session_mask(session)[rng]
+    amounts = arrays.volume[rng][mask] * arrays.close[rng][mask]
+    prev_amounts = np.concatenate(([0.0], amounts[:-1]))
+    return not bool(np.any(amounts < prev_amounts))
+
+
+def has_long_wick_up(arrays: BarArrays, avg_candle_ratio: float, prev_candle_ratio: float,
+                     change_ratio: float, up_ratio: float, period: int = 5, count: int = 1) -> bool:
+    period = min(arrays.size - 1, period)
+    rng = _period_range(arrays.size, period)
+    open_price = arrays.open[rng]
+    close_price = arrays.close[rng]
+    high = arrays.high[rng]
+    low = arrays.low[rng]
+    candle_size = high - low
+    avg_candle_size = 0.0
+    if len(candle_size) > 0:
+        avg_candle_size = candle_size.sum() / len(candle_size)
+    mid = np.maximum(close_price, open_price)
+    mid2 = np.minimum(close_price, open_price)
+    up_wick = high - mid
+    down_wick = mid2 - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # long wick body larger than average, wick tail larger than body and enough change
+        candidates = ~(candle_size < avg_candle_size * avg_candle_ratio) & \
+            ~(up_wick < np.abs(close_price - open_price)) & \
+            ~(candle_size / low < change_ratio)
+        # up tail is larger than down tail
+        long_wick_up = ((down_wick > 0) & (up_wick / down_wick >= up_ratio)) | \
+            ((down_wick == 0) & (up_wick > 0))
+    # candle should no less than last candidate candle, depend on previous result
+    long_wick_up_count = 0
+    prev_candle_size = 0.0
+    for i in np.flatnonzero(candidates):
+        if candle_size[i] < prev_candle_size * prev_candle_ratio:
+            continue
+        if long_wick_up[i]:
+            long_wick_up_count += 1
+        prev_candle_size = candle_size[i]
+    return long_wick_up_count >= count
+
+
+def has_bearish_candle(arrays: BarArrays, avg_candle_ratio: float, period: int = 5, count: int = 1) -> bool:
+    period = min(arrays.size - 1, period)
+    rng = _period_range(arrays.size, period)
+    open_price = arrays.open[rng]
+    close_price = arrays.close[rng]
+    avg_candle_size = 0.0
+    if len(open_price) > 0:
+        avg_candle_size = np.abs(close_price - open_price).sum() / \
+            len(open_price)
+    bearish_candle_size = open_price - close_price
+    bearish = (open_price > close_price) & ~(
+        bearish_candle_size < avg_candle_size * avg_candle_ratio)
+    return int(np.count_nonzero(bearish)) >= count
+
+
+def at_peak(arrays: BarArrays, long_period: int = 10, short_period: int = 3) -> bool:
+    if arrays.size < long_period * 2:
+        return False
+    open_price = arrays.open
+    close_price = arrays.close
+    volume = arrays.volume
+    # prev_bar2 should be red
+    if close_price[-2] > open_price[-2]:
+        return False
+    # prev_bar3 should be green
+    if close_price[-3] < open_price[-3]:
+        return False
+    # prev_bar3 price should be highest
+    if np.any(close_price[-3] < close_price):
+        return False
+    # prev_bar3 should has enough up percentage (15%)
+    if (close_price[-3] - open_price[-3]) / open_price[-3] < 0.15:
+        return False
+    # prev_bar3 vol should > avg long_period vol
+    total_vol = 0
+    for i in range(0, long_period):
+        total_vol += volume[-4 - i]
+    avg_vol = total_vol / long_period
+    if volume[-3] < avg_vol:
+        return False
+    # prev_bar3 vol should > each short_period vol
+    for i in range(0, short_period):
+        if volume[-3] < volume[-4 - i]:
+            return False
+    # long period vol should > pre long period vol * 4
+    prev_total_vol = 0
+    for i in range(0, long_period):
+        prev_total_vol += volume[-4 - long_period - i]
+    prev_avg_vol = prev_total_vol / long_period
+    if avg_vol < prev_avg_vol * 4:
+        return False
+    return True
+
+
+def reversal(arrays: BarArrays, period: int = 5) -> bool:
+    if arrays.size < period + 1:
+        return False
+    open_price = arrays.open
+    close_price = arrays.close
+    high = arrays.high
+    low = arrays.low
+    # prev_bar2 should be red
+    if close_price[-2] > open_price[-2]:
+        return False
+    # prev_bar2 up wick should > down wick or body
+    prev_bar2_up = max(open_price[-2], close_price[-2])
+    prev_bar2_down = min(open_price[-2], close_price[-2])
+    prev_bar2_up_wick = high[-2] - prev_bar2_up
+    prev_bar2_down_wick = prev_bar2_down - low[-2]
+    prev_bar2_body = prev_bar2_up - prev_bar2_down
+    if prev_bar2_up_wick < max(prev_bar2_down_wick, prev_bar2_body):
+        return False
+    # prev_bar3 should be green
+    if close_price[-3] < open_price[-3]:
+        return False
+    # prev_bar2 open should > prev_bar3 close
+    if open_price[-2] < close_price[-3]:
+        return False
+    # current_bar price should < prev_bar3 low
+    if close_price[-1] > low[-3]:
+        return False
+    # reversal bar should period high
+    period = min(arrays.size - 2, period)
+    period_high = high[_period_range(arrays.size, period, skip=2)]
+    period_high_price = np.max(period_high[period_high > 0.0], initial=0.0)
+    if high[-2] < period_high_price:
+        return False
+    return True
+
+
+def all_green(arrays: BarArrays, period: int = 5) -> bool:
+    period = min(arrays.size - 1, period)
+    rng = _period_range(arrays.size, period)
+    return not bool(np.any(arrays.open[rng] > arrays.close[rng]))
+
+
+def volatility(arrays: BarArrays, session: int, check_flat: bool = True, period: int = 5) -> bool:
+    period = min(arrays.size - 1, period)
+    rng = _period_range(arrays.size, period)
+    open_price = arrays.open[rng]
+    high = arrays.high[rng]
+    low = arrays.low[rng]
+    close_price = arrays.close[rng]
+    # valid candle in current market session
+    valid = np.zeros(len(open_price), dtype=bool)
+    if session != SESSION_NONE:
+        valid = arrays.get_sessions()[rng] == session
+    if np.count_nonzero(valid) == len(open_price):
+        # price not like open: 7.35, high: 7.35, low: 7.35, close: 7.35
+        if check_flat:
+            flat = valid & (open_price == close_price) & (
+                close_price == high) & (high == low)
+            if np.count_nonzero(flat) >= 3:
+                return False
+        # price set only in a few values
+        prices = np.concatenate((open_price, high, low, close_price))
+        if len(np.unique(prices)) <= 2:
+            return False
+    return True
+
+
+def largest_green_candle(arrays: BarArrays, session: int, green_candle_ratio: float = 1.0,
+                         allow_equal: bool = True, period: int = 10) -> bool:
+    period = min(arrays.size - 1, period)
+    rng = _period_range(arrays.size, period)
+    mask = arrays.get_session_mask(session)[rng]
+    candle_size = arrays.close[rng][mask] - arrays.open[rng][mask]
+    max_green_candle_size = np.max(candle_size[candle_size > 0], initial=0.0)
+    max_red_candle_size = np.max(-candle_size[candle_size < 0], initial=0.0)
+    if allow_equal:
+        return max_green_candle_size * green_candle_ratio >= max_red_candle_size
+    return max_green_candle_size * green_candle_ratio > max_red_candle_size
+
+
+def green_candle_ratio(arrays: BarArrays, session: int, period: int = 10) -> float:
+    period = min(arrays.size - 1, period)
+    rng = _period_range(arrays.size, period)
+    mask = arrays.get_session_mask(session)[rng]
+    green_candle_count = np.count_nonzero(
+        arrays.close[rng][mask] >= arrays.open[rng][mask])
+    # make sure total is not zero
+    total_candle_count = max(1, int(np.count_nonzero(mask)))
+    return float(green_candle_count) / float(total_candle_count)
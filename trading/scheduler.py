@@ -0,0 +1,117 @@
+import time
+import heapq
+from typing import Callable, Dict, List, Optional, Tuple
+from common import config
+from logger import trading_logger
+
+
+# Scheduled event class, callback return delay in seconds to next run, or None to stop
+class ScheduledEvent:
+
+    def __init__(self, name: str, callback: Callable[[], Optional[float]]):
+        self.name: str = name
+        self.callback: Callable[[], Optional[float]] = callback
+        self.due_time: Optional[float] = None
+
+
+# Event statistic class, latency from due time to start and run duration
+class EventStat:
+
+    def __init__(self):
+        self.count: int = 0
+        self.total_latency: float = 0.0
+        self.max_latency: float = 0.0
+        self.total_duration: float = 0.0
+        self.max_duration: float = 0.0
+
+    def add(self, latency: float, duration: float):
+        self.count += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+
+    def get_avg_latency(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return self.total_latency / self.count
+
+    def get_avg_duration(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return self.total_duration / self.count
+
+
+# Trading scheduler class, run each event when it is due instead of polling in fixed interval
+class TradingScheduler:
+
+    def __init__(self):
+        self.queue: List[Tuple[float, int, ScheduledEvent]] = []
+        self.events: Dict[str, ScheduledEvent] = {}
+        self.stats: Dict[str, EventStat] = {}
+        self.seq: int = 0
+        self.running: bool = False
+
+    def _push(self, event: ScheduledEvent, due_time: float):
+        # earlier queue entries of the event become stale
+        event.due_time = due_time
+        self.seq += 1
+        heapq.heappush(self.queue, (due_time, self.seq, event))
+
+    def schedule(self, name: str, callback: Callable[[], Optional[float]], delay: float = 0.0):
+        event = ScheduledEvent(name, callback)
+        self.events[name] = event
+        self._push(event, time.monotonic() + delay)
+
+    def trigger(self, name: str):
+        """
+        run scheduled event as soon as possible
+        """
+        event = self.events.get(name)
+        if event and event.due_time != None:
+            now = time.monotonic()
+            if event.due_time > now:
+                self._push(event, now)
+
+    def cancel(self, name: str):
+        event = self.events.pop(name, None)
+        if event:
+            event.due_time = None
+
+    def stop(self):
+        self.running = False
+
+    def run(self, is_running: Callable[[], bool]):
+        self.running = True
+        while self.running and len(self.queue) > 0 and is_running():
+            due_time, _, event = self.queue[0]
+            if event.due_time != due_time:
+                # stale entry of triggered or canceled event
+                heapq.heappop(self.queue)
+                continue
+            wait_sec = due_time - time.monotonic()
+            if wait_sec > 0:
+                time.sleep(min(wait_sec, config.SCHEDULER_MAX_SLEEP_IN_SEC))
+                continue
+            heapq.heappop(self.queue)
+            event.due_time = None
+            start_time = time.monotonic()
+            delay = event.callback()
+            end_time = time.monotonic()
+            self.get_stat(event.name).add(
+                start_time - due_time, end_time - start_time)
+            # reschedule if not triggered or canceled in callback
+            if delay != None and event.due_time == None and self.events.get(event.name) == event:
+                self._push(event, end_time + delay)
+        self.running = False
+
+    def get_stat(self, name: str) -> EventStat:
+        if name not in self.stats:
+            self.stats[name] = EventStat()
+        return self.stats[name]
+
+    def report(self):
+        for name, stat in self.stats.items():
+            trading_logger.log("Scheduler <{}> runs: {}, latency avg: {}ms, max: {}ms, duration avg: {}ms, max: {}ms".format(
+                name, stat.count, round(stat.get_avg_latency() * 1000), round(stat.max_latency * 1000),
+                round(stat.get_avg_duration() * 1000), round(stat.max_duration * 1000)))
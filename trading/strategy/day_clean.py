@@ -57,7 +57,7 @@ class DayTradingClean(StrategyBase):
             self.trading_end = True
             return
 
-        for ticker_id in self.trading_tracker.get_tickers():
+        for ticker_id in self.trading_tracker.get_due_tickers():
             ticker = self.trading_tracker.get_ticker(ticker_id)
             # clean ticker
             self.clean(ticker)
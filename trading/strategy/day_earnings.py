@@ -97,10 +97,7 @@ class DayTradingEarningsOvernight(StrategyBase):
 
     def update(self):
         # trading tickers
-        for ticker_id in self.trading_tracker.get_tickers():
-            ticker = self.trading_tracker.get_ticker(ticker_id)
-            # do trade
-            self.trade(ticker)
+        self.trade_tickers(self.trading_tracker.get_due_tickers())
 
     def end(self):
         self.trading_end = True
@@ -32,10 +32,7 @@ class DayTradingGrindingLargeCap(DayTradingBreakout):
             return
 
         # trading tickers
-        for ticker_id in self.trading_tracker.get_tickers():
-            ticker = self.trading_tracker.get_ticker(ticker_id)
-            # do trade
-            self.trade(ticker)
+        self.trade_tickers(self.trading_tracker.get_due_tickers())
 
         # find trading ticker in top gainers
         top_gainers = webullsdk.get_top_gainers(count=50)
@@ -120,10 +117,7 @@ class DayTradingGrindingSymbols(DayTradingBreakout):
             return
 
         # trading tickers
-        for ticker_id in self.trading_tracker.get_tickers():
-            ticker = self.trading_tracker.get_ticker(ticker_id)
-            # do trade
-            self.trade(ticker)
+        self.trade_tickers(self.trading_tracker.get_due_tickers())
 
         for trading_ticker in self.trading_tickers:
             symbol = trading_ticker["symbol"]
@@ -124,7 +124,7 @@ class DayTradingMomo(StrategyBase):
         if holding_quantity == 0:
             # fetch 1m bar charts
             if m1_bars.empty:
-                m1_bars = webullsdk.get_1m_bars(ticker_id, count=60)
+                m1_bars = self.get_1m_bars(ticker_id, count=60)
             m2_bars = utils.convert_2m_bars(m1_bars)
             if m2_bars.empty:
                 return
@@ -229,7 +229,7 @@ class DayTradingMomo(StrategyBase):
                 exit_trading = True
 
             if not exit_trading:
-                m1_bars = webullsdk.get_1m_bars(ticker_id, count=20)
+                m1_bars = self.get_1m_bars(ticker_id, count=20)
                 # get 2m bar charts
                 m2_bars = utils.convert_2m_bars(m1_bars)
 
@@ -266,10 +266,7 @@ class DayTradingMomo(StrategyBase):
 
     def update(self):
         # trading tickers
-        for ticker_id in self.trading_tracker.get_tickers():
-            ticker = self.trading_tracker.get_ticker(ticker_id)
-            # do trade
-            self.trade(ticker)
+        self.trade_tickers(self.trading_tracker.get_due_tickers())
 
         # find trading ticker in top gainers
         top_gainers = []
@@ -293,7 +290,7 @@ class DayTradingMomo(StrategyBase):
             change_percentage = gainer["change_percentage"]
             # check gap change
             if change_percentage >= config.MIN_SURGE_CHANGE_RATIO:
-                m1_bars = webullsdk.get_1m_bars(ticker_id, count=60)
+                m1_bars = self.get_1m_bars(ticker_id, count=60)
                 m2_bars = utils.convert_2m_bars(m1_bars)
                 if m2_bars.empty or len(m2_bars) <= 2:
                     continue
@@ -334,11 +331,9 @@ class DayTradingMomoShareSize(DayTradingMomo):
         return "DayTradingMomoShareSize"
 
     def submit_buy_limit_order(self, ticker: TrackingTicker, note: str = "Entry point."):
-        from common import db
         symbol = ticker.get_symbol()
         ticker_id = ticker.get_id()
-        usable_cash = webullsdk.get_usable_cash()
-        db.save_webull_min_usable_cash(usable_cash)
+        usable_cash = self.account_snapshot.get_usable_cash()
         buy_price = self.get_buy_price(ticker)
         buy_position_amount = buy_price * self.SHARE_SIZE
         if usable_cash <= buy_position_amount:
@@ -360,6 +355,8 @@ class DayTradingMomoShareSize(DayTradingMomo):
                 # tracking pending buy order
                 self.start_tracking_pending_buy_order(
                     ticker, order_id, entry_note=note)
+                # hold order amount until account refresh
+                self.account_snapshot.reserve_cash(buy_price * buy_quant)
             else:
                 trading_logger.log(
                     f"⚠️  Invalid buy order response: {order_response}")
@@ -447,10 +444,7 @@ class DayTradingMomoExtendedHour(DayTradingMomo):
             return
 
         # trading tickers
-        for ticker_id in self.trading_tracker.get_tickers():
-            ticker = self.trading_tracker.get_ticker(ticker_id)
-            # do trade
-            self.trade(ticker)
+        self.trade_tickers(self.trading_tracker.get_due_tickers())
 
         # find trading ticker in top gainers
         top_gainers = []
@@ -472,7 +466,7 @@ class DayTradingMomoExtendedHour(DayTradingMomo):
             change_percentage = gainer["change_percentage"]
             # check gap change
             if change_percentage >= config.MIN_SURGE_CHANGE_RATIO:
-                m1_bars = webullsdk.get_1m_bars(ticker_id, count=60)
+                m1_bars = self.get_1m_bars(ticker_id, count=60)
                 m2_bars = utils.convert_2m_bars(m1_bars)
                 if m2_bars.empty:
                     continue
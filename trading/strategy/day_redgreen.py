@@ -38,7 +38,7 @@ class DayTradingRedGreen(StrategyBase):
         holding_quantity = ticker.get_positions()
 
         # fetch 1m bar charts
-        m1_bars = webullsdk.get_1m_bars(ticker_id, count=60)
+        m1_bars = self.get_1m_bars(ticker_id, count=60)
         m2_bars = utils.convert_2m_bars(m1_bars)
         if m2_bars.empty:
             return
@@ -190,10 +190,7 @@ class DayTradingRedGreen(StrategyBase):
         # only trade regular market hour before 13:00
         if self.is_power_hour():
             # trading tickers
-            for ticker_id in self.trading_tracker.get_tickers():
-                ticker = self.trading_tracker.get_ticker(ticker_id)
-                # do trade
-                self.trade(ticker)
+            self.trade_tickers(self.trading_tracker.get_due_tickers())
         else:
             self.trading_end = True
 
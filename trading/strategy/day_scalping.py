@@ -53,16 +53,23 @@ class DayTradingScalping(StrategyBase):
             trading_logger.log(
                 "<{}> price is not above vwap, no entry!".format(symbol))
             return False
-        period_bars = bars.head(len(bars) - 1).tail(self.entry_period)
-        period_high_price = 0
-        period_low_price = constants.MAX_SECURITY_PRICE
-        for _, row in period_bars.iterrows():
-            # use close price for period high
-            if row['close'] > period_high_price:
-                period_high_price = row['close']
-            # use low price for period low
-            if row['low'] < period_low_price:
-                period_low_price = row['low']
+        period_window = self.get_period_window(
+            ticker, bars, self.entry_period)
+        if period_window:
+            # use close price for period high, low price for period low
+            period_high_price = period_window.get_max_close()
+            period_low_price = period_window.get_min_low()
+        else:
+            period_bars = bars.head(len(bars) - 1).tail(self.entry_period)
+            period_high_price = 0
+            period_low_price = constants.MAX_SECURITY_PRICE
+            for _, row in period_bars.iterrows():
+                # use close price for period high
+                if row['close'] > period_high_price:
+                    period_high_price = row['close']
+                # use low price for period low
+                if row['low'] < period_low_price:
+                    period_low_price = row['low']
 
         # check if new high
         if current_price <= period_high_price:
@@ -252,9 +259,7 @@ class DayTradingScalping(StrategyBase):
 
     def get_price_rate_of_change(self, bars: pd.DataFrame, period: int = 10) -> float:
         period = min(len(bars) - 1, period)
-        period_bars = bars.tail(period + 1)
-        period_bars = period_bars.head(period)
-        period_price = period_bars.iloc[0]['close']
+        period_price = bars.iloc[-period - 1]['close']
         current_price = bars.iloc[-1]['close']
         ROC = (current_price - period_price) / period_price * 100
         return ROC
@@ -280,13 +285,14 @@ class DayTradingScalping(StrategyBase):
 
             # fetch 1m bar charts
             if m1_bars.empty:
-                m1_bars = webullsdk.get_1m_bars(
+                m1_bars = self.get_1m_bars(
                     ticker_id, count=(self.entry_period+5))
             if m1_bars.empty:
                 return
             bars = m1_bars
             # calculate and fill ema 9 data
-            bars['ema9'] = bars['close'].ewm(span=9, adjust=False).mean()
+            if 'ema9' not in bars:
+                bars['ema9'] = bars['close'].ewm(span=9, adjust=False).mean()
 
             # check entry: current price above vwap, entry period minutes new high
             if self.check_entry(ticker, bars):
@@ -326,7 +332,7 @@ class DayTradingScalping(StrategyBase):
             if not exit_trading:
                 # get 1m bar charts
                 # check_bars_at_peak require 30 bars
-                m1_bars = webullsdk.get_1m_bars(ticker_id, count=30)
+                m1_bars = self.get_1m_bars(ticker_id, count=30)
                 # check bars error
                 if m1_bars.empty:
                     trading_logger.log(
@@ -355,10 +361,7 @@ class DayTradingScalping(StrategyBase):
 
     def update(self):
         # trading tickers
-        for ticker_id in self.trading_tracker.get_tickers():
-            ticker = self.trading_tracker.get_ticker(ticker_id)
-            # do trade
-            self.trade(ticker)
+        self.trade_tickers(self.trading_tracker.get_due_tickers())
 
         # find new ticker in top gainers
         top_gainers = []
@@ -389,7 +392,7 @@ class DayTradingScalping(StrategyBase):
             # check gap change
             if change_percentage >= config.MIN_SURGE_CHANGE_RATIO:
                 if self.is_extended_market_hour():
-                    m1_bars = webullsdk.get_1m_bars(
+                    m1_bars = self.get_1m_bars(
                         ticker_id, count=(self.entry_period+5))
                     if m1_bars.empty or len(m1_bars) < 2:
                         continue
@@ -98,7 +98,7 @@ class DayTradingVWAPPaper(StrategyBase):
 
         if holding_quantity == 0:
             # fetch 1m bar charts
-            m1_bars = webullsdk.get_1m_bars(ticker_id, count=30)
+            m1_bars = self.get_1m_bars(ticker_id, count=30)
             if m1_bars.empty:
                 return
             bars = m1_bars
@@ -132,7 +132,7 @@ class DayTradingVWAPPaper(StrategyBase):
                 return
 
             # get 1m bar charts
-            m1_bars = webullsdk.get_1m_bars(ticker_id, count=5)
+            m1_bars = self.get_1m_bars(ticker_id, count=5)
 
             # get bars error
             if m1_bars.empty:
@@ -159,10 +159,7 @@ class DayTradingVWAPPaper(StrategyBase):
 
     def update(self):
         # trading tickers
-        for ticker_id in self.trading_tracker.get_tickers():
-            ticker = self.trading_tracker.get_ticker(ticker_id)
-            # do trade
-            self.trade(ticker)
+        self.trade_tickers(self.trading_tracker.get_due_tickers())
 
         # find trading ticker in top gainers
         top_gainers = []
@@ -279,7 +276,7 @@ class DayTradingVWAPLargeCap(StrategyBase):
 
         if holding_quantity == 0:
             # fetch 1m bar charts
-            m1_bars = webullsdk.get_1m_bars(ticker_id, count=15)
+            m1_bars = self.get_1m_bars(ticker_id, count=15)
             if m1_bars.empty:
                 return
             bars = m1_bars
@@ -315,7 +312,7 @@ class DayTradingVWAPLargeCap(StrategyBase):
                 ticker.set_max_profit_loss_rate(profit_loss_rate)
 
             # get 1m bar charts
-            m1_bars = webullsdk.get_1m_bars(ticker_id, count=15)
+            m1_bars = self.get_1m_bars(ticker_id, count=15)
             # get bars error
             if m1_bars.empty:
                 trading_logger.log("<{}> bars data error!".format(symbol))
@@ -339,10 +336,7 @@ class DayTradingVWAPLargeCap(StrategyBase):
 
     def update(self):
         # trading tickers
-        for ticker_id in self.trading_tracker.get_tickers():
-            ticker = self.trading_tracker.get_ticker(ticker_id)
-            # do trade
-            self.trade(ticker)
+        self.trade_tickers(self.trading_tracker.get_due_tickers())
 
         # find large cap ticker with major news
         large_cap_with_major_news = finvizsdk.fetch_screeners(
@@ -2,13 +2,17 @@
 
 # Base trading class
 
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from django.utils import timezone
-from typing import Optional
+from typing import Dict, List, Optional
 from sdk import webullsdk, fmpsdk
-from common import utils, db, feishu, constants, exceptions
+from common import utils, db, config, feishu, constants, exceptions
 from common.enums import ActionType, SetupType, TradingHourType
-from logger import trading_logger
+from logger import trading_logger, exception_logger
+from trading.indicator import RollingWindow
+from trading.tracker.account_snapshot import AccountSnapshot
 from trading.tracker.trading_tracker import TradingTracker
 from trading.tracker.order_tracker import OrderTracker
 from webull_trader.models import ManualTradeRequest, SwingPosition, SwingTrade, WebullOrder
@@ -28,7 +32,13 @@ class StrategyBase:
         self.trading_end: bool = False
         self.trading_hour: TradingHourType = trading_hour
         self.trading_tracker: TradingTracker = TradingTracker()
-        self.order_tracker: OrderTracker = OrderTracker(paper=self.paper)
+        self.account_snapshot: AccountSnapshot = AccountSnapshot()
+        self.order_tracker: OrderTracker = OrderTracker(
+            paper=self.paper, account_snapshot=self.account_snapshot)
+        # monotonic time of last update
+        self.last_update_time: float = 0.0
+        self.trade_executor: Optional[ThreadPoolExecutor] = None
+        self.trade_futures: Dict[str, Future] = {}
 
     def begin(self):
         pass
@@ -96,14 +106,106 @@ class StrategyBase:
         trading_logger.log("Usable cash threshold for day trade: {}".format(
             self.day_trade_usable_cash_threshold))
 
-    def update_orders(self):
-        # update order tracker
-        self.order_tracker.update_orders()
+    def update_orders(self) -> bool:
+        # update order tracker, return true if any order done
+        order_done = self.order_tracker.update_orders()
+        if order_done:
+            # positions and cash changed
+            self.account_snapshot.invalidate()
+        return order_done
+
+    def set_account_snapshot(self, account_snapshot: AccountSnapshot):
+        # share account snapshot between strategies
+        self.account_snapshot = account_snapshot
+        self.order_tracker.set_account_snapshot(account_snapshot)
+
+    def has_pending_orders(self) -> bool:
+        return self.order_tracker.has_pending_orders()
+
+    def set_tickers_due(self):
+        # trade all tracking tickers in next update
+        self.trading_tracker.set_tickers_due()
+
+    def get_idle_update_interval(self) -> int:
+        return config.IDLE_UPDATE_INTERVAL_IN_SEC
+
+    def get_update_delay(self) -> float:
+        """
+        seconds until next tracking ticker is due or idle update interval passed
+        """
+        next_time = self.last_update_time + self.get_idle_update_interval()
+        next_check_time = self.trading_tracker.get_next_check_time()
+        if next_check_time != None:
+            next_time = min(next_time, next_check_time)
+        return max(0.0, next_time - time.monotonic())
+
+    def update_due(self) -> bool:
+        """
+        update strategy only if any tracking ticker is due or idle update interval passed
+        """
+        self.trading_tracker.update_due_tickers()
+        if not self.trading_tracker.has_due_tickers() and \
+                (time.monotonic() - self.last_update_time) < self.get_idle_update_interval():
+            return False
+        self.last_update_time = time.monotonic()
+        self.prefetch_bars()
+        self.update()
+        return True
 
     def update_account(self):
         account_data = webullsdk.get_account()
         db.save_webull_account(account_data, paper=self.paper)
 
+    def _trade_ticker(self, ticker: TrackingTicker):
+        with ticker.get_trade_lock():
+            try:
+                self.trade(ticker)
+            except Exception as e:
+                trading_logger.log(
+                    "⚠️  Exception trade <{}>: {}".format(ticker.get_symbol(), e))
+                exception_logger.log(str(e), f"ticker: {ticker.get_symbol()}")
+
+    def trade_tickers(self, ticker_ids: List[str]):
+        """
+        trade tickers concurrently in worker pool, skip ticker still trading in last update
+        """
+        if not self.trade_executor:
+            self.trade_executor = ThreadPoolExecutor(
+                max_workers=config.DAY_TRADE_MAX_WORKERS)
+        for ticker_id in ticker_ids:
+            ticker = self.trading_tracker.get_ticker(ticker_id)
+            if not ticker:
+                continue
+            future = self.trade_futures.get(ticker_id)
+            if future and not future.done():
+                continue
+            self.trade_futures[ticker_id] = self.trade_executor.submit(
+                self._trade_ticker, ticker)
+
+    def wait_trades(self):
+        # wait running trades done
+        for future in list(self.trade_futures.values()):
+            future.result()
+        self.trade_futures = {}
+
+    def prefetch_bars(self):
+        # fetch new 1m bars of due tickers in batch
+        self.trading_tracker.prefetch_m1_bars()
+
+    def get_1m_bars(self, ticker_id: str, count: int = 20) -> pd.DataFrame:
+        # use prefetched bars if exist, otherwise fetch from webull
+        m1_bars = self.trading_tracker.get_m1_bars(ticker_id, count)
+        if m1_bars is None:
+            m1_bars = webullsdk.get_1m_bars(ticker_id, count=count)
+        return m1_bars
+
+    def get_period_window(self, ticker: TrackingTicker, bars: pd.DataFrame, period: int) -> Optional[RollingWindow]:
+        # use streaming window of cached bars if bars end with the cached forming bar
+        bar_cache = ticker.get_bar_cache()
+        if not bar_cache.is_latest(bars):
+            return None
+        return bar_cache.get_window(period)
+
     def is_regular_market_hour(self) -> bool:
         return self.trading_hour == TradingHourType.REGULAR
 
@@ -172,8 +274,7 @@ class StrategyBase:
 
     # submit buy market order, only use for swing trade
     def submit_buy_market_order(self, symbol: str, position: Optional[SwingPosition], unit_weight: int, last_price: float, reason: str):
-        usable_cash = webullsdk.get_usable_cash()
-        db.save_webull_min_usable_cash(usable_cash)
+        usable_cash = self.account_snapshot.get_usable_cash()
         # buy swing position amount
         buy_position_amount = self.get_buy_order_limit(unit_weight)
         if usable_cash <= buy_position_amount:
@@ -193,6 +294,8 @@ class StrategyBase:
             if order_id:
                 trading_logger.log(
                     f"🟢 Submit buy order <{symbol}> for {reason}, quant: {buy_quant}, latest price: {last_price}")
+                # hold order amount until account refresh
+                self.account_snapshot.reserve_cash(last_price * buy_quant)
                 # add/update swing position, always assume market order filled
                 self.upsert_pending_swing_position(
                     symbol=symbol,
@@ -244,8 +347,7 @@ class StrategyBase:
     def submit_buy_limit_order(self, ticker: TrackingTicker, note: str = "Entry point."):
         symbol = ticker.get_symbol()
         ticker_id = ticker.get_id()
-        usable_cash = webullsdk.get_usable_cash()
-        db.save_webull_min_usable_cash(usable_cash)
+        usable_cash = self.account_snapshot.get_usable_cash()
         buy_position_amount = self.get_buy_order_limit(ticker)
         if usable_cash <= buy_position_amount:
             trading_logger.log(
@@ -267,6 +369,8 @@ class StrategyBase:
                 # tracking pending buy order
                 self.start_tracking_pending_buy_order(
                     ticker, order_id, entry_note=note)
+                # hold order amount until account refresh
+                self.account_snapshot.reserve_cash(buy_price * buy_quant)
             else:
                 trading_logger.log(
                     f"⚠️  Invalid buy order response: {order_response}")
@@ -278,8 +382,7 @@ class StrategyBase:
         symbol = ticker.get_symbol()
         ticker_id = ticker.get_id()
         order_id = ticker.get_pending_order_id()
-        usable_cash = webullsdk.get_usable_cash()
-        db.save_webull_min_usable_cash(usable_cash)
+        usable_cash = self.account_snapshot.get_usable_cash()
         buy_position_amount = self.get_buy_order_limit(ticker)
         if usable_cash <= buy_position_amount:
             trading_logger.log(
@@ -704,16 +807,7 @@ class StrategyBase:
             manual_request.delete()
 
     def get_position(self, ticker: TrackingTicker):
-        symbol = ticker.get_symbol()
-        positions = webullsdk.get_positions()
-        if positions == None:
-            return None
-        ticker_position = None
-        for position in positions:
-            if position['ticker']['symbol'] == symbol:
-                ticker_position = position
-                break
-        return ticker_position
+        return self.account_snapshot.get_position(ticker.get_symbol())
 
     # clear all positions
     def clear_positions(self):
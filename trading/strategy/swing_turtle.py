@@ -192,5 +192,11 @@ class SwingTurtle(StrategyBase):
             # remove from swing_symbols
             del self.watchlist[0]
 
+    def get_idle_update_interval(self) -> int:
+        # keep trading watchlist symbols one by one
+        if len(self.watchlist) > 0:
+            return config.DAY_ACTIVE_TICKER_INTERVAL_IN_SEC
+        return super().get_idle_update_interval()
+
     def end(self):
         self.trading_end = True
@@ -0,0 +1,79 @@
+import time
+import threading
+from typing import List, Optional
+from common import config, db
+from sdk import webullsdk
+from logger import trading_logger
+
+
+# Account snapshot class, positions, usable cash and open orders from one account request,
+# shared by all strategies and reused until expired or invalidated by order events
+class AccountSnapshot:
+
+    def __init__(self):
+        self.account_data: Optional[dict] = None
+        self.usable_cash: float = 0.0
+        self.min_usable_cash: Optional[float] = None
+        # monotonic time of last account request
+        self.updated_time: float = 0.0
+        self.lock: threading.Lock = threading.Lock()
+
+    def _load(self):
+        if self.account_data != None and \
+                (time.monotonic() - self.updated_time) < config.ACCOUNT_SNAPSHOT_TTL_IN_SEC:
+            return
+        try:
+            account_data = webullsdk.get_account()
+        except Exception as e:
+            trading_logger.log("⚠️  Exception get_account: {}".format(e))
+            account_data = None
+        self.updated_time = time.monotonic()
+        if not isinstance(account_data, dict):
+            self.account_data = None
+            self.usable_cash = 0.0
+            return
+        self.account_data = account_data
+        self.usable_cash = webullsdk.get_usable_cash(account_data)
+        # only save min usable cash when it goes lower
+        if self.min_usable_cash == None or self.usable_cash < self.min_usable_cash:
+            self.min_usable_cash = self.usable_cash
+            db.save_webull_min_usable_cash(self.usable_cash)
+
+    def invalidate(self):
+        with self.lock:
+            self.account_data = None
+
+    def get_positions(self) -> Optional[List[dict]]:
+        with self.lock:
+            self._load()
+            if self.account_data == None or 'positions' not in self.account_data:
+                return None
+            return self.account_data['positions']
+
+    def get_position(self, symbol: str) -> Optional[dict]:
+        positions = self.get_positions()
+        if positions == None:
+            return None
+        for position in positions:
+            if position['ticker']['symbol'] == symbol:
+                return position
+        return None
+
+    def get_open_orders(self) -> Optional[List[dict]]:
+        with self.lock:
+            self._load()
+            if self.account_data == None or 'openOrders' not in self.account_data:
+                return None
+            return self.account_data['openOrders']
+
+    def get_usable_cash(self) -> float:
+        with self.lock:
+            self._load()
+            return self.usable_cash
+
+    def reserve_cash(self, amount: float):
+        """
+        deduct submitted buy order amount until next account request
+        """
+        with self.lock:
+            self.usable_cash -= amount
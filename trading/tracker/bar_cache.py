@@ -0,0 +1,176 @@
+import time
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Optional
+from common import config
+from trading.indicator import BarIndicators, RollingWindow
+
+
+# Bar cache class, fixed size ring buffer of 1m bars for a tracking ticker
+class BarCache:
+
+    COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'vwap', 'ema9']
+
+    def __init__(self, capacity: int = config.DAY_BAR_CACHE_SIZE):
+        self.capacity: int = capacity
+        self.timestamps: np.ndarray = np.zeros(capacity, dtype=np.int64)
+        self.values: np.ndarray = np.zeros(
+            (capacity, len(self.COLUMNS)), dtype=np.float64)
+        # ring buffer start position and size
+        self.start: int = 0
+        self.size: int = 0
+        self.time_zone = None
+        self.updated_time: Optional[datetime] = None
+        self.indicators: BarIndicators = BarIndicators()
+        # prefetch may update while ticker trading in worker thread
+        self.lock: threading.RLock = threading.RLock()
+
+    def _pos(self, i: int) -> int:
+        return (self.start + i) % self.capacity
+
+    def _write(self, pos: int, timestamp: int, row: np.ndarray):
+        self.timestamps[pos] = timestamp
+        self.values[pos, :6] = row
+
+    def _append(self, timestamp: int, row: np.ndarray):
+        if self.size == self.capacity:
+            # overwrite oldest bar
+            self.start = self._pos(1)
+            self.size -= 1
+        pos = self._pos(self.size)
+        self.size += 1
+        self._write(pos, timestamp, row)
+
+    def _feed_indicators(self, from_timestamp: int):
+        # feed changed bars into indicators, replay all cached bars if a committed bar changed
+        indicator_timestamp = self.indicators.get_timestamp()
+        if indicator_timestamp != None and from_timestamp < indicator_timestamp:
+            periods = list(self.indicators.windows.keys())
+            self.indicators = BarIndicators()
+            for period in periods:
+                self.indicators.add_window(RollingWindow(period))
+            from_timestamp = 0
+        start_idx = self.size
+        while start_idx > 0 and self.timestamps[self._pos(start_idx - 1)] >= from_timestamp:
+            start_idx -= 1
+        for i in range(start_idx, self.size):
+            pos = self._pos(i)
+            open_price, high, low, close, volume = self.values[pos, :5]
+            self.indicators.update(
+                int(self.timestamps[pos]), open_price, high, low, close, volume)
+            self.values[pos, 6] = self.indicators.get_ema9()
+
+    def _find(self, timestamp: int) -> Optional[int]:
+        # search cached bar from latest
+        for i in range(self.size - 1, -1, -1):
+            cached_timestamp = self.timestamps[self._pos(i)]
+            if cached_timestamp == timestamp:
+                return i
+            if cached_timestamp < timestamp:
+                break
+        return None
+
+    def clear(self):
+        self.start = 0
+        self.size = 0
+        self.updated_time = None
+        self.indicators = BarIndicators()
+
+    def is_empty(self) -> bool:
+        return self.size == 0
+
+    def get_size(self) -> int:
+        return self.size
+
+    def get_last_timestamp(self) -> Optional[int]:
+        if self.size == 0:
+            return None
+        return int(self.timestamps[self._pos(self.size - 1)])
+
+    def get_fetch_count(self) -> int:
+        """
+        bars count required to catch up, include last cached bar which may still forming
+        """
+        last_timestamp = self.get_last_timestamp()
+        if last_timestamp == None:
+            return self.capacity
+        missing_minutes = int((time.time() - last_timestamp) // 60) + 2
+        return max(2, min(self.capacity, missing_minutes))
+
+    def update(self, bars: pd.DataFrame):
+        """
+        merge fetched bars, patch the forming bar in place and append newer bars
+        """
+        with self.lock:
+            if bars.empty:
+                return
+            if self.time_zone == None:
+                self.time_zone = bars.index.tz
+            timestamps = pd.DatetimeIndex(bars.index).asi8 // 10**9
+            rows = bars[self.COLUMNS[:6]].to_numpy(dtype=np.float64)
+            # cached bars fall out of fetched range, reset cache
+            last_timestamp = self.get_last_timestamp()
+            if last_timestamp != None and timestamps[0] > last_timestamp and len(bars) >= self.capacity:
+                self.clear()
+                last_timestamp = None
+            from_timestamp = None
+            for i in range(len(timestamps)):
+                timestamp = int(timestamps[i])
+                if last_timestamp == None or timestamp > last_timestamp:
+                    self._append(timestamp, rows[i])
+                    last_timestamp = timestamp
+                else:
+                    # patch cached bar, the forming bar or bar closed after last fetch
+                    idx = self._find(timestamp)
+                    if idx == None or np.array_equal(self.values[self._pos(idx), :6], rows[i]):
+                        continue
+                    self._write(self._pos(idx), timestamp, rows[i])
+                if from_timestamp == None:
+                    from_timestamp = timestamp
+            if from_timestamp != None:
+                self._feed_indicators(from_timestamp)
+            self.updated_time = datetime.now()
+
+    def is_latest(self, bars: pd.DataFrame) -> bool:
+        """
+        check if bars end with the latest cached bar
+        """
+        if self.size == 0 or bars.empty:
+            return False
+        return self.get_last_timestamp() == int(bars.index[-1].timestamp())
+
+    def get_indicators(self) -> BarIndicators:
+        return self.indicators
+
+    def get_window(self, period: int) -> RollingWindow:
+        """
+        rolling window of closed bars, seed from cached bars when first used
+        """
+        with self.lock:
+            window = self.indicators.get_window(period)
+            if window == None:
+                window = RollingWindow(period)
+                for i in range(0, self.size - 1):
+                    pos = self._pos(i)
+                    window.commit(self.values[pos, 1],
+                                  self.values[pos, 2], self.values[pos, 3])
+                self.indicators.add_window(window)
+            return window
+
+    def get_bars(self, count: int) -> pd.DataFrame:
+        """
+        latest count bars in ascending time order
+        """
+        with self.lock:
+            count = min(count, self.size)
+            positions = (self.start + np.arange(self.size -
+                         count, self.size)) % self.capacity
+            index = pd.to_datetime(
+                self.timestamps[positions], unit='s', utc=True)
+            if self.time_zone != None:
+                index = index.tz_convert(self.time_zone)
+            bars = pd.DataFrame(
+                self.values[positions], index=index.rename('timestamp'), columns=self.COLUMNS)
+            return bars
@@ -1,17 +1,24 @@
-from typing import Optional, Tuple
-from common import db
+import threading
+from typing import Dict, Optional
+from common import config, db
 from common.enums import SetupType
 from sdk import webullsdk
+from trading.tracker.account_snapshot import AccountSnapshot
 from webull_trader.models import WebullOrder
 from logger import exception_logger
 
 
-# Order tracker class
+# Order tracker class, keep in-memory order book of tracking orders
 class OrderTracker:
 
-    def __init__(self, paper: bool = True):
+    def __init__(self, paper: bool = True, account_snapshot: Optional[AccountSnapshot] = None):
         self.paper: bool = paper
+        self.account_snapshot: AccountSnapshot = account_snapshot or AccountSnapshot()
         self.current_orders: dict = {}
+        # orders are tracked in trade worker threads while scheduler updates them
+        self.lock: threading.Lock = threading.Lock()
+        # latest saved order of order id
+        self.orders: Dict[str, WebullOrder] = {}
 
     def _order_done(self, status: str) -> bool:
         if status == webullsdk.ORDER_STATUS_CANCELED or status == webullsdk.ORDER_STATUS_FILLED or \
@@ -19,41 +26,93 @@ class OrderTracker:
             return True
         return False
 
+    def _get_order_obj(self, order_data: dict) -> dict:
+        # live history orders are grouped
+        if 'orders' in order_data:
+            return order_data['orders'][0]
+        return order_data
+
+    def _update_order(self, order_data: dict):
+        """
+        save order only if status or filled quantity changed
+        """
+        order_obj = self._get_order_obj(order_data)
+        order_id = str(order_obj['orderId'])
+        order = self.orders.get(order_id)
+        if order and order.status == order_obj['statusStr'] and \
+                order.filled_quantity == int(order_obj['filledQuantity']):
+            return
+        if not self.paper and 'orders' not in order_data:
+            order_data = {'orders': [order_data]}
+        self.orders[order_id] = db.save_webull_order(order_data, self.paper)
+
+    def set_account_snapshot(self, account_snapshot: AccountSnapshot):
+        self.account_snapshot = account_snapshot
+
     def start_tracking(self, order_id: str, setup: SetupType, note: Optional[str] = None):
-        self.current_orders[order_id] = {
-            # 'status': webullsdk.ORDER_STATUS_PENDING,
-            'setup': setup,
-            'note': note or "",
-        }
+        with self.lock:
+            self.current_orders[order_id] = {
+                # 'status': webullsdk.ORDER_STATUS_PENDING,
+                'setup': setup,
+                'note': note or "",
+            }
 
     def stop_tracking(self, order_id: str):
-        if order_id in self.current_orders:
-            del self.current_orders[order_id]
+        with self.lock:
+            self.current_orders.pop(order_id, None)
 
     def get_order(self, order_id: str) -> Optional[WebullOrder]:
+        if order_id in self.orders:
+            return self.orders[order_id]
         return WebullOrder.objects.filter(order_id=order_id).first()
 
-    def update_orders(self):
-        if len(self.current_orders) > 0:
-            orders = []
+    def has_pending_orders(self) -> bool:
+        return len(self.current_orders) > 0
+
+    def update_orders(self) -> bool:
+        """
+        sync pending orders status from open orders, return true if any order done
+        """
+        order_done = False
+        with self.lock:
+            current_orders = dict(self.current_orders)
+        if len(current_orders) > 0:
+            open_orders = None
             try:
-                orders = webullsdk.get_history_orders(count=50)[::-1]
-                for order_data in orders:
-                    # save order to db
-                    db.save_webull_order(order_data, self.paper)
+                open_orders = self.account_snapshot.get_open_orders()
+                if open_orders == None:
+                    return False
+                open_order_ids = set()
+                for order_data in open_orders:
+                    order_obj = self._get_order_obj(order_data)
+                    order_id = str(order_obj['orderId'])
+                    open_order_ids.add(order_id)
+                    if order_id in current_orders:
+                        self._update_order(order_data)
+                # closed order no longer open, load final status from history orders
+                closed_order_ids = [order_id for order_id in current_orders
+                                    if order_id not in open_order_ids]
+                if len(closed_order_ids) > 0:
+                    history_orders = webullsdk.get_history_orders(
+                        count=config.ORDER_HISTORY_FETCH_COUNT)
+                    for order_data in history_orders:
+                        order_obj = self._get_order_obj(order_data)
+                        if str(order_obj['orderId']) in closed_order_ids:
+                            self._update_order(order_data)
             except Exception as e:
-                exception_logger.log(str(e), f"orders: {str(orders)}")
+                exception_logger.log(str(e), f"orders: {str(open_orders)}")
 
-            for order_id in list(self.current_orders):
-                order = WebullOrder.objects.filter(order_id=order_id).first()
+            for order_id, open_order in current_orders.items():
+                order = self.orders.get(order_id)
                 if order:
                     # order done
                     if self._order_done(order.status):
-                        open_order = self.current_orders[order_id]
                         # update setup
                         order.setup = open_order['setup']
                         # update note
                         order.note = open_order['note']
                         order.save()
                         # remove from open orders
-                        del self.current_orders[order_id]
+                        self.stop_tracking(order_id)
+                        order_done = True
+        return order_done
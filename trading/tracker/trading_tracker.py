@@ -1,6 +1,11 @@
+import time
+import threading
+import pandas as pd
 from typing import List, Optional
 from datetime import datetime, timedelta
 from common import config, constants
+from sdk import webullsdk
+from trading.tracker.bar_cache import BarCache
 from webull_trader.models import DayPosition, DayTrade
 
 
@@ -32,6 +37,11 @@ class TrackingTicker:
         self.exit_period: Optional[int] = None
         self.positions: int = 0
         self.position_obj: Optional[DayPosition] = None
+        self.bar_cache: BarCache = BarCache()
+        # monotonic time of last trade check, for per ticker timer
+        self.last_check_time: float = 0.0
+        # serialize trades of the ticker in worker threads
+        self.trade_lock: threading.Lock = threading.Lock()
         # for backtesting
         self.backtest_buy_price: float = 1.0
         self.backtest_sell_price: float = 1.0
@@ -189,6 +199,24 @@ class TrackingTicker:
     def get_position_obj(self) -> Optional[DayPosition]:
         return self.position_obj
 
+    def get_bar_cache(self) -> BarCache:
+        return self.bar_cache
+
+    def get_trade_lock(self) -> threading.Lock:
+        return self.trade_lock
+
+    def get_check_interval(self) -> int:
+        # check holding or pending ticker more frequently
+        if self.has_pending_order() or self.positions > 0:
+            return config.DAY_ACTIVE_TICKER_INTERVAL_IN_SEC
+        return config.DAY_WATCH_TICKER_INTERVAL_IN_SEC
+
+    def get_next_check_time(self) -> float:
+        return self.last_check_time + self.get_check_interval()
+
+    def set_last_check_time(self, check_time: float):
+        self.last_check_time = check_time
+
     def get_backtest_buy_price(self) -> float:
         return self.backtest_buy_price
 
@@ -338,23 +366,27 @@ class TradingTracker:
         self.paper: bool = paper
         self.tickers: dict = {}
         self.stats: dict = {}
+        self.due_tickers: List[str] = []
+        # tickers are started and stopped in trade worker threads while scheduler loops over them
+        self.lock: threading.Lock = threading.Lock()
 
     def start_tracking(self, ticker: TrackingTicker):
         symbol = ticker.get_symbol()
         ticker_id = ticker.get_id()
-        if ticker_id not in self.tickers:
-            # add tracking ticker
-            self.tickers[ticker_id] = ticker
-        # init tracking stats if not
-        if symbol not in self.stats:
-            # add tracking stat
-            tracking_stat = TrackingStat(symbol)
-            self.stats[symbol] = tracking_stat
+        with self.lock:
+            if ticker_id not in self.tickers:
+                # add tracking ticker
+                self.tickers[ticker_id] = ticker
+                ticker.set_last_check_time(time.monotonic())
+            # init tracking stats if not
+            if symbol not in self.stats:
+                # add tracking stat
+                tracking_stat = TrackingStat(symbol)
+                self.stats[symbol] = tracking_stat
 
     def stop_tracking(self, ticker: TrackingTicker):
-        ticker_id = ticker.get_id()
-        if ticker_id in self.tickers:
-            del self.tickers[ticker_id]
+        with self.lock:
+            self.tickers.pop(ticker.get_id(), None)
 
     def is_tracking(self, ticker_id: str) -> bool:
         if ticker_id in self.tickers:
@@ -362,14 +394,76 @@ class TradingTracker:
         return False
 
     def get_tickers(self) -> List[TrackingTicker]:
-        return list(self.tickers)
+        with self.lock:
+            return list(self.tickers)
+
+    def _get_tracking_tickers(self) -> List[TrackingTicker]:
+        # snapshot of tracking tickers to loop over without lock
+        with self.lock:
+            return list(self.tickers.values())
 
     def get_ticker(self, ticker_id: str) -> Optional[TrackingTicker]:
-        if self.is_tracking(ticker_id):
-            return self.tickers[ticker_id]
-        return None
+        return self.tickers.get(ticker_id)
 
     def get_stat(self, symbol) -> TrackingStat:
-        if symbol not in self.stats:
-            self.stats[symbol] = TrackingStat(symbol)
-        return self.stats[symbol]
+        with self.lock:
+            if symbol not in self.stats:
+                self.stats[symbol] = TrackingStat(symbol)
+            return self.stats[symbol]
+
+    def update_due_tickers(self) -> List[str]:
+        """
+        collect tickers due for trade check and restart their timers
+        """
+        now = time.monotonic()
+        due_tickers = []
+        for ticker in self._get_tracking_tickers():
+            if ticker.get_next_check_time() <= now:
+                ticker.set_last_check_time(now)
+                due_tickers.append(ticker.get_id())
+        self.due_tickers = due_tickers
+        return due_tickers
+
+    def get_due_tickers(self) -> List[str]:
+        return [ticker_id for ticker_id in self.due_tickers if ticker_id in self.tickers]
+
+    def has_due_tickers(self) -> bool:
+        return len(self.get_due_tickers()) > 0
+
+    def set_tickers_due(self):
+        for ticker in self._get_tracking_tickers():
+            ticker.set_last_check_time(0.0)
+
+    def get_next_check_time(self) -> Optional[float]:
+        tickers = self._get_tracking_tickers()
+        if len(tickers) == 0:
+            return None
+        return min([ticker.get_next_check_time() for ticker in tickers])
+
+    def prefetch_m1_bars(self):
+        tickers = [self.get_ticker(ticker_id)
+                   for ticker_id in self.get_due_tickers()]
+        tickers = [ticker for ticker in tickers if ticker]
+        if len(tickers) == 0:
+            return
+        # only fetch bars newer than cached, include the forming bar
+        count = max([ticker.get_bar_cache().get_fetch_count()
+                    for ticker in tickers])
+        bars_dict = webullsdk.get_1m_bars_batch(
+            [ticker.get_id() for ticker in tickers], count=count)
+        for ticker_id, bars in bars_dict.items():
+            ticker = self.get_ticker(ticker_id)
+            if ticker:
+                ticker.get_bar_cache().update(bars)
+
+    def get_m1_bars(self, ticker_id: str, count: int) -> Optional[pd.DataFrame]:
+        ticker = self.get_ticker(ticker_id)
+        if not ticker:
+            return None
+        bar_cache = ticker.get_bar_cache()
+        # cached bars expired, empty or not enough
+        if not bar_cache.updated_time or bar_cache.is_empty() or count > bar_cache.capacity:
+            return None
+        if (datetime.now() - bar_cache.updated_time) > timedelta(seconds=config.DAY_PREFETCH_BARS_TTL_IN_SEC):
+            return None
+        return bar_cache.get_bars(count)
@@ -0,0 +1 @@
+default_app_config = 'webull_trader.apps.WebullTraderConfig'
@@ -33,6 +33,16 @@ class TradingLogAdmin(admin.ModelAdmin):
 admin.site.register(models.TradingLog, TradingLogAdmin)
 
 
+class TradingLogChunkAdmin(admin.ModelAdmin):
+    list_display = [
+        'trading_log',
+        'created_at',
+    ]
+
+
+admin.site.register(models.TradingLogChunk, TradingLogChunkAdmin)
+
+
 class ExceptionLogAdmin(admin.ModelAdmin):
     list_display = [
         'exception',
@@ -311,6 +321,27 @@ admin.site.register(models.DayTrade,
                     DayTradeAdmin)
 
 
+class DayTradeFactsAdmin(admin.ModelAdmin):
+    list_display = [
+        'day_trade',
+        'buy_time',
+        'trading_hour',
+        'entry_price',
+        'market_value',
+        'gap',
+        'relative_volume',
+        'pre_entry_volume',
+        'sector',
+        'holding_sec',
+        'profit_loss',
+        'profit_loss_pct',
+    ]
+
+
+admin.site.register(models.DayTradeFacts,
+                    DayTradeFactsAdmin)
+
+
 class HistoricalDayTradePerformanceAdmin(admin.ModelAdmin):
     list_display = [
         'date',
@@ -442,3 +473,79 @@ class NotifiedErrorExecutionAdmin(admin.ModelAdmin):
 
 admin.site.register(models.NotifiedErrorExecution,
                     NotifiedErrorExecutionAdmin)
+
+
+class BacktestOrderAdmin(admin.ModelAdmin):
+    list_display = [
+        'order_id',
+        'symbol',
+        'action',
+        'quantity',
+        'price',
+        'filled_time',
+        'setup',
+        'note',
+    ]
+
+
+admin.site.register(models.BacktestOrder,
+                    BacktestOrderAdmin)
+
+
+class BacktestTradeAdmin(admin.ModelAdmin):
+    list_display = [
+        'symbol',
+        'total_cost',
+        'total_sold',
+        'quantity',
+        'units',
+        'buy_date',
+        'sell_date',
+        'setup',
+        'order_ids',
+    ]
+
+
+admin.site.register(models.BacktestTrade,
+                    BacktestTradeAdmin)
+
+
+class BacktestDayPerformanceAdmin(admin.ModelAdmin):
+    list_display = [
+        'date',
+        'trades',
+        'win_rate',
+        'profit_loss_ratio',
+        'day_profit_loss',
+        'net_liquidation',
+        'total_profit_loss',
+    ]
+
+
+admin.site.register(models.BacktestDayPerformance,
+                    BacktestDayPerformanceAdmin)
+
+
+class HistoricalFetchCheckpointAdmin(admin.ModelAdmin):
+    list_display = [
+        'date',
+        'symbol',
+        'dataset',
+        'created_at',
+    ]
+
+
+admin.site.register(models.HistoricalFetchCheckpoint,
+                    HistoricalFetchCheckpointAdmin)
+
+
+class HistoricalDayChartPayloadAdmin(admin.ModelAdmin):
+    list_display = [
+        'date',
+        'symbol',
+        'updated_at',
+    ]
+
+
+admin.site.register(models.HistoricalDayChartPayload,
+                    HistoricalDayChartPayloadAdmin)
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class WebullTraderConfig(AppConfig):
     name = 'webull_trader'
+
+    def ready(self):
+        from webull_trader import signals
+        signals.connect_report_signals()
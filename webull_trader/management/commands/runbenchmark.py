@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from scripts import benchmark
+
+
+class Command(BaseCommand):
+    help = 'run day trades benchmark with entry bar filters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--regular-volumes', type=float, nargs='*',
+                            default=benchmark.DEFAULT_REGULAR_VOLUMES)
+        parser.add_argument('--extended-volumes', type=float, nargs='*',
+                            default=benchmark.DEFAULT_EXTENDED_VOLUMES)
+        parser.add_argument('--min-price', type=float)
+        parser.add_argument('--max-price', type=float)
+        parser.add_argument('--setups', type=int, nargs='+')
+
+    def handle(self, *args, **options):
+        benchmark.start(benchmark.get_volume_filters(
+            options['regular_volumes'],
+            options['extended_volumes'],
+            min_price=options['min_price'],
+            max_price=options['max_price'],
+            setups=options['setups'],
+        ))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from common import utils
+from scripts import build_day_trade_facts
+
+
+class Command(BaseCommand):
+    help = 'run build missing day trade facts'
+
+    def handle(self, *args, **options):
+        print("[{}] Start build day trade facts job...".format(utils.get_now()))
+        build_day_trade_facts.start()
+        print("[{}] Done build day trade facts job!".format(utils.get_now()))
@@ -9,7 +9,7 @@ from django_apscheduler.jobstores import DjangoJobStore
 from sdk import fmpsdk
 from common import utils
 from scripts import fetch_account, fetch_quotes, fetch_orders, fetch_news, fetch_earnings, fetch_histdata, \
-    check_exception, adjust_trades, calculate_histdata
+    check_exception, adjust_trades, calculate_histdata, warm_reports
 from trading import executor as trading_executor
 
 WEEKDAYS = ["mon", "tue", "wed", "thu", "fri"]
@@ -136,6 +136,10 @@ def fetch_stats_data_job():
     calculate_histdata.start()
     print("[{}] Done calculate hist data job!".format(utils.get_now()))
 
+    print("[{}] Start warm reports job...".format(utils.get_now()))
+    warm_reports.start()
+    print("[{}] Done warm reports job!".format(utils.get_now()))
+
 
 @util.close_old_connections
 def check_exception_job():
@@ -1,7 +1,7 @@
 from datetime import datetime
 from django.core.management.base import BaseCommand
 from common import utils
-from scripts import fetch_account, fetch_orders, fetch_news, fetch_earnings, fetch_histdata, calculate_histdata, adjust_trades
+from scripts import fetch_account, fetch_orders, fetch_news, fetch_earnings, fetch_histdata, calculate_histdata, adjust_trades, warm_reports
 
 
 class Command(BaseCommand):
@@ -39,3 +39,7 @@ class Command(BaseCommand):
         print("[{}] Start calculate hist data job...".format(utils.get_now()))
         calculate_histdata.start(day=date)
         print("[{}] Done calculate hist data job!".format(utils.get_now()))
+
+        print("[{}] Start warm reports job...".format(utils.get_now()))
+        warm_reports.start()
+        print("[{}] Done warm reports job!".format(utils.get_now()))
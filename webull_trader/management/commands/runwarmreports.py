@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from common import utils
+from scripts import warm_reports
+
+
+class Command(BaseCommand):
+    help = 'run warm cached reports'
+
+    def handle(self, *args, **options):
+        print("[{}] Start warm reports job...".format(utils.get_now()))
+        warm_reports.start()
+        print("[{}] Done warm reports job!".format(utils.get_now()))
@@ -0,0 +1,23 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webull_trader', '0045_auto_20211224_0422'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TradingLogChunk',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('log_text', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('trading_log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='webull_trader.tradinglog')),
+            ],
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webull_trader', '0046_tradinglogchunk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BacktestDayPerformance',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('trades', models.PositiveIntegerField(default=0)),
+                ('win_rate', models.FloatField(default=0)),
+                ('profit_loss_ratio', models.FloatField(default=1)),
+                ('day_profit_loss', models.FloatField(default=0)),
+                ('total_buy_amount', models.FloatField(default=0)),
+                ('total_sell_amount', models.FloatField(default=0)),
+                ('min_usable_cash', models.FloatField(default=0)),
+                ('net_liquidation', models.FloatField(default=0)),
+                ('total_profit_loss', models.FloatField(default=0)),
+                ('total_profit_loss_rate', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BacktestOrder',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.CharField(max_length=128)),
+                ('ticker_id', models.CharField(max_length=128)),
+                ('symbol', models.CharField(max_length=64)),
+                ('action', models.PositiveSmallIntegerField(choices=[(0, 'BUY'), (1, 'SELL')], default=0)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('price', models.FloatField()),
+                ('filled_time', models.DateTimeField()),
+                ('trading_date', models.DateField(db_index=True)),
+                ('setup', models.PositiveSmallIntegerField(choices=[(0, '[Day] First candle new high'), (1, '[Day] Gap and Go'), (2, '[Day] Bull Flag'), (3, '[Day] Reversal'), (4, '[Day] Red to Green'), (8, '[Day] 10 candles new high'), (5, '[Day] 20 candles new high'), (6, '[Day] 30 candles new high'), (7, '[Day] Earning Gap'), (9, '[Day] VWAP Reclaim'), (10, '[Day] Grinding Up'), (100, '[Swing] 20 days new high'), (101, '[Swing] 55 days new high'), (500, '[Error] Failed to sell'), (999, 'Unknown')], default=999)),
+                ('note', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BacktestTrade',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=64)),
+                ('ticker_id', models.CharField(max_length=128)),
+                ('order_ids', models.CharField(max_length=1024)),
+                ('total_cost', models.FloatField(default=0)),
+                ('total_sold', models.FloatField(default=0)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('units', models.PositiveIntegerField(default=1)),
+                ('buy_date', models.DateField()),
+                ('buy_time', models.DateTimeField()),
+                ('sell_date', models.DateField(db_index=True)),
+                ('sell_time', models.DateTimeField()),
+                ('setup', models.PositiveSmallIntegerField(choices=[(0, '[Day] First candle new high'), (1, '[Day] Gap and Go'), (2, '[Day] Bull Flag'), (3, '[Day] Reversal'), (4, '[Day] Red to Green'), (8, '[Day] 10 candles new high'), (5, '[Day] 20 candles new high'), (6, '[Day] 30 candles new high'), (7, '[Day] Earning Gap'), (9, '[Day] VWAP Reclaim'), (10, '[Day] Grinding Up'), (100, '[Swing] 20 days new high'), (101, '[Swing] 55 days new high'), (500, '[Error] Failed to sell'), (999, 'Unknown')], default=5)),
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:55
+
+from django.db import migrations, models
+
+
+def remove_duplicated_bars(apps, schema_editor):
+    # keep first saved bar of same key
+    for model_name, key in [('HistoricalMinuteBar', 'time'), ('HistoricalDailyBar', 'date'), ('SwingHistoricalDailyBar', 'date')]:
+        model = apps.get_model('webull_trader', model_name)
+        duplicates = model.objects.values('symbol', key).annotate(
+            count=models.Count('id'), first_id=models.Min('id')).filter(count__gt=1)
+        for duplicate in duplicates:
+            model.objects.filter(symbol=duplicate['symbol'], **{key: duplicate[key]}).exclude(
+                id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webull_trader', '0047_backtest_results'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicated_bars,
+                             migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='historicaldailybar',
+            constraint=models.UniqueConstraint(fields=('symbol', 'date'), name='unique_hist_daily_bar'),
+        ),
+        migrations.AddConstraint(
+            model_name='historicalminutebar',
+            constraint=models.UniqueConstraint(fields=('symbol', 'time'), name='unique_hist_minute_bar'),
+        ),
+        migrations.AddConstraint(
+            model_name='swinghistoricaldailybar',
+            constraint=models.UniqueConstraint(fields=('symbol', 'date'), name='unique_swing_hist_daily_bar'),
+        ),
+    ]
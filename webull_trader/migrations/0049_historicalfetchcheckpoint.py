@@ -0,0 +1,27 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webull_trader', '0048_hist_bar_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoricalFetchCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('symbol', models.CharField(max_length=64)),
+                ('dataset', models.CharField(max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='historicalfetchcheckpoint',
+            constraint=models.UniqueConstraint(fields=('date', 'symbol', 'dataset'), name='unique_hist_fetch_checkpoint'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webull_trader', '0049_historicalfetchcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='daytrade',
+            index=models.Index(fields=['sell_date', 'require_adjustment'], name='day_trade_sell_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='daytrade',
+            index=models.Index(fields=['symbol', 'sell_date'], name='day_trade_symbol_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalminutebar',
+            index=models.Index(fields=['date', 'symbol', 'time'], name='hist_minute_bar_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='webullorder',
+            index=models.Index(fields=['order_id'], name='webull_order_id_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.1.7 on 2026-10-18 09:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webull_trader', '0050_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DayTradeFacts',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('buy_time', models.DateTimeField()),
+                ('trading_hour', models.PositiveSmallIntegerField(blank=True, choices=[(0, 'Regular Hour'), (1, 'Before Market Open'), (2, 'After Market Close')], default=None, null=True)),
+                ('entry_price', models.FloatField()),
+                ('has_key_statistics', models.BooleanField(default=False)),
+                ('market_value', models.FloatField(blank=True, default=None, null=True)),
+                ('outstanding_shares', models.FloatField(blank=True, default=None, null=True)),
+                ('turnover_rate', models.FloatField(blank=True, default=None, null=True)),
+                ('short_float', models.FloatField(blank=True, default=None, null=True)),
+                ('relative_volume', models.FloatField(blank=True, default=None, null=True)),
+                ('gap', models.FloatField(default=0)),
+                ('pre_entry_volume', models.FloatField(default=0)),
+                ('sector', models.CharField(blank=True, default=None, max_length=64, null=True)),
+                ('holding_sec', models.PositiveIntegerField(default=0)),
+                ('profit_loss', models.FloatField(default=0)),
+                ('profit_loss_pct', models.FloatField(default=0)),
+                ('day_trade', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='facts', to='webull_trader.daytrade')),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.1.7 on 2026-10-18 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webull_trader', '0051_day_trade_facts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoricalDayChartPayload',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('symbol', models.CharField(max_length=64)),
+                ('payload', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='historicaldaychartpayload',
+            constraint=models.UniqueConstraint(fields=('date', 'symbol'), name='unique_hist_day_chart_payload'),
+        ),
+    ]
@@ -52,6 +52,17 @@ class TradingLog(models.Model):
         return "[{}] {}: {}".format(self.date, self.tag, self.log_text)
 
 
+class TradingLogChunk(models.Model):
+    trading_log = models.ForeignKey(
+        TradingLog, on_delete=models.CASCADE, related_name='chunks')
+    log_text = models.TextField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return "[{}] {}: {} lines".format(self.trading_log.date, self.trading_log.tag, self.log_text.count("\n"))
+
+
 class ExceptionLog(models.Model):
     exception = models.CharField(max_length=1000, null=True)
     traceback = models.TextField(null=True)
@@ -121,6 +132,11 @@ class WebullOrder(models.Model):
     )
     note = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['order_id'], name='webull_order_id_idx'),
+        ]
+
     def __str__(self):
         return "[{}] <{}> {} total: {}, filled: {}, price: ${}, avg: ${}".format(
             self.placed_time,
@@ -308,6 +324,16 @@ class HistoricalMinuteBar(models.Model):
     volume = models.FloatField()
     vwap = models.FloatField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['symbol', 'time'], name='unique_hist_minute_bar'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'symbol', 'time'],
+                         name='hist_minute_bar_date_idx'),
+        ]
+
     def __str__(self):
         return "[{}] <{}> O:{}, H:{}, L:{}, C:{}".format(self.time, self.symbol, self.open, self.high, self.low, self.close)
 
@@ -321,10 +347,53 @@ class HistoricalDailyBar(models.Model):
     close = models.FloatField()
     volume = models.FloatField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['symbol', 'date'], name='unique_hist_daily_bar'),
+        ]
+
     def __str__(self):
         return "[{}] <{}> O:{}, H:{}, L:{}, C:{}".format(self.date, self.symbol, self.open, self.high, self.low, self.close)
 
 
+class HistoricalFetchCheckpoint(models.Model):
+    date = models.DateField(db_index=True)
+    symbol = models.CharField(max_length=64)
+    # minute_bars, daily_bars or key_statistics
+    dataset = models.CharField(max_length=32)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'symbol', 'dataset'], name='unique_hist_fetch_checkpoint'),
+        ]
+
+    def __str__(self):
+        return "[{}] <{}> {}".format(self.date, self.symbol, self.dataset)
+
+
+class HistoricalDayChartPayload(models.Model):
+    date = models.DateField(db_index=True)
+    symbol = models.CharField(max_length=64)
+    # zlib compressed json of day analytics chart data
+    payload = models.BinaryField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'symbol'], name='unique_hist_day_chart_payload'),
+        ]
+
+    def __str__(self):
+        return "[{}] <{}> {} bytes".format(self.date, self.symbol, len(self.payload))
+
+
 class DayPosition(models.Model):
     symbol = models.CharField(max_length=64)
     ticker_id = models.CharField(max_length=128)
@@ -389,10 +458,53 @@ class DayTrade(models.Model):
         default=enums.SetupType.DAY_20_CANDLES_NEW_HIGH
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['sell_date', 'require_adjustment'],
+                         name='day_trade_sell_date_idx'),
+            models.Index(fields=['symbol', 'sell_date'],
+                         name='day_trade_symbol_idx'),
+        ]
+
     def __str__(self):
         return "[{}] <{}> x{}, ${}/${}".format(self.sell_date, self.symbol, self.quantity, self.total_cost, self.total_sold)
 
 
+# denormalized report values of adjusted day trade
+class DayTradeFacts(models.Model):
+    day_trade = models.OneToOneField(
+        DayTrade, on_delete=models.CASCADE, related_name='facts')
+
+    buy_time = models.DateTimeField()
+    # None if bought outside trading hours
+    trading_hour = models.PositiveSmallIntegerField(
+        choices=enums.TradingHourType.tochoices(),
+        null=True,
+        blank=True,
+        default=None
+    )
+    entry_price = models.FloatField()
+    # key statistics values, None if no key statistics of buy date
+    has_key_statistics = models.BooleanField(default=False)
+    market_value = models.FloatField(null=True, blank=True, default=None)
+    outstanding_shares = models.FloatField(
+        null=True, blank=True, default=None)
+    turnover_rate = models.FloatField(null=True, blank=True, default=None)
+    short_float = models.FloatField(null=True, blank=True, default=None)
+    relative_volume = models.FloatField(null=True, blank=True, default=None)
+    gap = models.FloatField(default=0)
+    # avg volume of 2 minute bars before entry
+    pre_entry_volume = models.FloatField(default=0)
+    sector = models.CharField(
+        max_length=64, null=True, blank=True, default=None)
+    holding_sec = models.PositiveIntegerField(default=0)
+    profit_loss = models.FloatField(default=0)
+    profit_loss_pct = models.FloatField(default=0)
+
+    def __str__(self):
+        return "<{}> {}".format(self.day_trade_id, self.profit_loss)
+
+
 class HistoricalDayTradePerformance(models.Model):
     date = models.DateField(auto_now=False, auto_now_add=False)
     win_rate = models.FloatField()
@@ -522,6 +634,12 @@ class SwingHistoricalDailyBar(models.Model):
     sma_55 = models.FloatField()
     sma_120 = models.FloatField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['symbol', 'date'], name='unique_swing_hist_daily_bar'),
+        ]
+
     def __str__(self):
         return "[{}] <{}> O:{}, H:{}, L:{}, C:{}".format(self.date, self.symbol, self.open, self.high, self.low, self.close)
 
@@ -559,3 +677,72 @@ class NotifiedErrorExecution(models.Model):
 
     def __str__(self):
         return "[{}] {}".format(self.notified_time, self.execution_id)
+
+
+class BacktestOrder(models.Model):
+    order_id = models.CharField(max_length=128)
+    ticker_id = models.CharField(max_length=128)
+    symbol = models.CharField(max_length=64)
+    action = models.PositiveSmallIntegerField(
+        choices=WebullOrder.ACTION_TYPE_CHOICES,
+        default=enums.ActionType.BUY
+    )
+    quantity = models.PositiveIntegerField(default=1)
+    price = models.FloatField()
+    filled_time = models.DateTimeField()
+    trading_date = models.DateField(db_index=True)
+
+    setup = models.PositiveSmallIntegerField(
+        choices=enums.SetupType.tochoices(),
+        default=enums.SetupType.UNKNOWN
+    )
+    note = models.TextField(null=True, blank=True)
+
+    def __str__(self):
+        return "[{}] {} <{}> x{}, ${}".format(self.filled_time, enums.ActionType.tostr(self.action),
+                                              self.symbol, self.quantity, self.price)
+
+
+class BacktestTrade(models.Model):
+    symbol = models.CharField(max_length=64)
+    ticker_id = models.CharField(max_length=128)
+
+    # order id list, split by comma ','
+    order_ids = models.CharField(max_length=1024)
+
+    total_cost = models.FloatField(default=0)
+    total_sold = models.FloatField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=1)
+
+    buy_date = models.DateField()
+    buy_time = models.DateTimeField()
+    sell_date = models.DateField(db_index=True)
+    sell_time = models.DateTimeField()
+
+    setup = models.PositiveSmallIntegerField(
+        choices=enums.SetupType.tochoices(),
+        default=enums.SetupType.DAY_20_CANDLES_NEW_HIGH
+    )
+
+    def __str__(self):
+        return "[{}] <{}> x{}, ${}/${}".format(self.sell_date, self.symbol, self.quantity, self.total_cost, self.total_sold)
+
+
+class BacktestDayPerformance(models.Model):
+    date = models.DateField(unique=True)
+    trades = models.PositiveIntegerField(default=0)
+    win_rate = models.FloatField(default=0)
+    profit_loss_ratio = models.FloatField(default=1)
+    day_profit_loss = models.FloatField(default=0)
+    total_buy_amount = models.FloatField(default=0)
+    total_sell_amount = models.FloatField(default=0)
+    min_usable_cash = models.FloatField(default=0)
+
+    # account curve
+    net_liquidation = models.FloatField(default=0)
+    total_profit_loss = models.FloatField(default=0)
+    total_profit_loss_rate = models.FloatField(default=0)
+
+    def __str__(self):
+        return "[{}] trades: {}, P&L: ${}, net: ${}".format(self.date, self.trades, self.day_profit_loss, self.net_liquidation)
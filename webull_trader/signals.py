@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from common import report_cache
+from webull_trader.models import DayTrade, HistoricalDayTradePerformance, SwingHistoricalDailyBar, SwingPosition, SwingTrade, \
+    TradingSettings, WebullOrder
+
+# models of report data, each saved or deleted row bumps data version with model name
+REPORT_DATA_MODELS = [DayTrade, HistoricalDayTradePerformance, SwingHistoricalDailyBar,
+                      SwingPosition, SwingTrade, TradingSettings, WebullOrder]
+
+
+def bump_report_version(sender, **kwargs):
+    report_cache.bump_versions([sender.__name__])
+
+
+def connect_report_signals():
+    for model in REPORT_DATA_MODELS:
+        post_save.connect(bump_report_version, sender=model,
+                          dispatch_uid="report_version_save_{}".format(model.__name__))
+        post_delete.connect(bump_report_version, sender=model,
+                            dispatch_uid="report_version_delete_{}".format(model.__name__))
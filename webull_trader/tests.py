@@ -1,3 +1,1579 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from unittest import mock
+import numpy as np
+import pandas as pd
+import pytz
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from common import bar_store, bucketing, utils, config, db
+from common.enums import UNKNOWN, ActionType, SetupType, TradingHourType
+from backtest import config as backtest_config
+from backtest.broker import INIT_BALANCE, SimulatedBroker, chain_balances, save_results
+from backtest.pattern import BacktestPattern
+from backtest.strategy.strategy_base import BacktestStrategyBase
+from backtest.strategy.day_breakout import BacktestDayTradingBreakout
+from backtest.strategy.day_signal import BacktestDayTradingSignalBreakout
+from backtest.executor import BacktestExecutor, backtest_day, get_trading_time_range
+from backtest.sweep import sweep
+from backtest.tracker.day_bar_cache import DayBarCache
+from backtest.vectorized import backtest_session, resolve_positions
+from logger import trading_logger
+from trading import pattern
+from trading.scheduler import TradingScheduler
+from trading.tracker.account_snapshot import AccountSnapshot
+from trading.tracker.order_tracker import OrderTracker
+from trading.indicator import BarIndicators, RollingWindow
+from trading.tracker.bar_cache import BarCache
+from trading.tracker.trading_tracker import TrackingTicker, TradingTracker
+from webull_trader.models import BacktestDayPerformance, BacktestOrder, BacktestTrade, DayTrade, DayTradeFacts, HistoricalMinuteBar, \
+    HistoricalDailyBar, HistoricalKeyStatistics, StockQuote, SwingHistoricalDailyBar, TradingLog, TradingLogChunk, WebullOrder
+
 
 # Create your tests here.
+
+# legacy iterrows implementation of bar pattern checks, reference for vectorized engine
+
+def _legacy_time_match(now: dict, time: datetime) -> bool:
+    if now['regular'] and not utils.is_regular_market_time(time):
+        return False
+    if now['pre'] and not utils.is_pre_market_time(time):
+        return False
+    if now['after'] and not utils.is_after_market_time(time):
+        return False
+    return True
+
+
+def _legacy_continue(now, bars, time_scale=1, period=10):
+    period = min(len(bars) - 1, period)
+    last_minute = -1
+    period_bars = bars.tail(period)
+    for index, _ in period_bars.iterrows():
+        time = index.to_pydatetime()
+        if not _legacy_time_match(now, time):
+            continue
+        if last_minute == -1:
+            last_minute = time.minute
+            continue
+        current_minute = time.minute
+        if time.minute == 0:
+            current_minute = 60
+        if current_minute - last_minute != time_scale:
+            return False
+        last_minute = time.minute
+    return True
+
+
+def _legacy_has_volume(now, bars, confirm_volume, time_scale=1, period=10):
+    if len(bars) < period + 1:
+        return False
+    for i in range(0, 2):
+        period_bars = bars.tail(period + i).head(period)
+        total_volume = 0.0
+        for index, row in period_bars.iterrows():
+            if not _legacy_time_match(now, index.to_pydatetime()):
+                continue
+            total_volume += row["volume"]
+        if total_volume / float(period) >= confirm_volume * time_scale:
+            return True
+    return False
+
+
+def _legacy_has_amount(now, bars, confirm_amount, time_scale=1, period=10):
+    period = min(len(bars) - 1, period)
+    period_bars = bars.tail(period + 1).head(period)
+    total_amount = 0.0
+    for index, row in period_bars.iterrows():
+        if not _legacy_time_match(now, index.to_pydatetime()):
+            continue
+        total_amount += (row["volume"] * row["close"])
+    return total_amount / float(period) >= confirm_amount * time_scale
+
+
+def _legacy_volume_with_pos_size(now, bars, target_volume, period=10):
+    period = min(len(bars) - 1, period)
+    period_bars = bars.tail(period + 1).head(period)
+    for index, row in period_bars.iterrows():
+        if not _legacy_time_match(now, index.to_pydatetime()):
+            continue
+        if row["volume"] < target_volume:
+            return False
+    return True
+
+
+def _legacy_amount_grinding(now, bars, period=10):
+    period = min(len(bars) - 1, period)
+    period_bars = bars.tail(period + 1).head(period)
+    prev_amount = 0
+    for index, row in period_bars.iterrows():
+        if not _legacy_time_match(now, index.to_pydatetime()):
+            continue
+        current_amount = row["volume"] * row["close"]
+        if current_amount < prev_amount:
+            return False
+        prev_amount = current_amount
+    return True
+
+
+def _legacy_long_wick_up(cfg, bars, period=5, count=1):
+    long_wick_up_count = 0
+    period = min(len(bars) - 1, period)
+    period_bars = bars.tail(period + 1).head(period)
+    total_candle_size = 0.0
+    for _, row in period_bars.iterrows():
+        total_candle_size += row["high"] - row["low"]
+    avg_candle_size = 0.0
+    if len(period_bars) > 0:
+        avg_candle_size = total_candle_size / len(period_bars)
+    prev_row = pd.Series(dtype=float)
+    prev_candle_size = 0.0
+    for _, row in period_bars.iterrows():
+        mid = max(row["close"], row["open"])
+        mid2 = min(row["close"], row["open"])
+        high = row["high"]
+        low = row["low"]
+        if (high - low) < avg_candle_size * cfg.LONG_WICK_AVG_CANDLE_RATIO:
+            continue
+        if not prev_row.empty:
+            prev_candle_size = prev_row["high"] - prev_row["low"]
+        if (high - low) < prev_candle_size * cfg.LONG_WICK_PREV_CANDLE_RATIO:
+            continue
+        if (high - mid) < abs(row["close"] - row["open"]):
+            continue
+        if (high - low) / low < cfg.LONG_WICK_CHANGE_RATIO:
+            continue
+        if (mid2 - low) > 0 and (high - mid) / (mid2 - low) >= cfg.LONG_WICK_UP_RATIO:
+            long_wick_up_count += 1
+        elif (mid2 - low) == 0 and (high - mid) > 0:
+            long_wick_up_count += 1
+        prev_row = row
+    return long_wick_up_count >= count
+
+
+def _legacy_bearish_candle(bars, period=5, count=1):
+    bearish_candle_count = 0
+    period = min(len(bars) - 1, period)
+    period_bars = bars.tail(period + 1).head(period)
+    total_candle_size = 0.0
+    for _, row in period_bars.iterrows():
+        total_candle_size += abs(row["close"] - row["open"])
+    avg_candle_size = 0.0
+    if len(period_bars) > 0:
+        avg_candle_size = total_candle_size / len(period_bars)
+    for _, row in period_bars.iterrows():
+        if row["open"] > row["close"]:
+            if row["open"] - row["close"] < avg_candle_size * config.BEARISH_AVG_CANDLE_RATIO:
+                continue
+            bearish_candle_count += 1
+    return bearish_candle_count >= count
+
+
+def _legacy_at_peak(bars, long_period=10, short_period=3):
+    if len(bars) < long_period * 2:
+        return False
+    prev_bar2 = bars.iloc[-2]
+    if prev_bar2['close'] > prev_bar2['open']:
+        return False
+    prev_bar3 = bars.iloc[-3]
+    if prev_bar3['close'] < prev_bar3['open']:
+        return False
+    for _, row in bars.iterrows():
+        if prev_bar3['close'] < row['close']:
+            return False
+    if (prev_bar3['close'] - prev_bar3['open']) / prev_bar3['open'] < 0.15:
+        return False
+    total_vol = 0
+    for i in range(0, long_period):
+        total_vol += bars.iloc[-4 - i]['volume']
+    avg_vol = total_vol / long_period
+    if prev_bar3['volume'] < avg_vol:
+        return False
+    for i in range(0, short_period):
+        if prev_bar3['volume'] < bars.iloc[-4 - i]['volume']:
+            return False
+    prev_total_vol = 0
+    for i in range(0, long_period):
+        prev_total_vol += bars.iloc[-4 - long_period - i]['volume']
+    if avg_vol < prev_total_vol / long_period * 4:
+        return False
+    return True
+
+
+def _legacy_reversal(bars, period=5):
+    if len(bars) < period + 1:
+        return False
+    prev_bar2 = bars.iloc[-2]
+    if prev_bar2['close'] > prev_bar2['open']:
+        return False
+    prev_bar2_up = max(prev_bar2['open'], prev_bar2['close'])
+    prev_bar2_down = min(prev_bar2['open'], prev_bar2['close'])
+    prev_bar2_up_wick = prev_bar2['high'] - prev_bar2_up
+    prev_bar2_down_wick = prev_bar2_down - prev_bar2['low']
+    if prev_bar2_up_wick < max(prev_bar2_down_wick, prev_bar2_up - prev_bar2_down):
+        return False
+    prev_bar3 = bars.iloc[-3]
+    if prev_bar3['close'] < prev_bar3['open']:
+        return False
+    if prev_bar2['open'] < prev_bar3['close']:
+        return False
+    if bars.iloc[-1]['close'] > prev_bar3['low']:
+        return False
+    period = min(len(bars) - 2, period)
+    period_bars = bars.tail(period + 2).head(period)
+    period_high_price = 0.0
+    for _, row in period_bars.iterrows():
+        if row['high'] > period_high_price:
+            period_high_price = row['high']
+    if prev_bar2['high'] < period_high_price:
+        return False
+    return True
+
+
+def _legacy_all_green(bars, period=5):
+    period = min(len(bars) - 1, period)
+    period_bars = bars.tail(period + 1).head(period)
+    all_candle_green = True
+    for _, row in period_bars.iterrows():
+        if row['open'] > row['close']:
+            all_candle_green = False
+    return all_candle_green
+
+
+def _legacy_volatility(now, bars, period=5):
+    period = min(len(bars) - 1, period)
+    period_bars = bars.tail(period + 1).head(period)
+    flat_count = 0
+    valid_candle_count = 0
+    price_set = set()
+    for index, row in period_bars.iterrows():
+        time = index.to_pydatetime()
+        if (now['pre'] and utils.is_pre_market_time(time)) or (now['after'] and utils.is_after_market_time(time)) or \
+                (now['regular'] and utils.is_regular_market_time(time)):
+            valid_candle_count += 1
+        is_flat = row['open'] == row['close'] and row['close'] == row['high'] and row['high'] == row['low']
+        if now['pre'] and not now['pre15'] and utils.is_pre_market_time(time) and is_flat:
+            flat_count += 1
+        if now['after'] and not now['after15'] and utils.is_after_market_time(time) and is_flat:
+            flat_count += 1
+        if now['regular'] and not now['regular15'] and utils.is_regular_market_time(time) and is_flat:
+            flat_count += 1
+        price_set.add(row['open'])
+        price_set.add(row['high'])
+        price_set.add(row['low'])
+        price_set.add(row['close'])
+    if valid_candle_count == len(period_bars):
+        if flat_count >= 3:
+            return False
+        if len(price_set) <= 2:
+            return False
+    return True
+
+
+def _legacy_largest_green_candle(now, bars, ratio, allow_equal, period=10):
+    period = min(len(bars) - 1, period)
+    period_bars = bars.tail(period + 1).head(period)
+    max_green_candle_size = 0.0
+    max_red_candle_size = 0.0
+    for index, row in period_bars.iterrows():
+        if not _legacy_time_match(now, index.to_pydatetime()):
+            continue
+        if row['open'] > row['close']:
+            max_red_candle_size = max(
+                max_red_candle_size, row['open'] - row['close'])
+        if row['close'] > row['open']:
+            max_green_candle_size = max(
+                max_green_candle_size, row['close'] - row['open'])
+    if allow_equal:
+        return max_green_candle_size * ratio >= max_red_candle_size
+    return max_green_candle_size > max_red_candle_size
+
+
+def _legacy_green_candle_ratio(now, bars, period=10):
+    period = min(len(bars) - 1, period)
+    period_bars = bars.tail(period + 1).head(period)
+    green_candle_count = 0
+    total_candle_count = 0
+    for index, row in period_bars.iterrows():
+        if not _legacy_time_match(now, index.to_pydatetime()):
+            continue
+        if row['close'] >= row['open']:
+            green_candle_count += 1
+        total_candle_count += 1
+    total_candle_count = max(1, total_candle_count)
+    return float(green_candle_count) / float(total_candle_count)
+
+
+def _result(func, *args, **kwargs):
+    # compare raised exception type as well
+    try:
+        return func(*args, **kwargs)
+    except Exception as e:
+        return type(e)
+
+
+_NY_TZ = pytz.timezone('America/New_York')
+
+# market session now: hour, minute
+_SESSION_TIMES = {
+    'pre': (5, 0),
+    'pre15': (4, 10),
+    'regular': (11, 0),
+    'regular15': (9, 40),
+    'after': (17, 0),
+    'after15': (16, 5),
+    'none': (21, 0),
+}
+
+
+def _get_now_flags(hour: int, minute: int) -> dict:
+    t = datetime(2021, 10, 14, hour, minute)
+    return {
+        'pre': utils.is_pre_market_time(t),
+        'regular': utils.is_regular_market_time(t),
+        'after': utils.is_after_market_time(t),
+        'pre15': t.hour == 4 and t.minute <= 15,
+        'regular15': t.hour == 9 and 30 <= t.minute <= 45,
+        'after15': t.hour == 16 and t.minute <= 15,
+    }
+
+
+def _make_bars(seed: int, size: int, start: str) -> pd.DataFrame:
+    """
+    synthetic 1m bars shaped like recorded webull charts, with time gaps, flat candles and long wicks
+    """
+    rng = np.random.default_rng(seed)
+    minutes = np.cumsum(rng.choice([1, 1, 1, 2, 3], size=size))
+    index = pd.Timestamp(start, tz=_NY_TZ) + pd.to_timedelta(minutes, unit='m')
+    close = np.round(5 + np.cumsum(rng.normal(0, 0.08, size)), 2).clip(0.5)
+    open_price = np.round(close + rng.normal(0, 0.06, size), 2).clip(0.5)
+    high = np.maximum(open_price, close) + \
+        np.round(np.abs(rng.normal(0, 0.1, size)) * rng.choice([0, 1, 4], size=size), 2)
+    low = np.minimum(open_price, close) - \
+        np.round(np.abs(rng.normal(0, 0.05, size)) * rng.choice([0, 1], size=size), 2)
+    volume = np.round(rng.lognormal(9, 1.5, size)) * \
+        rng.choice([0, 1, 1, 1, 1, 1, 1, 1, 1, 1], size=size)
+    # flat candles
+    flat = rng.random(size) < 0.15
+    open_price[flat] = close[flat]
+    high[flat] = close[flat]
+    low[flat] = close[flat]
+    bars = pd.DataFrame({
+        'open': open_price,
+        'high': high,
+        'low': low.clip(0.01),
+        'close': close,
+        'volume': volume,
+        'vwap': close,
+    }, index=index.rename('timestamp'))
+    return bars
+
+
+def _make_peak_bars(seed: int) -> pd.DataFrame:
+    # volume surge with a 20% green candle then red candle
+    bars = _make_bars(seed, 30, '2021-10-14 10:00')
+    bars['volume'] = 1000.0
+    bars.iloc[-14:-3, bars.columns.get_loc('volume')] = 8000.0
+    bars.iloc[-3] = [5.0, 6.5, 4.9, 6.0, 20000.0, 5.5]
+    bars.iloc[-2] = [6.4, 7.0, 5.5, 5.8, 9000.0, 5.6]
+    bars.iloc[-1] = [5.8, 5.9, 4.5, 4.7, 9000.0, 5.6]
+    return bars
+
+
+def _get_fixtures() -> list:
+    fixtures = []
+    starts = ['2021-10-14 04:00', '2021-10-14 09:05',
+              '2021-10-14 11:00', '2021-10-14 15:40', '2021-10-14 19:30']
+    seed = 0
+    for start in starts:
+        for size in [0, 1, 2, 3, 5, 8, 12, 21, 25, 40, 60]:
+            fixtures.append(_make_bars(seed, size, start))
+            seed += 1
+    for i in range(5):
+        fixtures.append(_make_peak_bars(100 + i))
+    return fixtures
+
+
+class PatternEngineTestCase(TestCase):
+
+    def setUp(self):
+        self.fixtures = _get_fixtures()
+
+    def _patch_now(self, now: dict) -> ExitStack:
+        stack = ExitStack()
+        patchers = [
+            mock.patch('common.utils.is_pre_market_hour_now',
+                       return_value=now['pre']),
+            mock.patch('common.utils.is_regular_market_hour_now',
+                       return_value=now['regular']),
+            mock.patch('common.utils.is_after_market_hour_now',
+                       return_value=now['after']),
+            mock.patch('common.utils.is_pre_market_hour_15m',
+                       return_value=now['pre15']),
+            mock.patch('common.utils.is_regular_market_hour_15m',
+                       return_value=now['regular15']),
+            mock.patch('common.utils.is_after_market_hour_15m',
+                       return_value=now['after15']),
+            mock.patch('common.utils.is_paper_trading', return_value=True),
+        ]
+        for patcher in patchers:
+            stack.enter_context(patcher)
+        return stack
+
+    def test_trading_pattern_match_legacy(self):
+        for session, (hour, minute) in _SESSION_TIMES.items():
+            now = _get_now_flags(hour, minute)
+            with self.subTest(session=session), self._patch_now(now):
+                confirm_volume = pattern._get_avg_confirm_volume()
+                confirm_amount = pattern._get_avg_confirm_amount()
+                for i, bars in enumerate(self.fixtures):
+                    msg = "session: {}, fixture: {}".format(session, i)
+                    for period in [3, 5, 10, 20]:
+                        self.assertEqual(_result(pattern.check_bars_continue, bars, period=period),
+                                         _result(_legacy_continue, now, bars, period=period), msg)
+                        self.assertEqual(_result(pattern.check_bars_has_volume, bars, time_scale=2, period=period),
+                                         _result(_legacy_has_volume, now, bars, confirm_volume, time_scale=2, period=period), msg)
+                        self.assertEqual(_result(pattern.check_bars_has_amount, bars, period=period),
+                                         _result(_legacy_has_amount, now, bars, confirm_amount, period=period), msg)
+                        self.assertEqual(_result(pattern.check_bars_volume_with_pos_size, bars, 100, period=period),
+                                         _result(_legacy_volume_with_pos_size, now, bars, pattern._get_vol_for_pos_size(100), period=period), msg)
+                        self.assertEqual(_result(pattern.check_bars_amount_grinding, bars, period=period),
+                                         _result(_legacy_amount_grinding, now, bars, period=period), msg)
+                        self.assertEqual(_result(pattern.check_bars_volatility, bars, period=period),
+                                         _result(_legacy_volatility, now, bars, period=period), msg)
+                        self.assertEqual(_result(pattern.check_bars_has_largest_green_candle, bars, period=period),
+                                         _result(_legacy_largest_green_candle, now, bars, 1.2, True, period=period), msg)
+                        green_ratio = _result(
+                            _legacy_green_candle_ratio, now, bars, period=period)
+                        self.assertEqual(_result(pattern.check_bars_has_most_green_candle, bars, period=period),
+                                         green_ratio >= config.CHART_MOST_GREEN_CANDLES_THRESHOLD, msg)
+                        self.assertEqual(_result(pattern.check_bars_has_more_green_candle, bars, period=period),
+                                         green_ratio >= config.CHART_MORE_GREEN_CANDLES_THRESHOLD, msg)
+
+    def test_trading_candle_pattern_match_legacy(self):
+        for i, bars in enumerate(self.fixtures):
+            msg = "fixture: {}".format(i)
+            for period in [3, 5, 10, 20]:
+                for count in [1, 2]:
+                    self.assertEqual(_result(pattern.check_bars_has_long_wick_up, bars, period=period, count=count),
+                                     _result(_legacy_long_wick_up, config, bars, period=period, count=count), msg)
+                    self.assertEqual(_result(pattern.check_bars_has_bearish_candle, bars, period=period, count=count),
+                                     _result(_legacy_bearish_candle, bars, period=period, count=count), msg)
+                self.assertEqual(_result(pattern.check_bars_reversal, bars, period=period),
+                                 _result(_legacy_reversal, bars, period=period), msg)
+                self.assertEqual(_result(pattern.check_bars_all_green, bars, period=period),
+                                 _result(_legacy_all_green, bars, period=period), msg)
+            for long_period, short_period in [(5, 3), (10, 3), (12, 5)]:
+                self.assertEqual(_result(pattern.check_bars_at_peak, bars, long_period=long_period, short_period=short_period),
+                                 _result(_legacy_at_peak, bars, long_period=long_period, short_period=short_period), msg)
+
+    def test_at_peak_detected(self):
+        bars = _make_peak_bars(100)
+        self.assertTrue(_legacy_at_peak(bars, long_period=10))
+        self.assertTrue(pattern.check_bars_at_peak(bars, long_period=10))
+
+    def test_backtest_pattern_match_legacy(self):
+        backtest_pattern = BacktestPattern()
+        for session, (hour, minute) in _SESSION_TIMES.items():
+            trading_time = _NY_TZ.localize(datetime(2021, 10, 14, hour, minute))
+            backtest_pattern.set_trading_time(trading_time)
+            # backtest never skip first 15 minutes
+            now = _get_now_flags(hour, minute)
+            now['pre15'] = now['regular15'] = now['after15'] = False
+            confirm_volume = backtest_pattern._get_avg_confirm_volume()
+            with self.subTest(session=session):
+                for i, bars in enumerate(self.fixtures):
+                    msg = "session: {}, fixture: {}".format(session, i)
+                    for period in [3, 5, 10, 20]:
+                        self.assertEqual(_result(backtest_pattern.check_bars_continue, bars, period=period),
+                                         _result(_legacy_continue, now, bars, period=period), msg)
+                        self.assertEqual(_result(backtest_pattern.check_bars_has_volume, bars, period=period),
+                                         _result(_legacy_has_volume, now, bars, confirm_volume, period=period), msg)
+                        self.assertEqual(_result(backtest_pattern.check_bars_amount_grinding, bars, period=period),
+                                         _result(_legacy_amount_grinding, now, bars, period=period), msg)
+                        self.assertEqual(_result(backtest_pattern.check_bars_volume_with_pos_size, bars, 100, period=period),
+                                         _result(_legacy_volume_with_pos_size, now, bars, backtest_pattern._get_vol_for_pos_size(100), period=period), msg)
+                        self.assertEqual(_result(backtest_pattern.check_bars_volatility, bars, period=period),
+                                         _result(_legacy_volatility, now, bars, period=period), msg)
+                        self.assertEqual(_result(backtest_pattern.check_bars_has_largest_green_candle, bars, period=period),
+                                         _result(_legacy_largest_green_candle, now, bars, 1.0, False, period=period), msg)
+                        green_ratio = _result(
+                            _legacy_green_candle_ratio, now, bars, period=period)
+                        self.assertEqual(_result(backtest_pattern.check_bars_has_most_green_candle, bars, period=period),
+                                         green_ratio >= backtest_config.CHART_MOST_GREEN_CANDLES_THRESHOLD, msg)
+                        self.assertEqual(_result(backtest_pattern.check_bars_has_more_green_candle, bars, period=period),
+                                         green_ratio >= backtest_config.CHART_MORE_GREEN_CANDLES_THRESHOLD, msg)
+
+
+class BarIndicatorsTestCase(TestCase):
+
+    def _feed(self, bar_cache: BarCache, bars: pd.DataFrame, callback):
+        # feed bars like prefetch, a forming bar first then the patched bar
+        for i in range(1, len(bars) + 1):
+            fetched = bars.iloc[max(0, i - 3):i].copy()
+            forming = fetched.copy()
+            forming.iloc[-1, forming.columns.get_loc('close')] -= 0.01
+            bar_cache.update(forming)
+            bar_cache.update(fetched)
+            callback(i)
+
+    def test_ema9_match_ewm(self):
+        for seed in range(3):
+            bars = _make_bars(seed, 150, '2021-06-01 09:30')
+            bar_cache = BarCache(capacity=60)
+            self._feed(bar_cache, bars, lambda i: None)
+            ema9 = bars['close'].ewm(span=9, adjust=False).mean()
+            np.testing.assert_allclose(
+                bar_cache.get_bars(60)['ema9'].to_numpy(), ema9.to_numpy()[-60:])
+
+    def test_ema9_window_parity(self):
+        # strategies used ewm of the fetched window, seeded with the window's first close,
+        # the streaming ema9 is seeded with the day's first close, the gap decays by (1 - alpha) per bar
+        bars = _make_bars(5, 150, '2021-06-01 09:30')
+        bar_cache = BarCache(capacity=150)
+        self._feed(bar_cache, bars, lambda i: None)
+        cached_bars = bar_cache.get_bars(150)
+        for count in [15, 25, 35]:
+            window_bars = cached_bars.tail(count)
+            window_ema9 = window_bars['close'].ewm(span=9, adjust=False).mean().iloc[-1]
+            seed_gap = window_bars['close'].iloc[0] - window_bars['ema9'].iloc[0]
+            self.assertAlmostEqual(window_ema9 - window_bars['ema9'].iloc[-1],
+                                   (1 - 2.0 / 10) ** (count - 1) * seed_gap)
+
+    def test_vwap_atr_match_formula(self):
+        bars = _make_bars(11, 80, '2021-06-01 09:30')
+        indicators = BarIndicators()
+        highs, lows, closes, volumes = [bars[column].to_numpy() for column in ['high', 'low', 'close', 'volume']]
+        for i in range(len(bars)):
+            # forming bar patched before the next bar starts
+            indicators.update(i, closes[i], highs[i], lows[i], closes[i] - 0.01, volumes[i])
+            indicators.update(i, closes[i], highs[i], lows[i], closes[i], volumes[i])
+            typical_prices = (highs[:i + 1] + lows[:i + 1] + closes[:i + 1]) / 3
+            if volumes[:i + 1].sum() > 0:
+                self.assertAlmostEqual(indicators.get_vwap(),
+                                       (typical_prices * volumes[:i + 1]).sum() / volumes[:i + 1].sum())
+            true_ranges = [highs[0] - lows[0]] + [max(highs[k] - lows[k], abs(highs[k] - closes[k - 1]),
+                                                      abs(lows[k] - closes[k - 1])) for k in range(1, i + 1)]
+            # simple average of first 14 bars, wilder's smoothing after
+            atr = np.mean(true_ranges[:14])
+            for true_range in true_ranges[14:]:
+                atr = (atr * 13 + true_range) / 14
+            self.assertAlmostEqual(indicators.get_atr(), atr)
+
+    def test_window_match_period_bars(self):
+        bars = _make_bars(7, 150, '2021-06-01 09:30')
+        bar_cache = BarCache(capacity=60)
+
+        def check(i: int):
+            cached_bars = bar_cache.get_bars(60)
+            for period in [5, 20, 55]:
+                window = bar_cache.get_window(period)
+                period_bars = cached_bars.head(len(cached_bars) - 1).tail(period)
+                if period_bars.empty:
+                    self.assertTrue(window.is_empty())
+                    continue
+                self.assertEqual(window.get_max_close(),
+                                 period_bars['close'].max())
+                self.assertEqual(window.get_min_low(), period_bars['low'].min())
+                self.assertEqual(window.get_max_high(),
+                                 period_bars['high'].max())
+                current_price = cached_bars.iloc[-1]['close']
+                period_price = period_bars.iloc[0]['close']
+                self.assertAlmostEqual(window.get_rate_of_change(current_price),
+                                       (current_price - period_price) / period_price * 100)
+
+        self._feed(bar_cache, bars, check)
+
+
+class TradingSchedulerTestCase(TestCase):
+
+    def test_run_events_when_due(self):
+        scheduler = TradingScheduler()
+        runs = []
+
+        def tick():
+            runs.append("tick")
+            if runs.count("tick") == 2:
+                # order done, run update now instead of waiting
+                scheduler.trigger("update")
+            if runs.count("tick") == 4:
+                scheduler.stop()
+            return 0.01
+
+        def update():
+            runs.append("update")
+            return 10
+
+        scheduler.schedule("tick", tick)
+        scheduler.schedule("update", update, delay=10)
+        scheduler.schedule("once", lambda: runs.append("once"), delay=0.005)
+        scheduler.run(lambda: True)
+        self.assertEqual(runs, ["tick", "once", "tick", "update", "tick", "tick"])
+        self.assertEqual(scheduler.get_stat("tick").count, 4)
+        self.assertEqual(scheduler.get_stat("update").count, 1)
+        self.assertLess(scheduler.get_stat("update").max_latency, 1)
+
+
+class AccountSnapshotTestCase(TestCase):
+
+    def test_fetch_account_once_until_invalidated(self):
+        account_data = {
+            'accountMembers': [{'key': 'usableCash', 'value': '1000.00'}],
+            'positions': [{'ticker': {'symbol': 'AAPL'}, 'position': '10'}],
+            'openOrders': [],
+        }
+        with mock.patch('sdk.webullsdk.get_account', return_value=account_data) as get_account, \
+                mock.patch('common.db.save_webull_min_usable_cash') as save_min_usable_cash:
+            account_snapshot = AccountSnapshot()
+            self.assertEqual(account_snapshot.get_usable_cash(), 1000.0)
+            self.assertEqual(account_snapshot.get_position('AAPL')['position'], '10')
+            self.assertIsNone(account_snapshot.get_position('TSLA'))
+            self.assertEqual(account_snapshot.get_open_orders(), [])
+            self.assertEqual(get_account.call_count, 1)
+            account_snapshot.reserve_cash(400.0)
+            self.assertEqual(account_snapshot.get_usable_cash(), 600.0)
+            account_snapshot.invalidate()
+            self.assertEqual(account_snapshot.get_usable_cash(), 1000.0)
+            self.assertEqual(get_account.call_count, 2)
+            save_min_usable_cash.assert_called_once_with(1000.0)
+
+
+def _make_paper_order(order_id: int, status: str, filled_quantity: int) -> dict:
+    return {
+        'orderId': order_id,
+        'ticker': {'symbol': 'AAPL', 'tickerId': 913256135},
+        'action': 'BUY',
+        'statusStr': status,
+        'orderType': 'LMT',
+        'totalQuantity': '10',
+        'filledQuantity': str(filled_quantity),
+        'lmtPrice': '150.00',
+        'timeInForce': 'DAY',
+    }
+
+
+class OrderTrackerTestCase(TestCase):
+
+    def test_save_changed_orders_only(self):
+        account_snapshot = mock.Mock()
+        order_tracker = OrderTracker(
+            paper=True, account_snapshot=account_snapshot)
+        order_tracker.start_tracking("1", SetupType.DAY_20_CANDLES_NEW_HIGH, note="Entry point.")
+        with mock.patch('common.db.save_webull_order', wraps=db.save_webull_order) as save_webull_order, \
+                mock.patch('sdk.webullsdk.get_history_orders') as get_history_orders:
+            account_snapshot.get_open_orders.return_value = [
+                _make_paper_order(1, "Working", 0), _make_paper_order(2, "Working", 0)]
+            self.assertFalse(order_tracker.update_orders())
+            self.assertFalse(order_tracker.update_orders())
+            # untracked and unchanged orders are not saved
+            self.assertEqual(save_webull_order.call_count, 1)
+            get_history_orders.assert_not_called()
+            # filled order leaves open orders
+            account_snapshot.get_open_orders.return_value = [
+                _make_paper_order(2, "Working", 0)]
+            get_history_orders.return_value = [
+                _make_paper_order(1, "Filled", 10), _make_paper_order(3, "Cancelled", 0)]
+            self.assertTrue(order_tracker.update_orders())
+            self.assertEqual(save_webull_order.call_count, 2)
+            self.assertFalse(order_tracker.has_pending_orders())
+        order = order_tracker.get_order("1")
+        self.assertEqual(order.status, "Filled")
+        self.assertEqual(order.filled_quantity, 10)
+        self.assertEqual(order.note, "Entry point.")
+
+
+class TrackerThreadingTestCase(TestCase):
+
+    def test_stop_tracking_in_worker_while_scheduling(self):
+        import sys
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        trading_tracker = TradingTracker(paper=True)
+        account_snapshot = mock.Mock()
+        account_snapshot.get_open_orders.return_value = []
+        order_tracker = OrderTracker(paper=True, account_snapshot=account_snapshot)
+        tickers = [TrackingTicker(f"S{i}", str(i)) for i in range(200)]
+        for ticker in tickers:
+            trading_tracker.start_tracking(ticker)
+            order_tracker.start_tracking(ticker.get_id(), SetupType.DAY_20_CANDLES_NEW_HIGH)
+        stopped = threading.Event()
+
+        def trade_ticker(ticker: TrackingTicker):
+            # workers stop and restart tracking like strategies exiting and entering
+            while not stopped.is_set():
+                trading_tracker.stop_tracking(ticker)
+                order_tracker.stop_tracking(ticker.get_id())
+                trading_tracker.start_tracking(ticker)
+                order_tracker.start_tracking(ticker.get_id(), SetupType.DAY_20_CANDLES_NEW_HIGH)
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with mock.patch('sdk.webullsdk.get_history_orders', return_value=[]), \
+                    ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(trade_ticker, ticker) for ticker in tickers[:4]]
+                try:
+                    # scheduler loop
+                    for _ in range(300):
+                        trading_tracker.update_due_tickers()
+                        trading_tracker.set_tickers_due()
+                        trading_tracker.get_next_check_time()
+                        order_tracker.update_orders()
+                finally:
+                    stopped.set()
+                for future in futures:
+                    future.result()
+        finally:
+            sys.setswitchinterval(switch_interval)
+        self.assertEqual(len(trading_tracker.get_tickers()), 200)
+        self.assertTrue(order_tracker.has_pending_orders())
+
+
+class TradingLoggerTestCase(TestCase):
+
+    def test_append_log_chunks(self):
+        db.get_or_create_trading_settings()
+        trading_date = datetime(2021, 12, 24).date()
+        # start from empty buffers, logs of other tests are not saved
+        with mock.patch('logger.trading_logger._trading_logs', []), \
+                mock.patch('logger.trading_logger._pending_logs', {}), \
+                mock.patch('logger.trading_logger._start_writer'), \
+                mock.patch('builtins.print'):
+            trading_logger.log("first")
+            trading_logger.write(TradingHourType.REGULAR, trading_date)
+            trading_logger.log("second")
+            trading_logger.log("third")
+            trading_logger.write(TradingHourType.REGULAR, trading_date)
+            # nothing saved before flush
+            self.assertEqual(TradingLogChunk.objects.count(), 0)
+            trading_logger.flush()
+            trading_logger.log("fourth")
+            trading_logger.write(TradingHourType.REGULAR, trading_date)
+            trading_logger.flush()
+        self.assertEqual(TradingLog.objects.count(), 1)
+        self.assertEqual(TradingLogChunk.objects.count(), 2)
+        log_obj = TradingLog.objects.first()
+        log_obj.log_text = "legacy\n"
+        log_obj.save()
+        log_lines = list(trading_logger.iter_log_lines(log_obj))
+        self.assertEqual(len(log_lines), 5)
+        self.assertEqual(log_lines[0], "legacy")
+        self.assertTrue(log_lines[1].endswith("] first"))
+        self.assertTrue(log_lines[4].endswith("] fourth"))
+
+    def test_failed_flush_keeps_logs(self):
+        db.get_or_create_trading_settings()
+        trading_date = datetime(2021, 12, 24).date()
+        with mock.patch('logger.trading_logger._trading_logs', []), \
+                mock.patch('logger.trading_logger._pending_logs', {}), \
+                mock.patch('logger.trading_logger._start_writer'), \
+                mock.patch('builtins.print'):
+            trading_logger.log("first")
+            trading_logger.write(TradingHourType.REGULAR, trading_date)
+            with mock.patch('webull_trader.models.TradingLogChunk.objects.bulk_create', side_effect=Exception("locked")):
+                with self.assertRaises(Exception):
+                    trading_logger.flush()
+            trading_logger.log("second")
+            trading_logger.write(TradingHourType.REGULAR, trading_date)
+            trading_logger.flush()
+        log_lines = list(trading_logger.iter_log_lines(TradingLog.objects.get()))
+        self.assertEqual(len(log_lines), 2)
+        self.assertTrue(log_lines[0].endswith("] first"))
+        self.assertTrue(log_lines[1].endswith("] second"))
+
+    def test_views_skip_backtest_logs(self):
+        from django.contrib.auth.models import User
+        from django.urls import reverse
+
+        trading_date = datetime(2021, 12, 24).date()
+        TradingLog.objects.create(date=trading_date, tag="LIVE", trading_hour=TradingHourType.REGULAR)
+        TradingLog.objects.create(date=trading_date, tag=backtest_config.BACKTEST_LOG_TAG,
+                                  trading_hour=TradingHourType.REGULAR)
+        self.client.force_login(User.objects.create_user('trader', password='trader'))
+        response = self.client.get(reverse('logs'))
+        self.assertEqual([log['tag'] for log in response.context['trading_logs']], ["LIVE"])
+        response = self.client.get(reverse('trading_logs_date_hour', args=['2021-12-24', 'regular']))
+        self.assertEqual(response.status_code, 200)
+
+
+class DayBarCacheTestCase(TestCase):
+
+    def test_day_bars_window_views(self):
+        trading_date = datetime(2021, 12, 23).date()
+        start_time = datetime(2021, 12, 23, 14, 30, tzinfo=pytz.utc)
+        minute_bars = []
+        for symbol in ['AAPL', 'TSLA']:
+            for i in range(100):
+                close = 100.0 + i + (5.0 if symbol == 'TSLA' else 0.0)
+                minute_bars.append(HistoricalMinuteBar(
+                    symbol=symbol, date=trading_date, time=start_time + timedelta(minutes=i),
+                    open=close - 0.5, high=close + 1, low=close - 1, close=close, volume=1000.0, vwap=close))
+        HistoricalMinuteBar.objects.bulk_create(minute_bars)
+        strategy = BacktestStrategyBase(trading_date=trading_date)
+        with mock.patch('builtins.print'):
+            strategy.begin()
+            strategy.set_trading_time(start_time + timedelta(minutes=79))
+            strategy.update()
+        self.assertEqual([ticker['symbol'] for ticker in strategy.backtest_tickers], ['AAPL', 'TSLA'])
+        day_bar_cache = strategy.day_bar_cache
+        bars = strategy.backtest_df['AAPL']
+        self.assertEqual(len(bars), config.DAY_BAR_CACHE_SIZE)
+        self.assertEqual(bars.index[-1], start_time + timedelta(minutes=79))
+        self.assertEqual(bars.iloc[-1]['close'], 179.0)
+        # window is a view of day arrays
+        self.assertTrue(np.shares_memory(bars.to_numpy(), day_bar_cache.values['AAPL']))
+        closes = pd.Series([100.0 + i for i in range(80)])
+        self.assertAlmostEqual(
+            bars.iloc[-1]['ema9'], closes.ewm(span=9, adjust=False).mean().iloc[-1])
+        # precomputed window matches streaming window of closed bars
+        window = RollingWindow(20)
+        for i in range(79):
+            window.commit(101.0 + i, 99.0 + i, 100.0 + i)
+        period_window = strategy.get_period_window(
+            TrackingTicker('AAPL', '1'), bars, 20)
+        self.assertEqual(period_window.get_max_close(), window.get_max_close())
+        self.assertEqual(period_window.get_max_high(), window.get_max_high())
+        self.assertEqual(period_window.get_min_low(), window.get_min_low())
+        self.assertAlmostEqual(period_window.get_rate_of_change(
+            179.0), window.get_rate_of_change(179.0))
+        self.assertIsNone(strategy.get_period_window(
+            TrackingTicker('AAPL', '1'), bars.set_axis(bars.index + pd.Timedelta(seconds=30)), 20))
+        self.assertEqual(day_bar_cache.get_last_close(
+            'TSLA', start_time + timedelta(minutes=120)), 204.0)
+        self.assertIsNone(day_bar_cache.get_last_close(
+            'TSLA', start_time - timedelta(minutes=1)))
+
+
+class SimulatedBrokerTestCase(TestCase):
+
+    def test_fill_orders_in_memory(self):
+        first_date = datetime(2021, 12, 23).date()
+        second_date = datetime(2021, 12, 24).date()
+        buy_time = datetime(2021, 12, 23, 14, 40, tzinfo=pytz.utc)
+        first_broker = BacktestStrategyBase(trading_date=first_date).broker
+        first_broker.buy('AAPL', '1', 10, 100.0, buy_time,
+                         setup=SetupType.DAY_20_CANDLES_NEW_HIGH, note="Entry point.")
+        first_broker.buy('AAPL', '1', 10, 110.0, buy_time + timedelta(minutes=1),
+                         setup=SetupType.DAY_20_CANDLES_NEW_HIGH, note="Scale in.")
+        self.assertEqual(first_broker.get_balance(), 27900.0)
+        position = first_broker.get_position('AAPL')
+        self.assertEqual(position.quantity, 20)
+        self.assertEqual(position.units, 2)
+        trade = first_broker.sell(
+            'AAPL', '1', 120.0, buy_time + timedelta(minutes=5), note="Exit point.")
+        self.assertEqual(trade.total_cost, 2100.0)
+        self.assertEqual(trade.total_sold, 2400.0)
+        self.assertIsNone(first_broker.get_position('AAPL'))
+        self.assertEqual(first_broker.get_total_pl(), 300.0)
+        self.assertEqual(first_broker.get_min_balance(), 27900.0)
+        self.assertEqual(len(first_broker.ledger), 3)
+        # each day has its own broker
+        second_broker = SimulatedBroker(second_date)
+        second_broker.buy('TSLA', '2', 10, 100.0, buy_time + timedelta(days=1),
+                          setup=SetupType.DAY_20_CANDLES_NEW_HIGH, note="Entry point.")
+        second_broker.sell('TSLA', '2', 90.0, buy_time +
+                           timedelta(days=1, minutes=5), note="Stop loss.")
+        self.assertNotEqual(first_broker.orders[0].order_id, second_broker.orders[0].order_id)
+        # nothing saved until results are saved
+        self.assertEqual(BacktestOrder.objects.count(), 0)
+        save_results([second_broker, first_broker])
+        self.assertEqual(BacktestOrder.objects.count(), 5)
+        self.assertEqual(BacktestTrade.objects.count(), 2)
+        self.assertEqual(WebullOrder.objects.count(), 0)
+        self.assertEqual(DayTrade.objects.count(), 0)
+        day_perfs = list(BacktestDayPerformance.objects.order_by('date'))
+        self.assertEqual(day_perfs[0].net_liquidation, 30300.0)
+        self.assertEqual(day_perfs[1].day_profit_loss, -100.0)
+        self.assertEqual(day_perfs[1].net_liquidation, 30200.0)
+        self.assertEqual(day_perfs[1].total_profit_loss, 200.0)
+
+    def test_chain_balances(self):
+        buy_time = datetime(2021, 12, 23, 14, 30, tzinfo=pytz.utc)
+        first_broker = SimulatedBroker(buy_time.date())
+        self.assertTrue(first_broker.has_cash(20000.0))
+        first_broker.buy('AAPL', '1', 200, 100.0, buy_time,
+                         setup=SetupType.DAY_20_CANDLES_NEW_HIGH, note="Entry point.")
+        first_broker.sell('AAPL', '1', 75.0, buy_time +
+                          timedelta(minutes=5), note="Stop loss.")
+        self.assertEqual(first_broker.get_balance(), 25000.0)
+        # second day passed its cash checks with enough margin
+        second_broker = SimulatedBroker(buy_time.date() + timedelta(days=1))
+        self.assertTrue(second_broker.has_cash(1000.0))
+        second_broker.buy('TSLA', '2', 10, 100.0, buy_time + timedelta(days=1),
+                          setup=SetupType.DAY_20_CANDLES_NEW_HIGH, note="Entry point.")
+        second_broker.sell('TSLA', '2', 110.0, buy_time +
+                           timedelta(days=1, minutes=5), note="Exit point.")
+        # third day would block order of 26000 with carried balance
+        third_broker = SimulatedBroker(buy_time.date() + timedelta(days=2))
+        self.assertTrue(third_broker.has_cash(26000.0))
+        self.assertFalse(third_broker.has_cash(40000.0))
+        replayed = []
+
+        def replay_day(trading_date, balance):
+            replayed.append((trading_date, balance))
+            return SimulatedBroker(trading_date, balance=balance)
+
+        brokers = chain_balances(
+            [third_broker, first_broker, second_broker], replay_day)
+        self.assertEqual(replayed, [(third_broker.trading_date, 25100.0)])
+        self.assertEqual(brokers[1], second_broker)
+        self.assertEqual(second_broker.init_balance, 25000.0)
+        self.assertEqual(second_broker.get_min_balance(), 24000.0)
+        self.assertEqual(second_broker.get_total_pl(), 100.0)
+        self.assertEqual(brokers[2].init_balance, 25100.0)
+        save_results(brokers)
+        day_perfs = list(BacktestDayPerformance.objects.order_by('date'))
+        self.assertEqual(day_perfs[1].min_usable_cash, 24000.0)
+        self.assertEqual(day_perfs[2].net_liquidation, 25100.0)
+        self.assertEqual(day_perfs[2].total_profit_loss, 25100.0 - INIT_BALANCE)
+
+    def test_failed_day_not_raise(self):
+        db.get_or_create_trading_settings()
+        self.addCleanup(trading_logger.set_tag, UNKNOWN)
+        with mock.patch.object(BacktestExecutor, 'start', side_effect=Exception("database is locked")):
+            self.assertIsNone(backtest_day(datetime(2021, 12, 23).date()))
+
+
+class BacktestSweepTestCase(TestCase):
+
+    def test_sweep_without_persist(self):
+        db.get_or_create_trading_settings()
+        trading_date = datetime(2021, 12, 23).date()
+        start_time = datetime(2021, 12, 23, 14, 30, tzinfo=pytz.utc)
+        minute_bars = []
+        for i in range(60):
+            close = 10.0 + i * 0.1
+            minute_bars.append(HistoricalMinuteBar(
+                symbol='AAPL', date=trading_date, time=start_time + timedelta(minutes=i),
+                open=close - 0.05, high=close + 0.1, low=close - 0.1, close=close, volume=100000.0, vwap=close - 0.5))
+        HistoricalMinuteBar.objects.bulk_create(minute_bars)
+        with mock.patch('builtins.print'):
+            result = sweep(BacktestDayTradingBreakout, {
+                "entry_period": [10, 20],
+                "exit_period": [5, 9],
+            }, [trading_date], max_workers=1)
+        self.assertEqual(len(result), 4)
+        self.assertEqual(list(result.columns), [
+            "entry_period", "exit_period", "trades", "profit_loss", "win_rate", "profit_loss_ratio"])
+        # nothing saved into db
+        self.assertEqual(BacktestOrder.objects.count(), 0)
+        self.assertEqual(TradingLog.objects.count(), 0)
+
+
+class VectorizedBacktestTestCase(TestCase):
+
+    def test_resolve_positions(self):
+        entries = np.array([False, True, True, False, False, True, False])
+        exits = np.array([True, False, True, True, False, False, True])
+        # exit on entry bar is not allowed
+        self.assertEqual(resolve_positions(entries, exits), [(1, 2), (5, 6)])
+        self.assertEqual(resolve_positions(
+            entries, np.zeros(7, dtype=bool)), [(1, None)])
+
+    def test_same_trades_as_event_driven(self):
+        trading_settings = db.get_or_create_trading_settings()
+        trading_date = datetime(2021, 12, 23).date()
+        start_time = get_trading_time_range(trading_date, TradingHourType.REGULAR)[0].astimezone(pytz.utc)
+        rng = np.random.default_rng(7)
+        minute_bars = []
+        for symbol in ['AAPL', 'TSLA']:
+            close = 10.0
+            for i in range(-30, 200):
+                close = round(max(1.0, close * (1 + rng.normal(0.002, 0.01))), 2)
+                minute_bars.append(HistoricalMinuteBar(
+                    symbol=symbol, date=trading_date, time=start_time + timedelta(minutes=i),
+                    open=close, high=close + 0.05, low=close - 0.05, close=close, volume=1000.0, vwap=close - 0.1))
+        HistoricalMinuteBar.objects.bulk_create(minute_bars)
+
+        with mock.patch('builtins.print'), mock.patch.object(trading_logger, 'write'):
+            strategy = BacktestDayTradingSignalBreakout(
+                trading_date=trading_date, trading_hour=TradingHourType.REGULAR, entry_period=10, exit_period=5)
+            BacktestExecutor(strategy=strategy, trading_date=trading_date,
+                             trading_hour=TradingHourType.REGULAR).start()
+        broker = backtest_session(strategy.day_bar_cache, TradingHourType.REGULAR,
+                                  trading_settings.order_amount_limit, entry_period=10, exit_period=5)
+
+        def get_trade_list(trades):
+            return [(trade.symbol, trade.buy_time, trade.sell_time, trade.quantity, trade.total_cost, trade.total_sold)
+                    for trade in trades]
+
+        self.assertGreater(len(strategy.broker.trades), 1)
+        self.assertEqual(get_trade_list(broker.trades),
+                         get_trade_list(strategy.broker.trades))
+        self.assertEqual(broker.get_balance(), strategy.broker.get_balance())
+
+
+class BarStoreTestCase(TestCase):
+
+    def setUp(self):
+        self.store_dir = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(BAR_STORE_DIR=self.store_dir.name)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.store_dir.cleanup()
+
+    def test_memmap_read(self):
+        trading_date = datetime(2021, 12, 23).date()
+        start_time = datetime(2021, 12, 23, 14, 30, tzinfo=pytz.utc)
+        bar_list = []
+        for i in range(30):
+            close = 10.0 + i * 0.1
+            bar_list.append({'symbol': 'AAPL', 'date': trading_date, 'time': start_time + timedelta(minutes=i),
+                             'open': close, 'high': close + 0.1, 'low': close - 0.1, 'close': close,
+                             'volume': 1000.0 + i, 'vwap': close})
+        # save in two batches, existing bar is kept
+        bar_store.save_minute_bar_list(bar_list[10:])
+        bar_store.save_minute_bar_list(bar_list[:11] + [dict(bar_list[20], close=99.0)])
+        self.assertTrue(bar_store.has_day(trading_date))
+        self.assertEqual(bar_store.get_day_symbols(trading_date), ['AAPL'])
+        timestamps, values = bar_store.read_day_bars('AAPL', trading_date)
+        self.assertIsInstance(values, np.memmap)
+        self.assertEqual(len(timestamps), 30)
+        self.assertTrue(np.all(np.diff(timestamps) > 0))
+        self.assertAlmostEqual(values[20, 3], 12.0)
+        self.assertIsNone(bar_store.read_day_bars('TSLA', trading_date))
+        self.assertIsNone(bar_store.read_day_bars_df('TSLA', trading_date))
+        bars = bar_store.read_day_bars_df('AAPL', trading_date)
+        self.assertEqual(bars.index[0], start_time)
+        # volumes of symbols not in store read from database
+        HistoricalMinuteBar.objects.create(symbol='TSLA', date=trading_date, time=start_time, open=1.0, high=1.0,
+                                           low=1.0, close=1.0, volume=5.0, vwap=1.0)
+        start_minute = int(start_time.timestamp()) // 60
+        with self.assertNumQueries(1):
+            bar_volumes = bar_store.get_minute_volumes({'AAPL', 'TSLA'}, {trading_date})
+        self.assertEqual(bar_volumes[('AAPL', start_minute + 5)], 1005.0)
+        self.assertEqual(bar_volumes[('TSLA', start_minute)], 5.0)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(bar_store.get_minute_volumes({'AAPL'}, {trading_date})), 30)
+
+    def test_day_bar_cache_from_store(self):
+        trading_date = datetime(2021, 12, 23).date()
+        start_time = datetime(2021, 12, 23, 14, 30, tzinfo=pytz.utc)
+        minute_bars = []
+        for symbol in ['AAPL', 'TSLA']:
+            for i in range(30):
+                close = 10.0 + i * 0.1
+                minute_bars.append(HistoricalMinuteBar(
+                    symbol=symbol, date=trading_date, time=start_time + timedelta(minutes=i),
+                    open=close, high=close + 0.1, low=close - 0.1, close=close, volume=1000.0, vwap=close))
+        HistoricalMinuteBar.objects.bulk_create(minute_bars)
+        db_cache = DayBarCache()
+        db_cache.load(trading_date)
+        bar_store.sync_day_from_db(trading_date)
+        store_cache = DayBarCache()
+        # one query of symbols not in store
+        with self.assertNumQueries(1):
+            store_cache.load(trading_date)
+        self.assertEqual(store_cache.get_symbols(), db_cache.get_symbols())
+        for symbol in db_cache.get_symbols():
+            self.assertTrue(np.array_equal(store_cache.timestamps[symbol], db_cache.timestamps[symbol]))
+            self.assertTrue(np.allclose(store_cache.values[symbol], db_cache.values[symbol]))
+        # partly synced day loads missing symbols from db
+        shutil.rmtree(bar_store.get_day_dir(trading_date))
+        bar_store.save_minute_bar_list([{'symbol': bar.symbol, 'date': bar.date, 'time': bar.time, 'open': bar.open,
+                                         'high': bar.high, 'low': bar.low, 'close': bar.close, 'volume': bar.volume,
+                                         'vwap': bar.vwap} for bar in minute_bars if bar.symbol == 'AAPL'])
+        self.assertEqual(bar_store.get_day_symbols(trading_date), ['AAPL'])
+        partial_cache = DayBarCache()
+        partial_cache.load(trading_date)
+        self.assertEqual(partial_cache.get_symbols(), ['AAPL', 'TSLA'])
+        self.assertTrue(np.allclose(partial_cache.values['TSLA'], db_cache.values['TSLA']))
+
+
+class HistBarBulkSaveTestCase(TestCase):
+
+    def test_bulk_save_minute_bars(self):
+        trading_date = datetime(2021, 12, 23).date()
+        start_time = datetime(2021, 12, 23, 9, 0, tzinfo=pytz.utc)
+        bar_list = []
+        for i in range(1200):
+            close = 10.0 + i * 0.01
+            bar_list.append({'symbol': 'AAPL', 'date': trading_date, 'time': start_time + timedelta(minutes=i),
+                             'open': close, 'high': close, 'low': close, 'close': close, 'volume': 100.0, 'vwap': close})
+        HistoricalMinuteBar.objects.create(**dict(bar_list[0], close=99.0))
+        with mock.patch('builtins.print'), CaptureQueriesContext(connection) as queries:
+            db.save_hist_minute_bar_list(bar_list + bar_list[-5:])
+        # one select and batched inserts, not queries per bar, sqlite caps batch size by query params
+        self.assertLessEqual(len(queries), 20)
+        self.assertEqual(HistoricalMinuteBar.objects.count(), 1200)
+        # existing bar is kept
+        self.assertEqual(HistoricalMinuteBar.objects.get(
+            symbol='AAPL', time=start_time).close, 99.0)
+        with mock.patch('builtins.print'):
+            db.save_hist_minute_bar_list(bar_list)
+        self.assertEqual(HistoricalMinuteBar.objects.count(), 1200)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            HistoricalMinuteBar.objects.create(**bar_list[1])
+
+    def test_bulk_save_daily_bars(self):
+        bar_list = [{'symbol': 'AAPL', 'date': f'2021-12-{day}', 'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0,
+                     'volume': 100.0, 'rsi_10': 50.0, 'sma_55': 1.0, 'sma_120': 1.0} for day in range(10, 20)]
+        with mock.patch('builtins.print'):
+            db.save_swing_hist_daily_bar_list(bar_list)
+            db.save_hist_daily_bar_list(bar_list)
+            # string dates match saved dates
+            self.assertEqual(db.bulk_save_hist_bar_list(SwingHistoricalDailyBar, 'date', bar_list, ['symbol', 'date']), 0)
+        self.assertEqual(SwingHistoricalDailyBar.objects.count(), 10)
+        self.assertEqual(HistoricalDailyBar.objects.count(), 10)
+
+
+class FetchHistdataTestCase(TestCase):
+
+    def test_resume_from_checkpoints(self):
+        from scripts import fetch_histdata
+
+        day = datetime(2021, 12, 23).date()
+        index = pd.DatetimeIndex([datetime(2021, 12, 22, 20, 0, tzinfo=pytz.utc)] +
+                                 [datetime(2021, 12, 23, 14, 30, tzinfo=pytz.utc) + timedelta(minutes=i) for i in range(5)])
+        minute_bars = pd.DataFrame({'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0,
+                                   'volume': 100.0, 'vwap': 1.0}, index=index)
+        daily_bars = pd.DataFrame({'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'volume': 100.0},
+                                  index=pd.DatetimeIndex([datetime(2021, 12, 23, tzinfo=pytz.utc)]))
+
+        def get_bars(ticker_id, interval, count, timestamp=None):
+            if interval == 'm1':
+                return minute_bars
+            if ticker_id == 2:
+                raise Exception("network error")
+            return daily_bars
+
+        with ExitStack() as stack:
+            stack.enter_context(mock.patch('builtins.print'))
+            stack.enter_context(override_settings(BAR_STORE_DIR=stack.enter_context(tempfile.TemporaryDirectory())))
+            get_bars_mock = stack.enter_context(mock.patch('sdk.webullsdk.fetch_bars', side_effect=get_bars))
+            stack.enter_context(mock.patch('sdk.webullsdk.get_quote', side_effect=lambda ticker_id: {}))
+            stack.enter_context(mock.patch('sdk.finvizsdk.get_quote', return_value={'shortFloat': '1.0'}))
+            save_key_statistics = stack.enter_context(mock.patch('common.db.save_hist_key_statistics'))
+            fetch_histdata.fetch_symbols_histdata(day, ['AAPL', 'TSLA'], [1, 2])
+            self.assertEqual(HistoricalMinuteBar.objects.filter(date=day).count(), 10)
+            self.assertEqual(HistoricalDailyBar.objects.count(), 1)
+            self.assertEqual(save_key_statistics.call_count, 2)
+            self.assertEqual(len(db.get_hist_fetch_checkpoints(day)), 5)
+            # rerun only fetches failed dataset
+            get_bars_mock.reset_mock()
+            get_bars_mock.side_effect = None
+            get_bars_mock.return_value = daily_bars
+            fetch_histdata.fetch_symbols_histdata(day, ['AAPL', 'TSLA'], [1, 2])
+            get_bars_mock.assert_called_once_with(2, 'd1', 60)
+            self.assertEqual(save_key_statistics.call_count, 2)
+            self.assertEqual(len(db.get_hist_fetch_checkpoints(day)), 6)
+
+    def test_empty_bars_not_checkpointed(self):
+        from scripts import fetch_histdata
+
+        day = datetime(2021, 12, 23).date()
+        with ExitStack() as stack:
+            stack.enter_context(mock.patch('builtins.print'))
+            stack.enter_context(override_settings(BAR_STORE_DIR=stack.enter_context(tempfile.TemporaryDirectory())))
+            stack.enter_context(mock.patch('sdk.webullsdk.fetch_bars', return_value=pd.DataFrame()))
+            stack.enter_context(mock.patch('common.db.save_hist_key_statistics'))
+            stack.enter_context(mock.patch('sdk.webullsdk.get_quote', side_effect=lambda ticker_id: {}))
+            stack.enter_context(mock.patch('sdk.finvizsdk.get_quote', return_value={'shortFloat': '1.0'}))
+            fetch_histdata.fetch_symbols_histdata(day, ['AAPL'], [1])
+        self.assertEqual(db.get_hist_fetch_checkpoints(day), {('AAPL', fetch_histdata.DATASET_KEY_STATISTICS)})
+
+
+class QueryPlanTestCase(TestCase):
+
+    def get_query_plan(self, queryset) -> str:
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+    def test_hot_lookups_use_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("query plans are checked on sqlite")
+        trading_date = datetime(2021, 12, 23).date()
+        bar_time = datetime(2021, 12, 23, 14, 30, 20, tzinfo=pytz.utc)
+        HistoricalMinuteBar.objects.create(symbol='AAPL', date=trading_date, time=bar_time.replace(second=0),
+                                           open=1.0, high=1.0, low=1.0, close=1.0, volume=1.0, vwap=1.0)
+        self.assertEqual(db.get_hist_minute_bar('AAPL', bar_time).close, 1.0)
+        self.assertIsNone(db.get_hist_minute_bar('AAPL', bar_time + timedelta(minutes=1)))
+        start_time = bar_time.replace(second=0)
+        plans = {
+            'minute_bar': self.get_query_plan(HistoricalMinuteBar.objects.filter(
+                symbol='AAPL', time__gte=start_time, time__lt=start_time + timedelta(minutes=1)).order_by('time')),
+            'day_bars': self.get_query_plan(HistoricalMinuteBar.objects.filter(
+                date=trading_date).order_by('symbol', 'time')),
+            'order': self.get_query_plan(WebullOrder.objects.filter(order_id='1')),
+            'day_trades': self.get_query_plan(DayTrade.objects.filter(
+                sell_date=trading_date, require_adjustment=False)),
+            'symbol_day_trades': self.get_query_plan(DayTrade.objects.filter(
+                symbol='AAPL', sell_date=trading_date, require_adjustment=False)),
+        }
+        # unique constraint index of (symbol, time)
+        self.assertIn("(symbol=? AND time>? AND time<?)", plans['minute_bar'])
+        self.assertIn("USING INDEX hist_minute_bar_date_idx", plans['day_bars'])
+        self.assertIn("USING INDEX webull_order_id_idx", plans['order'])
+        self.assertIn("USING INDEX day_trade_sell_date_idx", plans['day_trades'])
+        self.assertIn("USING INDEX day_trade_symbol_idx", plans['symbol_day_trades'])
+        for plan in plans.values():
+            self.assertTrue(plan.startswith("SEARCH"))
+            # ordering is served by index
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+class BenchmarkTestCase(TestCase):
+
+    def test_filters_in_one_pass(self):
+        from scripts import benchmark
+
+        trading_date = datetime(2021, 12, 23).date()
+        # regular trades at 10:00, 10:01 and pre market trade at 8:00
+        trade_times = [datetime(2021, 12, 23, 15, 0, 30, tzinfo=pytz.utc), datetime(2021, 12, 23, 15, 1, tzinfo=pytz.utc),
+                       datetime(2021, 12, 23, 13, 0, tzinfo=pytz.utc)]
+        volumes = [200000.0, 50000.0, 30000.0]
+        for i, trade_time in enumerate(trade_times):
+            DayTrade.objects.create(symbol='AAPL', ticker_id='1', order_ids='', total_cost=100.0 * (i + 1), total_sold=110.0 * (i + 1) if i != 1 else 50.0,
+                                    quantity=10, units=1, buy_date=trading_date, buy_time=trade_time, sell_date=trading_date,
+                                    sell_time=trade_time + timedelta(minutes=5), setup=SetupType.DAY_20_CANDLES_NEW_HIGH)
+            HistoricalMinuteBar.objects.create(symbol='AAPL', date=trading_date, time=trade_time.replace(second=0),
+                                               open=1.0, high=1.0, low=1.0, close=1.0, volume=volumes[i], vwap=1.0)
+        # trade without entry bar
+        DayTrade.objects.create(symbol='TSLA', ticker_id='2', order_ids='', total_cost=100.0, total_sold=90.0,
+                                quantity=1, units=1, buy_date=trading_date, buy_time=trade_times[0], sell_date=trading_date,
+                                sell_time=trade_times[0], setup=SetupType.DAY_10_CANDLES_NEW_HIGH)
+        filters = benchmark.get_volume_filters([100000, 10000], [20000]) + [
+            benchmark.BenchmarkFilter(min_price=15.0),
+            benchmark.BenchmarkFilter(setups=[SetupType.DAY_10_CANDLES_NEW_HIGH])]
+        with mock.patch('builtins.print'), self.assertNumQueries(2):
+            results = benchmark.start(filters)
+        self.assertEqual([(result["trades"], result["profit_loss"]) for result in results], [
+            (4, -120.0), (1, 10.0), (2, -140.0), (1, 30.0), (3, -130.0), (1, -10.0)])
+        self.assertEqual(results[1]["filter"], "Volume > 100000 (regular)")
+        self.assertEqual(results[1]["profit_loss_rate"], 10.0)
+        # same results with entry bars from bar store
+        with ExitStack() as stack:
+            stack.enter_context(override_settings(BAR_STORE_DIR=stack.enter_context(tempfile.TemporaryDirectory())))
+            bar_store.sync_day_from_db(trading_date)
+            HistoricalMinuteBar.objects.all().delete()
+            with mock.patch('builtins.print'):
+                self.assertEqual(benchmark.start(filters), results)
+
+
+class DayTradeFactsTestCase(TestCase):
+
+    def create_day_trade(self, symbol: str, buy_time: datetime, total_cost: float, total_sold: float) -> DayTrade:
+        return DayTrade.objects.create(symbol=symbol, ticker_id='1', order_ids='', total_cost=total_cost, total_sold=total_sold,
+                                       quantity=10, units=1, buy_date=buy_time.date(), buy_time=buy_time, sell_date=buy_time.date(),
+                                       sell_time=buy_time + timedelta(minutes=2), require_adjustment=False,
+                                       setup=SetupType.DAY_20_CANDLES_NEW_HIGH)
+
+    def test_build_and_aggregate_facts(self):
+        trading_date = datetime(2021, 12, 23).date()
+        # regular trade at 10:00:30 and pre market trade at 8:00
+        regular_trade = self.create_day_trade(
+            'AAPL', datetime(2021, 12, 23, 15, 0, 30, tzinfo=pytz.utc), 100.0, 120.0)
+        pre_trade = self.create_day_trade(
+            'TSLA', datetime(2021, 12, 23, 13, 0, tzinfo=pytz.utc), 200.0, 190.0)
+        for minute, volume in [(58, 1000.0), (59, 3000.0), (0, 9000.0)]:
+            HistoricalMinuteBar.objects.create(symbol='AAPL', date=trading_date,
+                                               time=datetime(2021, 12, 23, 15 if minute == 0 else 14, minute, tzinfo=pytz.utc),
+                                               open=1.0, high=1.0, low=1.0, close=1.0, volume=volume, vwap=1.0)
+        for day, bar_open, bar_close in [(22, 9.0, 10.0), (23, 12.0, 11.0)]:
+            HistoricalDailyBar.objects.create(symbol='AAPL', date=datetime(2021, 12, day).date(),
+                                              open=bar_open, high=12.0, low=9.0, close=bar_close, volume=1.0)
+        HistoricalKeyStatistics.objects.create(
+            symbol='AAPL', open=1.0, high=1.0, low=1.0, close=1.0, change=0.0, change_ratio=0.0, market_value=5e8,
+            volume=3e6, avg_vol_10d=1.0, avg_vol_3m=1e6, fifty_two_wk_high=1.0, fifty_two_wk_low=1.0,
+            latest_earnings_date='', estimate_earnings_date='', date=trading_date)
+        StockQuote.objects.create(symbol='AAPL', price=1.0, volume=1.0, change=0.0,
+                                  change_percentage=0.0, sector='Healthcare')
+
+        # key statistics, daily bars, minute bars and quotes
+        with self.assertNumQueries(4):
+            facts_list = db.build_day_trade_facts([regular_trade, pre_trade])
+        self.assertEqual(db.save_day_trade_facts(
+            DayTrade.objects.all()), 2)
+        # rebuild replaces facts
+        self.assertEqual(db.save_day_trade_facts(
+            DayTrade.objects.all()), 2)
+        self.assertEqual(DayTradeFacts.objects.count(), 2)
+
+        facts = regular_trade.facts
+        self.assertEqual(facts.trading_hour, TradingHourType.REGULAR)
+        self.assertEqual(facts.entry_price, 10.0)
+        self.assertEqual(facts.market_value, 5e8)
+        self.assertEqual(facts.relative_volume, 3.0)
+        self.assertEqual(facts.gap, 20.0)
+        # bars of 9:58 and 9:59
+        self.assertEqual(facts.pre_entry_volume, 2000.0)
+        self.assertEqual(facts.sector, 'Healthcare')
+        self.assertEqual(facts.holding_sec, 120)
+        self.assertEqual(facts.profit_loss_pct, 20.0)
+        self.assertEqual(facts_list[1].trading_hour,
+                         TradingHourType.BEFORE_MARKET_OPEN)
+        # trade without key statistics, bars and quote
+        facts = DayTradeFacts.objects.get(day_trade=pre_trade)
+        self.assertIsNone(facts.market_value)
+        self.assertIsNone(facts.sector)
+        self.assertEqual(facts.gap, 0.0)
+        self.assertEqual(facts.pre_entry_volume, 0.0)
+
+        # all reports in one query
+        with self.assertNumQueries(1):
+            mktcap_stat, float_stat, sector_stat, pre_volume_stat = utils.get_day_trade_fact_stats_for_render([
+                bucketing.MARKET_CAP, bucketing.FREE_FLOAT, bucketing.SECTOR, bucketing.PRE_MARKET_VOLUME])
+        self.assertEqual(sum(mktcap_stat['trades']), 1)
+        # key statistics without free float go to None bucket
+        self.assertEqual(float_stat['trades'][0], 1)
+        self.assertEqual(sum(float_stat['trades']), 1)
+        self.assertEqual(sector_stat['trades'][6], 1)
+        self.assertEqual(sector_stat['trades'][-1], 1)
+        self.assertEqual(pre_volume_stat['trades'], [1, 0, 0, 0, 0, 0, 0, 0])
+        self.assertEqual(pre_volume_stat['total_loss'][0], -10.0)
+        # facts of trade require adjustment again are skipped
+        DayTrade.objects.filter(id=pre_trade.id).update(
+            require_adjustment=True)
+        self.assertEqual(db.get_day_trade_fact_columns(
+            ['profit_loss_pct'])['profit_loss_pct'].tolist(), [20.0])
+
+
+# legacy per trade loop of day reports, reference for bucketing engine
+
+def _legacy_value_stat(value_gains, value_idx_func, size):
+    statistics_list = [{"trades": 0, "win_trades": 0, "loss_trades": 0, "total_profit": 0.0,
+                        "total_loss": 0.0, "profit_loss": 0.0} for _ in range(0, size)]
+    for value, gain in value_gains:
+        value_idx = value_idx_func(value)
+        if gain > 0:
+            statistics_list[value_idx]['win_trades'] += 1
+            statistics_list[value_idx]['total_profit'] += gain
+        else:
+            statistics_list[value_idx]['loss_trades'] += 1
+            statistics_list[value_idx]['total_loss'] += gain
+        statistics_list[value_idx]['profit_loss'] += gain
+        statistics_list[value_idx]['trades'] += 1
+    stat = {"profit_loss": [], "total_profit": [], "total_loss": [],
+            "win_rate": [], "profit_loss_ratio": [], "trades": []}
+    for value_stat in statistics_list:
+        stat['trades'].append(value_stat['trades'])
+        stat['profit_loss'].append(utils.get_color_bar_chart_item_for_render(
+            round(value_stat['profit_loss'], 2)))
+        stat['total_profit'].append(round(value_stat['total_profit'], 2))
+        stat['total_loss'].append(round(value_stat['total_loss'], 2))
+        if value_stat['trades'] > 0:
+            stat['win_rate'].append(
+                round(value_stat['win_trades']/value_stat['trades'] * 100, 2))
+        else:
+            stat['win_rate'].append(0.0)
+        avg_profit = 1.0
+        if value_stat['win_trades'] > 0:
+            avg_profit = value_stat['total_profit'] / value_stat['win_trades']
+        avg_loss = 1.0
+        if value_stat['loss_trades'] > 0:
+            avg_loss = value_stat['total_loss'] / value_stat['loss_trades']
+        profit_loss_ratio = 0.0
+        if value_stat['trades'] > 0:
+            profit_loss_ratio = 1.0
+        if value_stat['trades'] > 0 and avg_loss < 0:
+            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
+        stat['profit_loss_ratio'].append(profit_loss_ratio)
+    return stat
+
+
+class BucketingTestCase(TestCase):
+
+    def test_labels_and_edges(self):
+        self.assertEqual(utils.get_market_hourly_interval_labels()[0], "04:00-04:30")
+        self.assertEqual(utils.get_market_hourly_interval_labels()[-1], "19:30-20:00")
+        # value on edge falls in lower bin
+        self.assertEqual(utils.get_entry_price_range_index(1), 0)
+        self.assertEqual(utils.get_entry_price_range_index(1.01), 1)
+        self.assertEqual(utils.get_entry_price_range_index(1000), 15)
+        self.assertEqual(utils.get_free_float_range_index(None), 0)
+        self.assertEqual(utils.get_free_float_range_index(500000), 1)
+        self.assertEqual(utils.get_volume_index(0), 0)
+        self.assertEqual(utils.get_sector_index("Unknown"), 11)
+        self.assertEqual(utils.get_market_hourly_interval_index(datetime(2021, 12, 23, 9, 30)), 11)
+        # out of market hours goes to last bin
+        self.assertEqual(utils.get_market_hourly_interval_index(datetime(2021, 12, 23, 3, 59)), 31)
+        self.assertEqual(utils.get_market_hourly_interval_index(datetime(2021, 12, 23, 20, 0)), 31)
+
+    def test_stats_same_as_trade_loop(self):
+        rng = np.random.default_rng(7)
+        size = 500
+        columns = {
+            "entry_price": np.round(rng.uniform(0, 250, size), 2),
+            "outstanding_shares": np.where(rng.random(size) < 0.2, np.nan, rng.uniform(0, 2e9, size)),
+            "has_key_statistics": rng.random(size) < 0.8,
+            "pre_entry_volume": np.where(rng.random(size) < 0.1, 0.0, rng.uniform(0, 2e6, size)),
+            "trading_hour": rng.integers(0, 3, size).astype(np.float64),
+            "sector": np.array(rng.choice(utils.get_sector_labels()[:-1] + [None, "Other"], size), dtype=object),
+            "profit_loss": np.round(rng.normal(0, 50, size), 2),
+        }
+        columns["profit_loss"][:10] = 0.0
+        dimensions = [bucketing.ENTRY_PRICE, bucketing.FREE_FLOAT,
+                      bucketing.REGULAR_VOLUME, bucketing.SECTOR]
+        stats = [utils.get_bucket_stat_for_render(bucket_stat)
+                 for bucket_stat in bucketing.get_bucket_stats(columns, dimensions)]
+        gains = columns["profit_loss"].tolist()
+        expected = [
+            _legacy_value_stat(zip(columns["entry_price"].tolist(), gains),
+                               utils.get_entry_price_range_index, 16),
+            _legacy_value_stat([(None if np.isnan(value) else value, gain) for value, gain, key_stat in zip(
+                columns["outstanding_shares"].tolist(), gains, columns["has_key_statistics"]) if key_stat],
+                utils.get_free_float_range_index, 28),
+            _legacy_value_stat([(value, gain) for value, gain, trading_hour in zip(
+                columns["pre_entry_volume"].tolist(), gains, columns["trading_hour"]) if trading_hour == TradingHourType.REGULAR],
+                utils.get_volume_index, 8),
+            _legacy_value_stat(zip(columns["sector"].tolist(), gains),
+                               utils.get_sector_index, 12),
+        ]
+        for stat, expected_stat in zip(stats, expected):
+            self.assertEqual(stat, expected_stat)
+
+
+# legacy resample apply implementation of convert_2m_bars and convert_5m_bars, reference for resample_bars
+
+def _legacy_resample_bars(bars: pd.DataFrame, minutes: int) -> pd.DataFrame:
+    resampler = {
+        'open': lambda series: series.iloc[0] if series.size > 0 else 0,
+        'close': lambda series: series.iloc[-1] if series.size > 0 else 0,
+        'high': lambda series: np.max(series) if series.size > 0 else 0,
+        'low': lambda series: np.min(series) if series.size > 0 else 0,
+        'volume': lambda series: np.sum(series) if series.size > 0 else 0,
+        'vwap': lambda series: series.iloc[-1] if series.size > 0 else 0,
+    }
+    resampled_bars = pd.DataFrame()
+    for column, func in resampler.items():
+        resampled_bars[column] = bars[column].resample(
+            pd.Timedelta(minutes=minutes), label="right", closed="right").apply(func)
+    return resampled_bars.loc[(resampled_bars != 0).all(axis=1), :]
+
+
+class ResampleBarsTestCase(TestCase):
+
+    def test_same_as_resample(self):
+        rng = np.random.default_rng(3)
+        index = pd.date_range("2021-12-23 04:00", periods=960, freq="1min",
+                              tz=pytz.timezone('America/New_York'), name="timestamp")
+        # missing minutes and zero volume bars
+        index = index[rng.random(len(index)) > 0.2]
+        closes = np.round(10 + rng.normal(0, 0.1, len(index)).cumsum(), 2)
+        bars = pd.DataFrame({
+            "open": closes + 0.01,
+            "high": closes + 0.05,
+            "low": closes - 0.05,
+            "close": closes,
+            "volume": np.where(rng.random(len(index)) < 0.05, 0.0, rng.integers(1, 10000, len(index)).astype(float)),
+            "vwap": closes,
+        }, index=index)
+        for minutes in [2, 5, 15, 7]:
+            pd.testing.assert_frame_equal(utils.resample_bars(
+                bars, minutes), _legacy_resample_bars(bars, minutes))
+        # no missing bar keeps frequency
+        pd.testing.assert_frame_equal(utils.convert_2m_bars(
+            bars.iloc[:2]), _legacy_resample_bars(bars.iloc[:2], 2))
+        self.assertTrue(utils.convert_5m_bars(pd.DataFrame()).empty)
+
+
+class DayChartPayloadTestCase(TestCase):
+
+    def test_payload_served_from_store(self):
+        from django.contrib.auth.models import User
+        from django.urls import reverse
+
+        day = datetime(2021, 12, 23).date()
+        for i in range(10):
+            HistoricalMinuteBar.objects.create(symbol='AAPL', date=day, time=datetime(2021, 12, 23, 15, i, tzinfo=pytz.utc),
+                                               open=10.0 + i, high=11.0 + i, low=9.0 + i, close=10.5 + i, volume=100.0, vwap=10.0)
+        HistoricalDailyBar.objects.create(symbol='AAPL', date=day, open=10.0, high=20.0, low=9.0, close=19.5, volume=1000.0)
+        for order_id, action, minute in [('1', ActionType.BUY, 2), ('2', ActionType.SELL, 7)]:
+            WebullOrder.objects.create(order_id=order_id, ticker_id='1', symbol='AAPL', action=action, status="Filled",
+                                       price=12.0, avg_price=12.0, filled_time=datetime(2021, 12, 23, 15, minute, 30, tzinfo=pytz.utc),
+                                       setup=SetupType.DAY_20_CANDLES_NEW_HIGH, note="exit")
+        DayTrade.objects.create(symbol='AAPL', ticker_id='1', order_ids='1,2', total_cost=120.0, total_sold=170.0, quantity=10,
+                                units=1, buy_date=day, buy_time=datetime(2021, 12, 23, 15, 2, 30, tzinfo=pytz.utc), sell_date=day,
+                                sell_time=datetime(2021, 12, 23, 15, 7, 30, tzinfo=pytz.utc), require_adjustment=False,
+                                setup=SetupType.DAY_20_CANDLES_NEW_HIGH)
+
+        payload = utils.get_day_chart_payload_for_render('AAPL', day)
+        self.assertEqual(len(payload['m1_candle_data']['candles']), 10)
+        # same payload from bar store
+        with ExitStack() as stack:
+            stack.enter_context(override_settings(BAR_STORE_DIR=stack.enter_context(tempfile.TemporaryDirectory())))
+            bar_store.sync_day_from_db(day)
+            with self.assertNumQueries(0):
+                m1_bars = bar_store.read_day_bars_df('AAPL', day)
+            self.assertEqual(len(m1_bars), 10)
+            self.assertEqual(utils.get_day_chart_payload_for_render('AAPL', day), payload)
+        self.assertEqual(len(payload['m5_candle_data']['candles']), 3)
+        self.assertEqual(len(payload['m2_trade_price_records']), 2)
+        self.assertEqual(len(payload['d1_candle_data']['candles']), 1)
+        self.assertIsNone(db.get_hist_day_chart_payload(day, 'AAPL'))
+        db.save_hist_day_chart_payload(day, 'AAPL', payload)
+        self.assertEqual(db.get_hist_day_chart_payload(day, 'AAPL'), payload)
+        # render same chart data after json round trip
+        self.assertEqual(str(db.get_hist_day_chart_payload(day, 'AAPL')), str(payload))
+
+        user = User.objects.create_user('trader', password='trader')
+        self.client.force_login(user)
+        with mock.patch('common.utils.get_day_chart_payload_for_render') as get_payload:
+            response = self.client.get(reverse('day_analytics_date_symbol', args=['2021-12-23', 'AAPL']))
+        get_payload.assert_not_called()
+        self.assertEqual(response.context['m5_candle_data'], payload['m5_candle_data'])
+        self.assertEqual(response.context['trade_records'][0]['note'], "exit")
+
+        # symbol without minute bars is not saved
+        from scripts import fetch_histdata
+        for dataset in [fetch_histdata.DATASET_MINUTE_BARS, fetch_histdata.DATASET_DAILY_BARS]:
+            for symbol in ['AAPL', 'TSLA']:
+                db.save_hist_fetch_checkpoint(day, symbol, dataset)
+        with mock.patch('builtins.print'):
+            fetch_histdata.save_symbols_chart_payload(day, ['AAPL', 'TSLA'])
+        self.assertIsNotNone(db.get_hist_day_chart_payload(day, 'AAPL'))
+        self.assertIsNone(db.get_hist_day_chart_payload(day, 'TSLA'))
+
+
+class ReportCacheTestCase(TestCase):
+
+    def test_versions_invalidate_reports(self):
+        from django.core.cache import cache
+        from common import report_cache
+        from scripts import warm_reports
+
+        day_key = report_cache.get_context_key('day_reports_price')
+        daily_key = report_cache.get_context_key('day_reports_daily')
+        swing_key = report_cache.get_context_key('swing_analytics_symbol', 'AAPL')
+        self.assertEqual(report_cache.get_context_key('day_reports_price'), day_key)
+        self.assertNotEqual(swing_key, report_cache.get_context_key('swing_analytics_symbol', 'TSLA'))
+
+        with mock.patch('builtins.print'):
+            warm_reports.start()
+        self.assertIsNotNone(cache.get(day_key))
+        self.assertIsNotNone(cache.get(daily_key))
+
+        # day trade save bumps day reports only
+        trade_time = datetime(2021, 12, 23, 15, 0, tzinfo=pytz.utc)
+        day_trade = DayTrade.objects.create(symbol='AAPL', ticker_id='1', order_ids='', total_cost=100.0, total_sold=120.0,
+                                            quantity=10, units=1, buy_date=trade_time.date(), buy_time=trade_time,
+                                            sell_date=trade_time.date(), sell_time=trade_time, require_adjustment=False,
+                                            setup=SetupType.DAY_20_CANDLES_NEW_HIGH)
+        day_key_after_save = report_cache.get_context_key('day_reports_price')
+        self.assertNotEqual(day_key_after_save, day_key)
+        self.assertEqual(report_cache.get_context_key('day_reports_daily'), daily_key)
+        self.assertEqual(report_cache.get_context_key('swing_analytics_symbol', 'AAPL'), swing_key)
+        # swing daily bars bulk created without save signal
+        with mock.patch('builtins.print'):
+            db.save_swing_hist_daily_bar_list([{'symbol': 'AAPL', 'date': trade_time.date(), 'open': 1.0, 'high': 1.0,
+                                                'low': 1.0, 'close': 1.0, 'volume': 1.0, 'rsi_10': 1.0, 'sma_55': 1.0,
+                                                'sma_120': 1.0}])
+        self.assertNotEqual(report_cache.get_context_key('swing_analytics_symbol', 'AAPL'), swing_key)
+        # facts bulk created without save signal
+        db.save_day_trade_facts([day_trade])
+        self.assertNotEqual(report_cache.get_context_key('day_reports_price'), day_key_after_save)
+        # evicted version is never reused
+        cache.delete(report_cache.get_version_key(report_cache.VERSION_DAY_TRADE_PERF))
+        self.assertNotEqual(report_cache.get_context_key('day_reports_daily'), daily_key)
+        # warm up builds facts of trades without facts
+        DayTradeFacts.objects.all().delete()
+        with mock.patch('builtins.print'):
+            warm_reports.start()
+        self.assertEqual(DayTradeFacts.objects.count(), 1)
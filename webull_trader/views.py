@@ -1,13 +1,15 @@
-import pandas as pd
-from datetime import date, datetime, timedelta
+import numpy as np
+from datetime import date, datetime
 from django.shortcuts import get_list_or_404, get_object_or_404, render
 from django.contrib.auth.decorators import login_required
 from django.core.cache import cache
 from sdk import fmpsdk
-from common import utils, config, db
+from backtest import config as backtest_config
+from common import bucketing, report_cache, utils, config, db
+from logger import trading_logger
 from common.enums import SetupType, TradingHourType
 from webull_trader.models import DayTrade, EarningCalendar, HistoricalDayTradePerformance, HistoricalMarketStatistics, \
-    HistoricalMinuteBar, StockQuote, SwingHistoricalDailyBar, SwingPosition, SwingTrade, WebullAccountStatistics, \
+    StockQuote, SwingHistoricalDailyBar, SwingPosition, SwingTrade, WebullAccountStatistics, \
     WebullNews, TradingLog, ExceptionLog, WebullOrder
 
 # Create your views here.
@@ -113,7 +115,9 @@ def logs(request):
     algo_type_texts = utils.get_algo_type_texts()
 
     trading_logs = []
-    trading_log_list = list(TradingLog.objects.order_by('-id')[:100])
+    # backtest logs share dates with live logs, only list live logs
+    trading_log_list = list(TradingLog.objects.exclude(
+        tag=backtest_config.BACKTEST_LOG_TAG).order_by('-id')[:100])
     for log in trading_log_list:
         log: TradingLog = log
         days = (date.today() - log.date).days
@@ -186,8 +190,10 @@ def trading_logs_date_hour(request, date=None, hour=None):
     elif hour == "amc":
         trading_hour = TradingHourType.AFTER_MARKET_CLOSE
 
-    log = get_object_or_404(TradingLog, date=date, trading_hour=trading_hour)
-    log_lines = log.log_text.splitlines()
+    log = get_object_or_404(TradingLog.objects.exclude(
+        tag=backtest_config.BACKTEST_LOG_TAG), date=date, trading_hour=trading_hour)
+    # lines of legacy log text and log chunks
+    log_lines = list(trading_logger.iter_log_lines(log))
 
     return render(request, 'webull_trader/trading_logs_date_hour.html', {
         "account_type": account_type,
@@ -339,47 +345,7 @@ def day_analytics_date(request, date=None):
     day_trades = DayTrade.objects.filter(
         sell_date=acc_stat.date, require_adjustment=False)
     print(len(day_trades))
-    hourly_statistics = utils.get_stats_empty_list(size=32)
-    # for hourly P&L, win rate and profit/loss ratio, trades
-    for day_trade in day_trades:
-        hourly_idx = utils.get_market_hourly_interval_index(
-            utils.local_datetime(day_trade.buy_time))
-        gain = day_trade.total_sold - day_trade.total_cost
-        if gain > 0:
-            hourly_statistics[hourly_idx]['win_trades'] += 1
-            hourly_statistics[hourly_idx]['total_profit'] += gain
-        else:
-            hourly_statistics[hourly_idx]['loss_trades'] += 1
-            hourly_statistics[hourly_idx]['total_loss'] += gain
-        hourly_statistics[hourly_idx]['profit_loss'] += gain
-        hourly_statistics[hourly_idx]['trades'] += 1
-    hourly_profit_loss = []
-    hourly_win_rate = []
-    hourly_profit_loss_ratio = []
-    hourly_trades = []
-    # calculate win rate and profit/loss ratio
-    for hourly_stat in hourly_statistics:
-        hourly_trades.append(hourly_stat['trades'])
-        hourly_profit_loss.append(utils.get_color_bar_chart_item_for_render(
-            round(hourly_stat['profit_loss'], 2)))
-        if hourly_stat['trades'] > 0:
-            hourly_win_rate.append(
-                round(hourly_stat['win_trades']/hourly_stat['trades'] * 100, 2))
-        else:
-            hourly_win_rate.append(0.0)
-        avg_profit = 1.0
-        if hourly_stat['win_trades'] > 0:
-            avg_profit = hourly_stat['total_profit'] / \
-                hourly_stat['win_trades']
-        avg_loss = 1.0
-        if hourly_stat['loss_trades'] > 0:
-            avg_loss = hourly_stat['total_loss'] / hourly_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if hourly_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if hourly_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        hourly_profit_loss_ratio.append(profit_loss_ratio)
+    hourly_stat = utils.get_hourly_stat_from_trades_for_render(day_trades)
 
     # for trade records group by symbol
     trades_dist = utils.get_trade_stat_dist_from_day_trades(day_trades)
@@ -403,101 +369,43 @@ def day_analytics_date(request, date=None):
         "win_rate": "{}%".format(daytrade_perf.win_rate),
         "profit_loss_ratio": daytrade_perf.profit_loss_ratio,
         "hourly_labels": utils.get_market_hourly_interval_labels(),
-        "hourly_profit_loss": hourly_profit_loss,
-        "hourly_win_rate": hourly_win_rate,
-        "hourly_profit_loss_ratio": hourly_profit_loss_ratio,
-        "hourly_trades": hourly_trades,
+        "hourly_profit_loss": hourly_stat['profit_loss'],
+        "hourly_win_rate": hourly_stat['win_rate'],
+        "hourly_profit_loss_ratio": hourly_stat['profit_loss_ratio'],
+        "hourly_trades": hourly_stat['trades'],
         "trade_records": trade_records,
     })
 
 
 @login_required
 def day_analytics_date_symbol(request, date=None, symbol=None):
-    # minute_bars = get_list_or_404(
-    #     HistoricalMinuteBar, date=date, symbol=symbol)
-
-    minute_bars = HistoricalMinuteBar.objects.filter(symbol=symbol, date=date)
-
     # account type data
     account_type = utils.get_account_type_for_render()
 
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    timestamps = []
-    # for load data frame
-    m1_data_for_df = {
-        "open": [],
-        "high": [],
-        "low": [],
-        "close": [],
-        "volume": [],
-        "vwap": [],
-    }
-    for minute_bar in minute_bars:
-        timestamps.append(minute_bar.time)
-        m1_data_for_df['open'].append(minute_bar.open)
-        m1_data_for_df['high'].append(minute_bar.high)
-        m1_data_for_df['low'].append(minute_bar.low)
-        m1_data_for_df['close'].append(minute_bar.close)
-        m1_data_for_df['volume'].append(minute_bar.volume)
-        m1_data_for_df['vwap'].append(minute_bar.vwap)
-
-    m1_bars = pd.DataFrame(m1_data_for_df, index=timestamps)
-    # calculate and fill ema 9 data
-    m1_bars['ema9'] = m1_bars['close'].ewm(span=9, adjust=False).mean()
-    # load 1m data for render
-    m1_candle_data = utils.get_minute_candle_data_for_render(m1_bars)
-    # calculate 2m bars
-    m2_bars = utils.convert_2m_bars(m1_bars)
-    # calculate and fill ema 9 data
-    if not m2_bars.empty:
-        m2_bars['ema9'] = m2_bars['close'].ewm(span=9, adjust=False).mean()
-    # load 2m data for render
-    m2_candle_data = utils.get_minute_candle_data_for_render(m2_bars)
-    # calculate 5m bars
-    m5_bars = utils.convert_5m_bars(m1_bars)
-    # calculate and fill ema 9 data
-    if not m5_bars.empty:
-        m5_bars['ema9'] = m5_bars['close'].ewm(span=9, adjust=False).mean()
-    # load 5m data for render
-    m5_candle_data = utils.get_minute_candle_data_for_render(m5_bars)
     # analytics date
     analytics_date = datetime.strptime(date, '%Y-%m-%d').date()
-    # calculate daily candle
-    d1_candle_data = utils.get_last_60d_daily_candle_data_for_render(
-        symbol, analytics_date)
-    # buy/sell orders
-    buy_orders, sell_orders = utils.get_day_trade_orders(
-        date=analytics_date, symbol=symbol)
-    # 1m trade records
-    m1_trade_price_buy_records, m1_trade_quantity_buy_records = utils.get_minutes_trade_marker_from_orders_for_render(
-        buy_orders, m1_candle_data, 1)
-    m1_trade_price_sell_records, m1_trade_quantity_sell_records = utils.get_minutes_trade_marker_from_orders_for_render(
-        sell_orders, m1_candle_data, 1)
-    m1_trade_price_records = m1_trade_price_buy_records + m1_trade_price_sell_records
-    m1_trade_quantity_records = m1_trade_quantity_buy_records + \
-        m1_trade_quantity_sell_records
-    # 2m trade records
-    m2_trade_price_buy_records, m2_trade_quantity_buy_records = utils.get_minutes_trade_marker_from_orders_for_render(
-        buy_orders, m2_candle_data, 2)
-    m2_trade_price_sell_records, m2_trade_quantity_sell_records = utils.get_minutes_trade_marker_from_orders_for_render(
-        sell_orders, m2_candle_data, 2)
-    m2_trade_price_records = m2_trade_price_buy_records + m2_trade_price_sell_records
-    m2_trade_quantity_records = m2_trade_quantity_buy_records + \
-        m2_trade_quantity_sell_records
-    # 5m trade records
-    m5_trade_price_buy_records, m5_trade_quantity_buy_records = utils.get_minutes_trade_marker_from_orders_for_render(
-        buy_orders, m5_candle_data, 5)
-    m5_trade_price_sell_records, m5_trade_quantity_sell_records = utils.get_minutes_trade_marker_from_orders_for_render(
-        sell_orders, m5_candle_data, 5)
-    m5_trade_price_records = m5_trade_price_buy_records + m5_trade_price_sell_records
-    m5_trade_quantity_records = m5_trade_quantity_buy_records + \
-        m5_trade_quantity_sell_records
+    # candles and trade markers, precomputed after histdata fetched, current day calculated live
+    chart_payload = None
+    if analytics_date < datetime.now().date():
+        chart_payload = db.get_hist_day_chart_payload(analytics_date, symbol)
+    if chart_payload == None:
+        chart_payload = utils.get_day_chart_payload_for_render(
+            symbol, analytics_date)
 
     # day trades
     day_trades = DayTrade.objects.filter(
         symbol=symbol, sell_date=analytics_date, require_adjustment=False)
+    # buy and sell orders of day trades
+    trade_order_ids = []
+    for day_trade in day_trades:
+        order_ids = day_trade.order_ids.split(",")
+        trade_order_ids += [order_ids[0], order_ids[-1]]
+    trade_orders = {}
+    for order in WebullOrder.objects.filter(order_id__in=trade_order_ids).order_by('id'):
+        trade_orders.setdefault(order.order_id, order)
     trade_records = []
     for day_trade in day_trades:
         buy_price = round(day_trade.total_cost / day_trade.quantity, 3)
@@ -517,11 +425,11 @@ def day_analytics_date_symbol(request, date=None, symbol=None):
         sell_order_id = order_ids[-1]
 
         setup = None
-        buy_order = WebullOrder.objects.filter(order_id=buy_order_id).first()
+        buy_order = trade_orders.get(buy_order_id)
         if buy_order:
             setup = SetupType.tostr(buy_order.setup)
         note = None
-        sell_order = WebullOrder.objects.filter(order_id=sell_order_id).first()
+        sell_order = trade_orders.get(sell_order_id)
         if sell_order:
             note = sell_order.note or ""
         trade_records.append({
@@ -565,16 +473,16 @@ def day_analytics_date_symbol(request, date=None, symbol=None):
         "symbol": symbol,
         "account_type": account_type,
         "algo_type_texts": algo_type_texts,
-        "m1_candle_data": m1_candle_data,
-        "m2_candle_data": m2_candle_data,
-        "m5_candle_data": m5_candle_data,
-        "m1_trade_price_records": m1_trade_price_records,
-        "m1_trade_quantity_records": m1_trade_quantity_records,
-        "m2_trade_price_records": m2_trade_price_records,
-        "m2_trade_quantity_records": m2_trade_quantity_records,
-        "m5_trade_price_records": m5_trade_price_records,
-        "m5_trade_quantity_records": m5_trade_quantity_records,
-        "d1_candle_data": d1_candle_data,
+        "m1_candle_data": chart_payload["m1_candle_data"],
+        "m2_candle_data": chart_payload["m2_candle_data"],
+        "m5_candle_data": chart_payload["m5_candle_data"],
+        "m1_trade_price_records": chart_payload["m1_trade_price_records"],
+        "m1_trade_quantity_records": chart_payload["m1_trade_quantity_records"],
+        "m2_trade_price_records": chart_payload["m2_trade_price_records"],
+        "m2_trade_quantity_records": chart_payload["m2_trade_quantity_records"],
+        "m5_trade_price_records": chart_payload["m5_trade_price_records"],
+        "m5_trade_quantity_records": chart_payload["m5_trade_quantity_records"],
+        "d1_candle_data": chart_payload["d1_candle_data"],
         "trade_records": trade_records,
         "trade_stats": trade_stats,
         "news": news,
@@ -586,7 +494,8 @@ def day_analytics_date_symbol(request, date=None, symbol=None):
 @login_required
 def day_reports_price(request):
 
-    cached_context = cache.get('day_reports_price_cache')
+    cache_key = report_cache.get_context_key('day_reports_price')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -596,68 +505,24 @@ def day_reports_price(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    price_statistics = utils.get_stats_empty_list(size=16)
-    # for price range P&L, win rate and profit/loss ratio, trades
-    for day_trade in day_trades:
-        buy_price = (day_trade.total_cost / day_trade.quantity)
-        price_idx = utils.get_entry_price_range_index(buy_price)
-        gain = day_trade.total_sold - day_trade.total_cost
-        if gain > 0:
-            price_statistics[price_idx]['win_trades'] += 1
-            price_statistics[price_idx]['total_profit'] += gain
-        else:
-            price_statistics[price_idx]['loss_trades'] += 1
-            price_statistics[price_idx]['total_loss'] += gain
-        price_statistics[price_idx]['profit_loss'] += gain
-        price_statistics[price_idx]['trades'] += 1
-    price_profit_loss = []
-    price_total_profit = []
-    price_total_loss = []
-    price_win_rate = []
-    price_profit_loss_ratio = []
-    price_trades = []
-    # calculate win rate and profit/loss ratio
-    for price_stat in price_statistics:
-        price_trades.append(price_stat['trades'])
-        price_profit_loss.append(utils.get_color_bar_chart_item_for_render(
-            round(price_stat['profit_loss'], 2)))
-        price_total_profit.append(round(price_stat['total_profit'], 2))
-        price_total_loss.append(round(price_stat['total_loss'], 2))
-        if price_stat['trades'] > 0:
-            price_win_rate.append(
-                round(price_stat['win_trades']/price_stat['trades'] * 100, 2))
-        else:
-            price_win_rate.append(0.0)
-        avg_profit = 1.0
-        if price_stat['win_trades'] > 0:
-            avg_profit = price_stat['total_profit'] / \
-                price_stat['win_trades']
-        avg_loss = 1.0
-        if price_stat['loss_trades'] > 0:
-            avg_loss = price_stat['total_loss'] / price_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if price_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if price_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        price_profit_loss_ratio.append(profit_loss_ratio)
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.ENTRY_PRICE])[0]
 
     context = {
         "account_type": account_type,
         "algo_type_texts": algo_type_texts,
         "title": "Entry Price",
         "labels": utils.get_entry_price_range_labels(),
-        "profit_loss": price_profit_loss,
-        "total_profit": price_total_profit,
-        "total_loss": price_total_loss,
-        "win_rate": price_win_rate,
-        "profit_loss_ratio": price_profit_loss_ratio,
-        "trades": price_trades,
+        "profit_loss": stat_render['profit_loss'],
+        "total_profit": stat_render['total_profit'],
+        "total_loss": stat_render['total_loss'],
+        "win_rate": stat_render['win_rate'],
+        "profit_loss_ratio": stat_render['profit_loss_ratio'],
+        "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_price_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_price'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -665,7 +530,8 @@ def day_reports_price(request):
 @login_required
 def day_reports_price_shares(request):
 
-    cached_context = cache.get('day_reports_price_shares_cache')
+    cache_key = report_cache.get_context_key('day_reports_price_shares')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -676,71 +542,32 @@ def day_reports_price_shares(request):
     algo_type_texts = utils.get_algo_type_texts()
 
     # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    price_statistics = utils.get_stats_empty_list(
-        size=len(utils.get_entry_price_range_labels()))
+    day_trades = DayTrade.objects.filter(
+        require_adjustment=False, quantity__gt=0).values_list('total_cost', 'total_sold', 'quantity')
+    total_costs, total_solds, quantities = np.array(
+        list(day_trades), dtype=np.float64).reshape(-1, 3).T
     NORMALIZED_SHARES = 100
-    # for price range P&L, win rate and profit/loss ratio, trades
-    for day_trade in day_trades:
-        day_trade: DayTrade = day_trade
-        buy_price = (day_trade.total_cost / day_trade.quantity)
-        price_idx = utils.get_entry_price_range_index(buy_price)
-        gain = (day_trade.total_sold - day_trade.total_cost) / \
-            day_trade.quantity * NORMALIZED_SHARES
-        if gain > 0:
-            price_statistics[price_idx]['win_trades'] += 1
-            price_statistics[price_idx]['total_profit'] += gain
-        else:
-            price_statistics[price_idx]['loss_trades'] += 1
-            price_statistics[price_idx]['total_loss'] += gain
-        price_statistics[price_idx]['profit_loss'] += gain
-        price_statistics[price_idx]['trades'] += 1
-    price_profit_loss = []
-    price_total_profit = []
-    price_total_loss = []
-    price_win_rate = []
-    price_profit_loss_ratio = []
-    price_trades = []
-    # calculate win rate and profit/loss ratio
-    for price_stat in price_statistics:
-        price_trades.append(price_stat['trades'])
-        price_profit_loss.append(utils.get_color_bar_chart_item_for_render(
-            round(price_stat['profit_loss'], 2)))
-        price_total_profit.append(round(price_stat['total_profit'], 2))
-        price_total_loss.append(round(price_stat['total_loss'], 2))
-        if price_stat['trades'] > 0:
-            price_win_rate.append(
-                round(price_stat['win_trades']/price_stat['trades'] * 100, 2))
-        else:
-            price_win_rate.append(0.0)
-        avg_profit = 1.0
-        if price_stat['win_trades'] > 0:
-            avg_profit = price_stat['total_profit'] / \
-                price_stat['win_trades']
-        avg_loss = 1.0
-        if price_stat['loss_trades'] > 0:
-            avg_loss = price_stat['total_loss'] / price_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if price_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if price_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        price_profit_loss_ratio.append(profit_loss_ratio)
+    columns = {
+        "entry_price": total_costs / quantities,
+        "profit_loss": (total_solds - total_costs) / quantities * NORMALIZED_SHARES,
+    }
+    stat_render = utils.get_bucket_stat_for_render(
+        bucketing.get_bucket_stats(columns, [bucketing.ENTRY_PRICE])[0])
 
     context = {
         "account_type": account_type,
         "algo_type_texts": algo_type_texts,
         "title": "Entry Price (Normalized Shares)",
         "labels": utils.get_entry_price_range_labels(),
-        "profit_loss": price_profit_loss,
-        "total_profit": price_total_profit,
-        "total_loss": price_total_loss,
-        "win_rate": price_win_rate,
-        "profit_loss_ratio": price_profit_loss_ratio,
-        "trades": price_trades,
+        "profit_loss": stat_render['profit_loss'],
+        "total_profit": stat_render['total_profit'],
+        "total_loss": stat_render['total_loss'],
+        "win_rate": stat_render['win_rate'],
+        "profit_loss_ratio": stat_render['profit_loss_ratio'],
+        "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_price_shares_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_price_shares'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -748,7 +575,8 @@ def day_reports_price_shares(request):
 @login_required
 def day_reports_mktcap(request):
 
-    cached_context = cache.get('day_reports_mktcap_cache')
+    cache_key = report_cache.get_context_key('day_reports_mktcap')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -758,13 +586,9 @@ def day_reports_mktcap(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    stat_render = utils.get_value_stat_from_trades_for_render(
-        day_trades,
-        "market_value",
-        utils.get_market_cap_range_index,
-        utils.get_market_cap_range_labels())
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.MARKET_CAP])[0]
 
     context = {
         "account_type": account_type,
@@ -779,7 +603,7 @@ def day_reports_mktcap(request):
         "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_mktcap_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_mktcap'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -787,7 +611,8 @@ def day_reports_mktcap(request):
 @login_required
 def day_reports_float(request):
 
-    cached_context = cache.get('day_reports_float_cache')
+    cache_key = report_cache.get_context_key('day_reports_float')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -797,13 +622,9 @@ def day_reports_float(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    stat_render = utils.get_value_stat_from_trades_for_render(
-        day_trades,
-        "outstanding_shares",
-        utils.get_free_float_range_index,
-        utils.get_free_float_range_labels())
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.FREE_FLOAT])[0]
 
     context = {
         "account_type": account_type,
@@ -818,7 +639,7 @@ def day_reports_float(request):
         "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_float_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_float'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -826,7 +647,8 @@ def day_reports_float(request):
 @login_required
 def day_reports_turnover(request):
 
-    cached_context = cache.get('day_reports_turnover_cache')
+    cache_key = report_cache.get_context_key('day_reports_turnover')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -836,13 +658,9 @@ def day_reports_turnover(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    stat_render = utils.get_value_stat_from_trades_for_render(
-        day_trades,
-        "turnover_rate",
-        utils.get_turnover_ratio_range_index,
-        utils.get_turnover_ratio_range_labels())
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.TURNOVER_RATIO])[0]
 
     context = {
         "account_type": account_type,
@@ -857,7 +675,7 @@ def day_reports_turnover(request):
         "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_turnover_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_turnover'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -865,7 +683,8 @@ def day_reports_turnover(request):
 @login_required
 def day_reports_short(request):
 
-    cached_context = cache.get('day_reports_short_cache')
+    cache_key = report_cache.get_context_key('day_reports_short')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -875,13 +694,9 @@ def day_reports_short(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    stat_render = utils.get_value_stat_from_trades_for_render(
-        day_trades,
-        "short_float",
-        utils.get_short_float_range_index,
-        utils.get_short_float_range_labels())
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.SHORT_FLOAT])[0]
 
     context = {
         "account_type": account_type,
@@ -896,7 +711,7 @@ def day_reports_short(request):
         "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_short_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_short'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -904,7 +719,8 @@ def day_reports_short(request):
 @login_required
 def day_reports_gap(request):
 
-    cached_context = cache.get('day_reports_gap_cache')
+    cache_key = report_cache.get_context_key('day_reports_gap')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -914,70 +730,24 @@ def day_reports_gap(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    gap_statistics = utils.get_stats_empty_list(
-        size=len(utils.get_gap_range_labels()))
-    # for P&L, win rate and profit/loss ratio, trades by gap
-    for day_trade in day_trades:
-        gap = utils.get_gap_by_symbol_date(
-            day_trade.symbol, day_trade.buy_date)
-        gap_idx = utils.get_gap_range_index(gap)
-        gain = day_trade.total_sold - day_trade.total_cost
-        if gain > 0:
-            gap_statistics[gap_idx]['win_trades'] += 1
-            gap_statistics[gap_idx]['total_profit'] += gain
-        else:
-            gap_statistics[gap_idx]['loss_trades'] += 1
-            gap_statistics[gap_idx]['total_loss'] += gain
-        gap_statistics[gap_idx]['profit_loss'] += gain
-        gap_statistics[gap_idx]['trades'] += 1
-    gap_profit_loss = []
-    gap_total_profit = []
-    gap_total_loss = []
-    gap_win_rate = []
-    gap_profit_loss_ratio = []
-    gap_trades = []
-    # calculate win rate and profit/loss ratio
-    for gap_stat in gap_statistics:
-        gap_trades.append(gap_stat['trades'])
-        gap_profit_loss.append(utils.get_color_bar_chart_item_for_render(
-            round(gap_stat['profit_loss'], 2)))
-        gap_total_profit.append(round(gap_stat['total_profit'], 2))
-        gap_total_loss.append(round(gap_stat['total_loss'], 2))
-        if gap_stat['trades'] > 0:
-            gap_win_rate.append(
-                round(gap_stat['win_trades']/gap_stat['trades'] * 100, 2))
-        else:
-            gap_win_rate.append(0.0)
-        avg_profit = 1.0
-        if gap_stat['win_trades'] > 0:
-            avg_profit = gap_stat['total_profit'] / \
-                gap_stat['win_trades']
-        avg_loss = 1.0
-        if gap_stat['loss_trades'] > 0:
-            avg_loss = gap_stat['total_loss'] / gap_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if gap_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if gap_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        gap_profit_loss_ratio.append(profit_loss_ratio)
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.GAP])[0]
 
     context = {
         "account_type": account_type,
         "algo_type_texts": algo_type_texts,
         "title": "Gap %",
         "labels": utils.get_gap_range_labels(),
-        "profit_loss": gap_profit_loss,
-        "total_profit": gap_total_profit,
-        "total_loss": gap_total_loss,
-        "win_rate": gap_win_rate,
-        "profit_loss_ratio": gap_profit_loss_ratio,
-        "trades": gap_trades,
+        "profit_loss": stat_render['profit_loss'],
+        "total_profit": stat_render['total_profit'],
+        "total_loss": stat_render['total_loss'],
+        "win_rate": stat_render['win_rate'],
+        "profit_loss_ratio": stat_render['profit_loss_ratio'],
+        "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_gap_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_gap'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -985,7 +755,8 @@ def day_reports_gap(request):
 @login_required
 def day_reports_relvol(request):
 
-    cached_context = cache.get('day_reports_relvol_cache')
+    cache_key = report_cache.get_context_key('day_reports_relvol')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -995,74 +766,24 @@ def day_reports_relvol(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    relvol_statistics = utils.get_stats_empty_list(
-        size=len(utils.get_relative_volume_labels()))
-    # for P&L, win rate and profit/loss ratio, trades by relative volume
-    for day_trade in day_trades:
-        symbol = day_trade.symbol
-        buy_date = day_trade.buy_date
-        key_statistics = db.get_hist_key_stat(symbol, buy_date)
-        if key_statistics:
-            relative_volume = round(
-                key_statistics.volume / key_statistics.avg_vol_3m, 2)
-            relvol_idx = utils.get_relative_volume_index(relative_volume)
-            gain = day_trade.total_sold - day_trade.total_cost
-            if gain > 0:
-                relvol_statistics[relvol_idx]['win_trades'] += 1
-                relvol_statistics[relvol_idx]['total_profit'] += gain
-            else:
-                relvol_statistics[relvol_idx]['loss_trades'] += 1
-                relvol_statistics[relvol_idx]['total_loss'] += gain
-            relvol_statistics[relvol_idx]['profit_loss'] += gain
-            relvol_statistics[relvol_idx]['trades'] += 1
-    relvol_profit_loss = []
-    relvol_total_profit = []
-    relvol_total_loss = []
-    relvol_win_rate = []
-    relvol_profit_loss_ratio = []
-    relvol_trades = []
-    # calculate win rate and profit/loss ratio
-    for relvol_stat in relvol_statistics:
-        relvol_trades.append(relvol_stat['trades'])
-        relvol_profit_loss.append(utils.get_color_bar_chart_item_for_render(
-            round(relvol_stat['profit_loss'], 2)))
-        relvol_total_profit.append(round(relvol_stat['total_profit'], 2))
-        relvol_total_loss.append(round(relvol_stat['total_loss'], 2))
-        if relvol_stat['trades'] > 0:
-            relvol_win_rate.append(
-                round(relvol_stat['win_trades']/relvol_stat['trades'] * 100, 2))
-        else:
-            relvol_win_rate.append(0.0)
-        avg_profit = 1.0
-        if relvol_stat['win_trades'] > 0:
-            avg_profit = relvol_stat['total_profit'] / \
-                relvol_stat['win_trades']
-        avg_loss = 1.0
-        if relvol_stat['loss_trades'] > 0:
-            avg_loss = relvol_stat['total_loss'] / relvol_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if relvol_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if relvol_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        relvol_profit_loss_ratio.append(profit_loss_ratio)
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.RELATIVE_VOLUME])[0]
 
     context = {
         "account_type": account_type,
         "algo_type_texts": algo_type_texts,
         "title": "Relative Volume",
         "labels": utils.get_relative_volume_labels(),
-        "profit_loss": relvol_profit_loss,
-        "total_profit": relvol_total_profit,
-        "total_loss": relvol_total_loss,
-        "win_rate": relvol_win_rate,
-        "profit_loss_ratio": relvol_profit_loss_ratio,
-        "trades": relvol_trades,
+        "profit_loss": stat_render['profit_loss'],
+        "total_profit": stat_render['total_profit'],
+        "total_loss": stat_render['total_loss'],
+        "win_rate": stat_render['win_rate'],
+        "profit_loss_ratio": stat_render['profit_loss_ratio'],
+        "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_relvol_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_relvol'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -1070,7 +791,8 @@ def day_reports_relvol(request):
 @login_required
 def day_reports_regvol(request):
 
-    cached_context = cache.get('day_reports_regvol_cache')
+    cache_key = report_cache.get_context_key('day_reports_regvol')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -1080,87 +802,24 @@ def day_reports_regvol(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    volume_statistics = utils.get_stats_empty_list(
-        size=len(utils.get_volume_labels()))
-    # for P&L, win rate and profit/loss ratio, trades by relative volume
-    for day_trade in day_trades:
-        day_trade: DayTrade = day_trade
-        symbol = day_trade.symbol
-        buy_time = day_trade.buy_time
-        local_time = utils.local_datetime(buy_time)
-        # check regular hour
-        if not utils.is_regular_market_time(local_time):
-            continue
-        bars = []
-        for i in range(1, 3):
-            m_time = local_time - timedelta(minutes=i)
-            m_bar = db.get_hist_minute_bar(symbol, m_time)
-            # m_bar = db.get_hist_minute_bar(symbol, m_time)
-            if m_bar:
-                bars.append(m_bar)
-        avg_volume = 0
-        if len(bars) > 0:
-            total_vol = sum([bar.volume for bar in bars])
-            avg_volume = total_vol / len(bars)
-        vol_idx = utils.get_volume_index(avg_volume)
-        gain = day_trade.total_sold - day_trade.total_cost
-        if gain > 0:
-            volume_statistics[vol_idx]['win_trades'] += 1
-            volume_statistics[vol_idx]['total_profit'] += gain
-        else:
-            volume_statistics[vol_idx]['loss_trades'] += 1
-            volume_statistics[vol_idx]['total_loss'] += gain
-        volume_statistics[vol_idx]['profit_loss'] += gain
-        volume_statistics[vol_idx]['trades'] += 1
-
-    volume_profit_loss = []
-    volume_total_profit = []
-    volume_total_loss = []
-    volume_win_rate = []
-    volume_profit_loss_ratio = []
-    volume_trades = []
-    # calculate win rate and profit/loss ratio
-    for relvol_stat in volume_statistics:
-        volume_trades.append(relvol_stat['trades'])
-        volume_profit_loss.append(utils.get_color_bar_chart_item_for_render(
-            round(relvol_stat['profit_loss'], 2)))
-        volume_total_profit.append(round(relvol_stat['total_profit'], 2))
-        volume_total_loss.append(round(relvol_stat['total_loss'], 2))
-        if relvol_stat['trades'] > 0:
-            volume_win_rate.append(
-                round(relvol_stat['win_trades']/relvol_stat['trades'] * 100, 2))
-        else:
-            volume_win_rate.append(0.0)
-        avg_profit = 1.0
-        if relvol_stat['win_trades'] > 0:
-            avg_profit = relvol_stat['total_profit'] / \
-                relvol_stat['win_trades']
-        avg_loss = 1.0
-        if relvol_stat['loss_trades'] > 0:
-            avg_loss = relvol_stat['total_loss'] / relvol_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if relvol_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if relvol_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        volume_profit_loss_ratio.append(profit_loss_ratio)
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.REGULAR_VOLUME])[0]
 
     context = {
         "account_type": account_type,
         "algo_type_texts": algo_type_texts,
         "title": "Regular Hours Volume",
         "labels": utils.get_volume_labels(),
-        "profit_loss": volume_profit_loss,
-        "total_profit": volume_total_profit,
-        "total_loss": volume_total_loss,
-        "win_rate": volume_win_rate,
-        "profit_loss_ratio": volume_profit_loss_ratio,
-        "trades": volume_trades,
+        "profit_loss": stat_render['profit_loss'],
+        "total_profit": stat_render['total_profit'],
+        "total_loss": stat_render['total_loss'],
+        "win_rate": stat_render['win_rate'],
+        "profit_loss_ratio": stat_render['profit_loss_ratio'],
+        "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_regvol_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_regvol'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -1168,7 +827,8 @@ def day_reports_regvol(request):
 @login_required
 def day_reports_bmovol(request):
 
-    cached_context = cache.get('day_reports_bmovol_cache')
+    cache_key = report_cache.get_context_key('day_reports_bmovol')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -1178,87 +838,24 @@ def day_reports_bmovol(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    volume_statistics = utils.get_stats_empty_list(
-        size=len(utils.get_volume_labels()))
-    # for P&L, win rate and profit/loss ratio, trades by relative volume
-    for day_trade in day_trades:
-        day_trade: DayTrade = day_trade
-        symbol = day_trade.symbol
-        buy_time = day_trade.buy_time
-        local_time = utils.local_datetime(buy_time)
-        # check bmo hour
-        if not utils.is_pre_market_time(local_time):
-            continue
-        bars = []
-        for i in range(1, 3):
-            m_time = local_time - timedelta(minutes=i)
-            m_bar = db.get_hist_minute_bar(symbol, m_time)
-            # m_bar = db.get_hist_minute_bar(symbol, m_time)
-            if m_bar:
-                bars.append(m_bar)
-        avg_volume = 0
-        if len(bars) > 0:
-            total_vol = sum([bar.volume for bar in bars])
-            avg_volume = total_vol / len(bars)
-        vol_idx = utils.get_volume_index(avg_volume)
-        gain = day_trade.total_sold - day_trade.total_cost
-        if gain > 0:
-            volume_statistics[vol_idx]['win_trades'] += 1
-            volume_statistics[vol_idx]['total_profit'] += gain
-        else:
-            volume_statistics[vol_idx]['loss_trades'] += 1
-            volume_statistics[vol_idx]['total_loss'] += gain
-        volume_statistics[vol_idx]['profit_loss'] += gain
-        volume_statistics[vol_idx]['trades'] += 1
-
-    volume_profit_loss = []
-    volume_total_profit = []
-    volume_total_loss = []
-    volume_win_rate = []
-    volume_profit_loss_ratio = []
-    volume_trades = []
-    # calculate win rate and profit/loss ratio
-    for relvol_stat in volume_statistics:
-        volume_trades.append(relvol_stat['trades'])
-        volume_profit_loss.append(utils.get_color_bar_chart_item_for_render(
-            round(relvol_stat['profit_loss'], 2)))
-        volume_total_profit.append(round(relvol_stat['total_profit'], 2))
-        volume_total_loss.append(round(relvol_stat['total_loss'], 2))
-        if relvol_stat['trades'] > 0:
-            volume_win_rate.append(
-                round(relvol_stat['win_trades']/relvol_stat['trades'] * 100, 2))
-        else:
-            volume_win_rate.append(0.0)
-        avg_profit = 1.0
-        if relvol_stat['win_trades'] > 0:
-            avg_profit = relvol_stat['total_profit'] / \
-                relvol_stat['win_trades']
-        avg_loss = 1.0
-        if relvol_stat['loss_trades'] > 0:
-            avg_loss = relvol_stat['total_loss'] / relvol_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if relvol_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if relvol_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        volume_profit_loss_ratio.append(profit_loss_ratio)
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.PRE_MARKET_VOLUME])[0]
 
     context = {
         "account_type": account_type,
         "algo_type_texts": algo_type_texts,
         "title": "Pre Hours Volume",
         "labels": utils.get_volume_labels(),
-        "profit_loss": volume_profit_loss,
-        "total_profit": volume_total_profit,
-        "total_loss": volume_total_loss,
-        "win_rate": volume_win_rate,
-        "profit_loss_ratio": volume_profit_loss_ratio,
-        "trades": volume_trades,
+        "profit_loss": stat_render['profit_loss'],
+        "total_profit": stat_render['total_profit'],
+        "total_loss": stat_render['total_loss'],
+        "win_rate": stat_render['win_rate'],
+        "profit_loss_ratio": stat_render['profit_loss_ratio'],
+        "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_bmovol_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_bmovol'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -1266,7 +863,8 @@ def day_reports_bmovol(request):
 @login_required
 def day_reports_amcvol(request):
 
-    cached_context = cache.get('day_reports_amcvol_cache')
+    cache_key = report_cache.get_context_key('day_reports_amcvol')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -1276,87 +874,24 @@ def day_reports_amcvol(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    volume_statistics = utils.get_stats_empty_list(
-        size=len(utils.get_volume_labels()))
-    # for P&L, win rate and profit/loss ratio, trades by relative volume
-    for day_trade in day_trades:
-        day_trade: DayTrade = day_trade
-        symbol = day_trade.symbol
-        buy_time = day_trade.buy_time
-        local_time = utils.local_datetime(buy_time)
-        # check bmo hour
-        if not utils.is_after_market_time(local_time):
-            continue
-        bars = []
-        for i in range(1, 3):
-            m_time = local_time - timedelta(minutes=i)
-            m_bar = db.get_hist_minute_bar(symbol, m_time)
-            # m_bar = db.get_hist_minute_bar(symbol, m_time)
-            if m_bar:
-                bars.append(m_bar)
-        avg_volume = 0
-        if len(bars) > 0:
-            total_vol = sum([bar.volume for bar in bars])
-            avg_volume = total_vol / len(bars)
-        vol_idx = utils.get_volume_index(avg_volume)
-        gain = day_trade.total_sold - day_trade.total_cost
-        if gain > 0:
-            volume_statistics[vol_idx]['win_trades'] += 1
-            volume_statistics[vol_idx]['total_profit'] += gain
-        else:
-            volume_statistics[vol_idx]['loss_trades'] += 1
-            volume_statistics[vol_idx]['total_loss'] += gain
-        volume_statistics[vol_idx]['profit_loss'] += gain
-        volume_statistics[vol_idx]['trades'] += 1
-
-    volume_profit_loss = []
-    volume_total_profit = []
-    volume_total_loss = []
-    volume_win_rate = []
-    volume_profit_loss_ratio = []
-    volume_trades = []
-    # calculate win rate and profit/loss ratio
-    for relvol_stat in volume_statistics:
-        volume_trades.append(relvol_stat['trades'])
-        volume_profit_loss.append(utils.get_color_bar_chart_item_for_render(
-            round(relvol_stat['profit_loss'], 2)))
-        volume_total_profit.append(round(relvol_stat['total_profit'], 2))
-        volume_total_loss.append(round(relvol_stat['total_loss'], 2))
-        if relvol_stat['trades'] > 0:
-            volume_win_rate.append(
-                round(relvol_stat['win_trades']/relvol_stat['trades'] * 100, 2))
-        else:
-            volume_win_rate.append(0.0)
-        avg_profit = 1.0
-        if relvol_stat['win_trades'] > 0:
-            avg_profit = relvol_stat['total_profit'] / \
-                relvol_stat['win_trades']
-        avg_loss = 1.0
-        if relvol_stat['loss_trades'] > 0:
-            avg_loss = relvol_stat['total_loss'] / relvol_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if relvol_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if relvol_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        volume_profit_loss_ratio.append(profit_loss_ratio)
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.AFTER_MARKET_VOLUME])[0]
 
     context = {
         "account_type": account_type,
         "algo_type_texts": algo_type_texts,
         "title": "After Hours Volume",
         "labels": utils.get_volume_labels(),
-        "profit_loss": volume_profit_loss,
-        "total_profit": volume_total_profit,
-        "total_loss": volume_total_loss,
-        "win_rate": volume_win_rate,
-        "profit_loss_ratio": volume_profit_loss_ratio,
-        "trades": volume_trades,
+        "profit_loss": stat_render['profit_loss'],
+        "total_profit": stat_render['total_profit'],
+        "total_loss": stat_render['total_loss'],
+        "win_rate": stat_render['win_rate'],
+        "profit_loss_ratio": stat_render['profit_loss_ratio'],
+        "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_amcvol_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_amcvol'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -1364,7 +899,8 @@ def day_reports_amcvol(request):
 @login_required
 def day_reports_sector(request):
 
-    cached_context = cache.get('day_reports_sector_cache')
+    cache_key = report_cache.get_context_key('day_reports_sector')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -1374,72 +910,24 @@ def day_reports_sector(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    sector_statistics = utils.get_stats_empty_list(
-        size=len(utils.get_sector_labels()))
-    # for P&L, win rate and profit/loss ratio, trades by sector
-    for day_trade in day_trades:
-        sector = None
-        quote = StockQuote.objects.filter(symbol=day_trade.symbol).first()
-        if quote:
-            sector = quote.sector
-        sector_idx = utils.get_sector_index(sector)
-        gain = day_trade.total_sold - day_trade.total_cost
-        if gain > 0:
-            sector_statistics[sector_idx]['win_trades'] += 1
-            sector_statistics[sector_idx]['total_profit'] += gain
-        else:
-            sector_statistics[sector_idx]['loss_trades'] += 1
-            sector_statistics[sector_idx]['total_loss'] += gain
-        sector_statistics[sector_idx]['profit_loss'] += gain
-        sector_statistics[sector_idx]['trades'] += 1
-    sector_profit_loss = []
-    sector_total_profit = []
-    sector_total_loss = []
-    sector_win_rate = []
-    sector_profit_loss_ratio = []
-    sector_trades = []
-    # calculate win rate and profit/loss ratio
-    for sector_stat in sector_statistics:
-        sector_trades.append(sector_stat['trades'])
-        sector_profit_loss.append(utils.get_color_bar_chart_item_for_render(
-            round(sector_stat['profit_loss'], 2)))
-        sector_total_profit.append(round(sector_stat['total_profit'], 2))
-        sector_total_loss.append(round(sector_stat['total_loss'], 2))
-        if sector_stat['trades'] > 0:
-            sector_win_rate.append(
-                round(sector_stat['win_trades']/sector_stat['trades'] * 100, 2))
-        else:
-            sector_win_rate.append(0.0)
-        avg_profit = 1.0
-        if sector_stat['win_trades'] > 0:
-            avg_profit = sector_stat['total_profit'] / \
-                sector_stat['win_trades']
-        avg_loss = 1.0
-        if sector_stat['loss_trades'] > 0:
-            avg_loss = sector_stat['total_loss'] / sector_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if sector_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if sector_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        sector_profit_loss_ratio.append(profit_loss_ratio)
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.SECTOR])[0]
 
     context = {
         "account_type": account_type,
         "algo_type_texts": algo_type_texts,
         "title": "Sector",
         "labels": utils.get_sector_labels(),
-        "profit_loss": sector_profit_loss,
-        "total_profit": sector_total_profit,
-        "total_loss": sector_total_loss,
-        "win_rate": sector_win_rate,
-        "profit_loss_ratio": sector_profit_loss_ratio,
-        "trades": sector_trades,
+        "profit_loss": stat_render['profit_loss'],
+        "total_profit": stat_render['total_profit'],
+        "total_loss": stat_render['total_loss'],
+        "win_rate": stat_render['win_rate'],
+        "profit_loss_ratio": stat_render['profit_loss_ratio'],
+        "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_sector_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_sector'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -1447,7 +935,8 @@ def day_reports_sector(request):
 @login_required
 def day_reports_holding(request):
 
-    cached_context = cache.get('day_reports_holding_cache')
+    cache_key = report_cache.get_context_key('day_reports_holding')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -1457,69 +946,24 @@ def day_reports_holding(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    holding_statistics = utils.get_stats_empty_list(
-        size=len(utils.get_holding_time_labels()))
-    # for P&L, win rate and profit/loss ratio, trades by holding time
-    for day_trade in day_trades:
-        holding_sec = (day_trade.sell_time - day_trade.buy_time).seconds
-        holding_idx = utils.get_holding_time_index(holding_sec)
-        gain = day_trade.total_sold - day_trade.total_cost
-        if gain > 0:
-            holding_statistics[holding_idx]['win_trades'] += 1
-            holding_statistics[holding_idx]['total_profit'] += gain
-        else:
-            holding_statistics[holding_idx]['loss_trades'] += 1
-            holding_statistics[holding_idx]['total_loss'] += gain
-        holding_statistics[holding_idx]['profit_loss'] += gain
-        holding_statistics[holding_idx]['trades'] += 1
-    holding_profit_loss = []
-    holding_total_profit = []
-    holding_total_loss = []
-    holding_win_rate = []
-    holding_profit_loss_ratio = []
-    holding_trades = []
-    # calculate win rate and profit/loss ratio
-    for holding_stat in holding_statistics:
-        holding_trades.append(holding_stat['trades'])
-        holding_profit_loss.append(utils.get_color_bar_chart_item_for_render(
-            round(holding_stat['profit_loss'], 2)))
-        holding_total_profit.append(round(holding_stat['total_profit'], 2))
-        holding_total_loss.append(round(holding_stat['total_loss'], 2))
-        if holding_stat['trades'] > 0:
-            holding_win_rate.append(
-                round(holding_stat['win_trades']/holding_stat['trades'] * 100, 2))
-        else:
-            holding_win_rate.append(0.0)
-        avg_profit = 1.0
-        if holding_stat['win_trades'] > 0:
-            avg_profit = holding_stat['total_profit'] / \
-                holding_stat['win_trades']
-        avg_loss = 1.0
-        if holding_stat['loss_trades'] > 0:
-            avg_loss = holding_stat['total_loss'] / holding_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if holding_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if holding_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        holding_profit_loss_ratio.append(profit_loss_ratio)
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.HOLDING_TIME])[0]
 
     context = {
         "account_type": account_type,
         "algo_type_texts": algo_type_texts,
         "title": "Holding Time",
         "labels": utils.get_holding_time_labels(),
-        "profit_loss": holding_profit_loss,
-        "total_profit": holding_total_profit,
-        "total_loss": holding_total_loss,
-        "win_rate": holding_win_rate,
-        "profit_loss_ratio": holding_profit_loss_ratio,
-        "trades": holding_trades,
+        "profit_loss": stat_render['profit_loss'],
+        "total_profit": stat_render['total_profit'],
+        "total_loss": stat_render['total_loss'],
+        "win_rate": stat_render['win_rate'],
+        "profit_loss_ratio": stat_render['profit_loss_ratio'],
+        "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_holding_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_holding'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -1527,7 +971,8 @@ def day_reports_holding(request):
 @login_required
 def day_reports_plpct(request):
 
-    cached_context = cache.get('day_reports_plpct_cache')
+    cache_key = report_cache.get_context_key('day_reports_plpct')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_field.html', cached_context)
 
@@ -1537,70 +982,24 @@ def day_reports_plpct(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    plpct_statistics = utils.get_stats_empty_list(
-        size=len(utils.get_plpct_range_labels()))
-    # for P&L, win rate and profit/loss ratio, trades by P/L percentage
-    for day_trade in day_trades:
-        percentage = round(
-            (day_trade.total_sold - day_trade.total_cost) / day_trade.total_cost * 100, 2)
-        percentage_idx = utils.get_plpct_range_index(percentage)
-        gain = day_trade.total_sold - day_trade.total_cost
-        if gain > 0:
-            plpct_statistics[percentage_idx]['win_trades'] += 1
-            plpct_statistics[percentage_idx]['total_profit'] += gain
-        else:
-            plpct_statistics[percentage_idx]['loss_trades'] += 1
-            plpct_statistics[percentage_idx]['total_loss'] += gain
-        plpct_statistics[percentage_idx]['profit_loss'] += gain
-        plpct_statistics[percentage_idx]['trades'] += 1
-    plpct_profit_loss = []
-    plpct_total_profit = []
-    plpct_total_loss = []
-    plpct_win_rate = []
-    plpct_profit_loss_ratio = []
-    plpct_trades = []
-    # calculate win rate and profit/loss ratio
-    for holding_stat in plpct_statistics:
-        plpct_trades.append(holding_stat['trades'])
-        plpct_profit_loss.append(utils.get_color_bar_chart_item_for_render(
-            round(holding_stat['profit_loss'], 2)))
-        plpct_total_profit.append(round(holding_stat['total_profit'], 2))
-        plpct_total_loss.append(round(holding_stat['total_loss'], 2))
-        if holding_stat['trades'] > 0:
-            plpct_win_rate.append(
-                round(holding_stat['win_trades']/holding_stat['trades'] * 100, 2))
-        else:
-            plpct_win_rate.append(0.0)
-        avg_profit = 1.0
-        if holding_stat['win_trades'] > 0:
-            avg_profit = holding_stat['total_profit'] / \
-                holding_stat['win_trades']
-        avg_loss = 1.0
-        if holding_stat['loss_trades'] > 0:
-            avg_loss = holding_stat['total_loss'] / holding_stat['loss_trades']
-        profit_loss_ratio = 0.0
-        if holding_stat['trades'] > 0:
-            profit_loss_ratio = 1.0
-        if holding_stat['trades'] > 0 and avg_loss < 0:
-            profit_loss_ratio = round(abs(avg_profit/avg_loss), 2)
-        plpct_profit_loss_ratio.append(profit_loss_ratio)
+    # day trade facts
+    stat_render = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.PLPCT])[0]
 
     context = {
         "account_type": account_type,
         "algo_type_texts": algo_type_texts,
         "title": "P/L %",
         "labels": utils.get_plpct_range_labels(),
-        "profit_loss": plpct_profit_loss,
-        "total_profit": plpct_total_profit,
-        "total_loss": plpct_total_loss,
-        "win_rate": plpct_win_rate,
-        "profit_loss_ratio": plpct_profit_loss_ratio,
-        "trades": plpct_trades,
+        "profit_loss": stat_render['profit_loss'],
+        "total_profit": stat_render['total_profit'],
+        "total_loss": stat_render['total_loss'],
+        "win_rate": stat_render['win_rate'],
+        "profit_loss_ratio": stat_render['profit_loss_ratio'],
+        "trades": stat_render['trades'],
     }
 
-    cache.set('day_reports_plpct_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_plpct'))
 
     return render(request, 'webull_trader/day_reports_field.html', context)
 
@@ -1608,7 +1007,8 @@ def day_reports_plpct(request):
 @login_required
 def day_reports_hourly(request):
 
-    cached_context = cache.get('day_reports_hourly_cache')
+    cache_key = report_cache.get_context_key('day_reports_hourly')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_hourly.html', cached_context)
 
@@ -1618,9 +1018,9 @@ def day_reports_hourly(request):
     # algo type data
     algo_type_texts = utils.get_algo_type_texts()
 
-    # day trades
-    day_trades = DayTrade.objects.filter(require_adjustment=False)
-    hourly_stat = utils.get_hourly_stat_from_trades_for_render(day_trades)
+    # day trade facts
+    hourly_stat = utils.get_day_trade_fact_stats_for_render(
+        [bucketing.MARKET_HOURLY])[0]
 
     context = {
         "account_type": account_type,
@@ -1633,7 +1033,7 @@ def day_reports_hourly(request):
         "hourly_trades": hourly_stat['trades'],
     }
 
-    cache.set('day_reports_hourly_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_hourly'))
 
     return render(request, 'webull_trader/day_reports_hourly.html', context)
 
@@ -1641,7 +1041,8 @@ def day_reports_hourly(request):
 @login_required
 def day_reports_daily(request):
 
-    cached_context = cache.get('day_reports_daily_cache')
+    cache_key = report_cache.get_context_key('day_reports_daily')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_daily.html', cached_context)
 
@@ -1676,7 +1077,7 @@ def day_reports_daily(request):
         "daily_trades": daily_trades,
     }
 
-    cache.set('day_reports_daily_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_daily'))
 
     return render(request, 'webull_trader/day_reports_daily.html', context)
 
@@ -1684,7 +1085,8 @@ def day_reports_daily(request):
 @login_required
 def day_reports_weekly(request):
 
-    cached_context = cache.get('day_reports_weekly_cache')
+    cache_key = report_cache.get_context_key('day_reports_weekly')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_weekly.html', cached_context)
 
@@ -1758,7 +1160,7 @@ def day_reports_weekly(request):
         "weekly_trades": weekly_trades,
     }
 
-    cache.set('day_reports_weekly_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_weekly'))
 
     return render(request, 'webull_trader/day_reports_weekly.html', context)
 
@@ -1766,7 +1168,8 @@ def day_reports_weekly(request):
 @login_required
 def day_reports_monthly(request):
 
-    cached_context = cache.get('day_reports_monthly_cache')
+    cache_key = report_cache.get_context_key('day_reports_monthly')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/day_reports_monthly.html', cached_context)
 
@@ -1840,7 +1243,7 @@ def day_reports_monthly(request):
         "monthly_trades": monthly_trades,
     }
 
-    cache.set('day_reports_monthly_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('day_reports_monthly'))
 
     return render(request, 'webull_trader/day_reports_monthly.html', context)
 
@@ -1848,7 +1251,8 @@ def day_reports_monthly(request):
 @login_required
 def swing_positions(request):
 
-    cached_context = cache.get('swing_positions_cache')
+    cache_key = report_cache.get_context_key('swing_positions')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/swing_positions.html', cached_context)
 
@@ -1922,7 +1326,7 @@ def swing_positions(request):
         "swing_positions": swing_positions,
     }
 
-    cache.set('swing_positions_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('swing_positions'))
 
     return render(request, 'webull_trader/swing_positions.html', context)
 
@@ -1930,8 +1334,8 @@ def swing_positions(request):
 @login_required
 def swing_positions_symbol(request, symbol=None):
 
-    cached_context = cache.get(
-        'swing_positions_symbol_{}_cache'.format(symbol))
+    cache_key = report_cache.get_context_key('swing_positions_symbol', symbol)
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/swing_positions_symbol.html', cached_context)
 
@@ -2031,8 +1435,7 @@ def swing_positions_symbol(request, symbol=None):
         "news": news,
     }
 
-    cache.set('swing_positions_symbol_{}_cache'.format(
-        symbol), context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('swing_positions_symbol'))
 
     return render(request, 'webull_trader/swing_positions_symbol.html', context)
 
@@ -2040,7 +1443,8 @@ def swing_positions_symbol(request, symbol=None):
 @login_required
 def swing_analytics(request):
 
-    cached_context = cache.get('swing_analytics_cache')
+    cache_key = report_cache.get_context_key('swing_analytics')
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/swing_analytics.html', cached_context)
 
@@ -2097,7 +1501,7 @@ def swing_analytics(request):
         "swing_top_loss": swing_top_loss,
     }
 
-    cache.set('swing_analytics_cache', context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('swing_analytics'))
 
     return render(request, 'webull_trader/swing_analytics.html', context)
 
@@ -2105,8 +1509,8 @@ def swing_analytics(request):
 @login_required
 def swing_analytics_symbol(request, symbol=None):
 
-    cached_context = cache.get(
-        'swing_analytics_{}_cache'.format(symbol))
+    cache_key = report_cache.get_context_key('swing_analytics_symbol', symbol)
+    cached_context = cache.get(cache_key)
     if cached_context:
         return render(request, 'webull_trader/swing_analytics_symbol.html', cached_context)
 
@@ -2178,7 +1582,6 @@ def swing_analytics_symbol(request, symbol=None):
         "d1_trade_quantity_records": d1_trade_quantity_records,
     }
 
-    cache.set('swing_analytics_{}_cache'.format(
-        symbol), context, config.CACHE_TIMEOUT)
+    cache.set(cache_key, context, report_cache.get_timeout('swing_analytics_symbol'))
 
     return render(request, 'webull_trader/swing_analytics_symbol.html', context)